@@ -0,0 +1,18 @@
+"""
+Offline benchmark suite for the helper scripts in scripts/.
+
+Every benchmark runs against synthetic fixtures generated into a temp dir (and a
+local stub HTTP server for the Steam lookups), so it works on Linux without
+network access or any launcher installed.
+
+  python -m benchmarks                      # default sizes, writes benchmarks/results/latest.json
+  python -m benchmarks --quick              # small sizes only
+  python -m benchmarks --baseline old.json  # compare medians, exit 1 on regressions
+"""
+
+import os
+import sys
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+if SCRIPTS_DIR not in sys.path:
+    sys.path.insert(0, SCRIPTS_DIR)
@@ -0,0 +1,357 @@
+"""Runs every benchmark and writes the timings as JSON (see benchmarks/__init__.py)."""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+from . import fixtures
+from .stub_server import SteamStub
+
+import steam_detect
+import verify_install
+import disk_usage
+import epic_detect
+import gog_detect
+import launcher_events
+import proc
+import ubisoft_detect
+import xbox_detect
+import SteamApi_Search
+import artwork_fetch
+import library_index
+import library_state
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+SIZES = {
+    'steam_manifests': (100, 1000, 5000),
+    'drive_tree': ((4, 3), (6, 4), (8, 4)),
+    'ubisoft_dirs': (200, 2000, 8000),
+    'ubisoft_installs': (20, 100, 400),
+    'processes': (300, 1500, 6000),
+    'applist': (10_000, 50_000, 150_000),
+    'xbox_packages': (50, 300, 1000),
+    'epic_manifests': (50, 300, 1500),
+    'gog_games': (50, 300, 1500),
+    'log_lines': (10_000, 100_000, 500_000),
+    'library_games': (1000, 10_000, 50_000),
+}
+QUICK = {k: v[:1] for k, v in SIZES.items()}
+
+
+def bench(results, name, size, fn, repeat=5):
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - t0) * 1000.0)
+    rec = {
+        'name': name,
+        'size': size,
+        'repeat': repeat,
+        'minMs': round(min(times), 3),
+        'medianMs': round(statistics.median(times), 3),
+        'meanMs': round(statistics.fmean(times), 3),
+    }
+    results.append(rec)
+    print(f"{name:<40} {str(size):>10}  median {rec['medianMs']:>10.3f} ms  min {rec['minMs']:>10.3f} ms", file=sys.stderr)
+    return rec
+
+
+def run_steam(results, tmp, sizes):
+    for n in sizes['steam_manifests']:
+        lib = fixtures.make_steam_library(os.path.join(tmp, f'steam{n}'), n)
+        bench(results, 'steam_detect.list_steam_games', n, lambda: steam_detect.list_steam_games([lib]))
+        appids = [str(10000 + i) for i in range(n)]
+        appinfo = fixtures.make_steam_appinfo(os.path.join(tmp, f'steam{n}'), appids, extra=n * 20)
+        bench(results, 'steam_detect.read_app_details', n, lambda: steam_detect.read_app_details(appinfo, appids))
+    for breadth, depth in sizes['drive_tree']:
+        root = fixtures.make_drive_tree(os.path.join(tmp, f'drive{breadth}x{depth}'), breadth, depth, libraries=3)
+        bench(results, 'steam_detect.find_steam_libraries', f'{breadth}^{depth}',
+              lambda: steam_detect.find_steam_libraries([], drives=[root]), repeat=3)
+
+
+def run_epic(results, tmp, sizes):
+    for n in sizes['epic_manifests']:
+        manifests, dat = fixtures.make_epic_manifests(os.path.join(tmp, f'epic{n}'), n)
+        cache = os.path.join(tmp, f'epic{n}.cache.json')
+        bench(results, 'epic_detect.detect(cold)', n,
+              lambda: epic_detect.detect(manifests, dat, None), repeat=3)
+        epic_detect.detect(manifests, dat, cache)
+        bench(results, 'epic_detect.detect(cached)', n, lambda: epic_detect.detect(manifests, dat, cache))
+
+
+def run_gog(results, tmp, sizes):
+    from glhelpers.registry import MemoryBackend
+    for n in sizes['gog_games']:
+        registry, games_root = fixtures.make_gog_library(os.path.join(tmp, f'gog{n}'), n)
+        backend = MemoryBackend.from_json(registry)
+        bench(results, 'gog_detect.detect', n, lambda: gog_detect.detect([games_root], backend), repeat=3)
+
+
+def run_events(results, tmp, sizes):
+    for n in sizes['log_lines']:
+        log = fixtures.append_steam_content_log(os.path.join(tmp, f'logs{n}', 'content_log.txt'), n)
+        bench(results, 'launcher_events.LogTail.read(prime)', n,
+              lambda: launcher_events.LogTail('steam', log).read(), repeat=3)
+        tail = launcher_events.LogTail('steam', log)
+        tail.read()
+        appended = [n]
+
+        def incremental():
+            fixtures.append_steam_content_log(log, 100, start=appended[0])
+            appended[0] += 100
+            tail.read()
+        bench(results, 'launcher_events.LogTail.read(+100 lines)', n, incremental)
+
+
+def run_disk(results, tmp, sizes):
+    from glhelpers.stamp_cache import StampCache
+    for n in sizes['ubisoft_dirs']:
+        roots = {f'gog:{i}': fixtures.make_ubisoft_game(os.path.join(tmp, f'du{n}', f'g{i}'), f'Game{i}', n // 4, 8, depth=5)
+                 for i in range(4)}
+        bench(results, 'disk_usage.walk_sizes(cold)', n, lambda: disk_usage.walk_sizes(roots, StampCache()), repeat=3)
+        cache = StampCache()
+        disk_usage.walk_sizes(roots, cache)
+        bench(results, 'disk_usage.walk_sizes(cached)', n, lambda: disk_usage.walk_sizes(roots, cache), repeat=3)
+        game, manifest = roots['gog:0'], os.path.join(tmp, f'du{n}', 'verify.json')
+        verify_install.make_baseline(game, manifest, workers=1)
+        bench(results, 'verify_install.verify(unchanged)', n, lambda: verify_install.verify(game, manifest), repeat=3)
+        bench(results, 'verify_install.verify(full)', n, lambda: verify_install.verify(game, manifest, full=True), repeat=3)
+
+
+def run_proc(results, sizes):
+    filters = proc._build_find_filters({
+        'executablePath': 'C:\\Games\\Star Forge\\bin\\starforge.exe',
+        'installDir': 'C:\\Games\\Star Forge',
+        'title': 'star forge',
+    })
+    for n in sizes['processes']:
+        procs = fixtures.make_process_snapshot(n)
+        bench(results, 'proc.ProcessTable', n, lambda: proc.ProcessTable(procs))
+        table = proc.ProcessTable(procs)
+        bench(results, 'proc.action_find(rank)', n, lambda: proc._rank_candidates(table, filters))
+
+
+def run_ubisoft(results, tmp, sizes):
+    from pathlib import Path
+    for n in sizes['ubisoft_dirs']:
+        game = fixtures.make_ubisoft_game(os.path.join(tmp, f'ubi{n}'), 'StarForge', n, 8, depth=6)
+        bench(results, 'ubisoft_detect.find_likely_exe', n, lambda: ubisoft_detect.find_likely_exe(Path(game)), repeat=3)
+    from glhelpers import ubisoft_config
+    from glhelpers.registry import RegistrySnapshot, MemoryBackend
+    from glhelpers.stamp_cache import StampCache
+    for n in sizes['ubisoft_installs']:
+        games_root, registry, configurations, titles = fixtures.make_ubisoft_library(os.path.join(tmp, f'ubilib{n}'), n)
+        snapshot = RegistrySnapshot(MemoryBackend.from_json(registry))
+        bench(results, 'ubisoft_config.read_configurations(all)', n * 4,
+              lambda: ubisoft_config.read_configurations(configurations), repeat=3)
+        bench(results, 'ubisoft_config.read_configurations(installed)', n * 4,
+              lambda: ubisoft_config.read_configurations(configurations, set(titles)), repeat=3)
+        bench(results, 'ubisoft_detect.detect(cold)', n,
+              lambda: ubisoft_detect.detect([games_root], snapshot, StampCache()), repeat=3)
+        cache = StampCache()
+        ubisoft_detect.detect([games_root], snapshot, cache)
+        bench(results, 'ubisoft_detect.detect(cached)', n, lambda: ubisoft_detect.detect([games_root], snapshot, cache))
+
+
+def run_xbox(results, tmp, sizes):
+    from glhelpers.registry import RegistrySnapshot, MemoryBackend
+    from glhelpers.stamp_cache import StampCache
+    for n in sizes['xbox_packages']:
+        games_root, registry = fixtures.make_xbox_library(os.path.join(tmp, f'xbox{n}'), n)
+        snapshot = RegistrySnapshot(MemoryBackend.from_json(registry))
+        bench(results, 'xbox_detect.detect(cold)', n,
+              lambda: xbox_detect.detect(snapshot, [games_root], StampCache()), repeat=3)
+        cache = StampCache()
+        xbox_detect.detect(snapshot, [games_root], cache)
+        bench(results, 'xbox_detect.detect(cached)', n, lambda: xbox_detect.detect(snapshot, [games_root], cache))
+
+
+def run_steam_search(results, tmp, sizes):
+    for n in sizes['steam_manifests']:
+        root = os.path.join(tmp, f'artwork{n}')
+        appids = [10000 + i for i in range(n)]
+        fixtures.make_steam_appinfo(root, appids, extra=n * 20)
+        fixtures.make_steam_librarycache(root, appids)
+        title = steam_detect.read_app_details(os.path.join(root, 'appcache', 'appinfo.vdf'), [str(appids[-1])])[str(appids[-1])]['title']
+
+        def cold():
+            SteamApi_Search._local.clear()
+            return SteamApi_Search.resolve_thumbnail(title, root)
+
+        bench(results, 'SteamApi_Search.resolve_thumbnail(cold)', n, cold, repeat=3)
+        bench(results, 'SteamApi_Search.resolve_thumbnail(local)', n,
+              lambda: SteamApi_Search.resolve_thumbnail(title, root), repeat=20)
+    os.environ.setdefault('NO_PROXY', '127.0.0.1,localhost')
+    os.environ.setdefault('no_proxy', '127.0.0.1,localhost')
+    for n in sizes['applist']:
+        apps = fixtures.make_app_list(n)
+        hit_title = apps[-1]['name']
+        with SteamStub(apps) as stub:
+            restore = stub.patch(SteamApi_Search)
+            try:
+                stub.search_hits = True
+                bench(results, 'SteamApi_Search.find_steam_appid(search)', n,
+                      lambda: SteamApi_Search.find_steam_appid(hit_title))
+                stub.search_hits = False
+                bench(results, 'SteamApi_Search.find_steam_appid(applist)', n,
+                      lambda: SteamApi_Search.find_steam_appid(hit_title), repeat=3)
+                bench(results, 'SteamApi_Search.find_steam_appid(miss)', n,
+                      lambda: SteamApi_Search.find_steam_appid('zzqx no such game'), repeat=3)
+                # 200 lookups (every tenth title requested twice) with the gates wide open
+                lines = [json.dumps({ 'op': 'want', 'key': f'k{i}', 'title': apps[i % 180]['name'], 'priority': i })
+                         for i in range(200)]
+                gate = artwork_fetch.HostGate({}, (8, 1e6, 1e6))
+                bench(results, 'artwork_fetch.serve', n,
+                      lambda: artwork_fetch.serve(lines, lambda _obj: None, workers=4, gate=gate), repeat=3)
+            finally:
+                restore()
+                SteamApi_Search.http_gate = None
+                SteamApi_Search.applist_ttl = 0.0
+
+
+def run_library_index(results, sizes):
+    queries = ('dark souls', 'kamon', 'kingdo', 'shadw', 'racing 2', 's', 'iron knight ii', 'orge', 'zzqx')
+    for n in sizes['library_games']:
+        games = fixtures.make_library(n)
+        bench(results, 'library_index.sync(build)', n, lambda: library_index.LibraryIndex().sync(games), repeat=3)
+        index = library_index.LibraryIndex()
+        index.sync(games)
+        bench(results, 'library_index.sync(unchanged)', n, lambda: index.sync(games))
+        # 1% of titles renamed and 1% of games dropped, then back again
+        edited = [{ **g, 'title': g['title'] + ' Redux' } if i % 100 == 0 else g
+                  for i, g in enumerate(games) if i % 100 != 50]
+
+        def churn():
+            index.sync(edited)
+            index.sync(games)
+
+        bench(results, 'library_index.sync(2% churn x2)', n, churn)
+        for q in queries:
+            bench(results, f'library_index.search({q!r})', n, lambda: index.search(q, 50), repeat=20)
+        found = [k for k, _ in index.search(games[-1]['title'], n)]
+        assert library_index.game_key(games[-1]) in found
+
+
+def run_library_state(results, sizes):
+    for n in sizes['library_games']:
+        games = [{ **g, 'playtimeMinutes': i % 600, 'lastPlayedAt': 0 } for i, g in enumerate(fixtures.make_library(n))]
+        bench(results, 'library_state.commit(build)', n, lambda: library_state.LibraryState().commit(games), repeat=3)
+        state = library_state.LibraryState()
+        state.commit(games)
+        bench(results, 'library_state.commit(unchanged)', n, lambda: state.commit(games))
+        # 1% of games gain playtime, then it is rolled back
+        played = [{ **g, 'playtimeMinutes': g['playtimeMinutes'] + 30 } if i % 100 == 0 else g for i, g in enumerate(games)]
+        before = state.version
+
+        def churn():
+            state.commit(played)
+            state.commit(games)
+
+        bench(results, 'library_state.commit(1% changed x2)', n, churn)
+        current = state.version
+        bench(results, 'library_state.since(current)', n, lambda: state.since(current), repeat=20)
+        bench(results, 'library_state.since(before churn)', n, lambda: state.since(before), repeat=20)
+        bench(results, 'library_state.since(stale)', n, lambda: state.since(0), repeat=5)
+
+
+def run_metrics(results, tmp):
+    from glhelpers import metrics
+    n = 100_000
+    values = [(i * 7919) % 50_000 / 100.0 for i in range(n)]
+
+    def observe_all():
+        for v in values:
+            metrics.observe('bench_ms', v, kind='a')
+
+    bench(results, 'metrics.observe(disabled)', n, observe_all)
+    metrics.enable(os.path.join(tmp, 'metrics.json'))
+    try:
+        bench(results, 'metrics.observe', n, observe_all)
+        for i in range(200):
+            metrics.inc('bench_total', kind=str(i % 4))
+        metrics.flush()
+        data = metrics.load(metrics.path())
+        bench(results, 'metrics.render_prometheus', n, lambda: metrics.render_prometheus(data))
+    finally:
+        metrics.disable()
+
+
+def compare(current, baseline_path, threshold):
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        base = {(r['name'], str(r['size'])): r for r in json.load(f).get('results', [])}
+    regressions = []
+    for r in current:
+        b = base.get((r['name'], str(r['size'])))
+        if not b or not b['medianMs']:
+            continue
+        ratio = r['medianMs'] / b['medianMs']
+        r['baselineMedianMs'] = b['medianMs']
+        r['ratio'] = round(ratio, 3)
+        if ratio > threshold:
+            regressions.append(r)
+    for r in regressions:
+        print(f"REGRESSION {r['name']} [{r['size']}]: {r['baselineMedianMs']} -> {r['medianMs']} ms (x{r['ratio']})", file=sys.stderr)
+    return regressions
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description='Benchmark the scripts/ hot paths')
+    parser.add_argument('--quick', action='store_true', help='Run only the smallest size of each benchmark')
+    parser.add_argument('--only', action='append', default=[], help='Run only groups: steam, epic, gog, events, disk, proc, ubisoft, xbox, search, index, state, metrics')
+    parser.add_argument('--out', default=os.path.join(RESULTS_DIR, 'latest.json'), help='Where to write JSON results')
+    parser.add_argument('--baseline', help='Previous results JSON to compare against')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Median ratio counted as a regression')
+    args = parser.parse_args(argv)
+
+    sizes = QUICK if args.quick else SIZES
+    groups = set(args.only) or {'steam', 'epic', 'gog', 'events', 'disk', 'proc', 'ubisoft', 'xbox', 'search', 'index', 'state', 'metrics'}
+    results = []
+    with tempfile.TemporaryDirectory(prefix='gl-bench-') as tmp:
+        if 'steam' in groups:
+            run_steam(results, tmp, sizes)
+        if 'epic' in groups:
+            run_epic(results, tmp, sizes)
+        if 'gog' in groups:
+            run_gog(results, tmp, sizes)
+        if 'events' in groups:
+            run_events(results, tmp, sizes)
+        if 'disk' in groups:
+            run_disk(results, tmp, sizes)
+        if 'proc' in groups:
+            run_proc(results, sizes)
+        if 'ubisoft' in groups:
+            run_ubisoft(results, tmp, sizes)
+        if 'xbox' in groups:
+            run_xbox(results, tmp, sizes)
+        if 'search' in groups:
+            run_steam_search(results, tmp, sizes)
+        if 'index' in groups:
+            run_library_index(results, sizes)
+        if 'state' in groups:
+            run_library_state(results, sizes)
+        if 'metrics' in groups:
+            run_metrics(results, tmp)
+
+    regressions = compare(results, args.baseline, args.threshold) if args.baseline else []
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump({
+            'createdAt': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'quick': bool(args.quick),
+            'results': results,
+        }, f, indent=2)
+    print(f'wrote {len(results)} results to {args.out}', file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,490 @@
+"""Synthetic fixture generators for the benchmark suite."""
+
+import ntpath
+import os
+import random
+
+_WORDS = (
+    'dark', 'souls', 'legend', 'quest', 'star', 'war', 'city', 'racing', 'shadow', 'tactics',
+    'empire', 'forge', 'hollow', 'knight', 'sky', 'ocean', 'iron', 'storm', 'saga', 'frontier',
+    'zero', 'dawn', 'edge', 'rise', 'fall', 'kingdom', 'world', 'hunter', 'craft', 'lands',
+)
+
+
+def game_title(rng, i):
+    n = rng.randint(1, 4)
+    return ' '.join(rng.choice(_WORDS).capitalize() for _ in range(n)) + f' {i}'
+
+
+def make_library(n, seed=11):
+    """Return `n` detector-shaped games across launchers with made-up titles, aliases and folders."""
+    rng = random.Random(seed)
+    syllables = ('ka', 'ri', 'mon', 'tel', 'dra', 'vos', 'lin', 'gar', 'eth', 'zu', 'or', 'bel', 'qua', 'nix')
+    launchers = ('steam', 'epic', 'gog', 'ubisoft', 'xbox')
+    games = []
+    for i in range(n):
+        words = [rng.choice(_WORDS) if rng.random() < 0.5 else ''.join(rng.choice(syllables) for _ in range(rng.randint(2, 3)))
+                 for _ in range(rng.randint(1, 4))]
+        if rng.random() < 0.2:
+            words.append(rng.choice(('2', '3', 'II', 'IV', 'Remastered', 'Deluxe Edition')))
+        title = ' '.join(w.capitalize() for w in words)
+        launcher = launchers[i % len(launchers)]
+        gid = {
+            'steam': str(1000 + i), 'gog': str(1_200_000_000 + i), 'ubisoft': str(i),
+            'epic': ''.join(w.capitalize() for w in words[:2]) + str(i),
+            'xbox': f"Studio{i % 50}.{''.join(w.capitalize() for w in words[:2])}_8wekyb3d8bbwe",
+        }[launcher]
+        games.append({
+            'id': gid, 'title': title, 'launcher': launcher,
+            'installDir': f"C:\\Games\\{''.join(w.capitalize() for w in words)}",
+        })
+    return games
+
+
+def make_steam_library(root, n, seed=1):
+    """Create <root>/steamapps with `n` appmanifest_*.acf files; return the steamapps path."""
+    rng = random.Random(seed)
+    lib = os.path.join(root, 'steamapps')
+    os.makedirs(os.path.join(lib, 'common'), exist_ok=True)
+    for i in range(n):
+        appid = 10000 + i
+        title = game_title(rng, i)
+        text = (
+            '"AppState"\n{\n'
+            f'\t"appid"\t\t"{appid}"\n'
+            '\t"universe"\t\t"1"\n'
+            f'\t"name"\t\t"{title}"\n'
+            '\t"StateFlags"\t\t"4"\n'
+            f'\t"installdir"\t\t"{title.replace(" ", "")}"\n'
+            f'\t"SizeOnDisk"\t\t"{rng.randint(1, 80) * 1_000_000_000}"\n'
+            '\t"InstalledDepots"\n\t{\n'
+            + ''.join(f'\t\t"{appid + d}"\n\t\t{{\n\t\t\t"manifest"\t\t"{rng.getrandbits(63)}"\n\t\t}}\n' for d in range(1, 3))
+            + '\t}\n}\n'
+        )
+        with open(os.path.join(lib, f'appmanifest_{appid}.acf'), 'w', encoding='utf-8') as f:
+            f.write(text)
+    return lib
+
+
+def make_drive_tree(root, breadth, depth, libraries=1, seed=2):
+    """Create a directory tree `breadth` wide and `depth` deep with `libraries` steamapps dirs inside."""
+    rng = random.Random(seed)
+    leaves = []
+
+    def grow(path, level):
+        if level == depth:
+            leaves.append(path)
+            return
+        for b in range(breadth):
+            child = os.path.join(path, f'd{level}_{b}')
+            os.makedirs(child, exist_ok=True)
+            grow(child, level + 1)
+
+    os.makedirs(root, exist_ok=True)
+    grow(root, 0)
+    for leaf in rng.sample(leaves, min(libraries, len(leaves))):
+        os.makedirs(os.path.join(os.path.dirname(leaf), 'steamapps'), exist_ok=True)
+    return root
+
+
+def make_ubisoft_game(root, name, dirs, files_per_dir, depth, seed=3):
+    """Create a game folder with a deep asset tree and a handful of exes (only one is the game)."""
+    rng = random.Random(seed)
+    game = os.path.join(root, name)
+    os.makedirs(game, exist_ok=True)
+    made = 0
+    frontier = [game]
+    while made < dirs:
+        parent = rng.choice(frontier)
+        if parent.count(os.sep) - game.count(os.sep) >= depth:
+            continue
+        child = os.path.join(parent, f'assets{made}')
+        os.makedirs(child, exist_ok=True)
+        frontier.append(child)
+        for j in range(files_per_dir):
+            open(os.path.join(child, f'chunk{j}.pak'), 'wb').close()
+        made += 1
+    helpers = ('UbisoftCrashReporter.exe', 'vcredist_x64.exe', 'EasyAntiCheat_Setup.exe', 'uplay_install.exe')
+    for h in helpers:
+        open(os.path.join(rng.choice(frontier), h), 'wb').close()
+    deepest = max(frontier, key=lambda p: p.count(os.sep))
+    open(os.path.join(deepest, f'{name}.exe'), 'wb').close()
+    return game
+
+
+def make_ubisoft_library(root, n, seed=12):
+    """Create `n` Ubisoft installs named only by product id, plus a Connect configurations cache.
+
+    The cache also holds three uninstalled products per install; every other
+    install has no DisplayName in the registry fixture. Returns (games root,
+    registry JSON path, configurations path, {id: expected title})."""
+    import json
+    from glhelpers.ubisoft_config import encode_record
+    rng = random.Random(seed)
+    games_root = os.path.join(root, 'games')
+    launcher = os.path.join(root, 'Ubisoft Game Launcher')
+    os.makedirs(os.path.join(launcher, 'cache', 'configuration'), exist_ok=True)
+    os.makedirs(os.path.join(launcher, 'cache', 'assets'), exist_ok=True)
+    registry = {'HKLM\\SOFTWARE\\WOW6432Node\\Ubisoft\\Launcher': {'InstallDir': launcher}}
+    titles = {}
+    records = []
+    for i in range(n * 4):
+        pid = 100 + i
+        title = game_title(rng, i)
+        stem = title.replace(' ', '')
+        thumb = f'{rng.getrandbits(64):016x}.jpg'
+        records.append(encode_record(pid, (
+            'version: 2.0\nroot:\n  name: l1\n'
+            f'  thumb_image: {thumb}\n  logo_image: {rng.getrandbits(64):016x}.png\n'
+            '  start_game:\n    offline:\n      executables:\n'
+            f'      - path:\n          relative: bin\\{stem}_launcher.exe\n'
+            f'      - path:\n          relative: bin\\{stem}.exe\n'
+            '        working_directory:\n'
+            f'          register: HKEY_LOCAL_MACHINE\\SOFTWARE\\Ubisoft\\Launcher\\Installs\\{pid}\\InstallDir\n'
+            '    online:\n      executables:\n'
+            f'      - path:\n          relative: bin\\{stem}.exe\n'
+            '  installer:\n    game_identifier: ' + stem + '\n    publisher: Ubisoft\n'
+            '  uninstall:\n    display_name: l1\n'
+            + ''.join(f'  tag{j}: value {j}\n' for j in range(rng.randint(5, 40)))
+            + f'localizations:\n  default:\n    l1: "{title}"\n    l2: "{title} description"\n'
+        )))
+        if i % 4:
+            continue
+        game = os.path.join(games_root, str(pid))
+        os.makedirs(os.path.join(game, 'bin'), exist_ok=True)
+        open(os.path.join(game, 'bin', f'{stem}.exe'), 'wb').close()
+        if i % 8 == 0:
+            open(os.path.join(launcher, 'cache', 'assets', thumb), 'wb').close()
+        reg = {'InstallDir': game}
+        if i % 8 == 4:
+            reg['DisplayName'] = title
+        registry[f'HKLM\\SOFTWARE\\WOW6432Node\\Ubisoft\\Launcher\\Installs\\{pid}'] = reg
+        titles[str(pid)] = title
+    configurations = os.path.join(launcher, 'cache', 'configuration', 'configurations')
+    with open(configurations, 'wb') as f:
+        f.write(b''.join(records))
+    path = os.path.join(root, 'registry.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=2)
+    return games_root, path, configurations, titles
+
+
+def make_process_snapshot(n, game_dir='c:\\games\\star forge', seed=4):
+    """Return `n` Win32_Process-shaped dicts; a few belong to the tracked game."""
+    rng = random.Random(seed)
+    images = ('svchost.exe', 'chrome.exe', 'explorer.exe', 'code.exe', 'steam.exe', 'discord.exe', 'runtimebroker.exe')
+    procs = []
+    for i in range(n):
+        img = rng.choice(images)
+        path = f'C:\\Windows\\System32\\{img}' if img in ('svchost.exe', 'runtimebroker.exe', 'explorer.exe') else f'C:\\Program Files\\{img[:-4]}\\{img}'
+        procs.append({
+            'ProcessId': 1000 + i * 4,
+            'ParentProcessId': 1000 + rng.randrange(max(1, i)) * 4 if i else 4,
+            'Name': img,
+            'ExecutablePath': path,
+            'CommandLine': f'"{path}" --type=renderer --field-trial-handle={rng.getrandbits(64)} ' + '--flag ' * rng.randint(0, 40),
+        })
+    for k in range(3):
+        pos = rng.randrange(len(procs)) if procs else 0
+        exe = f'{game_dir}\\bin\\starforge{k or ""}.exe'
+        procs.insert(pos, {
+            'ProcessId': 900000 + k, 'ParentProcessId': 4, 'Name': ntpath.basename(exe),
+            'ExecutablePath': exe.replace('c:', 'C:'), 'CommandLine': f'"{exe}"',
+        })
+    return procs
+
+
+def make_app_list(n, seed=5):
+    """Return a GetAppList-shaped list of `n` {appid, name} entries."""
+    rng = random.Random(seed)
+    return [{'appid': 100 + i, 'name': game_title(rng, i)} for i in range(n)]
+
+
+def make_xbox_library(root, n, seed=6):
+    """Create <root>/XboxGames with `n` packages (Content/AppxManifest.xml + MicrosoftGame.config).
+
+    Every fifth package is also listed in a GamingServices registry fixture, installed
+    outside XboxGames; returns (XboxGames root, registry JSON path)."""
+    import json
+    rng = random.Random(seed)
+    games_root = os.path.join(root, 'XboxGames')
+    registry = {}
+    publisher = 'CN=Microsoft Corporation, O=Microsoft Corporation, L=Redmond, S=Washington, C=US'
+    for i in range(n):
+        title = game_title(rng, i)
+        name = f'Microsoft.{title.replace(" ", "")}'
+        folder = os.path.join(root, 'Other', title.replace(' ', '')) if i % 5 == 4 else os.path.join(games_root, title.replace(' ', ''))
+        content = os.path.join(folder, 'Content')
+        os.makedirs(os.path.join(content, 'Assets'), exist_ok=True)
+        with open(os.path.join(content, 'AppxManifest.xml'), 'w', encoding='utf-8') as f:
+            f.write(
+                '<?xml version="1.0" encoding="utf-8"?>\n'
+                '<Package xmlns="http://schemas.microsoft.com/appx/manifest/foundation/windows10" '
+                'xmlns:uap="http://schemas.microsoft.com/appx/manifest/uap/windows10">\n'
+                f'  <Identity Name="{name}" Publisher="{publisher}" Version="1.0.{i}.0" ProcessorArchitecture="x64" />\n'
+                '  <Properties>\n    <DisplayName>ms-resource:ApplicationDisplayName</DisplayName>\n'
+                '    <PublisherDisplayName>Microsoft Studios</PublisherDisplayName>\n'
+                '    <Logo>Assets\\StoreLogo.png</Logo>\n  </Properties>\n'
+                '  <Applications>\n'
+                '    <Application Id="Game" Executable="gamelaunchhelper.exe" EntryPoint="Windows.FullTrustApplication">\n'
+                f'      <uap:VisualElements DisplayName="{title}" Square150x150Logo="Assets\\Logo.png" Description="{title}" BackgroundColor="transparent" />\n'
+                '    </Application>\n  </Applications>\n'
+                + ''.join(f'  <Capabilities><Capability Name="internetClient{j}" /></Capabilities>\n' for j in range(rng.randint(5, 40)))
+                + '</Package>\n'
+            )
+        with open(os.path.join(content, 'MicrosoftGame.config'), 'w', encoding='utf-8') as f:
+            f.write(
+                '<?xml version="1.0" encoding="utf-8"?>\n<Game configVersion="1">\n'
+                f'  <Identity Name="{name}" Publisher="{publisher}" Version="1.0.{i}.0" />\n'
+                f'  <ExecutableList>\n    <Executable Name="{title.replace(" ", "")}.exe" Id="Game" />\n  </ExecutableList>\n'
+                f'  <ShellVisuals DefaultDisplayName="{title}" PublisherDisplayName="Microsoft Studios" '
+                'StoreLogo="Assets\\StoreLogo.png" Square150x150Logo="Assets\\Logo.png" />\n</Game>\n'
+            )
+        with open(os.path.join(content, 'Assets', 'StoreLogo.scale-100.png'), 'wb') as f:
+            f.write(b'\x89PNG\r\n\x1a\n')
+        if i % 5 == 4:
+            registry[f'HKLM\\SOFTWARE\\Microsoft\\GamingServices\\Games\\{i}'] = {
+                'PackageFamilyName': f'{name}_8wekyb3d8bbwe', 'InstallFullPath': folder,
+            }
+    path = os.path.join(root, 'registry.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=2)
+    return games_root, path
+
+
+def make_epic_manifests(root, n, seed=7):
+    """Create an Epic Manifests dir with `n` .item files plus LauncherInstalled.dat.
+
+    Every tenth manifest is a DLC and every 25th is missing from the .dat; returns (manifests, dat)."""
+    import json
+    rng = random.Random(seed)
+    manifests = os.path.join(root, 'Manifests')
+    os.makedirs(manifests, exist_ok=True)
+    installed = []
+    for i in range(n):
+        title = game_title(rng, i)
+        app = f'App{i:05d}'
+        install = os.path.join(root, 'Games', title.replace(' ', ''))
+        data = {
+            'FormatVersion': 0,
+            'bIsIncompleteInstall': False,
+            'DisplayName': title,
+            'InstallationGuid': f'{rng.getrandbits(128):032X}',
+            'InstallLocation': install,
+            'LaunchExecutable': f'Binaries/Win64/{title.replace(" ", "")}.exe',
+            'InstallSize': rng.randint(1, 80) * 1_000_000_000,
+            'AppName': app,
+            'MainGameAppName': f'App{i - 1:05d}' if i % 10 == 9 else app,
+            'CatalogItemId': f'{rng.getrandbits(128):032x}',
+            'CatalogNamespace': f'{rng.getrandbits(64):016x}',
+            'AppCategories': ['public', 'games', 'applications'],
+        }
+        with open(os.path.join(manifests, f'{data["InstallationGuid"]}.item'), 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent='\t')
+        if i % 25 != 24:
+            installed.append({'InstallLocation': install, 'AppName': app, 'AppVersion': '1.0'})
+    dat = os.path.join(root, 'LauncherInstalled.dat')
+    with open(dat, 'w', encoding='utf-8') as f:
+        json.dump({'InstallationList': installed}, f, indent='\t')
+    return manifests, dat
+
+
+def make_gog_library(root, n, seed=8):
+    """Create `n` GOG install dirs with goggame-*.info files and a registry fixture for them.
+
+    Every tenth game is missing from the registry (offline installer) and every 15th
+    registry entry is a DLC; returns (registry JSON path, games root)."""
+    import json
+    rng = random.Random(seed)
+    games_root = os.path.join(root, 'GOG Games')
+    registry = {}
+    for i in range(n):
+        title = game_title(rng, i)
+        gid = str(1_200_000_000 + i)
+        install = os.path.join(games_root, title.replace(' ', '_'))
+        os.makedirs(install, exist_ok=True)
+        exe = f'bin/{title.replace(" ", "")}.exe'
+        info = {
+            'gameId': gid,
+            'rootGameId': str(1_200_000_000 + i - 1) if i % 15 == 14 else gid,
+            'name': title,
+            'buildId': str(rng.getrandbits(48)),
+            'playTasks': [
+                {'category': 'document', 'type': 'FileTask', 'path': 'manual.pdf', 'name': 'Manual'},
+                {'category': 'game', 'isPrimary': True, 'type': 'FileTask', 'path': exe, 'name': title},
+            ],
+        }
+        with open(os.path.join(install, f'goggame-{gid}.info'), 'w', encoding='utf-8') as f:
+            json.dump(info, f, indent=2)
+        if i % 10 == 9:
+            continue
+        values = {'gameID': gid, 'gameName': title, 'path': install, 'exe': os.path.join(install, exe)}
+        if i % 15 == 14:
+            values['dependsOn'] = str(1_200_000_000 + i - 1)
+        registry[f'HKLM\\SOFTWARE\\WOW6432Node\\GOG.com\\Games\\{gid}'] = values
+    path = os.path.join(root, 'registry.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(registry, f, indent=2)
+    return path, games_root
+
+
+def _kv_bytes(obj, key_index=None):
+    """Encode a dict as binary KeyValues; `key_index` (a dict) switches keys to appinfo v29 indexes."""
+    import struct
+    out = bytearray()
+    for key, val in obj.items():
+        if isinstance(val, dict):
+            out.append(0x00)
+        elif isinstance(val, int):
+            out.append(0x02)
+        else:
+            out.append(0x01)
+        if key_index is None:
+            out += key.encode('utf-8') + b'\0'
+        else:
+            out += struct.pack('<I', key_index.setdefault(key, len(key_index)))
+        if isinstance(val, dict):
+            out += _kv_bytes(val, key_index)
+        elif isinstance(val, int):
+            out += struct.pack('<i', val)
+        else:
+            out += str(val).encode('utf-8') + b'\0'
+    out.append(0x08)
+    return bytes(out)
+
+
+def make_steam_appinfo(root, appids, extra=0, seed=9, version=29):
+    """Create <root>/appcache/appinfo.vdf for `appids` plus `extra` unrelated apps; return its path.
+
+    Each app gets a common/name and a config/launch map with a Linux and a Windows entry.
+    `version` picks the layout: 27 (no binary KV hash), 28 (inline keys) or 29 (key table)."""
+    import struct
+    rng = random.Random(seed)
+    keys = {} if version >= 29 else None
+    records = bytearray()
+    all_ids = list(appids) + [900_000 + i for i in range(extra)]
+    for i, appid in enumerate(all_ids):
+        title = game_title(rng, i)
+        exe = title.replace(' ', '')
+        kv = _kv_bytes({'appinfo': {
+            'appid': int(appid),
+            'common': {'name': title, 'type': 'Game', 'oslist': 'windows,linux'},
+            'config': {
+                'installdir': exe,
+                'launch': {
+                    '0': {'executable': f'{exe}.sh', 'type': 'default', 'config': {'oslist': 'linux'}},
+                    '1': {'executable': f'bin\\{exe}.exe', 'type': 'default', 'config': {'oslist': 'windows'}},
+                },
+            },
+        }}, keys)
+        body = struct.pack('<IIQ', 2, 1_700_000_000 + i, 0) + bytes(20) + struct.pack('<I', i)
+        body += (bytes(20) if version >= 28 else b'') + kv
+        records += struct.pack('<II', int(appid), len(body)) + body
+    records += struct.pack('<I', 0)
+    magic = {27: 0x07564427, 28: 0x07564428, 29: 0x07564429}[version]
+    if version >= 29:
+        table = struct.pack('<I', len(keys)) + b''.join(k.encode('utf-8') + b'\0' for k in keys)
+        data = struct.pack('<IIq', magic, 1, 16 + len(records)) + records + table
+    else:
+        data = struct.pack('<II', magic, 1) + records
+    path = os.path.join(root, 'appcache', 'appinfo.vdf')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def make_steam_shortcuts(root, n, account='12345678'):
+    """Create <root>/userdata/<account>/config/shortcuts.vdf with `n` non-Steam games; return its path."""
+    entries = {}
+    for i in range(n):
+        exe = f'C:\\Emulators\\Tool{i}\\tool{i}.exe'
+        entries[str(i)] = {
+            'appid': -(0x7FFF0000 + i), 'AppName': f'Tool {i}', 'Exe': f'"{exe}"',
+            'StartDir': f'"C:\\Emulators\\Tool{i}\\"', 'LaunchOptions': '', 'IsHidden': 1 if i % 7 == 6 else 0,
+        }
+    path = os.path.join(root, 'userdata', account, 'config', 'shortcuts.vdf')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'\x00shortcuts\x00' + _kv_bytes(entries) + b'\x08')
+    return path
+
+
+def make_steam_librarycache(root, appids, nested_every=3):
+    """Create <root>/appcache/librarycache artwork for `appids`; return the librarycache dir.
+
+    Every `nested_every`-th app uses the newer <appid>/ directory layout."""
+    cache = os.path.join(root, 'appcache', 'librarycache')
+    os.makedirs(cache, exist_ok=True)
+    for i, appid in enumerate(appids):
+        names = ('header.jpg', 'library_600x900.jpg', 'library_hero.jpg', 'logo.png')
+        if i % nested_every == nested_every - 1:
+            d = os.path.join(cache, str(appid), f'{i:040x}')
+            os.makedirs(d, exist_ok=True)
+            paths = [os.path.join(d, n) for n in names]
+        else:
+            paths = [os.path.join(cache, f'{appid}_{n}') for n in names]
+        for p in paths:
+            with open(p, 'wb') as f:
+                f.write(b'\xff\xd8\xff')
+    return cache
+
+
+def append_steam_content_log(path, n, start=0, seed=10):
+    """Append `n` content_log.txt lines to `path`: mostly update noise, with apps starting and stopping."""
+    rng = random.Random(seed + start)
+    lines = []
+    for i in range(start, start + n):
+        appid = 10000 + rng.randint(0, 50)
+        stamp = f'[2024-05-01 {i // 3600 % 24:02d}:{i // 60 % 60:02d}:{i % 60:02d}]'
+        if i % 10 == 0:
+            state = 'Fully Installed,App Running,' if rng.random() < 0.5 else 'Fully Installed,'
+            lines.append(f'{stamp} AppID {appid} state changed : {state}')
+        else:
+            lines.append(f'{stamp} AppID {appid} update started : download 0/{rng.randint(1, 9) * 1000000}, store 0/0')
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + '\n')
+    return path
+
+
+# Run by the fake game executables: argv is role, events file, start delay, run seconds, crash, child exe
+_FAKE_GAME = '''\
+import json, os, subprocess, sys, time
+role, events, delay, run, crash, child = sys.argv[1:7]
+def note(event):
+    with open(events, 'a') as f:
+        f.write(json.dumps({'event': event, 'pid': os.getpid(), 't': time.monotonic()}) + '\\n')
+time.sleep(float(delay))
+if role == 'bootstrap':
+    note('handoff')
+    subprocess.Popen([child, sys.argv[0], 'game', events, '0', run, crash, ''], start_new_session=True)
+    sys.exit(0)
+note('start')
+time.sleep(float(run))
+note('exit')
+if crash == '1':
+    os.kill(os.getpid(), 9)
+'''
+
+
+def make_fake_game(root, name='Star Forge'):
+    """Create <root>/<name> with a fake game executable and a bootstrapper next to it (Linux).
+
+    Both are copies of the running interpreter, so /proc reports them under the
+    install dir; they run game.py from the same dir. Returns a dict with
+    installDir, exe, bootstrapper and script."""
+    import shutil
+    import sys
+    install = os.path.join(root, name)
+    stem = ''.join(ch for ch in name.lower() if ch.isalnum())
+    os.makedirs(os.path.join(install, 'bin'), exist_ok=True)
+    exe = os.path.join(install, 'bin', stem)
+    boot = os.path.join(install, f'{stem}_launcher')
+    for path in (exe, boot):
+        if not os.path.exists(path):
+            shutil.copy2(os.path.realpath(sys.executable), path)
+    script = os.path.join(install, 'game.py')
+    with open(script, 'w', encoding='utf-8') as f:
+        f.write(_FAKE_GAME)
+    return { 'installDir': install, 'exe': exe, 'bootstrapper': boot, 'script': script, 'title': name }
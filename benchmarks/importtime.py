@@ -0,0 +1,86 @@
+"""
+Cold-start import check for the helper scripts.
+
+Runs `python -X importtime -c "import <module>"` from scripts/ a few times per
+module, reports the median cumulative import time, and fails when a module goes
+over its budget or pulls in a module that should only be imported lazily.
+Every module of the helper bundle is checked; tests/test_importtime.py runs the
+same check under pytest.
+
+  python -m benchmarks.importtime [--budget 40] [--repeat 5]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts')
+
+
+def helper_modules():
+    """Every module that ships in the helper bundle: scripts/*.py and glhelpers/*.py, minus build tools."""
+    from build_pybundle import EXCLUDE
+    out = sorted(n[:-3] for n in os.listdir(SCRIPTS_DIR) if n.endswith('.py') and n not in EXCLUDE)
+    pkg = os.path.join(SCRIPTS_DIR, 'glhelpers')
+    out += sorted(f'glhelpers.{n[:-3]}' for n in os.listdir(pkg) if n.endswith('.py') and n != '__init__.py')
+    return out
+
+
+# Heavy stdlib modules that must stay behind lazy imports in the helpers
+LAZY_ONLY = ('urllib.request', 'http.client', 'ssl', 'subprocess', 'concurrent.futures', 'argparse')
+
+
+def measure(module, repeat):
+    """Return (median cumulative microseconds, set of imported module names)."""
+    totals = []
+    loaded = set()
+    for _ in range(repeat):
+        proc = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+            cwd=SCRIPTS_DIR, capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f'import {module} failed:\n{proc.stderr}')
+        for line in proc.stderr.splitlines():
+            if not line.startswith('import time:'):
+                continue
+            parts = line.split('|')
+            if len(parts) != 3 or not parts[1].strip().isdigit():
+                continue
+            name = parts[2].strip()
+            loaded.add(name)
+            if name == module:
+                totals.append(int(parts[1]))
+    return statistics.median(totals) if totals else 0, loaded
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Check helper script import times')
+    parser.add_argument('--budget', type=float, default=40.0, help='Per-module budget in ms (default 40)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--only', nargs='*', default=None, help='Modules to check')
+    args = parser.parse_args(argv)
+
+    failures = []
+    for module in args.only or helper_modules():
+        us, loaded = measure(module, max(1, args.repeat))
+        ms = us / 1000.0
+        eager = sorted(m for m in LAZY_ONLY if m in loaded)
+        status = 'ok'
+        if ms > args.budget:
+            status = 'over budget'
+            failures.append(module)
+        if eager:
+            status = f'eager: {", ".join(eager)}'
+            failures.append(module)
+        print(f'{module:<20} {ms:>8.1f} ms  {status}', file=sys.stderr)
+    if failures:
+        print(f'import check failed: {", ".join(sorted(set(failures)))}', file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
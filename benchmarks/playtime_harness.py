@@ -0,0 +1,275 @@
+"""
+Launch-to-running and exit-detection latency for playtime tracking (Linux).
+
+Starts fake games (copies of the interpreter under a synthetic install dir,
+see fixtures.make_fake_game) and tracks them the way PlaytimeService does:
+`find` until a PID matches, then `alive` on the tracked PIDs plus a `find`
+reacquire every poll, and after the PIDs vanish a reacquire grace window
+before the session ends. Scenarios:
+
+  direct     the game executable starts right away
+  bootstrap  a launcher stub starts the game after 0.5 s and exits
+  delayed    the launcher stub waits 3 s before starting the game
+  crash      the game is SIGKILLed instead of exiting
+
+Strategies differ in how proc.py is driven:
+
+  spawn-200ms   python proc.py find|alive '<json>' per call, 200 ms polls (what the app does)
+  spawn-1s      the same with 1 s polls
+  inproc-200ms  proc.action_find / action_alive called in-process, 200 ms polls
+
+Per run it reports detectMs (launch to the game PID being tracked),
+exitNoticedMs (game exit to the first poll that finds it gone), endMs (game
+exit to the session ending, grace included) and CPU seconds the tracker used
+per tracked hour (its own and its proc.py children's).
+
+  python -m benchmarks.playtime_harness [--quick] [--only spawn-200ms] [--scenario crash] [--decoys 100]
+"""
+
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from . import SCRIPTS_DIR, fixtures
+
+import proc
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+PROC_PY = os.path.join(SCRIPTS_DIR, 'proc.py')
+
+# Same windows as PlaytimeService.followProcessTracking
+SEED_WINDOW = 45.0
+GRACE = 3.5
+
+SCENARIOS = {
+    # name: (start via bootstrapper, bootstrapper delay, crash)
+    'direct': (False, 0.0, False),
+    'bootstrap': (True, 0.5, False),
+    'delayed': (True, 3.0, False),
+    'crash': (False, 0.0, True),
+}
+
+
+def spawn_runner(action, filters):
+    out = subprocess.run([sys.executable, PROC_PY, action, json.dumps(filters)],
+                         capture_output=True, text=True).stdout
+    try:
+        return json.loads(out or '{}')
+    except ValueError:
+        return {}
+
+
+def inproc_runner(action, filters):
+    return proc.action_find(filters) if action == 'find' else proc.action_alive(filters)
+
+
+STRATEGIES = {
+    'spawn-200ms': (spawn_runner, 0.2),
+    'spawn-1s': (spawn_runner, 1.0),
+    'inproc-200ms': (inproc_runner, 0.2),
+}
+
+
+def _cpu_seconds():
+    me = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return me.ru_utime + me.ru_stime + kids.ru_utime + kids.ru_stime
+
+
+def track(runner, interval, filters, launched_at, grace=GRACE):
+    """Follow one launch like PlaytimeService.
+
+    Returns ({pid: first tracked time}, start of the final empty stretch, end time, reason)."""
+    seeded = False
+    tracked = set()
+    seen = {}
+    empty_since = None
+
+    def note(pids):
+        now = time.monotonic()
+        for pid in pids:
+            seen.setdefault(pid, now)
+
+    while True:
+        now = time.monotonic()
+        if not seeded:
+            if now - launched_at >= SEED_WINDOW:
+                return seen, None, now, 'no-seed-within-window'
+            pids = runner('find', filters).get('pids') or []
+            if pids:
+                tracked, seeded = set(pids), True
+                note(pids)
+        if tracked:
+            tracked = set(runner('alive', { 'pids': sorted(tracked) }).get('pids') or [])
+            if tracked:
+                empty_since = None
+                # Regular reacquire, as the app does while no launcher log says the game runs
+                pids = runner('find', filters).get('pids') or []
+                if pids:
+                    tracked = set(pids)
+                    note(pids)
+        if seeded and not tracked:
+            if empty_since is None:
+                empty_since = time.monotonic()
+            pids = runner('find', filters).get('pids') or []
+            if pids:
+                tracked = set(pids)
+                note(pids)
+                empty_since = None
+            elif time.monotonic() - empty_since >= grace:
+                return seen, empty_since, time.monotonic(), 'no-alive-pids-after-grace'
+        time.sleep(interval)
+
+
+def _read_events(path):
+    out = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    out.append(json.loads(line))
+                except ValueError:
+                    pass
+    except OSError:
+        pass
+    return out
+
+
+def run_once(game, scenario, strategy, run_seconds, tmp, grace=GRACE):
+    via_boot, delay, crash = SCENARIOS[scenario]
+    runner, interval = STRATEGIES[strategy]
+    events = os.path.join(tmp, f'{scenario}-{strategy}.events')
+    env = { **os.environ, 'PYTHONHOME': sys.base_prefix }
+    target = game['bootstrapper'] if via_boot else game['exe']
+    filters = {
+        'executablePath': game['exe'], 'installDir': game['installDir'],
+        'title': game['title'].lower(), 'imageName': os.path.basename(game['exe']),
+    }
+    cpu0 = _cpu_seconds()
+    launched_at = time.monotonic()
+    child = subprocess.Popen(
+        [target, game['script'], 'bootstrap' if via_boot else 'game', events,
+         str(delay if via_boot else 0), str(run_seconds), '1' if crash else '0', game['exe']],
+        env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    # Reap the direct child as soon as it exits, like the app's spawn does (a zombie keeps its PID),
+    # and keep its CPU time out of the tracker's
+    reaped = []
+
+    def reap():
+        _, status, usage = os.wait4(child.pid, 0)
+        child.returncode = status
+        reaped.append(usage.ru_utime + usage.ru_stime)
+
+    reaper = threading.Thread(target=reap, daemon=True)
+    reaper.start()
+    seen, first_empty, ended_at, reason = track(runner, interval, filters, launched_at, grace)
+    reaper.join()
+    cpu = _cpu_seconds() - cpu0 - sum(reaped)
+
+    log = _read_events(events)
+    start = next((e for e in log if e['event'] == 'start'), None)
+    exited = next((e for e in log if e['event'] == 'exit'), None)
+    game_pid = start['pid'] if start else None
+    tracked_at = seen.get(game_pid)
+    first_seen = min(seen.values()) if seen else None
+    ms = lambda a, b: round((b - a) * 1000.0, 1) if a is not None and b is not None else None
+    tracked_for = (ended_at - first_seen) if first_seen is not None else 0.0
+    return {
+        'scenario': scenario,
+        'strategy': strategy,
+        'reason': reason,
+        'firstMatchMs': ms(launched_at, first_seen),
+        'detectMs': ms(launched_at, tracked_at),
+        'gameStartedMs': ms(launched_at, start['t'] if start else None),
+        'exitNoticedMs': ms(exited['t'] if exited else None, first_empty),
+        'endMs': ms(exited['t'] if exited else None, ended_at),
+        'trackedS': round(tracked_for, 3),
+        'cpuS': round(cpu, 3),
+        'cpuSecPerHour': round(cpu / tracked_for * 3600.0, 1) if tracked_for else None,
+    }
+
+
+def start_decoys(n):
+    """Unrelated processes so each snapshot has a realistic amount to scan."""
+    return [subprocess.Popen(['sleep', '3600'], stdin=subprocess.DEVNULL) for _ in range(n)]
+
+
+def summarize(runs):
+    by_strategy = {}
+    for r in runs:
+        by_strategy.setdefault(r['strategy'], []).append(r)
+    out = {}
+    for strategy, rs in by_strategy.items():
+        pick = lambda k: [r[k] for r in rs if r[k] is not None]
+        out[strategy] = {
+            k: round(statistics.median(pick(k)), 1) if pick(k) else None
+            for k in ('detectMs', 'exitNoticedMs', 'endMs', 'cpuSecPerHour')
+        }
+    return out
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.playtime_harness',
+                                     description='Measure playtime tracking detection latency and CPU cost (Linux)')
+    parser.add_argument('--quick', action='store_true', help='Short runs of the direct and bootstrap scenarios only')
+    parser.add_argument('--only', action='append', default=[], help=f'Strategies to run: {", ".join(STRATEGIES)}')
+    parser.add_argument('--scenario', action='append', default=[], help=f'Scenarios to run: {", ".join(SCENARIOS)}')
+    parser.add_argument('--run', type=float, default=None, help='Seconds each fake game runs (default 6, quick 2)')
+    parser.add_argument('--grace', type=float, default=GRACE, help='Reacquire window after the PIDs vanish')
+    parser.add_argument('--decoys', type=int, default=100, help='Idle processes started alongside the games')
+    parser.add_argument('--out', default=os.path.join(RESULTS_DIR, 'playtime.json'), help='Where to write JSON results')
+    args = parser.parse_args(argv)
+    if not sys.platform.startswith('linux'):
+        print('playtime_harness needs Linux (/proc)', file=sys.stderr)
+        return 2
+
+    strategies = args.only or list(STRATEGIES)
+    scenarios = args.scenario or (['direct', 'bootstrap'] if args.quick else list(SCENARIOS))
+    run_seconds = args.run if args.run is not None else (2.0 if args.quick else 6.0)
+    for name in strategies + scenarios:
+        if name not in STRATEGIES and name not in SCENARIOS:
+            parser.error(f'unknown strategy or scenario: {name}')
+
+    runs = []
+    decoys = start_decoys(args.decoys)
+    try:
+        with tempfile.TemporaryDirectory(prefix='gl-playtime-') as tmp:
+            game = fixtures.make_fake_game(tmp)
+            for scenario in scenarios:
+                for strategy in strategies:
+                    r = run_once(game, scenario, strategy, run_seconds, tmp, args.grace)
+                    runs.append(r)
+                    print(f"{scenario:<10} {strategy:<13} detect {r['detectMs']!s:>8} ms  exit seen {r['exitNoticedMs']!s:>7} ms  "
+                          f"end {r['endMs']!s:>7} ms  cpu {r['cpuSecPerHour']!s:>7} s/h  ({r['reason']})", file=sys.stderr)
+    finally:
+        for p in decoys:
+            p.kill()
+            p.wait()
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump({
+            'createdAt': time.time(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'runSeconds': run_seconds,
+            'grace': args.grace,
+            'decoys': args.decoys,
+            'runs': runs,
+            'summary': summarize(runs),
+        }, f, indent=2)
+    print(f'wrote {len(runs)} runs to {args.out}', file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
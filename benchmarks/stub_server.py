@@ -0,0 +1,75 @@
+"""Local stand-in for the Steam endpoints used by SteamApi_Search."""
+
+import json
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class SteamStub:
+    """Serves SearchApps, store suggest, GetAppList and header images from memory.
+
+    `search_hits` decides whether SearchApps answers with a match, so benchmarks can
+    force the slower fallbacks.
+    """
+
+    def __init__(self, apps):
+        self.apps = apps
+        self.applist_body = json.dumps({'applist': {'apps': apps}}).encode('utf-8')
+        self.by_name = {a['name'].casefold(): a for a in apps}
+        self.search_hits = True
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_args):
+                pass
+
+            def do_GET(self):
+                stub.requests += 1
+                path, _, query = self.path.partition('?')
+                if path.startswith('/actions/SearchApps/'):
+                    term = urllib.parse.unquote(path.rsplit('/', 1)[1]).casefold()
+                    hit = stub.by_name.get(term) if stub.search_hits else None
+                    body = json.dumps([{'appid': str(hit['appid']), 'name': hit['name']}] if hit else []).encode()
+                    return self._send(200, body, 'application/json')
+                if path.startswith('/search/suggest'):
+                    return self._send(200, b'<ul></ul>', 'text/html')
+                if path.startswith('/ISteamApps/GetAppList/v2'):
+                    return self._send(200, stub.applist_body, 'application/json')
+                if path.endswith('/header.jpg'):
+                    return self._send(206, b'\xff\xd8\xff\xe0' + b'\0' * 13, 'image/jpeg')
+                return self._send(404, b'', 'text/plain')
+
+            def _send(self, code, body, ctype):
+                self.send_response(code)
+                self.send_header('Content-Type', ctype)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.base = f'http://127.0.0.1:{self.server.server_address[1]}'
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *_exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def patch(self, module):
+        """Point SteamApi_Search's URL templates at this server; returns a restore callable."""
+        names = ('SEARCH_URL', 'STORE_SUGGEST_URL', 'APPLIST_URL', 'HEADER_URL_FMT')
+        saved = {n: getattr(module, n) for n in names}
+        module.SEARCH_URL = self.base + '/actions/SearchApps/{}'
+        module.STORE_SUGGEST_URL = self.base + '/search/suggest?term={term}&f=games'
+        module.APPLIST_URL = self.base + '/ISteamApps/GetAppList/v2/'
+        module.HEADER_URL_FMT = self.base + '/steam/apps/{appid}/header.jpg'
+
+        def restore():
+            for n, v in saved.items():
+                setattr(module, n, v)
+        return restore
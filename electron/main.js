@@ -5,6 +5,10 @@ import { fileURLToPath } from 'node:url'
 import { GameDetectionService } from '../src/main/services/detection/GameDetectionService.js'
 import { PlaytimeService } from '../src/main/services/tracking/PlaytimeService.js'
 import { SettingsService } from '../src/main/services/settings/SettingsService.js'
+import { DiskUsageService } from '../src/main/services/library/DiskUsageService.js'
+import { InstallVerifyService } from '../src/main/services/library/InstallVerifyService.js'
+import { ArtworkService } from '../src/main/services/library/ArtworkService.js'
+import { LibraryIndexService } from '../src/main/services/library/LibraryIndexService.js'
 import { SteamDetector } from '../src/main/services/detection/SteamDetector.js'
 import fs from 'node:fs/promises'
 import fsSync from 'node:fs'
@@ -18,6 +22,10 @@ let appIcon = null
 const detectionService = new GameDetectionService()
 let playtimeService = null
 let settingsService = null
+let diskUsageService = null
+let artworkService = null
+let libraryIndexService = null
+let installVerifyService = null
 let backendInitialized = false
 let lastVersionJsonPath = null
 let debugLogBuffer = []
@@ -198,7 +206,17 @@ async function checkForUpdate() {
 
 async function registerIpcAndServices() {
   if (backendInitialized) return
+  // Every Python helper spawned from here on folds its counters and latencies into this file
+  if (!process.env.GL_METRICS) process.env.GL_METRICS = path.join(app.getPath('userData'), 'metrics.json')
   playtimeService = new PlaytimeService(app.getPath('userData'))
+  diskUsageService = new DiskUsageService(app.getPath('userData'))
+  installVerifyService = new InstallVerifyService(app.getPath('userData'))
+  artworkService = new ArtworkService((payload) => {
+    for (const bw of BrowserWindow.getAllWindows()) {
+      try { bw.webContents.send('artwork:resolved', payload) } catch {}
+    }
+  })
+  libraryIndexService = new LibraryIndexService()
   settingsService = new SettingsService(app.getPath('userData'))
   await settingsService.load()
 
@@ -228,9 +246,70 @@ async function registerIpcAndServices() {
     }
   } catch {}
 
+  const collectGames = async () => {
+    const games = artworkService.fill(await detectionService.detectAll(settingsService.get()))
+      .map((g) => ({ ...g, playtimeMinutes: playtimeService.getPlaytimeMinutes(g), lastPlayedAt: playtimeService.getLastPlayedAt(g) }))
+    libraryIndexService.commit(games)
+    return games
+  }
+
   ipcMain.handle('games:list', async () => {
-    const games = await detectionService.detectAll(settingsService.get())
-    return games.map((g) => ({ ...g, playtimeMinutes: playtimeService.getPlaytimeMinutes(g), lastPlayedAt: playtimeService.getLastPlayedAt(g) }))
+    return await collectGames()
+  })
+
+  // Re-detects and returns only what changed since the renderer's version ({ version } alone when nothing did)
+  ipcMain.handle('games:changes', async (_e, version) => {
+    const games = await collectGames()
+    return (await libraryIndexService.changes(version)) || { version: null, full: true, games }
+  })
+
+  // Ranked "launcher:id" keys for the search box; null means filter in the renderer instead
+  ipcMain.handle('games:search', async (_e, query) => {
+    return await libraryIndexService.search(query)
+  })
+
+  ipcMain.handle('games:sizes', async (e, games) => {
+    // Progress and per-game sizes stream to the caller while the walk runs
+    return await diskUsageService.computeSizes(games, (ev) => {
+      try { e.sender.send('games:size-progress', ev) } catch {}
+    })
+  })
+
+  // Cards on screen jump the artwork queue; cards scrolled away give their slot back
+  ipcMain.handle('artwork:want', async (_e, games) => {
+    for (const g of games || []) artworkService.want(g, 0)
+    return true
+  })
+
+  ipcMain.handle('artwork:cancel', async (_e, keys) => {
+    for (const key of keys || []) artworkService.cancel(key)
+    return true
+  })
+
+  ipcMain.handle('game:verify', async (_e, game) => {
+    return await installVerifyService.verify(game)
+  })
+
+  // Helper metrics as JSON (counters + latency percentiles) or Prometheus text when format is 'prometheus'
+  ipcMain.handle('metrics:get', async (_e, format) => {
+    const base = app && app.isPackaged ? process.resourcesPath : process.cwd()
+    const args = [path.join(base, 'scripts', 'proc.py'), 'metrics', JSON.stringify({ format: format || 'json' })]
+    return await new Promise((resolve) => {
+      const run = (cmd) => {
+        const py = spawn(cmd, args, { stdio: ['ignore', 'pipe', 'ignore'] })
+        let out = ''
+        py.stdout.on('data', (d) => (out += d.toString()))
+        py.on('error', () => {
+          if (cmd === 'python') return run('py')
+          return resolve({ ok: false, error: 'python not available' })
+        })
+        py.on('exit', () => {
+          if (format === 'prometheus') return resolve(out)
+          try { resolve(JSON.parse(out)) } catch { resolve({ ok: false, error: 'bad output' }) }
+        })
+      }
+      run('python')
+    })
   })
 
   ipcMain.handle('game:launch', async (_e, game) => {
@@ -688,6 +767,11 @@ app.on('window-all-closed', () => {
   if (process.platform !== 'darwin') app.quit()
 })
 
+app.on('will-quit', () => {
+  if (artworkService) artworkService.stop()
+  if (libraryIndexService) libraryIndexService.stop()
+})
+
 app.on('activate', () => {
   if (BrowserWindow.getAllWindows().length === 0) createWindow()
 })
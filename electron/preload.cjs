@@ -2,7 +2,16 @@ const { contextBridge, ipcRenderer } = require('electron')
 
 contextBridge.exposeInMainWorld('electronAPI', {
   listGames: () => ipcRenderer.invoke('games:list'),
+  searchGames: (query) => ipcRenderer.invoke('games:search', query),
+  getGameChanges: (version) => ipcRenderer.invoke('games:changes', version),
+  getGameSizes: (games) => ipcRenderer.invoke('games:sizes', games),
+  onGameSizeProgress: (handler) => ipcRenderer.on('games:size-progress', (_e, payload) => handler(payload)),
   launchGame: (game) => ipcRenderer.invoke('game:launch', game),
+  verifyGame: (game) => ipcRenderer.invoke('game:verify', game),
+  wantArtwork: (games) => ipcRenderer.invoke('artwork:want', games),
+  cancelArtwork: (keys) => ipcRenderer.invoke('artwork:cancel', keys),
+  onArtwork: (handler) => ipcRenderer.on('artwork:resolved', (_e, payload) => handler(payload)),
+  getMetrics: (format) => ipcRenderer.invoke('metrics:get', format),
   openExternal: (url) => ipcRenderer.invoke('open:external', url),
   getSettings: () => ipcRenderer.invoke('settings:get'),
   saveSettings: (next) => ipcRenderer.invoke('settings:save', next),
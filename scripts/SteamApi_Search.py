@@ -3,19 +3,27 @@
 SteamApi_Search
 
 Look up a game's Steam AppID by name and return a high-resolution header image URL.
-Constructs the image URL in the format:
+Artwork the Steam client already has in appcache/librarycache is used first
+(as a file:// URL); the name is matched against the titles in appinfo.vdf for
+the apps found there, so Steam-known titles resolve without any HTTP request.
+The librarycache listing and that title index are built once per Steam root and
+reused until librarycache or appinfo.vdf changes, so long-running callers pay
+for them once rather than per lookup.
+Otherwise constructs the image URL in the format:
   https://cdn.steamstatic.com/steam/apps/{appid}/header.jpg
 
 Intended fallback for Epic Games titles when local or Epic API thumbnails are unavailable.
 
 CLI:
   python scripts/SteamApi_Search.py --game "Trackmania" [--debug]
+  python scripts/SteamApi_Search.py --appid 440 [--steam-path "C:/Program Files (x86)/Steam"]
 
 Outputs JSON to stdout with keys:
   ok: bool
   game: str
   steamAppId: int | null
   imageUrl: str | null
+  source: "librarycache" | "cdn" | null
 
 If --debug is provided, also prints the four debug lines:
   [Game]: ...
@@ -27,13 +35,17 @@ No Steam API key required.
 
 from __future__ import annotations
 
-import argparse
-import html
 import json
+import os
 import re
 import sys
+import threading
 import urllib.parse
-import urllib.request
+from contextlib import nullcontext
+
+from glhelpers import metrics, span_trace
+from glhelpers.span_trace import span
+from glhelpers.steam_artwork import LibraryCache, default_steam_path
 
 
 SEARCH_URL = "https://steamcommunity.com/actions/SearchApps/{}"
@@ -45,8 +57,20 @@ STORE_SUGGEST_URL = (
 APP_PAGE_URL = "https://steamcommunity.com/app/{appid}"
 HEADER_URL_FMT = "https://cdn.steamstatic.com/steam/apps/{appid}/header.jpg"
 
+# Set by long-running callers (artwork_fetch.py): http_gate(host) returns a context
+# manager held around each request, and a fetched app list is reused for
+# applist_ttl seconds. One-shot CLI runs leave both off.
+http_gate = None
+applist_ttl = 0.0
+_applist = (0.0, None)
+# steam_root -> [stamp, LibraryCache, title index or None until first needed]
+_local = {}
+_local_lock = threading.Lock()
+
 
 def _http_get(url: str, timeout: float = 8.0, headers: dict | None = None) -> tuple[int, bytes]:
+    # urllib.request pulls in http.client/ssl/email; only pay for it when a request is made
+    import urllib.request
     req = urllib.request.Request(
         url,
         headers={
@@ -54,12 +78,37 @@ def _http_get(url: str, timeout: float = 8.0, headers: dict | None = None) -> tu
             **(headers or {}),
         },
     )
-    with urllib.request.urlopen(req, timeout=timeout) as resp:
-        code = getattr(resp, "status", 200)
-        data = resp.read()
+    host = urllib.parse.urlsplit(url).hostname or ""
+    gate = http_gate(host) if http_gate else nullcontext()
+    with gate, span("http", url=url.split("?", 1)[0]) as s, metrics.timed("http_ms", host=host):
+        metrics.inc("http_requests_total", host=host)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                code = getattr(resp, "status", 200)
+                data = resp.read()
+        except Exception:
+            metrics.inc("http_errors_total", host=host)
+            raise
+        s.set(status=code, bytes=len(data))
         return code, data
 
 
+def _app_list() -> list:
+    """GetAppList apps, reused for applist_ttl seconds when that is set."""
+    global _applist
+    import time
+    fetched, apps = _applist
+    if apps is not None and time.monotonic() - fetched < applist_ttl:
+        return apps
+    code, data = _http_get(APPLIST_URL)
+    if code != 200:
+        return []
+    apps = json.loads(data.decode("utf-8", errors="replace")).get("applist", {}).get("apps", [])
+    if applist_ttl > 0:
+        _applist = (time.monotonic(), apps)
+    return apps
+
+
 def _normalize_name(name: str) -> str:
     s = name.casefold()
     s = s.replace("®", "").replace("™", "").replace("©", "")
@@ -105,10 +154,7 @@ def find_steam_appid(game_name: str) -> int | None:
 
     # Strategy 3: Full applist fuzzy match
     try:
-        code, data = _http_get(APPLIST_URL)
-        if code != 200:
-            return None
-        apps = json.loads(data.decode("utf-8", errors="replace")).get("applist", {}).get("apps", [])
+        apps = _app_list()
         if not apps:
             return None
         target = _normalize_name(game_name)
@@ -142,33 +188,101 @@ def verify_image_url(url: str, timeout: float = 8.0) -> bool:
         return False
 
 
-def resolve_thumbnail(game_name: str) -> dict:
-    appid = find_steam_appid(game_name)
+def local_title_index(steam_root: str, appids) -> dict:
+    """Map normalized title -> appid for `appids`, reading only their names from appinfo.vdf."""
+    from glhelpers.binary_vdf import AppInfo
+    out = {}
+    try:
+        info = AppInfo(os.path.join(steam_root, "appcache", "appinfo.vdf"))
+    except Exception:
+        return out
+    with info:
+        for appid in sorted(appids):
+            try:
+                name = info.find(appid, "appinfo", "common", "name")
+            except Exception:
+                continue
+            if name:
+                out.setdefault(_normalize_name(str(name)), appid)
+    return out
+
+
+def _stamp(path: str):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def local_artwork(steam_root: str | None, titles: bool = True):
+    """(LibraryCache, {normalized title: appid}) for a Steam install.
+
+    Both are kept per steam_root while the librarycache dir and appinfo.vdf
+    stamps are unchanged; the title index is only read when first asked for.
+    """
+    if not steam_root:
+        return LibraryCache(None), {}
+    appcache = os.path.join(steam_root, "appcache")
+    stamp = (_stamp(os.path.join(appcache, "librarycache")), _stamp(os.path.join(appcache, "appinfo.vdf")))
+    with _local_lock:
+        entry = _local.get(steam_root)
+        if entry is None or entry[0] != stamp:
+            metrics.inc("steam_local_index_builds_total")
+            entry = _local[steam_root] = [stamp, LibraryCache(steam_root), None]
+        if titles and entry[2] is None:
+            appids = entry[1].appids()
+            entry[2] = local_title_index(steam_root, appids) if appids else {}
+        return entry[1], entry[2] or {}
+
+
+def _file_url(path: str) -> str:
+    from pathlib import Path
+    return Path(path).resolve().as_uri()
+
+
+def resolve_thumbnail(game_name: str, steam_root: str | None = None, appid: int | None = None) -> dict:
+    result = {"ok": True, "game": game_name, "steamAppId": appid, "imageUrl": None, "source": None}
+    with span("librarycache"):
+        cache, titles = local_artwork(steam_root, titles=appid is None and bool(game_name))
+        if appid is None and game_name:
+            appid = titles.get(_normalize_name(game_name))
+        local = cache.best(appid) if appid else None
+    if local:
+        result.update(steamAppId=appid, imageUrl=_file_url(local), source="librarycache")
+        return result
+
+    if not appid and game_name:
+        with span("find_steam_appid"):
+            appid = find_steam_appid(game_name)
     if not appid:
-        return {
-            "ok": True,
-            "game": game_name,
-            "steamAppId": None,
-            "imageUrl": None,
-        }
+        return result
+    result["steamAppId"] = appid
+    local = cache.best(appid)
+    if local:
+        result.update(imageUrl=_file_url(local), source="librarycache")
+        return result
     url = build_header_url(appid)
-    found = verify_image_url(url)
-    return {
-        "ok": True,
-        "game": game_name,
-        "steamAppId": appid,
-        "imageUrl": url if found else None,
-    }
+    with span("verify_image"):
+        found = verify_image_url(url)
+    if found:
+        result.update(imageUrl=url, source="cdn")
+    return result
 
 
 def main(argv: list[str]) -> int:
+    import argparse
     parser = argparse.ArgumentParser(description="Find Steam community thumbnail for a game name")
-    parser.add_argument("--game", required=True, help="Game name to search on Steam (e.g., from Epic)")
+    parser.add_argument("--game", default="", help="Game name to search on Steam (e.g., from Epic)")
+    parser.add_argument("--appid", type=int, default=None, help="Known Steam appid; skips the name lookup")
+    parser.add_argument("--steam-path", default=None, help="Steam install dir (default: from the registry)")
     parser.add_argument("--debug", action="store_true", help="Print debug lines in addition to JSON output")
-    args = parser.parse_args(argv)
+    args = parser.parse_args(metrics.init_from_argv(span_trace.init_from_argv(list(argv))))
+    if not args.game.strip() and args.appid is None:
+        parser.error("--game or --appid is required")
 
     game_name = args.game.strip()
-    result = resolve_thumbnail(game_name)
+    result = resolve_thumbnail(game_name, args.steam_path or default_steam_path(), args.appid)
 
     if args.debug:
         print(f"[Game]: {game_name}")
@@ -180,7 +294,7 @@ def main(argv: list[str]) -> int:
         print("[ImgHash]: Not found")
         print(f"[FoundImgSuccess]: {'true' if bool(result.get('imageUrl')) else 'false'}")
 
-    print(json.dumps(result, ensure_ascii=False))
+    print(json.dumps(span_trace.finish(result), ensure_ascii=False))
     return 0
 
 
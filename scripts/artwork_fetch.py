@@ -0,0 +1,353 @@
+#!/usr/bin/env python3
+"""
+artwork_fetch.py
+
+Long-running artwork lookup worker. Reads NDJSON requests on stdin and resolves
+them with SteamApi_Search.resolve_thumbnail on a few threads:
+
+  {"op": "want", "key": "epic:Fortnite", "title": "Fortnite", "priority": 0}
+  {"op": "cancel", "key": "epic:Fortnite"}
+  {"op": "clear"}
+
+Lower priorities run first (the app sends 0 for cards on screen and a larger
+value per library row for the rest); equal priorities run in request order.
+Sending "want" again for a key moves it to the new priority. Keys whose titles
+normalize to the same name share one lookup, and finished titles are answered
+from memory. A queued lookup whose keys were all cancelled is dropped; one
+already running stops before its next HTTP request.
+
+Every request goes through a per-host gate: at most HOST_LIMITS[host][0]
+requests in flight and a token bucket refilled at HOST_LIMITS[host][1]
+requests/second (burst of HOST_LIMITS[host][2]).
+
+CLI:
+  python scripts/artwork_fetch.py [--workers 3] [--steam-path PATH]
+
+Outputs NDJSON:
+  {"event": "artwork", "key": "epic:Fortnite", "title": "Fortnite", "imageUrl": "...", "source": "cdn", "steamAppId": 1665460}
+  {"event": "idle", "stats": {"requested": 40, "coalesced": 3, "cached": 2, "cancelled": 5, "resolved": 30}}
+`idle` is printed whenever the queue drains. The worker exits once stdin is
+closed and the queued lookups are done.
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import sys
+import threading
+import time
+
+import SteamApi_Search
+from glhelpers import metrics, span_trace
+from glhelpers.steam_artwork import default_steam_path
+
+# host -> (max in flight, requests per second, burst); hosts not listed use DEFAULT_LIMIT
+HOST_LIMITS = {
+    'steamcommunity.com': (2, 2.0, 4),
+    'store.steampowered.com': (2, 2.0, 4),
+    'api.steampowered.com': (1, 0.2, 1),
+    'cdn.steamstatic.com': (4, 8.0, 8),
+}
+DEFAULT_LIMIT = (2, 4.0, 4)
+# Seconds a fetched GetAppList is reused by this worker
+APPLIST_TTL = 6 * 3600
+
+
+class Cancelled(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.stamp = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take one token, sleeping until one is available."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostGate:
+    """http_gate for SteamApi_Search: a concurrency cap and a token bucket per host."""
+
+    def __init__(self, limits: dict | None = None, default: tuple = DEFAULT_LIMIT):
+        self.limits = HOST_LIMITS if limits is None else limits
+        self.default = default
+        self.hosts = {}
+        self.lock = threading.Lock()
+        self.local = threading.local()
+
+    def _host(self, host: str):
+        with self.lock:
+            h = self.hosts.get(host)
+            if h is None:
+                n, rate, burst = self.limits.get(host, self.default)
+                h = self.hosts[host] = (threading.BoundedSemaphore(n), TokenBucket(rate, burst))
+            return h
+
+    def __call__(self, host: str):
+        return _Gated(self, host)
+
+
+class _Gated:
+    __slots__ = ('gate', 'host', 'sem')
+
+    def __init__(self, gate: HostGate, host: str):
+        self.gate = gate
+        self.host = host
+
+    def __enter__(self):
+        job = getattr(self.gate.local, 'job', None)
+        if job is not None and job.cancelled:
+            raise Cancelled(job.title)
+        self.sem, bucket = self.gate._host(self.host)
+        t0 = time.perf_counter()
+        self.sem.acquire()
+        try:
+            bucket.acquire()
+        except BaseException:
+            self.sem.release()
+            raise
+        metrics.observe('http_gate_wait_ms', (time.perf_counter() - t0) * 1000.0, host=self.host)
+        return self
+
+    def __exit__(self, *exc):
+        self.sem.release()
+        return False
+
+
+class Job:
+    __slots__ = ('title', 'name', 'keys', 'priority', 'seq', 'queued_at', 'state', 'cancelled')
+
+    def __init__(self, title: str, name: str, priority: float, seq: int):
+        self.title = title
+        self.name = name
+        self.keys = set()
+        self.priority = priority
+        self.seq = seq
+        self.queued_at = time.perf_counter()
+        self.state = 'queued'
+        self.cancelled = False
+
+
+class Scheduler:
+    """Priority queue of title lookups shared by the worker threads."""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.heap = []
+        self.jobs = {}
+        self.by_key = {}
+        self.priority = {}
+        self.results = {}
+        self.running = 0
+        self.seq = 0
+        self.closed = False
+        self.stats = { 'requested': 0, 'coalesced': 0, 'cached': 0, 'cancelled': 0, 'resolved': 0 }
+
+    def _push(self, job: Job) -> None:
+        heapq.heappush(self.heap, (job.priority, job.seq, job))
+
+    def _drop_key(self, key: str) -> None:
+        job = self.by_key.pop(key, None)
+        self.priority.pop(key, None)
+        if job is None:
+            return
+        job.keys.discard(key)
+        if not job.keys:
+            job.cancelled = True
+            self.stats['cancelled'] += 1
+            if job.state == 'queued':
+                del self.jobs[job.name]
+
+    def want(self, key: str, title: str, priority: float = 0):
+        """Queue a lookup for key; returns the finished result right away when the title is known."""
+        name = SteamApi_Search._normalize_name(title)
+        with self.cond:
+            self.stats['requested'] += 1
+            if name in self.results:
+                self._drop_key(key)
+                self.stats['cached'] += 1
+                return self.results[name]
+            job = self.by_key.get(key)
+            if job is not None and job.name != name:
+                self._drop_key(key)
+                job = None
+            if job is None:
+                job = self.jobs.get(name)
+                if job is None or job.cancelled:
+                    # A cancelled lookup may already be stopping; start a fresh one
+                    self.seq += 1
+                    job = self.jobs[name] = Job(title, name, priority, self.seq)
+                    self._push(job)
+                    self.cond.notify()
+                else:
+                    self.stats['coalesced'] += 1
+                    metrics.inc('artwork_coalesced_total')
+                job.keys.add(key)
+                self.by_key[key] = job
+            self.priority[key] = priority
+            best = min(self.priority[k] for k in job.keys)
+            if job.state == 'queued' and best != job.priority:
+                # Push again at the new priority; the stale heap entry is skipped when popped
+                job.priority = best
+                self.seq += 1
+                job.seq = self.seq
+                self._push(job)
+            return None
+
+    def cancel(self, key: str) -> None:
+        with self.cond:
+            self._drop_key(key)
+
+    def clear(self) -> None:
+        with self.cond:
+            for key in list(self.by_key):
+                self._drop_key(key)
+
+    def close(self) -> None:
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+
+    def take(self):
+        """Next job to run (blocking); None once closed and drained."""
+        with self.cond:
+            while True:
+                while self.heap:
+                    _, seq, job = heapq.heappop(self.heap)
+                    if job.state == 'queued' and not job.cancelled and seq == job.seq:
+                        job.state = 'running'
+                        self.running += 1
+                        metrics.observe('artwork_queue_wait_ms', (time.perf_counter() - job.queued_at) * 1000.0)
+                        return job
+                if self.closed:
+                    return None
+                self.cond.wait()
+
+    def finish(self, job: Job, result: dict | None) -> tuple[list, bool]:
+        """Record a finished job; returns (keys to answer, queue now idle)."""
+        with self.cond:
+            self.running -= 1
+            if self.jobs.get(job.name) is job:
+                del self.jobs[job.name]
+            keys = []
+            if result is not None:
+                self.results[job.name] = result
+                self.stats['resolved'] += 1
+                keys = sorted(job.keys)
+                for key in keys:
+                    self.by_key.pop(key, None)
+                    self.priority.pop(key, None)
+            idle = not self.running and not any(j.state == 'queued' for j in self.jobs.values())
+            return keys, idle
+
+
+def _answer(key: str, title: str, result: dict) -> dict:
+    return {
+        'event': 'artwork', 'key': key, 'title': title, 'imageUrl': result.get('imageUrl'),
+        'source': result.get('source'), 'steamAppId': result.get('steamAppId'),
+    }
+
+
+def run_worker(sched: Scheduler, gate: HostGate, steam_root: str | None, emit) -> None:
+    while True:
+        job = sched.take()
+        if job is None:
+            return
+        gate.local.job = job
+        result = None
+        try:
+            result = SteamApi_Search.resolve_thumbnail(job.title, steam_root)
+            if job.cancelled and not result.get('imageUrl'):
+                # A cancelled lookup may have skipped strategies; do not remember its miss
+                result = None
+        except Cancelled:
+            pass
+        except Exception:
+            result = { 'imageUrl': None, 'source': None, 'steamAppId': None }
+        finally:
+            gate.local.job = None
+        keys, idle = sched.finish(job, result)
+        for key in keys:
+            emit(_answer(key, job.title, result))
+        if idle:
+            emit({ 'event': 'idle', 'stats': dict(sched.stats) })
+            metrics.flush()
+
+
+def serve(lines, emit, workers: int = 3, steam_root: str | None = None, gate: HostGate | None = None) -> Scheduler:
+    """Handle request lines until they run out, then wait for queued lookups to finish."""
+    sched = Scheduler()
+    gate = gate or HostGate()
+    SteamApi_Search.http_gate = gate
+    SteamApi_Search.applist_ttl = APPLIST_TTL
+    threads = [threading.Thread(target=run_worker, args=(sched, gate, steam_root, emit), daemon=True)
+               for _ in range(max(1, workers))]
+    for t in threads:
+        t.start()
+    for line in lines:
+        try:
+            req = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(req, dict):
+            continue
+        op = req.get('op')
+        key = str(req.get('key') or '')
+        if op == 'want' and key and req.get('title'):
+            try:
+                priority = float(req.get('priority') or 0)
+            except (TypeError, ValueError):
+                priority = 0.0
+            cached = sched.want(key, str(req['title']), priority)
+            if cached is not None:
+                emit(_answer(key, str(req['title']), cached))
+        elif op == 'cancel' and key:
+            sched.cancel(key)
+        elif op == 'clear':
+            sched.clear()
+    sched.close()
+    for t in threads:
+        t.join()
+    return sched
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Resolve artwork for game titles read from stdin (NDJSON)')
+    parser.add_argument('--workers', type=int, default=3, help='Lookups running at once')
+    parser.add_argument('--steam-path', default=None, help='Steam install dir (default: from the registry)')
+    args = parser.parse_args(metrics.init_from_argv(span_trace.init_from_argv(list(argv))))
+    lock = threading.Lock()
+
+    def emit(obj: dict) -> None:
+        with lock:
+            sys.stdout.write(json.dumps(obj, ensure_ascii=False) + '\n')
+            sys.stdout.flush()
+
+    try:
+        serve(sys.stdin, emit, args.workers, args.steam_path or default_steam_path())
+    except KeyboardInterrupt:
+        return 0
+    except Exception as e:
+        emit({ 'ok': False, 'error': str(e) })
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
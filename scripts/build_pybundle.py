@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+build_pybundle.py
+
+Startup-optimized packaging for the helper scripts.
+
+  --pycache   precompile scripts/ in place (__pycache__), so the first launch of
+              each helper does not pay for compiling it
+  --zipapp    build a single sourceless bundle of the helpers and glhelpers:
+                python gl_helpers.pyz <script> [args...]
+              e.g. python gl_helpers.pyz steam_detect '["D:/Games"]'
+
+Bytecode is tied to the interpreter that builds it; rebuild the bundle for each
+Python version it ships with. The plain .py scripts keep working either way.
+
+CLI:
+  python scripts/build_pybundle.py --pycache
+  python scripts/build_pybundle.py --zipapp [--out build/gl_helpers.pyz]
+"""
+
+from __future__ import annotations
+
+import argparse
+import compileall
+import importlib.util
+import os
+import py_compile
+import sys
+import tempfile
+import zipfile
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+# Build-time tools are not needed at runtime
+EXCLUDE = {'build_pybundle.py', 'gen_controller_db.py'}
+DATA_FILES = ('data/controllers.bin',)
+
+MAIN = '''import sys
+
+
+def _run():
+    if len(sys.argv) < 2:
+        sys.stderr.write('usage: gl_helpers.pyz <script> [args...]\\n')
+        raise SystemExit(2)
+    name = sys.argv[1]
+    sys.argv = [name] + sys.argv[2:]
+    import runpy
+    runpy.run_module(name, run_name='__main__', alter_sys=True)
+
+
+_run()
+'''
+
+
+def _sources():
+    for name in sorted(os.listdir(SCRIPTS_DIR)):
+        if name.endswith('.py') and name not in EXCLUDE:
+            yield name, os.path.join(SCRIPTS_DIR, name)
+    pkg = os.path.join(SCRIPTS_DIR, 'glhelpers')
+    for name in sorted(os.listdir(pkg)):
+        if name.endswith('.py'):
+            yield f'glhelpers/{name}', os.path.join(pkg, name)
+
+
+def build_pycache() -> bool:
+    return compileall.compile_dir(
+        SCRIPTS_DIR, quiet=1, workers=0,
+        invalidation_mode=py_compile.PycInvalidationMode.CHECKED_HASH,
+    )
+
+
+def build_zipapp(out: str) -> int:
+    os.makedirs(os.path.dirname(os.path.abspath(out)) or '.', exist_ok=True)
+    count = 0
+    with tempfile.TemporaryDirectory() as tmp, zipfile.ZipFile(out + '.tmp', 'w', zipfile.ZIP_DEFLATED) as zf:
+        for arc, src in _sources():
+            cfile = os.path.join(tmp, arc.replace('/', '_') + 'c')
+            # Unchecked-hash pycs are loaded without looking for (or stat-ing) a source file
+            py_compile.compile(
+                src, cfile=cfile, dfile=arc, doraise=True, optimize=0,
+                invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+            )
+            zf.write(cfile, arc + 'c')
+            count += 1
+        for rel in DATA_FILES:
+            path = os.path.join(SCRIPTS_DIR, rel)
+            if os.path.exists(path):
+                zf.write(path, rel)
+        zf.writestr('__main__.py', MAIN)
+    os.replace(out + '.tmp', out)
+    return count
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description='Precompile / bundle the Python helper scripts')
+    parser.add_argument('--pycache', action='store_true', help='Precompile scripts/ in place')
+    parser.add_argument('--zipapp', action='store_true', help='Build a sourceless .pyz bundle')
+    parser.add_argument('--out', default=os.path.join(SCRIPTS_DIR, 'build', 'gl_helpers.pyz'))
+    args = parser.parse_args(argv)
+    if not (args.pycache or args.zipapp):
+        parser.error('choose --pycache and/or --zipapp')
+
+    if args.pycache:
+        ok = build_pycache()
+        print(f'pycache: {"ok" if ok else "errors"}')
+        if not ok:
+            return 1
+    if args.zipapp:
+        n = build_zipapp(args.out)
+        tag = importlib.util.MAGIC_NUMBER.hex()
+        print(f'zipapp: {n} modules -> {args.out} (python {sys.version_info[0]}.{sys.version_info[1]}, magic {tag})')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+controller_db.py
+
+Reader for the packed VID/PID controller table (data/controllers.bin) built by
+gen_controller_db.py. The file is memory-mapped on first lookup and searched in
+place; nothing is decoded except the record that matches.
+
+Layout (little-endian, version 1):
+  header   '<4sHHII'  magic b'GLCD', version, record size, record count, strings offset
+  records  '<IBBBxI'  key (vid << 16 | pid), type, layout, button map, name offset
+  strings  '<H' length + UTF-8 bytes, referenced by name offset
+
+Records are sorted by key. A pid of 0xFFFF is the vendor-wide default.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+
+MAGIC = b'GLCD'
+VERSION = 1
+HEADER = struct.Struct('<4sHHII')
+RECORD = struct.Struct('<IBBBxI')
+ANY_PRODUCT = 0xFFFF
+
+# Enum tables are part of the format version; append only.
+TYPES = ('Generic', 'Xbox', 'PlayStation', 'Nintendo', 'Valve', '8BitDo')
+LAYOUTS = ('standard', 'adaptive', 'gamecube', 'joycon-left', 'joycon-right', 'joycon-pair', 'steam', 'handheld')
+BUTTON_MAPS = ('xbox', 'playstation', 'nintendo')
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'controllers.bin')
+
+
+class ControllerDB:
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        self._buf = None
+        self._count = 0
+        self._strings = 0
+
+    def _open(self) -> bool:
+        if self._buf is not None:
+            return self._count > 0
+        self._buf = b''
+        try:
+            with open(self.path, 'rb') as f:
+                buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # Inside the zipapp bundle the table is a zip member, not a file
+            try:
+                buf = __loader__.get_data(self.path)
+            except Exception:
+                return False
+        if len(buf) < HEADER.size:
+            return False
+        magic, version, rec_size, count, strings = HEADER.unpack_from(buf, 0)
+        # A truncated table would otherwise fail mid-search with struct.error
+        bad = magic != MAGIC or version != VERSION or rec_size != RECORD.size
+        if bad or strings != HEADER.size + count * RECORD.size or strings > len(buf):
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+            return False
+        self._buf, self._count, self._strings = buf, count, strings
+        return count > 0
+
+    def _find(self, key: int):
+        lo, hi = 0, self._count
+        buf = self._buf
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k = struct.unpack_from('<I', buf, HEADER.size + mid * RECORD.size)[0]
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                return RECORD.unpack_from(buf, HEADER.size + mid * RECORD.size)
+        return None
+
+    def _name(self, offset: int) -> str | None:
+        pos = self._strings + offset
+        if pos + 2 > len(self._buf):
+            return None
+        (n,) = struct.unpack_from('<H', self._buf, pos)
+        if pos + 2 + n > len(self._buf):
+            return None
+        return bytes(self._buf[pos + 2:pos + 2 + n]).decode('utf-8', errors='replace')
+
+    def lookup(self, vid: str, pid: str = '') -> dict | None:
+        """Return {type, layout, buttonMap, model, exact} for a hex VID/PID, or None."""
+        if not self._open():
+            return None
+        try:
+            v = int(vid, 16)
+        except (TypeError, ValueError):
+            return None
+        try:
+            p = int(pid, 16)
+        except (TypeError, ValueError):
+            p = ANY_PRODUCT
+        rec = self._find((v << 16) | p)
+        exact = rec is not None
+        if rec is None and p != ANY_PRODUCT:
+            rec = self._find((v << 16) | ANY_PRODUCT)
+        if rec is None:
+            return None
+        _key, typ, layout, bmap, name_off = rec
+        model = self._name(name_off)
+        if model is None:
+            # String section cut short: the table is damaged, trust none of it
+            return None
+        return {
+            'type': TYPES[typ] if typ < len(TYPES) else 'Generic',
+            'layout': LAYOUTS[layout] if layout < len(LAYOUTS) else 'standard',
+            'buttonMap': BUTTON_MAPS[bmap] if bmap < len(BUTTON_MAPS) else 'xbox',
+            'model': model,
+            'exact': exact,
+        }
+
+    def __len__(self) -> int:
+        self._open()
+        return self._count
+
+
+_default: ControllerDB | None = None
+
+
+def lookup(vid: str, pid: str = '') -> dict | None:
+    global _default
+    if _default is None:
+        _default = ControllerDB()
+    return _default.lookup(vid, pid)
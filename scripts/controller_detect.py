@@ -2,8 +2,13 @@
 """
 controller_detect.py
 
-Windows-only game controller detector. Enumerates connected input devices via
-PowerShell/WMI and classifies known vendors (Xbox/PlayStation/Nintendo/Valve/8BitDo/etc.).
+Game controller detector. Enumerates connected input devices via PowerShell/WMI
+on Windows (or /sys/class/input on Linux) and classifies known vendors
+(Xbox/PlayStation/Nintendo/Valve/8BitDo/etc.).
+
+CLI:
+  python scripts/controller_detect.py            # one-shot listing
+  python scripts/controller_detect.py --watch    # hot-plug watcher (NDJSON)
 
 Outputs JSON:
 {
@@ -14,6 +19,16 @@ Outputs JSON:
     {"name": "Xbox Wireless Controller", "instanceId": "HID\\VID_045E&PID_02FD...", "vendorId": "045E", "type": "Xbox"}
   ]
 }
+
+Watch mode lists devices once, then blocks on OS device notifications
+(CM_Register_Notification on Windows, inotify on /dev/input on Linux) and prints
+one JSON object per line. On Windows a HID arrival only counts when the device
+is in the controller table by exact VID/PID or its top-level collection is a
+joystick/gamepad usage, and a pad exposing several HID interfaces is reported
+once, keyed by its physical (parent) device:
+  {"event": "snapshot", "devices": [...]}
+  {"event": "connected", "device": {...}}
+  {"event": "disconnected", "device": {...}}
 """
 
 from __future__ import annotations
@@ -21,42 +36,34 @@ from __future__ import annotations
 import json
 import os
 import re
-import subprocess
 import sys
+import time
+from functools import lru_cache
+
+from glhelpers import span_trace
+from glhelpers.span_trace import span
 
 
 def _run_powershell(cmd: str, timeout: float = 4.0) -> str:
-    try:
-        completed = subprocess.run(
-            [
-                'powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass',
-                '-Command', cmd
-            ],
-            capture_output=True, text=True, timeout=timeout, encoding='utf-8', errors='replace'
-        )
-        if completed.returncode == 0:
-            return completed.stdout.strip()
-    except Exception:
-        pass
-    return ''
+    from glhelpers.powershell import run_powershell
+    return run_powershell(cmd, timeout, label=cmd.split('|', 1)[0].replace('try {', '').strip())
+
+
+# Known vendor IDs
+_VID_TYPES = {
+    '045E': 'Xbox',         # Microsoft
+    '054C': 'PlayStation',  # Sony (DualShock/DualSense)
+    '057E': 'Nintendo',     # Nintendo (Switch Pro/Joy‑Con via adapters)
+    '28DE': 'Valve',        # Steam Controller/Deck
+    '2DC8': '8BitDo',
+    # third-party pads (PDP, Mad Catz, Hori, Razer, PowerA, Hyperkin, ...)
+    '0E6F': 'Generic', '12BA': 'Generic', '24C6': 'Generic', '1BAD': 'Generic', '146B': 'Generic', '1532': 'Generic',
+    '20D6': 'Generic', '2E24': 'Generic',
+}
 
 
 def _vid_to_type(vid: str) -> str:
-    v = (vid or '').upper()
-    # Known vendor IDs
-    if v == '045E':
-        return 'Xbox'  # Microsoft
-    if v == '054C':
-        return 'PlayStation'  # Sony (DualShock/DualSense)
-    if v == '057E':
-        return 'Nintendo'  # Nintendo (Switch Pro/Joy‑Con via adapters)
-    if v == '28DE':
-        return 'Valve'  # Steam Controller/Deck
-    if v in {'2E24', '20D6', '2DC8'}:
-        return '8BitDo'  # common 8BitDo USB/Bluetooth bridges
-    if v in {'0E6F', '12BA', '24C6', '1BAD', '146B', '1532'}:
-        return 'Generic'
-    return 'Generic'
+    return _VID_TYPES.get((vid or '').upper(), 'Generic')
 
 
 def _name_to_type(name: str) -> str:
@@ -73,6 +80,8 @@ def _name_to_type(name: str) -> str:
 
 
 def detect_devices() -> dict:
+    if sys.platform.startswith('linux'):
+        return _summarize(_list_linux_devices())
     if sys.platform != 'win32':
         return { 'ok': True, 'connected': False, 'primaryType': None, 'devices': [] }
 
@@ -121,18 +130,47 @@ def detect_devices() -> dict:
             try:
                 name = str(item.get('FriendlyName') or '').strip()
                 inst = str(item.get('InstanceId') or '').strip()
-                m = re.search(r'VID_([0-9A-Fa-f]{4})', inst)
-                vid = m.group(1).upper() if m else ''
-                typ = _vid_to_type(vid)
-                if typ == 'Generic':
-                    typ = _name_to_type(name)
                 # Avoid obvious false positives
                 if not name and not inst:
                     continue
-                devices.append({ 'name': name or 'Controller', 'instanceId': inst, 'vendorId': vid, 'type': typ })
+                devices.append(_make_device(name, inst))
             except Exception:
                 continue
 
+    return _summarize(devices)
+
+
+@lru_cache(maxsize=None)
+def _classify(vid: str, pid: str, name: str) -> tuple:
+    """Return (type, layout, buttonMap, model) for a device; memoized per VID/PID/name."""
+    from controller_db import lookup
+    info = lookup(vid, pid) if vid else None
+    if info and (info['exact'] or info['type'] != 'Generic'):
+        return info['type'], info['layout'], info['buttonMap'], info['model'] if info['exact'] else None
+    typ = _vid_to_type(vid)
+    if typ == 'Generic':
+        typ = _name_to_type(name)
+    return typ, None, None, None
+
+
+def _make_device(name: str, inst: str, vid: str = '', pid: str = '') -> dict:
+    if not vid:
+        m = re.search(r'VID_([0-9A-Fa-f]{4})', inst)
+        vid = m.group(1).upper() if m else ''
+    if not pid:
+        m = re.search(r'PID_([0-9A-Fa-f]{4})', inst)
+        pid = m.group(1).upper() if m else ''
+    typ, layout, button_map, model = _classify(vid, pid, name)
+    dev = { 'name': name or model or 'Controller', 'instanceId': inst, 'vendorId': vid, 'productId': pid, 'type': typ }
+    if layout:
+        dev['layout'] = layout
+        dev['buttonMap'] = button_map
+    if model:
+        dev['model'] = model
+    return dev
+
+
+def _summarize(devices: list) -> dict:
     connected = len(devices) > 0
     # Choose primary type by preference order
     primary = None
@@ -145,9 +183,291 @@ def detect_devices() -> dict:
     return { 'ok': True, 'connected': connected, 'primaryType': primary, 'devices': devices }
 
 
+# --- Linux: /sys/class/input -------------------------------------------------
+
+SYS_INPUT = '/sys/class/input'
+DEV_INPUT = '/dev/input'
+BTN_JOYSTICK = 0x120
+BTN_GAMEPAD = 0x130
+
+
+def _read_sys(path: str) -> str:
+    try:
+        with open(path, 'r', encoding='utf-8', errors='replace') as f:
+            return f.read().strip()
+    except OSError:
+        return ''
+
+
+def _has_key_bit(bitmap: str, bit: int) -> bool:
+    # sysfs prints the key bitmap as hex words (native long), most significant first
+    width = 64 if sys.maxsize > 2 ** 32 else 32
+    words = bitmap.split()[::-1]
+    idx = bit // width
+    if idx >= len(words):
+        return False
+    try:
+        return bool((int(words[idx], 16) >> (bit % width)) & 1)
+    except ValueError:
+        return False
+
+
+def _list_linux_devices(root: str = SYS_INPUT) -> list:
+    devices = []
+    try:
+        entries = sorted(os.listdir(root))
+    except OSError:
+        return devices
+    for entry in entries:
+        if not entry.startswith('input'):
+            continue
+        base = os.path.join(root, entry)
+        keys = _read_sys(os.path.join(base, 'capabilities', 'key'))
+        if not (_has_key_bit(keys, BTN_GAMEPAD) or _has_key_bit(keys, BTN_JOYSTICK)):
+            continue
+        vid = _read_sys(os.path.join(base, 'id', 'vendor')).upper()
+        pid = _read_sys(os.path.join(base, 'id', 'product')).upper()
+        name = _read_sys(os.path.join(base, 'name'))
+        phys = _read_sys(os.path.join(base, 'uniq')) or _read_sys(os.path.join(base, 'phys'))
+        inst = f'INPUT\\VID_{vid}&PID_{pid}\\{phys or entry}'
+        devices.append(_make_device(name, inst, vid, pid))
+    return devices
+
+
+def _inotify_fd(path: str):
+    """Return an inotify fd watching `path` for node creation/removal, or None."""
+    try:
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        IN_CLOEXEC = 0o2000000
+        IN_CREATE, IN_DELETE, IN_ATTRIB = 0x100, 0x200, 0x004
+        fd = libc.inotify_init1(IN_CLOEXEC)
+        if fd < 0:
+            return None
+        if libc.inotify_add_watch(fd, path.encode(), IN_CREATE | IN_DELETE | IN_ATTRIB) < 0:
+            os.close(fd)
+            return None
+        return fd
+    except Exception:
+        return None
+
+
+def _linux_changes(poll_interval: float = 2.0):
+    """Yield once per (debounced) input-device change; blocks while idle."""
+    fd = _inotify_fd(DEV_INPUT) if os.path.isdir(DEV_INPUT) else None
+    if fd is None:
+        while True:
+            time.sleep(poll_interval)
+            yield
+    import select
+    while True:
+        os.read(fd, 4096)
+        # udev finishes populating sysfs shortly after the node appears
+        while select.select([fd], [], [], 0.25)[0]:
+            os.read(fd, 4096)
+        yield
+
+
+def _watch_linux(emit) -> None:
+    current = { d['instanceId']: d for d in _list_linux_devices() }
+    emit({ 'event': 'snapshot', 'devices': list(current.values()) })
+    for _ in _linux_changes():
+        latest = { d['instanceId']: d for d in _list_linux_devices() }
+        for inst in current.keys() - latest.keys():
+            emit({ 'event': 'disconnected', 'device': current[inst] })
+        for inst in latest.keys() - current.keys():
+            emit({ 'event': 'connected', 'device': latest[inst] })
+        current = latest
+
+
+# --- Windows: CM_Register_Notification ---------------------------------------
+
+def _symlink_to_instance(link: str) -> str:
+    # \\?\HID#VID_045E&PID_02FD&IG_00#8&1a2b&0&0000#{4d1e55b2-...} -> HID\VID_045E&PID_02FD&IG_00\8&1a2b&0&0000
+    s = link
+    if s.startswith('\\\\?\\'):
+        s = s[4:]
+    if '#{' in s:
+        s = s[:s.rfind('#{')]
+    return s.replace('#', '\\').upper()
+
+
+# (usage page, usage) of HID top-level collections that are controllers:
+# Generic Desktop joystick, gamepad and multi-axis controller
+HID_CONTROLLER_USAGES = {(0x01, 0x04), (0x01, 0x05), (0x01, 0x08)}
+
+
+def _is_controller(dev: dict, usage: tuple | None = None) -> bool:
+    """An exact controller-table hit or a controller HID usage.
+
+    A known vendor alone is not enough: Microsoft and Razer also make keyboards and mice.
+    """
+    return 'model' in dev or usage in HID_CONTROLLER_USAGES
+
+
+def _hid_usage(link: str) -> tuple | None:
+    """(usage page, usage) of a HID interface's top-level collection, or None."""
+    import ctypes
+    from ctypes import wintypes
+
+    class HIDP_CAPS(ctypes.Structure):
+        _fields_ = [('Usage', ctypes.c_ushort), ('UsagePage', ctypes.c_ushort), ('_rest', ctypes.c_ushort * 30)]
+
+    k32 = ctypes.WinDLL('kernel32')
+    hid = ctypes.WinDLL('hid')
+    k32.CreateFileW.restype = wintypes.HANDLE
+    k32.CreateFileW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD, wintypes.DWORD, ctypes.c_void_p,
+                                wintypes.DWORD, wintypes.DWORD, wintypes.HANDLE]
+    k32.CloseHandle.argtypes = [wintypes.HANDLE]
+    hid.HidD_GetPreparsedData.argtypes = [wintypes.HANDLE, ctypes.POINTER(ctypes.c_void_p)]
+    hid.HidD_FreePreparsedData.argtypes = [ctypes.c_void_p]
+    hid.HidP_GetCaps.argtypes = [ctypes.c_void_p, ctypes.POINTER(HIDP_CAPS)]
+    hid.HidP_GetCaps.restype = ctypes.c_long
+    HIDP_STATUS_SUCCESS = 0x00110000
+    # Zero access is enough to read the descriptor, even of keyboards/mice the system holds open
+    h = k32.CreateFileW(link, 0, 0x1 | 0x2, None, 3, 0, None)  # FILE_SHARE_READ|WRITE, OPEN_EXISTING
+    if not h or h == ctypes.c_void_p(-1).value:
+        return None
+    try:
+        pre = ctypes.c_void_p()
+        if not hid.HidD_GetPreparsedData(h, ctypes.byref(pre)):
+            return None
+        try:
+            caps = HIDP_CAPS()
+            if hid.HidP_GetCaps(pre, ctypes.byref(caps)) != HIDP_STATUS_SUCCESS:
+                return None
+            return caps.UsagePage, caps.Usage
+        finally:
+            hid.HidD_FreePreparsedData(pre)
+    finally:
+        k32.CloseHandle(h)
+
+
+def _parent_key(inst: str) -> str:
+    """Instance ID of the physical device behind a HID device node; `inst` when it cannot be resolved.
+
+    HID collections (&COLnn) share their parent; interfaces of a composite USB
+    device (&MI_nn) are climbed once more to the device itself.
+    """
+    import ctypes
+    from ctypes import wintypes
+    cfg = ctypes.WinDLL('cfgmgr32')
+    node = wintypes.DWORD()
+    if cfg.CM_Locate_DevNodeW(ctypes.byref(node), inst, 0) != 0:
+        return inst
+    buf = ctypes.create_unicode_buffer(512)
+    key = inst
+    for _ in range(2):
+        parent = wintypes.DWORD()
+        if cfg.CM_Get_Parent(ctypes.byref(parent), node, 0) != 0 or cfg.CM_Get_Device_IDW(parent, buf, len(buf), 0) != 0:
+            break
+        node, key = parent, buf.value.upper()
+        if not re.search(r'&MI_[0-9A-F]{2}', key):
+            break
+    return key
+
+
+def _watch_windows(emit) -> None:
+    import ctypes
+    import queue
+    from ctypes import wintypes
+
+    class GUID(ctypes.Structure):
+        _fields_ = [('Data1', wintypes.DWORD), ('Data2', wintypes.WORD), ('Data3', wintypes.WORD), ('Data4', ctypes.c_ubyte * 8)]
+
+    class CM_NOTIFY_FILTER(ctypes.Structure):
+        _fields_ = [('cbSize', wintypes.DWORD), ('Flags', wintypes.DWORD), ('FilterType', ctypes.c_int),
+                    ('Reserved', wintypes.DWORD), ('ClassGuid', GUID), ('_pad', ctypes.c_byte * (400 - 16))]
+
+    CM_NOTIFY_FILTER_TYPE_DEVICEINTERFACE = 0
+    CM_NOTIFY_ACTION_DEVICEINTERFACEARRIVAL = 0
+    CM_NOTIFY_ACTION_DEVICEINTERFACEREMOVAL = 1
+    # GUID_DEVINTERFACE_HID {4D1E55B2-F16F-11CF-88CB-001111000030}
+    hid = GUID(0x4D1E55B2, 0xF16F, 0x11CF, (ctypes.c_ubyte * 8)(0x88, 0xCB, 0x00, 0x11, 0x11, 0x00, 0x00, 0x30))
+
+    CALLBACK = ctypes.WINFUNCTYPE(wintypes.DWORD, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_void_p, wintypes.DWORD)
+    events: queue.Queue = queue.Queue()
+
+    def _on_change(_h, _ctx, action, data, _size):
+        try:
+            if action in (CM_NOTIFY_ACTION_DEVICEINTERFACEARRIVAL, CM_NOTIFY_ACTION_DEVICEINTERFACEREMOVAL):
+                # FilterType + Reserved + ClassGuid precede the SymbolicLink string
+                link = ctypes.wstring_at(data + 24)
+                events.put((action, link))
+        except Exception:
+            pass
+        return 0
+
+    cb = CALLBACK(_on_change)
+    flt = CM_NOTIFY_FILTER()
+    flt.cbSize = ctypes.sizeof(CM_NOTIFY_FILTER)
+    flt.FilterType = CM_NOTIFY_FILTER_TYPE_DEVICEINTERFACE
+    flt.ClassGuid = hid
+    handle = ctypes.c_void_p()
+    cfg = ctypes.WinDLL('cfgmgr32')
+    rc = cfg.CM_Register_Notification(ctypes.byref(flt), None, cb, ctypes.byref(handle))
+    if rc != 0:
+        raise OSError(f'CM_Register_Notification failed ({rc})')
+
+    devices = {}    # physical device instance ID -> device
+    owners = {}     # HID device instance ID -> physical device instance ID
+    for dev in detect_devices().get('devices', []):
+        inst = dev['instanceId'].upper()
+        owners[inst] = _parent_key(inst)
+        devices.setdefault(owners[inst], dev)
+    emit({ 'event': 'snapshot', 'devices': list(devices.values()) })
+    try:
+        while True:
+            action, link = events.get()
+            inst = _symlink_to_instance(link)
+            if action == CM_NOTIFY_ACTION_DEVICEINTERFACEREMOVAL:
+                # The node may already be gone, so the parent comes from the arrival
+                key = owners.pop(inst, None)
+                if key is not None and key not in owners.values():
+                    dev = devices.pop(key, None)
+                    if dev:
+                        emit({ 'event': 'disconnected', 'device': dev })
+                continue
+            if inst in owners:
+                continue
+            dev = _make_device('', inst)
+            if not _is_controller(dev, _hid_usage(link)):
+                continue
+            key = owners[inst] = _parent_key(inst)
+            if key in devices:
+                continue
+            if dev['name'] == 'Controller':
+                dev['name'] = f"{dev['type']} Controller"
+            devices[key] = dev
+            emit({ 'event': 'connected', 'device': dev })
+    finally:
+        cfg.CM_Unregister_Notification(handle)
+
+
+def watch_devices() -> None:
+    def emit(obj: dict) -> None:
+        sys.stdout.write(json.dumps(obj, ensure_ascii=False) + '\n')
+        sys.stdout.flush()
+
+    if sys.platform == 'win32':
+        _watch_windows(emit)
+    elif sys.platform.startswith('linux'):
+        _watch_linux(emit)
+    else:
+        emit({ 'event': 'snapshot', 'devices': [] })
+
+
 def main():
     try:
-        print(json.dumps(detect_devices(), ensure_ascii=False))
+        span_trace.init_from_argv(sys.argv)
+        if '--watch' in sys.argv[1:]:
+            watch_devices()
+            return
+        with span('detect_devices'):
+            result = detect_devices()
+        print(json.dumps(span_trace.finish(result), ensure_ascii=False))
+    except KeyboardInterrupt:
+        pass
     except Exception as e:
         print(json.dumps({ 'ok': False, 'error': str(e) }))
         sys.exit(1)
@@ -155,5 +475,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-
-
@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+disk_usage.py
+
+Install sizes for library games. Sizes the launcher already knows are used
+as-is (`installSize` / `sizeOnDisk` on the game, else SizeOnDisk from the Steam
+appmanifest); remaining install dirs are walked with os.scandir on a thread
+pool, one task per directory, shared by all games.
+
+Walk results are cached per directory: the bytes and count of the files
+directly in it plus its subdirectory names, keyed by the directory's stamp. A
+directory whose entries did not change (nothing added, removed or renamed) is
+not listed again, only stat'ed, so a rescan of an unchanged library costs one
+stat per directory. A file rewritten in place keeps its cached size until
+something in its directory changes.
+
+CLI:
+  python scripts/disk_usage.py --games FILE|- [--cache FILE] [--workers N] [--stream]
+
+Input: a JSON array of games,
+  [{"launcher": "gog", "id": "1207", "installDir": "...", "library": null, "installSize": null}, ...]
+
+Outputs JSON:
+{
+  "ok": true,
+  "sizes": {"gog:1207": {"bytes": 5368709120, "source": "scan"}},
+  "stats": {"games": 1, "scanned": 1, "dirs": 120, "listed": 3, "reused": 117}
+}
+`source` is "launcher" (given on the game), "manifest" (Steam appmanifest) or "scan".
+
+Stream mode prints, as work completes:
+  {"event": "progress", "key": "gog:1207", "dirs": 64, "bytes": 1073741824}
+  {"event": "size", "key": "gog:1207", "bytes": 5368709120, "source": "scan"}
+  {"event": "done", "stats": {...}}
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import stat
+import sys
+import time
+
+from glhelpers import metrics, span_trace
+from glhelpers.span_trace import span
+from glhelpers.stamp_cache import StampCache, stamp_of
+
+CACHE_VERSION = 1
+# Minimum seconds between progress events for one game
+PROGRESS_EVERY = 0.25
+
+_SIZE_ON_DISK = re.compile(r'"SizeOnDisk"\s*"(\d+)"', re.IGNORECASE)
+
+
+def game_key(game: dict) -> str:
+    return f"{game.get('launcher') or ''}:{game.get('id') or ''}"
+
+
+def steam_manifest_size(library: str, appid: str) -> int | None:
+    """SizeOnDisk from <library>/appmanifest_<appid>.acf, when it is there and non-zero."""
+    try:
+        with open(os.path.join(library, f'appmanifest_{appid}.acf'), 'r', encoding='utf-8', errors='ignore') as f:
+            m = _SIZE_ON_DISK.search(f.read())
+    except OSError:
+        return None
+    return (int(m.group(1)) or None) if m else None
+
+
+def known_size(game: dict) -> tuple[int | None, str | None]:
+    for field in ('installSize', 'sizeOnDisk'):
+        try:
+            size = int(game.get(field) or 0)
+        except (TypeError, ValueError):
+            size = 0
+        if size > 0:
+            return size, 'launcher'
+    if game.get('launcher') == 'steam' and game.get('library') and str(game.get('id') or '').isdigit():
+        size = steam_manifest_size(game['library'], str(game['id']))
+        if size:
+            return size, 'manifest'
+    return None, None
+
+
+def _is_reparse_point(entry: os.DirEntry) -> bool:
+    """True for junctions and other reparse points, which is_dir(follow_symlinks=False) reports as dirs before 3.12."""
+    if hasattr(entry, 'is_junction') and entry.is_junction():
+        return True
+    return bool(getattr(entry.stat(follow_symlinks=False), 'st_file_attributes', 0) & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+
+def _list_dir(path: str, cache: StampCache):
+    """Return (path, stamp, [file bytes, file count, subdir names], reused) for one directory."""
+    st = os.stat(path)
+    stamp = stamp_of(st)
+    hit, value = cache.get(path, stamp)
+    if hit and value is not None:
+        return path, stamp, value, True
+    total = count = 0
+    subdirs = []
+    with os.scandir(path) as it:
+        for e in it:
+            try:
+                if e.is_dir(follow_symlinks=False):
+                    # A junction points elsewhere (often back up the tree); its target is not this install's
+                    if not _is_reparse_point(e):
+                        subdirs.append(e.name)
+                elif e.is_file(follow_symlinks=False):
+                    # DirEntry.stat() comes from the directory listing on Windows
+                    total += e.stat(follow_symlinks=False).st_size
+                    count += 1
+            except OSError:
+                continue
+    return path, stamp, [total, count, subdirs], False
+
+
+def walk_sizes(roots: dict, cache: StampCache, workers: int | None = None, on_progress=None, on_done=None,
+               stats: dict | None = None) -> dict:
+    """Total bytes under each root of {key: dir}; one thread-pool task per directory across all roots."""
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    stats = stats if stats is not None else {}
+    for k in ('dirs', 'listed', 'reused'):
+        stats.setdefault(k, 0)
+    totals = {key: 0 for key in roots}
+    dirs = {key: 0 for key in roots}
+    pending = {key: 0 for key in roots}
+    last_progress = {}
+    seen = set()
+    with ThreadPoolExecutor(max_workers=max(1, workers or min(16, (os.cpu_count() or 4) * 2))) as pool:
+        running = {}
+
+        def submit(key, path):
+            pending[key] += 1
+            running[pool.submit(_list_dir, path, cache)] = key
+
+        for key, root in roots.items():
+            submit(key, root)
+        while running:
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in done:
+                key = running.pop(fut)
+                pending[key] -= 1
+                try:
+                    path, stamp, value, reused = fut.result()
+                except OSError:
+                    value = None
+                if value is not None:
+                    seen.add(path)
+                    stats['dirs'] += 1
+                    stats['reused' if reused else 'listed'] += 1
+                    if not reused:
+                        cache.put(path, stamp, value)
+                    totals[key] += value[0]
+                    dirs[key] += 1
+                    for name in value[2]:
+                        submit(key, os.path.join(path, name))
+                if pending[key] == 0:
+                    if on_done:
+                        on_done(key, totals[key])
+                elif on_progress:
+                    now = time.monotonic()
+                    if now - last_progress.get(key, 0) >= PROGRESS_EVERY:
+                        last_progress[key] = now
+                        on_progress(key, dirs[key], totals[key])
+
+    # Forget directories that vanished from the walked trees; keep other trees' entries
+    walked = set(roots.values())
+    prefixes = tuple(os.path.join(root, '') for root in walked)
+    cache.prune({p for p in cache.entries if p in seen or not (p in walked or p.startswith(prefixes))})
+    return totals
+
+
+def compute_sizes(games: list, cache: StampCache, workers: int | None = None, emit=None) -> dict:
+    sizes = {}
+    stats = { 'games': 0, 'scanned': 0 }
+
+    def report(key, size, source):
+        sizes[key] = { 'bytes': size, 'source': source }
+        if emit:
+            emit({ 'event': 'size', 'key': key, 'bytes': size, 'source': source })
+
+    to_walk = {}
+    with span('known_sizes'):
+        for game in games:
+            key = game_key(game)
+            if key in sizes or key in to_walk:
+                continue
+            stats['games'] += 1
+            size, source = known_size(game)
+            if size:
+                report(key, size, source)
+            elif game.get('installDir') and os.path.isdir(game['installDir']):
+                to_walk[key] = os.path.normpath(game['installDir'])
+    if to_walk:
+        stats['scanned'] = len(to_walk)
+        on_progress = (lambda key, n, b: emit({ 'event': 'progress', 'key': key, 'dirs': n, 'bytes': b })) if emit else None
+        with span('walk', roots=len(to_walk)):
+            walk_sizes(to_walk, cache, workers, on_progress, lambda key, b: report(key, b, 'scan'), stats)
+    return { 'ok': True, 'sizes': sizes, 'stats': stats }
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Compute install sizes for library games')
+    parser.add_argument('--games', required=True, help='JSON file with the games array, or - for stdin')
+    parser.add_argument('--cache', help='JSON file for the per-directory cache')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--stream', action='store_true', help='Print NDJSON progress/size events')
+    args = parser.parse_args(metrics.init_from_argv(span_trace.init_from_argv(list(argv))))
+
+    def emit(obj: dict) -> None:
+        sys.stdout.write(json.dumps(obj, ensure_ascii=False) + '\n')
+        sys.stdout.flush()
+
+    try:
+        if args.games == '-':
+            games = json.load(sys.stdin)
+        else:
+            with open(args.games, 'r', encoding='utf-8') as f:
+                games = json.load(f)
+        cache = StampCache(args.cache, CACHE_VERSION)
+        with span('disk_usage'):
+            result = compute_sizes([g for g in games if isinstance(g, dict)], cache, args.workers,
+                                   emit if args.stream else None)
+        cache.save()
+        if args.stream:
+            emit(span_trace.finish({ 'event': 'done', 'stats': result['stats'] }))
+        else:
+            print(json.dumps(span_trace.finish(result), ensure_ascii=False))
+    except Exception as e:
+        print(json.dumps({ 'ok': False, 'error': str(e) }))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+epic_detect.py
+
+Epic Games Launcher detector. Reads the launcher's `.item` manifests with a
+thread pool and cross-references `LauncherInstalled.dat`, which is what the
+launcher itself treats as the list of installed apps; manifests left behind by
+uninstalled games are dropped when the .dat is readable.
+
+Parsed manifests can be cached in a JSON file keyed by path and (mtime, size),
+so a refresh only re-reads manifests that changed.
+
+CLI:
+  python scripts/epic_detect.py [--manifests DIR] [--installed FILE] [--cache FILE] [--workers N]
+  python scripts/epic_detect.py --stream ...     # NDJSON, one game per line
+
+Outputs JSON:
+{
+  "ok": true,
+  "manifestDir": "C:/ProgramData/Epic/EpicGamesLauncher/Data/Manifests",
+  "games": [
+    {"id": "Fortnite", "title": "Fortnite", "launcher": "epic", "installDir": "C:/Program Files/Epic Games/Fortnite",
+     "executablePath": "...", "installSize": 123, "catalogItemId": "...", "catalogNamespace": "..."}
+  ],
+  "stats": {"manifests": 12, "parsed": 1, "cached": 11, "skipped": 0}
+}
+
+Stream mode prints:
+  {"event": "game", "game": {...}}
+  {"event": "done", "manifestDir": "...", "stats": {...}}
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+from glhelpers import metrics, span_trace
+from glhelpers.span_trace import span
+from glhelpers.stamp_cache import StampCache, stamp_of
+
+# Cached value shape; bump when parse_manifest's output changes
+CACHE_VERSION = 3
+# AppCategories of items that are not games (DLC, engine builds, marketplace plugins)
+_NOT_GAMES = {'addons', 'plugins', 'engines', 'digitalextras'}
+
+
+def default_paths() -> tuple[str, str]:
+    """Return (manifest dir, LauncherInstalled.dat path) under %ProgramData%."""
+    base = os.environ.get('PROGRAMDATA') or 'C:\\ProgramData'
+    return (
+        os.path.join(base, 'Epic', 'EpicGamesLauncher', 'Data', 'Manifests'),
+        os.path.join(base, 'Epic', 'UnrealEngineLauncher', 'LauncherInstalled.dat'),
+    )
+
+
+def read_launcher_installed(path: str) -> dict | None:
+    """Map AppName -> InstallLocation from LauncherInstalled.dat; None when it cannot be read."""
+    try:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            data = json.load(f)
+        out = {}
+        for entry in data.get('InstallationList') or []:
+            name = entry.get('AppName')
+            if name:
+                out[name] = entry.get('InstallLocation') or ''
+        return out
+    except Exception:
+        return None
+
+
+def parse_manifest(data: dict) -> dict | None:
+    """Extract the detector game shape from one parsed .item manifest.
+
+    Without an InstallLocation, executablePath is LaunchExecutable relative to
+    the install dir; scan_manifests() resolves it against LauncherInstalled.dat.
+    """
+    if data.get('bIsIncompleteInstall'):
+        return None
+    cats = {str(c).lower() for c in data.get('AppCategories') or []}
+    if cats & _NOT_GAMES and 'games' not in cats:
+        return None
+    app = data.get('AppName') or ''
+    main = data.get('MainGameAppName') or app
+    if app and main != app:
+        # DLC installed on top of another app
+        return None
+    install_dir = data.get('InstallLocation') or ''
+    exe = data.get('LaunchExecutable') or ''
+    game = {
+        'id': app or data.get('CatalogItemId') or data.get('InstallationGuid') or '',
+        'title': data.get('DisplayName') or app or 'Epic Game',
+        'launcher': 'epic',
+        'installDir': os.path.normpath(install_dir) if install_dir else None,
+        'executablePath': os.path.normpath(os.path.join(install_dir, exe)) if exe else None,
+        'installSize': int(data.get('InstallSize') or 0) or None,
+        'catalogItemId': data.get('CatalogItemId') or None,
+        'catalogNamespace': data.get('CatalogNamespace') or None,
+    }
+    return game if game['id'] else None
+
+
+def _read_manifest(path: str) -> dict | None:
+    with open(path, 'rb') as f:
+        return parse_manifest(json.loads(f.read().decode('utf-8-sig', errors='replace')))
+
+
+def scan_manifests(manifest_dir: str, installed: dict | None = None, cache: StampCache | None = None,
+                   workers: int | None = None, on_game=None) -> tuple[list, dict]:
+    """Return (games, stats). `on_game(game)` is called as soon as each game is known."""
+    cache = cache or StampCache()
+    stats = { 'manifests': 0, 'parsed': 0, 'cached': 0, 'skipped': 0 }
+    games = []
+
+    def accept(game):
+        if not game:
+            stats['skipped'] += 1
+            return
+        if installed is not None and game['id'] not in installed:
+            stats['skipped'] += 1
+            return
+        if not game['installDir']:
+            install_dir = (installed or {}).get(game['id']) or ''
+            exe = game['executablePath']
+            game = {
+                **game,
+                'installDir': os.path.normpath(install_dir) if install_dir else None,
+                'executablePath': os.path.normpath(os.path.join(install_dir, exe)) if install_dir and exe else None,
+            }
+        games.append(game)
+        if on_game:
+            on_game(game)
+
+    todo = []
+    seen = set()
+    with span('list', dir=manifest_dir):
+        try:
+            entries = list(os.scandir(manifest_dir))
+        except OSError:
+            entries = []
+        for entry in entries:
+            if not entry.name.lower().endswith('.item'):
+                continue
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+            stats['manifests'] += 1
+            stamp = stamp_of(st)
+            seen.add(entry.path)
+            hit, game = cache.get(entry.path, stamp)
+            if hit:
+                stats['cached'] += 1
+                accept(game)
+            else:
+                todo.append((entry.path, stamp))
+
+    if todo:
+        with span('parse', files=len(todo)):
+            for (path, stamp), game, ok in _parse_all(todo, workers):
+                stats['parsed'] += 1
+                if ok:
+                    cache.put(path, stamp, game)
+                accept(game)
+
+    cache.prune(seen)
+    return games, stats
+
+
+def _parse_all(todo: list, workers: int | None):
+    """Yield ((path, stamp), game, ok) for each manifest, reading them on a thread pool."""
+    def work(item):
+        try:
+            return item, _read_manifest(item[0]), True
+        except Exception:
+            return item, None, False
+
+    if len(todo) == 1:
+        yield work(todo[0])
+        return
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=max(1, min(workers or 8, len(todo)))) as pool:
+        yield from pool.map(work, todo)
+
+
+def detect(manifest_dir: str | None = None, installed_path: str | None = None, cache_path: str | None = None,
+           workers: int | None = None, on_game=None) -> dict:
+    default_dir, default_dat = default_paths()
+    manifest_dir = manifest_dir or default_dir
+    with span('launcher_installed'):
+        installed = read_launcher_installed(installed_path or default_dat)
+    cache = StampCache(cache_path, CACHE_VERSION)
+    games, stats = scan_manifests(manifest_dir, installed, cache, workers, on_game)
+    cache.save()
+    return { 'ok': True, 'manifestDir': manifest_dir, 'games': games, 'stats': stats }
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Detect Epic Games Launcher installs')
+    parser.add_argument('--manifests', help='Manifests directory (default: %%ProgramData%%\\Epic\\...\\Manifests)')
+    parser.add_argument('--installed', help='LauncherInstalled.dat path')
+    parser.add_argument('--cache', help='JSON file for the parsed-manifest cache')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--stream', action='store_true', help='Print NDJSON events as games are found')
+    args = parser.parse_args(metrics.init_from_argv(span_trace.init_from_argv(list(argv))))
+
+    def emit(obj: dict) -> None:
+        sys.stdout.write(json.dumps(obj, ensure_ascii=False) + '\n')
+        sys.stdout.flush()
+
+    try:
+        on_game = (lambda g: emit({ 'event': 'game', 'game': g })) if args.stream else None
+        with span('detect'), metrics.timed('detect_ms', launcher='epic'):
+            result = detect(args.manifests, args.installed, args.cache, args.workers, on_game)
+        if args.stream:
+            emit(span_trace.finish({ 'event': 'done', 'manifestDir': result['manifestDir'], 'stats': result['stats'] }))
+        else:
+            print(json.dumps(span_trace.finish(result), ensure_ascii=False))
+    except Exception as e:
+        print(json.dumps({ 'ok': False, 'error': str(e) }))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+gen_controller_db.py
+
+Builds data/controllers.bin (see controller_db.py for the format) from one or
+more source tables.
+
+Sources:
+  *.csv   vendor_id,product_id,type,layout,button_map,name   ('*' product = vendor default)
+  *.txt   SDL gamecontrollerdb.txt; USB GUIDs are decoded to VID/PID and typed
+          from the vendor defaults of the CSV sources
+
+Later sources never override earlier ones, so list the curated CSV first.
+
+CLI:
+  python scripts/gen_controller_db.py [--out data/controllers.bin] data/controllers.csv [gamecontrollerdb.txt ...]
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import struct
+import sys
+
+from controller_db import (
+    ANY_PRODUCT, BUTTON_MAPS, DEFAULT_PATH, HEADER, LAYOUTS, MAGIC, RECORD, TYPES, VERSION
+)
+
+
+def _read_csv(path: str, rows: dict) -> None:
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for line in csv.reader(r for r in f if r.strip() and not r.lstrip().startswith('#')):
+            if len(line) < 6:
+                continue
+            vid, pid, typ, layout, bmap = (c.strip() for c in line[:5])
+            name = ','.join(line[5:]).strip()
+            v = int(vid, 16)
+            p = ANY_PRODUCT if pid == '*' else int(pid, 16)
+            rows.setdefault((v << 16) | p, (typ, layout, bmap, name))
+
+
+def _read_sdl(path: str, rows: dict) -> None:
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split(',', 2)
+            guid = parts[0].lower()
+            # USB/Bluetooth GUIDs: bus(4) 0000 vid-le(4) 0000 pid-le(4) 0000 version(4) ...
+            if len(guid) != 32 or len(parts) < 2 or guid[4:8] != '0000' or guid[12:16] != '0000':
+                continue
+            try:
+                v = int(guid[10:12] + guid[8:10], 16)
+                p = int(guid[18:20] + guid[16:18], 16)
+            except ValueError:
+                continue
+            if not v or p == ANY_PRODUCT:
+                continue
+            vendor = rows.get((v << 16) | ANY_PRODUCT, ('Generic', 'standard', 'xbox', ''))
+            rows.setdefault((v << 16) | p, (vendor[0], 'standard', vendor[2], parts[1].strip()))
+
+
+def build(sources: list[str]) -> bytes:
+    rows: dict = {}
+    for src in sources:
+        if src.lower().endswith('.csv'):
+            _read_csv(src, rows)
+        else:
+            _read_sdl(src, rows)
+
+    strings = bytearray()
+    string_offsets: dict = {}
+    records = bytearray()
+    for key in sorted(rows):
+        typ, layout, bmap, name = rows[key]
+        if name not in string_offsets:
+            raw = name.encode('utf-8')[:0xFFFF]
+            string_offsets[name] = len(strings)
+            strings += struct.pack('<H', len(raw)) + raw
+        records += RECORD.pack(
+            key,
+            TYPES.index(typ) if typ in TYPES else 0,
+            LAYOUTS.index(layout) if layout in LAYOUTS else 0,
+            BUTTON_MAPS.index(bmap) if bmap in BUTTON_MAPS else 0,
+            string_offsets[name],
+        )
+    header = HEADER.pack(MAGIC, VERSION, RECORD.size, len(rows), HEADER.size + len(records))
+    return bytes(header + records + strings)
+
+
+def main(argv: list[str]) -> int:
+    parser = argparse.ArgumentParser(description='Build the packed controller VID/PID table')
+    parser.add_argument('sources', nargs='+', help='CSV seed tables and/or SDL gamecontrollerdb.txt files')
+    parser.add_argument('--out', default=DEFAULT_PATH, help='Output .bin path')
+    args = parser.parse_args(argv)
+
+    data = build(args.sources)
+    tmp = args.out + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    os.replace(tmp, args.out)
+    count = HEADER.unpack_from(data, 0)[3]
+    print(f'wrote {count} records ({len(data)} bytes) to {args.out}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
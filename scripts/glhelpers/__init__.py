@@ -0,0 +1,7 @@
+"""
+Shared helpers for the Python scripts in scripts/.
+
+Kept deliberately small: the scripts are started once per request, so every
+module here imports only what its hot path needs and defers the rest
+(subprocess, threading, ...) to the functions that use it.
+"""
@@ -0,0 +1,251 @@
+"""
+Readers for Steam's binary KeyValues ("binary VDF") files.
+
+  AppInfo(path)         appcache/appinfo.vdf, memory-mapped. The record index
+                        is built by hopping over each record's size field, so
+                        only the records asked for are ever decoded:
+                          with AppInfo(path) as info:
+                              name = info.find(440, 'appinfo', 'common', 'name')
+  read_shortcuts(path)  userdata/<id>/config/shortcuts.vdf as a list of dicts
+
+appinfo.vdf versions 27, 28 and 29 are understood; v29 stores keys as indexes
+into a string table at the end of the file, which is decoded on demand too.
+
+Binary KeyValues: each entry is a type byte, a key (NUL-terminated, or a
+uint32 string-table index in appinfo v29), then the value; 0x08 closes a map.
+"""
+
+import mmap
+import struct
+
+T_MAP = 0x00
+T_STRING = 0x01
+T_INT32 = 0x02
+T_FLOAT32 = 0x03
+T_POINTER = 0x04
+T_WSTRING = 0x05
+T_COLOR = 0x06
+T_UINT64 = 0x07
+T_END = 0x08
+T_INT64 = 0x0A
+T_END_ALT = 0x0B
+
+_FIXED = {
+    T_INT32: struct.Struct('<i'),
+    T_POINTER: struct.Struct('<i'),
+    T_COLOR: struct.Struct('<i'),
+    T_FLOAT32: struct.Struct('<f'),
+    T_UINT64: struct.Struct('<Q'),
+    T_INT64: struct.Struct('<q'),
+}
+_U32 = struct.Struct('<I')
+_I64 = struct.Struct('<q')
+
+APPINFO_MAGICS = {0x07564427: 27, 0x07564428: 28, 0x07564429: 29}
+# appid, size, infoState, lastUpdated, picsToken, sha1 of the text KV, changeNumber
+_RECORD_HEADER = 4 + 4 + 4 + 4 + 8 + 20 + 4
+# v28+ adds a sha1 of the binary KV
+_RECORD_HASH = 20
+
+
+class _Reader:
+    """Decodes KeyValues out of a bytes-like buffer; `keys` resolves v29 key indexes."""
+
+    def __init__(self, buf, keys=None):
+        self.buf = buf
+        self.keys = keys
+
+    def _cstring(self, pos):
+        end = self.buf.find(b'\0', pos)
+        if end < 0:
+            raise ValueError(f'unterminated string at {pos}')
+        return self.buf[pos:end].decode('utf-8', errors='replace'), end + 1
+
+    def _skip_cstring(self, pos):
+        end = self.buf.find(b'\0', pos)
+        if end < 0:
+            raise ValueError(f'unterminated string at {pos}')
+        return end + 1
+
+    def _wstring_end(self, pos):
+        end = pos
+        while True:
+            end = self.buf.find(b'\0\0', end)
+            if end < 0:
+                raise ValueError(f'unterminated wide string at {pos}')
+            if (end - pos) % 2 == 0:
+                return end
+            end += 1
+
+    def key(self, pos):
+        if self.keys is not None:
+            return self.keys(_U32.unpack_from(self.buf, pos)[0]), pos + 4
+        return self._cstring(pos)
+
+    def skip_key(self, pos):
+        return pos + 4 if self.keys is not None else self._skip_cstring(pos)
+
+    def value(self, t, pos):
+        """Decode the value of type `t` at pos; return (value, next pos)."""
+        if t == T_MAP:
+            return self.map(pos)
+        if t == T_STRING:
+            return self._cstring(pos)
+        fixed = _FIXED.get(t)
+        if fixed is not None:
+            return fixed.unpack_from(self.buf, pos)[0], pos + fixed.size
+        if t == T_WSTRING:
+            end = self._wstring_end(pos)
+            return self.buf[pos:end].decode('utf-16-le', errors='replace'), end + 2
+        raise ValueError(f'unknown binary VDF type 0x{t:02x} at {pos - 1}')
+
+    def skip(self, t, pos):
+        """Step over a value of type `t` without decoding it."""
+        if t == T_MAP:
+            while True:
+                t = self.buf[pos]
+                if t in (T_END, T_END_ALT):
+                    return pos + 1
+                pos = self.skip(t, self.skip_key(pos + 1))
+        if t == T_STRING:
+            return self._skip_cstring(pos)
+        fixed = _FIXED.get(t)
+        if fixed is not None:
+            return pos + fixed.size
+        if t == T_WSTRING:
+            return self._wstring_end(pos) + 2
+        raise ValueError(f'unknown binary VDF type 0x{t:02x} at {pos - 1}')
+
+    def map(self, pos):
+        """Decode the map body at pos (entries up to its end byte); return (dict, next pos)."""
+        out = {}
+        while True:
+            t = self.buf[pos]
+            if t in (T_END, T_END_ALT):
+                return out, pos + 1
+            key, pos = self.key(pos + 1)
+            out[key], pos = self.value(t, pos)
+
+    def find(self, pos, path):
+        """Decode only the value at `path` (case-insensitive keys) in the map body at pos; None if absent."""
+        want = path[0].lower()
+        while True:
+            t = self.buf[pos]
+            if t in (T_END, T_END_ALT):
+                return None
+            key, vpos = self.key(pos + 1)
+            if key.lower() == want:
+                if len(path) == 1:
+                    return self.value(t, vpos)[0]
+                return self.find(vpos, path[1:]) if t == T_MAP else None
+            pos = self.skip(t, vpos)
+
+
+class AppInfo:
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        magic, self.universe = struct.unpack_from('<II', self._mm, 0)
+        self.version = APPINFO_MAGICS.get(magic)
+        if self.version is None:
+            self.close()
+            raise ValueError(f'unsupported appinfo.vdf magic 0x{magic:08x}')
+        self._end = len(self._mm)
+        self._start = 8
+        self._key_offsets = None
+        self._key_cache = {}
+        if self.version >= 29:
+            self._end = _I64.unpack_from(self._mm, 8)[0]
+            self._start = 16
+        self._kv_offset = _RECORD_HEADER + (_RECORD_HASH if self.version >= 28 else 0)
+        self._reader = _Reader(self._mm, self._key if self.version >= 29 else None)
+        self._index = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        try:
+            self._mm.close()
+        except Exception:
+            pass
+        self._file.close()
+
+    def _key(self, i):
+        name = self._key_cache.get(i)
+        if name is None:
+            if self._key_offsets is None:
+                self._load_key_offsets()
+            pos = self._key_offsets[i]
+            name = self._key_cache[i] = self._mm[pos:self._mm.find(b'\0', pos)].decode('utf-8', errors='replace')
+        return name
+
+    def _load_key_offsets(self):
+        mm = self._mm
+        count = _U32.unpack_from(mm, self._end)[0]
+        pos = self._end + 4
+        offsets = []
+        for _ in range(count):
+            offsets.append(pos)
+            pos = mm.find(b'\0', pos) + 1
+        self._key_offsets = offsets
+
+    @property
+    def index(self):
+        """{appid: record offset}, built by reading only the 8-byte (appid, size) prefix of each record."""
+        if self._index is None:
+            index = {}
+            mm, pos, end = self._mm, self._start, self._end
+            while pos + 8 <= end:
+                appid, size = struct.unpack_from('<II', mm, pos)
+                if appid == 0:
+                    break
+                index[appid] = pos
+                pos += 8 + size
+            self._index = index
+        return self._index
+
+    def __contains__(self, appid):
+        return int(appid) in self.index
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, appid):
+        """Decode the whole KeyValues tree of one app (usually {"appinfo": {...}}); None if unknown."""
+        pos = self.index.get(int(appid))
+        if pos is None:
+            return None
+        return self._reader.map(pos + self._kv_offset)[0]
+
+    def find(self, appid, *path):
+        """Decode a single value of one app, e.g. find(440, 'appinfo', 'common', 'name')."""
+        pos = self.index.get(int(appid))
+        if pos is None or not path:
+            return None
+        return self._reader.find(pos + self._kv_offset, path)
+
+
+def loads(data):
+    """Decode a standalone binary KeyValues blob (e.g. a whole shortcuts.vdf)."""
+    return _Reader(data).map(0)[0]
+
+
+def read_shortcuts(path):
+    """Entries of a shortcuts.vdf, in file order; [] when it is missing or unreadable."""
+    try:
+        with open(path, 'rb') as f:
+            data = loads(f.read())
+    except Exception:
+        return []
+    for key, val in data.items():
+        if key.lower() == 'shortcuts' and isinstance(val, dict):
+            return [v for v in val.values() if isinstance(v, dict)]
+    return []
@@ -0,0 +1,323 @@
+"""
+Counters and latency histograms for the helper scripts.
+
+Disabled by default: inc() / observe() then return after one global check.
+Enable per run with a flag stripped from argv like span_trace's --trace (or
+with GL_METRICS=<file> in the environment):
+  --metrics=<file>   merge this run's metrics into <file> at exit
+
+Helpers are mostly short-lived, so every run folds its values into the shared
+JSON file; long-running modes (--watch, --follow) call flush() as they go.
+Concurrent writers can lose an update to each other; the totals are for
+watching trends, not accounting.
+
+Histograms are HDR-style: values (milliseconds) are recorded in microseconds
+into log-linear buckets, SUB_BUCKETS per power of two, which keeps ~3% relative
+precision from 1 us to hours in a few hundred sparse buckets that merge by
+adding counts.
+
+Usage:
+  metrics.inc('proc_requests_total', action='find')
+  with metrics.timed('proc_snapshot_ms'):
+      ...
+  metrics.observe('http_ms', 84.2, host='store.steampowered.com')
+  text = metrics.render_prometheus(metrics.load(path))
+
+Read the file back with `python scripts/proc.py metrics '{"format": "prometheus"}'`
+(JSON with p50/p90/p99 per histogram when format is omitted).
+"""
+
+import json
+import os
+import time
+
+VERSION = 1
+SUB_BITS = 5
+SUB_BUCKETS = 1 << SUB_BITS
+
+_enabled = False
+_path = None
+_counters = {}
+_histograms = {}
+_registered = False
+_keys = {}
+
+
+def _key(name, labels):
+    if not labels:
+        return name
+    # Call sites pass the same labels over and over; build each series name once
+    lookup = (name, *labels.items())
+    key = _keys.get(lookup)
+    if key is None:
+        key = _keys[lookup] = name + '{' + ','.join(f'{k}="{labels[k]}"' for k in sorted(labels)) + '}'
+    return key
+
+
+def bucket_index(us):
+    us = max(1, int(us))
+    e = us.bit_length() - 1
+    if e < SUB_BITS:
+        return us
+    return ((e - SUB_BITS + 1) << SUB_BITS) + (us >> (e - SUB_BITS)) - SUB_BUCKETS
+
+
+def bucket_upper(index):
+    """Largest microsecond value that lands in bucket `index`."""
+    if index < SUB_BUCKETS:
+        return index
+    shift = (index >> SUB_BITS) - 1
+    mantissa = (index & (SUB_BUCKETS - 1)) + SUB_BUCKETS
+    return ((mantissa + 1) << shift) - 1
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'sum', 'min', 'max')
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, ms):
+        i = bucket_index(ms * 1000.0)
+        counts = self.counts
+        counts[i] = counts.get(i, 0) + 1
+        if not self.count:
+            self.min = self.max = ms
+        elif ms < self.min:
+            self.min = ms
+        elif ms > self.max:
+            self.max = ms
+        self.count += 1
+        self.sum += ms
+
+    def merge(self, other):
+        for i, n in other.counts.items():
+            self.counts[i] = self.counts.get(i, 0) + n
+        self.count += other.count
+        self.sum += other.sum
+        for attr, pick in (('min', min), ('max', max)):
+            a, b = getattr(self, attr), getattr(other, attr)
+            setattr(self, attr, b if a is None else a if b is None else pick(a, b))
+
+    def percentile(self, p):
+        """Upper bound (ms) of the bucket holding the p-th percentile; None when empty."""
+        if not self.count:
+            return None
+        rank = max(1, int(round(p / 100.0 * self.count)))
+        seen = 0
+        for i in sorted(self.counts):
+            seen += self.counts[i]
+            if seen >= rank:
+                return min(max(bucket_upper(i) / 1000.0, self.min), self.max)
+        return self.max
+
+    def to_json(self):
+        return {
+            'count': self.count, 'sum': round(self.sum, 3),
+            'min': None if self.min is None else round(self.min, 3),
+            'max': None if self.max is None else round(self.max, 3),
+            'buckets': {str(i): n for i, n in sorted(self.counts.items())},
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        h = cls()
+        h.counts = {int(i): int(n) for i, n in (data.get('buckets') or {}).items()}
+        h.count = int(data.get('count') or 0)
+        h.sum = float(data.get('sum') or 0.0)
+        h.min = data.get('min')
+        h.max = data.get('max')
+        return h
+
+
+def enable(path=None):
+    global _enabled, _path, _registered
+    _enabled = True
+    _path = path
+    if path and not _registered:
+        import atexit
+        atexit.register(flush)
+        _registered = True
+
+
+def disable():
+    """Stop recording and drop anything not flushed yet."""
+    global _enabled
+    _enabled = False
+    _counters.clear()
+    _histograms.clear()
+
+
+def enabled():
+    return _enabled
+
+
+def path():
+    return _path
+
+
+def init_from_argv(argv):
+    """Strip --metrics=<file> from argv (in place) and enable metrics if present."""
+    env = os.environ.get('GL_METRICS', '')
+    if env:
+        enable(env)
+    for arg in list(argv):
+        if arg.startswith('--metrics='):
+            argv.remove(arg)
+            enable(arg.split('=', 1)[1] or None)
+            break
+    return argv
+
+
+def inc(name, n=1, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    _counters[key] = _counters.get(key, 0) + n
+
+
+def observe(name, ms, **labels):
+    if not _enabled:
+        return
+    key = _key(name, labels)
+    h = _histograms.get(key)
+    if h is None:
+        h = _histograms[key] = Histogram()
+    h.record(ms)
+
+
+class _Timed:
+    __slots__ = ('name', 'labels', 't0')
+
+    def __init__(self, name, labels):
+        self.name = name
+        self.labels = labels
+
+    def __enter__(self):
+        self.t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.name, (time.perf_counter() - self.t0) * 1000.0, **self.labels)
+        return False
+
+
+class _NoopTimed:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NOOP = _NoopTimed()
+
+
+def timed(name, **labels):
+    return _Timed(name, labels) if _enabled else _NOOP
+
+
+def snapshot():
+    """This process's metrics since the last flush, in the file format."""
+    return {
+        'version': VERSION,
+        'counters': dict(_counters),
+        'histograms': {k: h.to_json() for k, h in _histograms.items()},
+    }
+
+
+def load(path):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == VERSION:
+            return data
+    except Exception:
+        pass
+    return {'version': VERSION, 'counters': {}, 'histograms': {}}
+
+
+def merge(into, data):
+    counters = into.setdefault('counters', {})
+    for k, n in (data.get('counters') or {}).items():
+        counters[k] = counters.get(k, 0) + n
+    hists = into.setdefault('histograms', {})
+    for k, h in (data.get('histograms') or {}).items():
+        merged = Histogram.from_json(hists.get(k) or {})
+        merged.merge(Histogram.from_json(h))
+        hists[k] = merged.to_json()
+    return into
+
+
+def flush():
+    """Fold this process's metrics into the metrics file and reset them."""
+    if not _enabled or not _path or not (_counters or _histograms):
+        return
+    try:
+        data = merge(load(_path), snapshot())
+        data.setdefault('since', time.time())
+        data['updated'] = time.time()
+        tmp = f'{_path}.{os.getpid()}.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, _path)
+        _counters.clear()
+        _histograms.clear()
+    except Exception:
+        pass
+
+
+def summarize(data, percentiles=(50, 90, 99)):
+    """JSON view for callers: counters as-is, histograms as count/sum/min/max/pNN (ms)."""
+    out = {'counters': dict(data.get('counters') or {}), 'histograms': {}}
+    for k, h in (data.get('histograms') or {}).items():
+        hist = Histogram.from_json(h)
+        entry = {'count': hist.count, 'sum': round(hist.sum, 3), 'min': hist.min, 'max': hist.max}
+        for p in percentiles:
+            entry[f'p{p}'] = hist.percentile(p)
+        out['histograms'][k] = entry
+    for k in ('since', 'updated'):
+        if k in data:
+            out[k] = data[k]
+    return out
+
+
+def _split_key(key):
+    name, brace, rest = key.partition('{')
+    return name, (rest[:-1] if brace else '')
+
+
+def render_prometheus(data):
+    """Prometheus text exposition format (counters, and histograms with cumulative le buckets in seconds)."""
+    lines = []
+    typed = set()
+    for key in sorted(data.get('counters') or {}):
+        name, labels = _split_key(key)
+        if name not in typed:
+            lines.append(f'# TYPE {name} counter')
+            typed.add(name)
+        lines.append(f'{key} {data["counters"][key]}')
+    for key in sorted(data.get('histograms') or {}):
+        name, labels = _split_key(key)
+        base = name[:-3] + '_seconds' if name.endswith('_ms') else name
+        if base not in typed:
+            lines.append(f'# TYPE {base} histogram')
+            typed.add(base)
+        hist = Histogram.from_json(data['histograms'][key])
+        sep = ',' if labels else ''
+        cumulative = 0
+        for i in sorted(hist.counts):
+            cumulative += hist.counts[i]
+            le = bucket_upper(i) / 1e6
+            lines.append(f'{base}_bucket{{{labels}{sep}le="{le:.6g}"}} {cumulative}')
+        lines.append(f'{base}_bucket{{{labels}{sep}le="+Inf"}} {hist.count}')
+        suffix = '{' + labels + '}' if labels else ''
+        lines.append(f'{base}_sum{suffix} {hist.sum / 1000.0:.6f}')
+        lines.append(f'{base}_count{suffix} {hist.count}')
+    return '\n'.join(lines) + '\n'
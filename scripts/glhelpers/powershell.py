@@ -0,0 +1,40 @@
+"""PowerShell invocation shared by the Windows detectors."""
+
+import json
+
+from . import metrics
+from .span_trace import span
+
+
+def run_powershell(command, timeout=4.0, label=None):
+    """Run one PowerShell command; return stripped stdout, or '' on failure / non-zero exit."""
+    import subprocess
+    metrics.inc('powershell_spawns_total')
+    try:
+        with span('subprocess', cmd='powershell ' + (label or command[:60])) as s, \
+                metrics.timed('powershell_ms'):
+            completed = subprocess.run(
+                ['powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass', '-Command', command],
+                capture_output=True, text=True, timeout=timeout, encoding='utf-8', errors='replace'
+            )
+            s.set(returncode=completed.returncode, bytes=len(completed.stdout or ''))
+        if completed.returncode == 0:
+            return (completed.stdout or '').strip()
+    except Exception:
+        pass
+    return ''
+
+
+def run_powershell_json(command, timeout=4.0, label=None):
+    """Run a command ending in ConvertTo-Json; always return a list of objects."""
+    raw = run_powershell(command, timeout, label)
+    if not raw:
+        return []
+    try:
+        with span('parse', format='json', bytes=len(raw)):
+            data = json.loads(raw)
+    except Exception:
+        return []
+    if isinstance(data, dict):
+        return [data]
+    return data or []
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+proc_snapshot.py
+
+Shared process snapshot backend for proc.py and process_kill.py.
+
+Every record uses the Win32_Process field names so callers do not care which
+backend produced it:
+  { "ProcessId": int, "ParentProcessId": int|None, "Name": str,
+    "ExecutablePath": str, "CommandLine": str }
+Ask for "CreationDate" to also get a creation stamp that orders processes
+within one snapshot (FILETIME on Windows, clock ticks since boot on Linux).
+
+Windows: one Get-CimInstance Win32_Process query through PowerShell. Callers
+         can pass a WQL `where` clause so the filtering happens in WMI and
+         only matching rows are serialized; if the query fails the full
+         listing is returned instead.
+Linux:   read directly from /proc (no subprocess); `where` is ignored.
+
+Pass a dict as `stats` to get the query, payload size and parse time back.
+"""
+
+import json
+import os
+import sys
+import time
+
+from . import metrics
+from .powershell import run_powershell
+from .span_trace import span
+
+
+PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+ERROR_ACCESS_DENIED = 5
+STILL_ACTIVE = 259
+
+DEFAULT_FIELDS = ('ProcessId', 'ExecutablePath', 'CommandLine', 'ParentProcessId', 'Name')
+# Fields selected as PowerShell calculated properties; CreationDate comes back as a FILETIME number
+_PS_SELECT = {
+    'CreationDate': "@{n='CreationDate';e={if ($_.CreationDate) { $_.CreationDate.ToFileTimeUtc() }}}",
+}
+
+
+def _ps_list_windows(fields=DEFAULT_FIELDS, where=None, stats=None):
+    """Run the CIM query; None when it fails (bad WQL, timeout), [] when nothing matched."""
+    query = 'Get-CimInstance Win32_Process'
+    if where:
+        query += " -Filter '" + where.replace("'", "''") + "'"
+    select = ','.join(_PS_SELECT.get(f, f) for f in fields)
+    # -InputObject @(...) always prints a JSON array, so an empty result is '[]' rather than nothing
+    raw = run_powershell(
+        f"ConvertTo-Json -Depth 2 -Compress -InputObject @({query} -ErrorAction Stop | Select-Object {select})",
+        timeout=10, label='Get-CimInstance Win32_Process' + (' -Filter' if where else '')
+    )
+    if not raw:
+        return None
+    t0 = time.perf_counter()
+    try:
+        with span('parse', format='json', bytes=len(raw)):
+            data = json.loads(raw)
+    except Exception:
+        return None
+    if stats is not None:
+        stats['bytes'] = stats.get('bytes', 0) + len(raw)
+        stats['parseMs'] = round(stats.get('parseMs', 0) + (time.perf_counter() - t0) * 1000.0, 3)
+    if isinstance(data, dict):
+        return [data]
+    return data or []
+
+
+def _read_proc_entry(pid, want_cmdline, want_created=False):
+    base = f'/proc/{pid}'
+    try:
+        with open(base + '/stat', 'rb') as f:
+            stat = f.read().decode('utf-8', errors='replace')
+    except OSError:
+        return None
+    # comm is wrapped in parens and may itself contain spaces/parens
+    lp = stat.find('(')
+    rp = stat.rfind(')')
+    name = stat[lp + 1:rp] if lp != -1 and rp != -1 else ''
+    rest = stat[rp + 2:].split() if rp != -1 else []
+    if rest and rest[0] == 'Z':
+        # Exited, waiting to be reaped by its parent
+        return None
+    ppid = None
+    try:
+        ppid = int(rest[1])
+    except Exception:
+        pass
+    created = None
+    if want_created:
+        try:
+            # Field 22, starttime: clock ticks after boot
+            created = int(rest[19])
+        except Exception:
+            pass
+    exe = ''
+    try:
+        exe = os.readlink(base + '/exe')
+    except OSError:
+        pass
+    cmdline = ''
+    if want_cmdline:
+        try:
+            with open(base + '/cmdline', 'rb') as f:
+                cmdline = f.read().replace(b'\0', b' ').decode('utf-8', errors='replace').strip()
+        except OSError:
+            pass
+    if exe:
+        name = os.path.basename(exe)
+    rec = {
+        'ProcessId': pid,
+        'ParentProcessId': ppid,
+        'Name': name,
+        'ExecutablePath': exe,
+        'CommandLine': cmdline
+    }
+    if want_created:
+        rec['CreationDate'] = created
+    return rec
+
+
+def _proc_list_posix(fields=DEFAULT_FIELDS):
+    out = []
+    want_cmdline = 'CommandLine' in fields
+    want_created = 'CreationDate' in fields
+    try:
+        entries = os.listdir('/proc')
+    except OSError:
+        return out
+    with span('procfs') as s:
+        for e in entries:
+            if not e.isdigit():
+                continue
+            rec = _read_proc_entry(int(e), want_cmdline, want_created)
+            if rec:
+                out.append(rec)
+        s.add('processes', len(out))
+    return out
+
+
+def list_processes(fields=DEFAULT_FIELDS, where=None, stats=None):
+    """Return one snapshot of the process table as a list of Win32_Process-shaped dicts.
+
+    `where` is a WQL condition applied server-side on Windows; callers must still
+    filter the result themselves, since the full listing is the fallback."""
+    if stats is not None:
+        stats.update({'where': where, 'fields': list(fields), 'fallback': None})
+    with metrics.timed('proc_snapshot_ms', filtered='yes' if where else 'no'):
+        procs = _list_processes(fields, where, stats)
+    if stats is not None:
+        stats['processes'] = len(procs)
+    return procs
+
+
+def _list_processes(fields, where, stats):
+    if os.name == 'nt':
+        procs = _ps_list_windows(fields, where, stats)
+        if procs is None and where:
+            if stats is not None:
+                stats.update({'where': None, 'fallback': 'query-failed'})
+            procs = _ps_list_windows(fields, None, stats)
+        procs = procs or []
+    elif sys.platform.startswith('linux'):
+        t0 = time.perf_counter()
+        procs = _proc_list_posix(fields)
+        if stats is not None:
+            stats.update({'where': None, 'bytes': 0, 'parseMs': round((time.perf_counter() - t0) * 1000.0, 3)})
+    else:
+        procs = []
+    return procs
+
+
+def _is_zombie(pid):
+    try:
+        with open(f'/proc/{pid}/stat', 'rb') as f:
+            stat = f.read()
+    except OSError:
+        return False
+    return stat[stat.rfind(b')') + 2:stat.rfind(b')') + 3] == b'Z'
+
+
+def pids_alive(pids):
+    """The pids that still exist, checked one by one without taking a snapshot.
+
+    Windows asks OpenProcess/GetExitCodeProcess (no PowerShell); POSIX uses
+    signal 0. Access denied means the process exists."""
+    if os.name != 'nt':
+        alive = []
+        for pid in pids:
+            try:
+                os.kill(pid, 0)
+            except PermissionError:
+                pass
+            except OSError:
+                continue
+            if not _is_zombie(pid):
+                alive.append(pid)
+        return alive
+    import ctypes
+    from ctypes import wintypes
+    k32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    k32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    k32.OpenProcess.restype = wintypes.HANDLE
+    k32.GetExitCodeProcess.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+    k32.CloseHandle.argtypes = (wintypes.HANDLE,)
+    code = wintypes.DWORD()
+    alive = []
+    for pid in pids:
+        h = k32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not h:
+            if ctypes.get_last_error() == ERROR_ACCESS_DENIED:
+                alive.append(pid)
+            continue
+        try:
+            if k32.GetExitCodeProcess(h, ctypes.byref(code)) and code.value == STILL_ACTIVE:
+                alive.append(pid)
+        finally:
+            k32.CloseHandle(h)
+    return alive
+
+
+def children_map(procs):
+    """Map parent PID -> list of child PIDs for one snapshot.
+
+    Windows keeps a dead parent's PID in ParentProcessId, and that PID can be
+    reused by an unrelated newer process. With CreationDate in the snapshot, a
+    child created before the process now holding its parent PID is not linked."""
+    created = {p.get('ProcessId'): p.get('CreationDate') for p in procs}
+    kids = {}
+    for p in procs:
+        pid = p.get('ProcessId')
+        ppid = p.get('ParentProcessId')
+        if isinstance(pid, int) and isinstance(ppid, int) and pid != ppid:
+            born, parent_born = p.get('CreationDate'), created.get(ppid)
+            if born is not None and parent_born is not None and born < parent_born:
+                continue
+            kids.setdefault(ppid, []).append(pid)
+    return kids
+
+
+def descendants(roots, kids):
+    """Return the roots plus every descendant PID, parents before children."""
+    order = []
+    seen = set()
+    stack = list(reversed([r for r in roots if isinstance(r, int)]))
+    while stack:
+        pid = stack.pop()
+        if pid in seen:
+            continue
+        seen.add(pid)
+        order.append(pid)
+        for c in reversed(kids.get(pid, [])):
+            if c not in seen:
+                stack.append(c)
+    return order
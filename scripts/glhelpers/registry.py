@@ -0,0 +1,394 @@
+"""
+Registry access shared by the Windows detectors.
+
+Detectors talk to a backend rather than to winreg directly, so the same code
+runs against an in-memory registry on other platforms:
+
+  WinregBackend    the real registry (Windows only)
+  MemoryBackend    a flat {"HKLM\\Path\\To\\Key": {"Value": data}} mapping,
+                   loadable from a JSON fixture with MemoryBackend.from_json()
+
+Hive names are the short forms HKLM / HKCU. Key lookups are case-insensitive,
+as they are in the registry.
+
+RegistrySnapshot caches {subkey: values} views of a tree, optionally in a JSON
+file, and revalidates them with key last-write times: the subkey list is only
+re-enumerated when the tree key itself changed (a subkey was added or removed),
+and a subkey's values are only re-read when its own last-write time moved.
+`wait_for_change()` blocks on RegNotifyChangeKeyValue (or the in-memory
+equivalent) for the trees read so far.
+
+Scripts pick these up from argv, like span_trace's --trace:
+  --registry=<fixture.json>      use a MemoryBackend instead of the registry
+  --registry-cache=<file.json>   persist the snapshot between runs
+"""
+
+import json
+import os
+
+from . import metrics
+
+try:
+    import winreg  # type: ignore
+except Exception:
+    winreg = None  # type: ignore
+
+CACHE_VERSION = 1
+
+
+class WinregBackend:
+    def __init__(self):
+        self._hives = {'HKLM': winreg.HKEY_LOCAL_MACHINE, 'HKCU': winreg.HKEY_CURRENT_USER}
+
+    def _open(self, hive, path, access=None):
+        if access is None:
+            return winreg.OpenKey(self._hives[hive], path)
+        return winreg.OpenKey(self._hives[hive], path, 0, access)
+
+    def subkeys(self, hive, path):
+        """Names of the direct subkeys of hive\\path; [] when the key does not exist."""
+        out = []
+        try:
+            with self._open(hive, path) as key:
+                i = 0
+                while True:
+                    try:
+                        out.append(winreg.EnumKey(key, i))
+                    except OSError:
+                        break
+                    i += 1
+        except OSError:
+            pass
+        return out
+
+    def values(self, hive, path):
+        """All values of hive\\path as {name: data}; {} when the key does not exist."""
+        out = {}
+        try:
+            with self._open(hive, path) as key:
+                i = 0
+                while True:
+                    try:
+                        name, val, _ = winreg.EnumValue(key, i)
+                    except OSError:
+                        break
+                    out[name] = val
+                    i += 1
+        except OSError:
+            pass
+        return out
+
+    def last_write(self, hive, path):
+        """Last-write time of hive\\path (FILETIME ticks); None when the key does not exist."""
+        try:
+            with self._open(hive, path) as key:
+                return winreg.QueryInfoKey(key)[2]
+        except OSError:
+            return None
+
+    def watch(self, keys):
+        return _WinregWatch(self, keys)
+
+
+class _WinregWatch:
+    """RegNotifyChangeKeyValue on each key's subtree (or its nearest existing ancestor)."""
+
+    def __init__(self, backend, keys):
+        import ctypes
+        from ctypes import wintypes
+        self._kernel32 = ctypes.windll.kernel32
+        advapi32 = ctypes.windll.advapi32
+        self._kernel32.CreateEventW.restype = wintypes.HANDLE
+        self._keys = []
+        events = []
+        flags = 0x1 | 0x4  # REG_NOTIFY_CHANGE_NAME | REG_NOTIFY_CHANGE_LAST_SET
+        for hive, path in keys:
+            parts = path.split('\\')
+            while True:
+                try:
+                    key = backend._open(hive, '\\'.join(parts), winreg.KEY_NOTIFY | winreg.KEY_READ)
+                    break
+                except OSError:
+                    if not parts:
+                        key = None
+                        break
+                    parts.pop()
+            if key is None:
+                continue
+            event = self._kernel32.CreateEventW(None, False, False, None)
+            if advapi32.RegNotifyChangeKeyValue(wintypes.HKEY(key.handle), True, flags, event, True) != 0:
+                self._kernel32.CloseHandle(event)
+                key.Close()
+                continue
+            self._keys.append(key)
+            events.append(event)
+        self._events = (wintypes.HANDLE * len(events))(*events)
+
+    def wait(self, timeout=None):
+        import time
+        if not len(self._events):
+            if timeout is not None:
+                time.sleep(timeout)
+            return False
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            # Wait in slices so Ctrl+C still gets through
+            slice_ms = 1000 if deadline is None else max(0, min(1000, int((deadline - time.monotonic()) * 1000)))
+            rc = self._kernel32.WaitForMultipleObjects(len(self._events), self._events, False, slice_ms)
+            if 0 <= rc < len(self._events):
+                return True
+            if rc != 0x102 or (deadline is not None and time.monotonic() >= deadline):
+                return False
+
+    def close(self):
+        for event in self._events:
+            self._kernel32.CloseHandle(event)
+        for key in self._keys:
+            key.Close()
+        self._events = ()
+        self._keys = []
+
+
+class MemoryBackend:
+    def __init__(self, keys=None):
+        # normalized full path -> (path components as written, values)
+        self._keys = {}
+        # normalized full path -> last-write counter; parents move when subkeys come and go
+        self._stamps = {}
+        self._clock = 0
+        self._log = []
+        self._cond = None
+        for full, values in (keys or {}).items():
+            self.set(full, values)
+
+    @classmethod
+    def from_json(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    @staticmethod
+    def _parts(full):
+        return [p for p in full.replace('/', '\\').split('\\') if p]
+
+    def _touch(self, norms):
+        self._clock += 1
+        for norm in norms:
+            self._stamps[norm] = self._clock
+        self._log = self._log[-255:] + [(self._clock, norms[0])]
+        if self._cond is not None:
+            with self._cond:
+                self._cond.notify_all()
+
+    def set(self, full, values):
+        """Create or replace a key (parents are implied); `full` starts with the hive."""
+        parts = self._parts(full)
+        norm = '\\'.join(parts).casefold()
+        touched = [norm]
+        if norm not in self._keys:
+            touched.append('\\'.join(parts[:-1]).casefold())
+        self._keys[norm] = (parts, dict(values or {}))
+        self._touch(touched)
+
+    def delete(self, full):
+        parts = self._parts(full)
+        norm = '\\'.join(parts).casefold()
+        gone = [k for k in self._keys if k == norm or k.startswith(norm + '\\')]
+        for k in gone:
+            del self._keys[k]
+            self._stamps.pop(k, None)
+        if gone:
+            self._touch([norm, '\\'.join(parts[:-1]).casefold()])
+            self._stamps.pop(norm, None)
+
+    def subkeys(self, hive, path):
+        base = self._parts(f'{hive}\\{path}')
+        prefix = '\\'.join(base).casefold() + '\\'
+        names = {}
+        for norm, (parts, _values) in self._keys.items():
+            if norm.startswith(prefix):
+                # Deeper keys imply their intermediate parents
+                name = parts[len(base)]
+                names.setdefault(name.casefold(), name)
+        return sorted(names.values(), key=str.casefold)
+
+    def values(self, hive, path):
+        entry = self._keys.get('\\'.join(self._parts(f'{hive}\\{path}')).casefold())
+        return dict(entry[1]) if entry else {}
+
+    def last_write(self, hive, path):
+        norm = '\\'.join(self._parts(f'{hive}\\{path}')).casefold()
+        if norm in self._keys or any(k.startswith(norm + '\\') for k in self._keys):
+            return self._stamps.get(norm, 0)
+        return None
+
+    def watch(self, keys):
+        if self._cond is None:
+            import threading
+            self._cond = threading.Condition()
+        return _MemoryWatch(self, keys)
+
+
+class _MemoryWatch:
+    def __init__(self, backend, keys):
+        self._backend = backend
+        self._since = backend._clock
+        self._prefixes = ['\\'.join(backend._parts(f'{h}\\{p}')).casefold() for h, p in keys]
+
+    def _changed(self):
+        for seq, norm in self._backend._log:
+            if seq > self._since and any(norm == p or norm.startswith(p + '\\') for p in self._prefixes):
+                return True
+        return False
+
+    def wait(self, timeout=None):
+        with self._backend._cond:
+            return self._backend._cond.wait_for(self._changed, timeout)
+
+    def close(self):
+        pass
+
+
+def default_backend(fixture=None):
+    """MemoryBackend for a JSON fixture path, else the real registry, else None (non-Windows)."""
+    if fixture:
+        return MemoryBackend.from_json(fixture)
+    if winreg is not None:
+        return WinregBackend()
+    return None
+
+
+def read_children(backend, hive, path):
+    """Return {subkey name: values} for every direct subkey of hive\\path."""
+    if backend is None:
+        return {}
+    return {name: backend.values(hive, f'{path}\\{name}') for name in backend.subkeys(hive, path)}
+
+
+def _jsonable(values):
+    out = {}
+    for name, val in values.items():
+        if isinstance(val, (bytes, bytearray)):
+            val = bytes(val).hex()
+        elif isinstance(val, (list, tuple)):
+            val = [str(v) for v in val]
+        out[name] = val
+    return out
+
+
+class RegistrySnapshot:
+    def __init__(self, backend, cache_path=None):
+        self.backend = backend
+        self.cache_path = cache_path
+        self.stats = {'enumerated': 0, 'read': 0, 'reused': 0}
+        self._trees = {}
+        self._read = []
+        self._dirty = False
+        if cache_path:
+            try:
+                with open(cache_path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == CACHE_VERSION:
+                    self._trees = data.get('trees') or {}
+            except Exception:
+                pass
+
+    def children(self, hive, path):
+        """Return {subkey name: values} for hive\\path, re-reading only keys whose last-write moved."""
+        if self.backend is None:
+            return {}
+        tree_id = f'{hive}\\{path}'
+        if (hive, path) not in self._read:
+            self._read.append((hive, path))
+        cached = self._trees.get(tree_id) or {'stamp': None, 'keys': {}}
+        stamp = self.backend.last_write(hive, path)
+        if stamp is None:
+            fresh = {'stamp': None, 'keys': {}}
+        else:
+            if cached['stamp'] == stamp:
+                names = list(cached['keys'])
+            else:
+                names = self.backend.subkeys(hive, path)
+                self.stats['enumerated'] += 1
+            keys = {}
+            for name in names:
+                sub = f'{path}\\{name}'
+                sub_stamp = self.backend.last_write(hive, sub)
+                if sub_stamp is None:
+                    continue
+                old = cached['keys'].get(name)
+                if old and old['stamp'] == sub_stamp:
+                    keys[name] = old
+                    self.stats['reused'] += 1
+                    metrics.inc('registry_keys_reused_total')
+                else:
+                    keys[name] = {'stamp': sub_stamp, 'values': _jsonable(self.backend.values(hive, sub))}
+                    self.stats['read'] += 1
+                    metrics.inc('registry_keys_read_total')
+            fresh = {'stamp': stamp, 'keys': keys}
+        if fresh != self._trees.get(tree_id):
+            self._trees[tree_id] = fresh
+            self._dirty = True
+        return {name: dict(e['values']) for name, e in fresh['keys'].items()}
+
+    def stale(self):
+        """True when a tree read so far gained or lost subkeys, or one of its subkeys changed, since it was read."""
+        for hive, path in self._read:
+            tree = self._trees.get(f'{hive}\\{path}') or {}
+            if self.backend.last_write(hive, path) != tree.get('stamp'):
+                return True
+            for name, entry in (tree.get('keys') or {}).items():
+                if self.backend.last_write(hive, f'{path}\\{name}') != entry['stamp']:
+                    return True
+        return False
+
+    def wait_for_change(self, timeout=None):
+        """Block until a tree read so far changes; False on timeout or without a backend."""
+        if self.backend is None or not self._read:
+            return False
+        watch = self.backend.watch(self._read)
+        try:
+            # Changes between the last read and arming the notification are caught here
+            if self.stale():
+                return True
+            return watch.wait(timeout)
+        finally:
+            watch.close()
+
+    def save(self):
+        if not self.cache_path or not self._dirty:
+            return
+        try:
+            tmp = self.cache_path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': CACHE_VERSION, 'trees': self._trees}, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, self.cache_path)
+            self._dirty = False
+        except Exception:
+            pass
+
+
+def snapshot_from_argv(argv):
+    """Strip --registry=<fixture> / --registry-cache=<file> from argv (in place); return a RegistrySnapshot."""
+    fixture = cache = None
+    for arg in list(argv):
+        if arg.startswith('--registry='):
+            fixture = arg.split('=', 1)[1]
+            argv.remove(arg)
+        elif arg.startswith('--registry-cache='):
+            cache = arg.split('=', 1)[1]
+            argv.remove(arg)
+    return RegistrySnapshot(default_backend(fixture), cache)
+
+
+def watch_loop(snapshot, detect, emit):
+    """Run detect(), emit {"event": "games", ...} when its result changes, then sleep until the registry changes."""
+    last = None
+    while True:
+        result = detect()
+        snapshot.save()
+        metrics.flush()
+        if result != last:
+            emit({'event': 'games', **result})
+            last = result
+        if not snapshot.wait_for_change():
+            return
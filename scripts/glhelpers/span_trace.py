@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+span_trace.py
+
+Lightweight span tracing for the helper scripts. Disabled by default: `span()`
+then returns a shared no-op object, so instrumented code pays one global check.
+
+Enable per run with a flag the scripts strip from argv before parsing their own
+arguments (or with GL_TRACE=1 / GL_TRACE=<path> in the environment):
+  --trace             attach a nested `_trace` field to the JSON result
+  --trace=<file>      write a Chrome trace (chrome://tracing, Perfetto) to <file>
+
+Only the last MAX_EVENTS finished spans are kept, so long-running modes
+(--watch, --follow, --serve) hold a bounded window rather than every span
+since start.
+
+Usage:
+  with span('manifests', library=lib) as s:
+      s.add('files')
+  result = span_trace.finish(result)
+"""
+
+import itertools
+import os
+import time
+from collections import deque
+
+# Finished spans kept for the report; older ones are dropped first
+MAX_EVENTS = 10000
+
+_enabled = False
+_out_path = None
+_t0 = time.perf_counter()
+_events = deque(maxlen=MAX_EVENTS)
+_local = None
+_ids = itertools.count(1)
+
+
+class _Span:
+    __slots__ = ('id', 'parent', 'name', 'attrs', 'counts', 'start', 'tid')
+
+    def __init__(self, name, attrs):
+        self.id = next(_ids)
+        self.name = name
+        self.attrs = attrs
+        self.counts = None
+
+    def __enter__(self):
+        stack = _stack()
+        self.parent = stack[-1].id if stack else 0
+        self.tid = _get_ident()
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, _exc, _tb):
+        end = time.perf_counter()
+        stack = _stack()
+        if stack and stack[-1] is self:
+            stack.pop()
+        if exc_type is not None:
+            self.attrs['error'] = exc_type.__name__
+        _events.append((self, end))
+        return False
+
+    def add(self, key, n=1):
+        if self.counts is None:
+            self.counts = {}
+        self.counts[key] = self.counts.get(key, 0) + n
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        return False
+
+    def add(self, key, n=1):
+        pass
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP = _NoSpan()
+
+
+def _stack():
+    global _local
+    if _local is None:
+        import threading
+        _local = threading.local()
+    s = getattr(_local, 'stack', None)
+    if s is None:
+        s = _local.stack = []
+    return s
+
+
+def _get_ident():
+    import threading
+    return threading.get_ident()
+
+
+def enabled():
+    return _enabled
+
+
+def enable(out_path=None):
+    global _enabled, _out_path
+    _enabled = True
+    _out_path = out_path or None
+
+
+def span(name, **attrs):
+    """Context manager timing one phase; nested spans become children."""
+    if not _enabled:
+        return _NOOP
+    return _Span(name, attrs)
+
+
+def add(key, n=1):
+    """Increment a counter on the innermost open span of this thread."""
+    if _enabled:
+        stack = _stack()
+        if stack:
+            stack[-1].add(key, n)
+
+
+def traced(name):
+    """Decorator form of span()."""
+    def wrap(fn):
+        def inner(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with _Span(name, {}):
+                return fn(*args, **kwargs)
+        inner.__name__ = fn.__name__
+        inner.__doc__ = fn.__doc__
+        return inner
+    return wrap
+
+
+def init_from_argv(argv):
+    """Strip --trace / --trace=<file> from argv (in place) and enable tracing if present."""
+    env = os.environ.get('GL_TRACE', '')
+    if env:
+        enable(None if env in ('1', 'true') else env)
+    for arg in list(argv):
+        if arg == '--trace' or arg.startswith('--trace='):
+            argv.remove(arg)
+            enable(arg.split('=', 1)[1] if '=' in arg else None)
+            break
+    return argv
+
+
+def _tree():
+    nodes = {}
+    roots = []
+    for sp, end in sorted(_events, key=lambda e: e[0].start):
+        node = {'name': sp.name, 'ms': round((end - sp.start) * 1000.0, 3)}
+        if sp.attrs:
+            node['attrs'] = sp.attrs
+        if sp.counts:
+            node['counts'] = sp.counts
+        nodes[sp.id] = node
+        parent = nodes.get(sp.parent)
+        if parent is not None:
+            parent.setdefault('children', []).append(node)
+        else:
+            roots.append(node)
+    return roots
+
+
+def chrome_events():
+    pid = os.getpid()
+    out = []
+    for sp, end in _events:
+        args = dict(sp.attrs)
+        if sp.counts:
+            args.update(sp.counts)
+        out.append({
+            'name': sp.name, 'ph': 'X', 'pid': pid, 'tid': sp.tid,
+            'ts': round((sp.start - _t0) * 1e6, 1), 'dur': round((end - sp.start) * 1e6, 1),
+            'args': args,
+        })
+    return out
+
+
+def finish(result):
+    """Attach `_trace` to a dict result or write the Chrome trace file; no-op when disabled."""
+    if not _enabled:
+        return result
+    import json
+    if _out_path:
+        try:
+            with open(_out_path, 'w', encoding='utf-8') as f:
+                json.dump({'traceEvents': chrome_events(), 'displayTimeUnit': 'ms'}, f)
+        except OSError:
+            pass
+    elif isinstance(result, dict):
+        result['_trace'] = {'totalMs': round((time.perf_counter() - _t0) * 1000.0, 3), 'spans': _tree()}
+    return result
@@ -0,0 +1,73 @@
+"""
+JSON-file cache of values derived from files, keyed by path and valid while the
+file's (mtime_ns, size) stamp is unchanged.
+
+  cache = StampCache(path, version=1)
+  hit, value = cache.get(file, stamp)
+  if not hit:
+      cache.put(file, stamp, parse(file))
+  cache.prune(paths_seen)
+  cache.save()
+
+A cache written with a different `version` is ignored, so bump it whenever the
+shape of the cached values changes.
+"""
+
+import json
+import os
+
+from . import metrics
+
+
+def stamp_of(st):
+    """The (mtime_ns, size) stamp of an os.stat_result, as a JSON-friendly list."""
+    return [st.st_mtime_ns, st.st_size]
+
+
+class StampCache:
+    def __init__(self, path=None, version=1):
+        self.path = path
+        self.version = version
+        self.entries = {}
+        self.dirty = False
+        # Metrics label: which cache file this is (disk_usage.json -> disk_usage)
+        self.name = os.path.splitext(os.path.basename(path))[0] if path else 'memory'
+        if path:
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                if data.get('version') == version:
+                    self.entries = data.get('entries') or {}
+            except Exception:
+                pass
+
+    def get(self, path, stamp):
+        """Return (hit, value); a cached None is a hit."""
+        e = self.entries.get(path)
+        if e and e.get('stamp') == stamp:
+            metrics.inc('stamp_cache_hits_total', cache=self.name)
+            return True, e.get('value')
+        metrics.inc('stamp_cache_misses_total', cache=self.name)
+        return False, None
+
+    def put(self, path, stamp, value):
+        self.entries[path] = {'stamp': stamp, 'value': value}
+        self.dirty = True
+
+    def prune(self, keep):
+        for p in [p for p in self.entries if p not in keep]:
+            del self.entries[p]
+            self.dirty = True
+
+    def save(self):
+        if not self.path or not self.dirty:
+            return
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            tmp = self.path + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'version': self.version, 'entries': self.entries}, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, self.path)
+            self.dirty = False
+        except Exception:
+            pass
@@ -0,0 +1,116 @@
+"""
+Index of the artwork the Steam client keeps in appcache/librarycache.
+
+The directory is listed once per LibraryCache; lookups are then dict reads and
+are safe to make from several threads.
+Both layouts are understood:
+  librarycache/<appid>_header.jpg             (older clients, flat)
+  librarycache/<appid>/header.jpg             (newer clients, one dir per app,
+                                               listed on first lookup)
+
+  cache = LibraryCache(steam_root)
+  cache.best(440)          # path of the preferred image, or None
+  cache.artwork(440)       # {"header": path, "portrait": path, ...}
+"""
+
+import os
+import threading
+
+# file stem (without the appid) -> artwork kind
+KINDS = {
+    'header': 'header',
+    'capsule_616x353': 'capsule',
+    'capsule_231x87': 'capsule_small',
+    'library_600x900': 'portrait',
+    'library_600x900_2x': 'portrait',
+    'library_capsule': 'portrait',
+    'library_hero': 'hero',
+    'logo': 'logo',
+    'icon': 'icon',
+}
+IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.webp')
+# Landscape first: callers use this as a header thumbnail
+PREFERRED = ('header', 'capsule', 'portrait', 'hero', 'capsule_small')
+
+
+def default_steam_path():
+    """SteamPath from the registry (HKCU), else the default install dir; None when not found."""
+    try:
+        from glhelpers.registry import default_backend
+        backend = default_backend()
+        if backend is not None:
+            path = backend.values('HKCU', r'Software\Valve\Steam').get('SteamPath')
+            if path and os.path.isdir(path):
+                return os.path.normpath(path)
+    except Exception:
+        pass
+    for env in ('ProgramFiles(x86)', 'ProgramFiles'):
+        base = os.environ.get(env)
+        if base and os.path.isdir(os.path.join(base, 'Steam')):
+            return os.path.join(base, 'Steam')
+    return None
+
+
+def _add(found, stem, path):
+    kind = KINDS.get(stem.lower())
+    if kind and kind not in found:
+        found[kind] = path
+
+
+class LibraryCache:
+    def __init__(self, steam_root):
+        self.dir = os.path.join(steam_root, 'appcache', 'librarycache') if steam_root else None
+        self._files = {}
+        self._dirs = {}
+        self._lock = threading.Lock()
+        if not self.dir:
+            return
+        try:
+            entries = os.scandir(self.dir)
+        except OSError:
+            return
+        with entries:
+            for e in entries:
+                name = e.name
+                if name.isdigit():
+                    if e.is_dir():
+                        self._dirs[int(name)] = e.path
+                    continue
+                appid, sep, rest = name.partition('_')
+                stem, ext = os.path.splitext(rest)
+                if sep and appid.isdigit() and ext.lower() in IMAGE_EXTS:
+                    _add(self._files.setdefault(int(appid), {}), stem, e.path)
+
+    def __contains__(self, appid):
+        return int(appid) in self._files or int(appid) in self._dirs
+
+    def appids(self):
+        return set(self._files) | set(self._dirs)
+
+    def artwork(self, appid):
+        """{kind: path} for one app; an app's own dir is listed the first time it is asked for."""
+        appid = int(appid)
+        if appid in self._dirs:
+            with self._lock:
+                d = self._dirs.get(appid)
+                if d is not None:
+                    found = self._files.setdefault(appid, {})
+                    try:
+                        # Images sit in the app dir or one level below (content-hash subdirs)
+                        for e in sorted(os.scandir(d), key=lambda e: e.is_dir()):
+                            paths = [e] if not e.is_dir() else list(os.scandir(e.path))
+                            for f in paths:
+                                stem, ext = os.path.splitext(f.name)
+                                if ext.lower() in IMAGE_EXTS:
+                                    _add(found, stem, f.path)
+                    except OSError:
+                        pass
+                    del self._dirs[appid]
+        return dict(self._files.get(appid) or {})
+
+    def best(self, appid, prefer=PREFERRED):
+        art = self.artwork(appid)
+        for kind in prefer:
+            if kind in art:
+                return art[kind]
+        return None
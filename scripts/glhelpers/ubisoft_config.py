@@ -0,0 +1,306 @@
+"""
+Reader for Ubisoft Connect's product configuration cache,
+<launcher>/cache/configuration/configurations.
+
+The file is a protobuf stream: repeated field 1 records, each holding the
+product id (field 1, varint) and the product's YAML configuration (field 3).
+Records are read one at a time from a buffered file, so memory stays at one
+record however large the cache grows, and only the handful of YAML keys the
+detector needs are kept:
+
+  index = read_configurations(path)       # {"1803": {"name": "Far Cry 5", ...}}
+  meta = index.get('1803')
+  meta['executables']                     # ['bin\\FarCry5.exe', ...] relative to the install dir
+  meta['thumbImage']                      # asset file name, see asset_url()
+
+Names given as localization ids ("name: l1") are resolved through the
+record's `localizations: default:` table.
+"""
+
+import os
+
+CONFIGURATIONS = os.path.join('cache', 'configuration', 'configurations')
+ASSETS_URL = 'https://ubistatic3-a.akamaihd.net/orbit/uplay_launcher_3_0/assets/{}'
+LAUNCHER_KEY = r'SOFTWARE\WOW6432Node\Ubisoft'
+
+# Wire types
+_VARINT, _FIXED64, _BYTES, _FIXED32 = 0, 1, 2, 5
+_IMAGES = (('thumb_image', 'thumbImage'), ('logo_image', 'logoImage'),
+           ('background_image', 'backgroundImage'), ('icon_image', 'iconImage'))
+
+
+def default_launcher_dir(snapshot=None):
+    """Ubisoft Connect's install dir from the registry, else the default location; None when missing."""
+    if snapshot is not None:
+        try:
+            d = (snapshot.children('HKLM', LAUNCHER_KEY).get('Launcher') or {}).get('InstallDir')
+            if d and os.path.isdir(d):
+                return os.path.normpath(d)
+        except Exception:
+            pass
+    base = os.environ.get('ProgramFiles(x86)')
+    if base and os.path.isdir(os.path.join(base, 'Ubisoft', 'Ubisoft Game Launcher')):
+        return os.path.join(base, 'Ubisoft', 'Ubisoft Game Launcher')
+    return None
+
+
+def asset_url(name):
+    return ASSETS_URL.format(name) if name else None
+
+
+def _read_varint(f):
+    """Next varint from a file; None at a clean end of file."""
+    shift = value = 0
+    while True:
+        b = f.read(1)
+        if not b:
+            if shift:
+                raise ValueError('truncated varint')
+            return None
+        value |= (b[0] & 0x7F) << shift
+        if b[0] < 0x80:
+            return value
+        shift += 7
+        if shift > 63:
+            raise ValueError('varint too long')
+
+
+def _varint(buf, pos):
+    shift = value = 0
+    while True:
+        b = buf[pos]
+        pos += 1
+        value |= (b & 0x7F) << shift
+        if b < 0x80:
+            return value, pos
+        shift += 7
+        if shift > 63:
+            raise ValueError('varint too long')
+
+
+def _fields(buf):
+    """(field number, value) pairs of one message; bytes fields come back as memoryview slices."""
+    pos, end = 0, len(buf)
+    while pos < end:
+        tag, pos = _varint(buf, pos)
+        wire = tag & 7
+        if wire == _VARINT:
+            value, pos = _varint(buf, pos)
+        elif wire == _BYTES:
+            n, pos = _varint(buf, pos)
+            value = buf[pos:pos + n]
+            pos += n
+        elif wire == _FIXED64:
+            value, pos = buf[pos:pos + 8], pos + 8
+        elif wire == _FIXED32:
+            value, pos = buf[pos:pos + 4], pos + 4
+        else:
+            raise ValueError(f'unsupported wire type {wire}')
+        if pos > end:
+            raise ValueError('field runs past the record')
+        yield tag >> 3, value
+
+
+def iter_records(f):
+    """(product id, YAML bytes) for each record of an open configurations file."""
+    while True:
+        tag = _read_varint(f)
+        if tag is None:
+            return
+        wire = tag & 7
+        if wire == _VARINT:
+            _read_varint(f)
+            continue
+        if wire in (_FIXED64, _FIXED32):
+            f.read(8 if wire == _FIXED64 else 4)
+            continue
+        if wire != _BYTES:
+            raise ValueError(f'unsupported wire type {wire}')
+        n = _read_varint(f)
+        data = f.read(n or 0)
+        if len(data) < (n or 0):
+            raise ValueError('truncated record')
+        if tag >> 3 != 1:
+            continue
+        pid = config = None
+        for field, value in _fields(memoryview(data)):
+            if field == 1 and isinstance(value, int):
+                pid = value
+            elif field == 3 and not isinstance(value, int):
+                config = bytes(value)
+        if pid is not None and config:
+            yield pid, config
+
+
+def _scalar(s):
+    s = s.strip()
+    if len(s) >= 2 and s[0] == s[-1] and s[0] in '"\'':
+        inner = s[1:-1]
+        return inner.replace("''", "'") if s[0] == "'" else inner.replace('\\"', '"')
+    cut = s.find(' #')
+    return s[:cut].rstrip() if cut >= 0 else s
+
+
+def _split_key(s):
+    """('key', 'rest') for a 'key: value' / 'key:' line, else None."""
+    if s.endswith(':'):
+        return _scalar(s[:-1]), ''
+    i = s.find(': ')
+    if i <= 0:
+        return None
+    return _scalar(s[:i]), s[i + 2:].strip()
+
+
+def parse_yaml(text):
+    """Nested dicts/lists/strings for the block-style YAML subset the configurations use.
+
+    Anchors, tags and flow mappings are not understood; block scalars (| >) are
+    kept as joined text and flow lists ([a, b]) as lists of strings.
+    """
+    root = {}
+    stack = [(-1, root)]
+    pending = None      # (mapping, key, indent) of a "key:" line waiting for its block
+    block = None        # (mapping, key, indent, lines) of a | or > scalar being collected
+    for raw in text.splitlines():
+        content = raw.lstrip(' ')
+        indent = len(raw) - len(content)
+        content = content.rstrip()
+        if block is not None:
+            if not content or indent > block[2]:
+                block[3].append(content)
+                continue
+            block[0][block[1]] = '\n'.join(block[3]).strip()
+            block = None
+        if not content or content[0] == '#' or content in ('---', '...'):
+            continue
+        is_item = content == '-' or content.startswith('- ')
+        if pending is not None:
+            m, key, key_indent = pending
+            pending = None
+            if is_item and indent >= key_indent:
+                m[key] = []
+                stack.append((indent, m[key]))
+            elif indent > key_indent:
+                m[key] = {}
+                stack.append((indent, m[key]))
+            else:
+                m[key] = ''
+        while stack[-1][0] > indent or (stack[-1][0] == indent and isinstance(stack[-1][1], list) and not is_item):
+            stack.pop()
+        top = stack[-1][1]
+        if is_item:
+            if not isinstance(top, list):
+                continue
+            item = content[1:].strip()
+            kv = _split_key(item) if item else None
+            if item and kv is None:
+                top.append(_scalar(item))
+                continue
+            m = {}
+            top.append(m)
+            indent += 2
+            stack.append((indent, m))
+            if kv is None:
+                continue
+            top, content = m, item
+        if not isinstance(top, dict):
+            continue
+        kv = _split_key(content)
+        if kv is None:
+            continue
+        key, rest = kv
+        if not rest:
+            pending = (top, key, indent)
+        elif rest[0] in '|>':
+            block = (top, key, indent, [])
+        elif rest[0] == '[' and rest.endswith(']'):
+            top[key] = [_scalar(p) for p in rest[1:-1].split(',') if p.strip()]
+        else:
+            top[key] = _scalar(rest)
+    if block is not None:
+        block[0][block[1]] = '\n'.join(block[3]).strip()
+    if pending is not None:
+        pending[0][pending[1]] = ''
+    return root
+
+
+def _get(d, *keys):
+    for k in keys:
+        if not isinstance(d, dict):
+            return None
+        d = d.get(k)
+    return d
+
+
+def product_meta(config):
+    """The detector-facing fields of one product's parsed configuration."""
+    root = config.get('root') if isinstance(config, dict) else None
+    if not isinstance(root, dict):
+        return {}
+    strings = _get(config, 'localizations', 'default')
+    strings = strings if isinstance(strings, dict) else {}
+
+    def text(v):
+        v = v if isinstance(v, str) else ''
+        return strings.get(v, v).strip()
+
+    meta = {'name': text(root.get('name')) or text(root.get('display_name'))}
+    exes = []
+    for mode in ('offline', 'online'):
+        for ex in _get(root, 'start_game', mode, 'executables') or []:
+            rel = _get(ex, 'path', 'relative')
+            if isinstance(rel, str) and rel and rel not in exes:
+                exes.append(rel)
+    meta['executables'] = exes
+    for yaml_key, field in _IMAGES:
+        value = root.get(yaml_key)
+        if isinstance(value, str) and value:
+            meta[field] = text(value)
+    third_party = _get(root, 'third_party_platform', 'name')
+    if isinstance(third_party, str) and third_party:
+        meta['thirdParty'] = third_party
+    return meta
+
+
+def read_configurations(path, ids=None):
+    """{product id (str): product_meta()} for every record (or only `ids`) in a configurations file.
+
+    Later records for the same product replace earlier ones. A damaged tail
+    ends the read; the records before it are kept.
+    """
+    out = {}
+    with open(path, 'rb') as f:
+        try:
+            for pid, raw in iter_records(f):
+                key = str(pid)
+                if ids is not None and key not in ids:
+                    continue
+                try:
+                    meta = product_meta(parse_yaml(raw.decode('utf-8', errors='replace')))
+                except Exception:
+                    continue
+                if meta.get('name') or meta.get('executables'):
+                    out[key] = meta
+        except (ValueError, IndexError):
+            pass
+    return out
+
+
+def _varint_bytes(n):
+    out = bytearray()
+    while True:
+        b = n & 0x7F
+        n >>= 7
+        if n:
+            out.append(b | 0x80)
+        else:
+            out.append(b)
+            return bytes(out)
+
+
+def encode_record(pid, yaml_text, version=1):
+    """One configurations record; the inverse of iter_records(), for fixtures."""
+    body = yaml_text.encode('utf-8')
+    inner = (b'\x08' + _varint_bytes(pid) + b'\x10' + _varint_bytes(version)
+             + b'\x1a' + _varint_bytes(len(body)) + body)
+    return b'\x0a' + _varint_bytes(len(inner)) + inner
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+gog_detect.py
+
+GOG Galaxy detector. Reads every game under GOG.com\\Games in one registry
+enumeration, then fills in anything the registry lacks from the
+`goggame-<id>.info` file in each install dir. Library roots passed on the
+command line are scanned for .info files too, which also finds games installed
+without Galaxy (offline installers).
+
+DLC (registry `dependsOn`, or an .info whose rootGameId differs from its gameId)
+is skipped.
+
+CLI:
+  python scripts/gog_detect.py [--roots '["D:/GOG Games"]'] [--registry fixture.json]
+
+`--registry` replaces the Windows registry with a JSON fixture of
+{"HKLM\\SOFTWARE\\WOW6432Node\\GOG.com\\Games\\<id>": {"gameName": ..., "path": ...}}
+(see glhelpers/registry.py), so the detector can run off-Windows.
+
+Outputs JSON:
+{
+  "ok": true,
+  "games": [
+    {"id": "1207658924", "title": "Unreal Tournament 2004", "launcher": "gog",
+     "installDir": "C:/GOG Games/UT2004", "executablePath": "C:/GOG Games/UT2004/System/UT2004.exe"}
+  ],
+  "stats": {"registry": 3, "infoFiles": 3, "skipped": 0}
+}
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+
+from glhelpers import metrics, span_trace
+from glhelpers.registry import default_backend, read_children
+from glhelpers.span_trace import span
+
+GAMES_KEYS = (
+    ('HKLM', r'SOFTWARE\WOW6432Node\GOG.com\Games'),
+    ('HKLM', r'SOFTWARE\GOG.com\Games'),
+)
+
+
+def _value(values: dict, *names: str) -> str:
+    lower = {k.lower(): v for k, v in values.items()}
+    for n in names:
+        v = lower.get(n.lower())
+        if v not in (None, ''):
+            return str(v).strip()
+    return ''
+
+
+def read_info(install_dir: str, game_id: str = '') -> dict | None:
+    """Parse goggame-<id>.info in install_dir (any goggame-*.info when the id is unknown)."""
+    candidates = []
+    if game_id:
+        candidates.append(os.path.join(install_dir, f'goggame-{game_id}.info'))
+    else:
+        try:
+            candidates = sorted(
+                e.path for e in os.scandir(install_dir)
+                if e.name.startswith('goggame-') and e.name.endswith('.info') and e.is_file()
+            )
+        except OSError:
+            return None
+    for path in candidates:
+        try:
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                return json.load(f)
+        except Exception:
+            continue
+    return None
+
+
+def _primary_task(info: dict) -> str:
+    tasks = info.get('playTasks') or []
+    for t in tasks:
+        if t.get('isPrimary') and t.get('type', 'FileTask') == 'FileTask' and t.get('path'):
+            return t['path']
+    for t in tasks:
+        if t.get('type', 'FileTask') == 'FileTask' and t.get('path'):
+            return t['path']
+    return ''
+
+
+def _is_dlc(info: dict | None) -> bool:
+    if not info:
+        return False
+    root = str(info.get('rootGameId') or '')
+    return bool(root) and root != str(info.get('gameId') or '')
+
+
+def _make_game(gid: str, title: str, install_dir: str, exe: str) -> dict:
+    install_dir = os.path.normpath(install_dir)
+    if exe and not os.path.isabs(exe):
+        exe = os.path.join(install_dir, exe.replace('\\', os.sep).replace('/', os.sep))
+    return {
+        'id': gid,
+        'title': title,
+        'launcher': 'gog',
+        'installDir': install_dir,
+        'executablePath': os.path.normpath(exe) if exe else None,
+    }
+
+
+def read_registry_games(backend, stats: dict) -> list:
+    games = []
+    seen = set()
+    for hive, path in GAMES_KEYS:
+        with span('registry', key=path) as s:
+            children = read_children(backend, hive, path)
+            s.add('keys', len(children))
+        for key_name, values in children.items():
+            gid = _value(values, 'gameID', 'productID') or key_name
+            if gid in seen:
+                continue
+            seen.add(gid)
+            stats['registry'] += 1
+            install_dir = _value(values, 'path', 'InstallPath')
+            if _value(values, 'dependsOn') or not install_dir or not os.path.isdir(install_dir):
+                stats['skipped'] += 1
+                continue
+            info = read_info(install_dir, gid)
+            if info is not None:
+                stats['infoFiles'] += 1
+            if _is_dlc(info):
+                stats['skipped'] += 1
+                continue
+            title = _value(values, 'gameName', 'DisplayName', 'startMenu') or (info or {}).get('name') or key_name
+            exe = _value(values, 'exe') or (_primary_task(info) if info else '')
+            games.append(_make_game(gid, title, install_dir, exe))
+    return games
+
+
+def scan_roots(roots: list, known: set, known_dirs: set, stats: dict) -> list:
+    """Find goggame-*.info in each root and its direct subdirectories not already known."""
+    games = []
+    for root in roots:
+        if not root:
+            continue
+        with span('scan_root', root=root):
+            dirs = [root]
+            try:
+                dirs += [e.path for e in os.scandir(root) if e.is_dir()]
+            except OSError:
+                continue
+            for d in dirs:
+                if os.path.normcase(os.path.normpath(d)) in known_dirs:
+                    continue
+                info = read_info(d)
+                if not info:
+                    continue
+                stats['infoFiles'] += 1
+                gid = str(info.get('gameId') or '')
+                if not gid or gid in known or _is_dlc(info):
+                    continue
+                known.add(gid)
+                games.append(_make_game(gid, info.get('name') or os.path.basename(d), d, _primary_task(info)))
+    return games
+
+
+def detect(roots: list | None = None, backend=None) -> dict:
+    stats = { 'registry': 0, 'infoFiles': 0, 'skipped': 0 }
+    games = read_registry_games(backend, stats)
+    known_dirs = {os.path.normcase(g['installDir']) for g in games}
+    games += scan_roots(roots or [], {g['id'] for g in games}, known_dirs, stats)
+    return { 'ok': True, 'games': games, 'stats': stats }
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Detect GOG Galaxy installs')
+    parser.add_argument('--roots', default='[]', help='JSON array of extra library roots to scan for goggame-*.info')
+    parser.add_argument('--registry', help='JSON registry fixture to use instead of the Windows registry')
+    args = parser.parse_args(metrics.init_from_argv(span_trace.init_from_argv(list(argv))))
+    try:
+        try:
+            roots = json.loads(args.roots)
+        except Exception:
+            roots = []
+        backend = default_backend(args.registry)
+        with span('detect'), metrics.timed('detect_ms', launcher='gog'):
+            result = detect(roots if isinstance(roots, list) else [], backend)
+        print(json.dumps(span_trace.finish(result), ensure_ascii=False))
+    except Exception as e:
+        print(json.dumps({ 'ok': False, 'error': str(e) }))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
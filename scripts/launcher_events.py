@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+launcher_events.py
+
+Follows launcher log files and turns their app state lines into start/stop
+events, so a running game can be noticed without scanning the process table.
+Each log is read incrementally from the offset saved in the state file; a
+rotated log (new file identity, shrunk, or rewritten head) is finished from its
+rotated copy when one can be found, then read from the start.
+
+Sources and the lines they react to:
+  steam    <Steam>/logs/content_log.txt
+           "[...] AppID 440 state changed : Fully Installed,App Running,"
+  epic     %LOCALAPPDATA%/EpicGamesLauncher/Saved/Logs/EpicGamesLauncher.log
+           "LogLaunch: ... Launching app 'Fortnite'" / "... app 'Fortnite' exited"
+  ubisoft  %LOCALAPPDATA%/Ubisoft Game Launcher/logs/launcher_log.txt
+           "Game launched ... 635" / "Game closed ... 635"
+
+Without saved state, the last PRIME_BYTES of a log are read only to learn what
+is running now; no events are emitted for them.
+
+CLI:
+  python scripts/launcher_events.py [--source steam[=PATH] ...] [--state FILE]
+  python scripts/launcher_events.py --follow [--interval 1.0] ...   # NDJSON until killed
+
+Outputs JSON:
+{
+  "ok": true,
+  "events": [{"event": "start", "launcher": "steam", "appId": "440", "logTime": "2024-05-01 20:15:02"}],
+  "running": {"steam": ["440"]}
+}
+
+Follow mode first catches up with everything logged since the saved offset
+without reporting it, prints {"event": "running", "running": {...}} for the
+state that leaves, then one line per start/stop event logged after that. A
+stop left over from an earlier session never reaches a new follower.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import time
+
+from glhelpers import metrics, span_trace
+
+# Bytes read from the end of a log that has no saved offset yet
+PRIME_BYTES = 1 << 20
+# Bytes of the file start kept to notice a log rewritten in place
+HEAD_BYTES = 64
+
+_STEAM_TIME = r'^\[(?P<time>\d{4}-\d\d-\d\d \d\d:\d\d:\d\d)\]'
+_EPIC_TIME = r'^\[(?P<time>\d{4}\.\d\d\.\d\d-\d\d\.\d\d\.\d\d)'
+
+# source -> [(regex, kind)]; kind is 'start', 'stop', or 'state' (running iff "App Running" is listed)
+RULES = {
+    'steam': [
+        (re.compile(_STEAM_TIME + r'.*?AppID (?P<app>\d+) state changed : (?P<state>.*)$'), 'state'),
+    ],
+    'epic': [
+        (re.compile(_EPIC_TIME + r'.*?LogLaunch:.*?Launching app \'(?P<app>[^\']+)\''), 'start'),
+        (re.compile(_EPIC_TIME + r'.*?LogLaunch:.*?app \'(?P<app>[^\']+)\' (?:exited|stopped|closed)'), 'stop'),
+    ],
+    'ubisoft': [
+        (re.compile(r'Game (?:launched|started)\D*(?P<app>\d+)'), 'start'),
+        (re.compile(r'Game (?:closed|exited|stopped)\D*(?P<app>\d+)'), 'stop'),
+    ],
+}
+
+# Literal every matching line contains; other lines are skipped before decoding
+MARKERS = { 'steam': b' state changed : ', 'epic': b'LogLaunch', 'ubisoft': b'Game ' }
+
+
+def default_logs() -> dict:
+    """{source: log path} for the launchers whose default log location exists."""
+    from glhelpers.steam_artwork import default_steam_path
+    out = {}
+    steam = default_steam_path()
+    if steam:
+        out['steam'] = os.path.join(steam, 'logs', 'content_log.txt')
+    local = os.environ.get('LOCALAPPDATA')
+    if local:
+        out['epic'] = os.path.join(local, 'EpicGamesLauncher', 'Saved', 'Logs', 'EpicGamesLauncher.log')
+        out['ubisoft'] = os.path.join(local, 'Ubisoft Game Launcher', 'logs', 'launcher_log.txt')
+    return {k: v for k, v in out.items() if os.path.exists(v)}
+
+
+def rotated_candidates(path: str) -> list:
+    """Names a launcher gives a log when it rotates it (content_log.previous.txt, x.log.1, x-backup-*.log)."""
+    root, ext = os.path.splitext(path)
+    out = [f'{root}.previous{ext}', f'{path}.1', f'{path}.old']
+    try:
+        d, base = os.path.split(root)
+        out += sorted(
+            (os.path.join(d, n) for n in os.listdir(d or '.') if n.startswith(base + '-backup-')),
+            reverse=True,
+        )
+    except OSError:
+        pass
+    return out
+
+
+def _identity(st) -> list:
+    return [st.st_dev, st.st_ino]
+
+
+class LogTail:
+    def __init__(self, source: str, path: str, state: dict | None = None):
+        self.source = source
+        self.path = path
+        self.rules = RULES[source]
+        self.marker = MARKERS[source]
+        state = state or {}
+        self.offset = state.get('offset')
+        self.ident = state.get('id')
+        self.head = state.get('head')
+        self.running = set(state.get('running') or [])
+
+    def state(self) -> dict:
+        return {
+            'path': self.path, 'offset': self.offset, 'id': self.ident, 'head': self.head,
+            'running': sorted(self.running),
+        }
+
+    def _apply(self, line: str, events: list | None) -> None:
+        for rx, kind in self.rules:
+            m = rx.search(line)
+            if not m:
+                continue
+            app = m.group('app')
+            if kind == 'state':
+                kind = 'start' if 'App Running' in m.group('state') else 'stop'
+            if (kind == 'start') == (app in self.running):
+                return
+            if kind == 'start':
+                self.running.add(app)
+            else:
+                self.running.discard(app)
+            if events is not None:
+                event = { 'event': kind, 'launcher': self.source, 'appId': app }
+                if 'time' in rx.groupindex and m.group('time'):
+                    event['logTime'] = m.group('time')
+                events.append(event)
+            return
+
+    def _consume(self, f, offset: int, end: int, events: list | None) -> int:
+        """Apply the complete lines in [offset, end); return the offset after the last one."""
+        f.seek(offset)
+        data = f.read(end - offset)
+        cut = data.rfind(b'\n')
+        if cut < 0:
+            return offset
+        marker = self.marker
+        for raw in data[:cut].split(b'\n'):
+            if marker in raw:
+                self._apply(raw.decode('utf-8', errors='replace').rstrip('\r'), events)
+        return offset + cut + 1
+
+    def _finish_rotated(self, events: list | None) -> None:
+        """Read what was appended to the old file between our last read and the rotation."""
+        for cand in rotated_candidates(self.path):
+            try:
+                st = os.stat(cand)
+                if _identity(st) != self.ident and not self._same_head(cand):
+                    continue
+                with open(cand, 'rb') as f:
+                    if st.st_size > self.offset:
+                        self._consume(f, self.offset, st.st_size, events)
+                return
+            except OSError:
+                continue
+
+    def _same_head(self, path: str) -> bool:
+        if not self.head:
+            return False
+        try:
+            with open(path, 'rb') as f:
+                return f.read(HEAD_BYTES).hex() == self.head
+        except OSError:
+            return False
+
+    def read(self, report: bool = True) -> list:
+        """Return the start/stop events for lines appended since the last read.
+
+        With report=False the lines only update `running`, and [] is returned."""
+        events = []
+        sink = events if report else None
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return events
+        with open(self.path, 'rb') as f:
+            head = f.read(HEAD_BYTES).hex()
+            if self.offset is None:
+                # First sight: learn the current state from the tail, report nothing
+                start = max(0, st.st_size - PRIME_BYTES)
+                if start:
+                    f.seek(start)
+                    f.readline()
+                    start = f.tell()
+                self.offset = self._consume(f, start, st.st_size, None)
+            else:
+                rotated = (
+                    _identity(st) != self.ident or st.st_size < self.offset
+                    or (self.head and not head.startswith(self.head[:len(head)]))
+                )
+                if rotated:
+                    self._finish_rotated(sink)
+                    self.offset = 0
+                if st.st_size > self.offset:
+                    self.offset = self._consume(f, self.offset, st.st_size, sink)
+            self.ident = _identity(st)
+            self.head = head
+        return events
+
+
+def load_state(path: str | None) -> dict:
+    if not path:
+        return {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get('logs') or {}
+    except Exception:
+        return {}
+
+
+def save_state(path: str | None, tails: list) -> None:
+    if not path:
+        return
+    try:
+        tmp = path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump({ 'logs': { t.source: t.state() for t in tails } }, f)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
+
+def make_tails(logs: dict, state: dict) -> list:
+    tails = []
+    for source, path in logs.items():
+        saved = state.get(source) or {}
+        # A saved offset only means something for the same file
+        tails.append(LogTail(source, path, saved if saved.get('path') == path else None))
+    return tails
+
+
+def _parse_sources(values: list) -> dict:
+    if not values:
+        return default_logs()
+    defaults = None
+    out = {}
+    for v in values:
+        name, _, path = v.partition('=')
+        if name not in RULES:
+            raise ValueError(f'unknown source: {name}')
+        if not path:
+            defaults = defaults if defaults is not None else default_logs()
+            path = defaults.get(name)
+        if path:
+            out[name] = path
+    return out
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Turn launcher log lines into game start/stop events')
+    parser.add_argument('--source', action='append', default=[], help='NAME or NAME=PATH (steam, epic, ubisoft)')
+    parser.add_argument('--state', help='JSON file holding offsets and running apps between runs')
+    parser.add_argument('--follow', action='store_true', help='Keep polling and print NDJSON events')
+    parser.add_argument('--interval', type=float, default=1.0)
+    args = parser.parse_args(metrics.init_from_argv(span_trace.init_from_argv(list(argv))))
+
+    def emit(obj: dict) -> None:
+        sys.stdout.write(json.dumps(obj, ensure_ascii=False) + '\n')
+        sys.stdout.flush()
+
+    try:
+        tails = make_tails(_parse_sources(args.source), load_state(args.state))
+        events = []
+        for t in tails:
+            # A follower starts at the present: the backlog only sets what is running now
+            events += t.read(report=not args.follow)
+        save_state(args.state, tails)
+        running = { t.source: sorted(t.running) for t in tails }
+        if not args.follow:
+            print(json.dumps(span_trace.finish({ 'ok': True, 'events': events, 'running': running }), ensure_ascii=False))
+            return 0
+        emit({ 'event': 'running', 'running': running })
+        while True:
+            time.sleep(max(0.05, args.interval))
+            before = [t.offset for t in tails]
+            for t in tails:
+                for e in t.read():
+                    emit(e)
+            if [t.offset for t in tails] != before:
+                save_state(args.state, tails)
+                metrics.flush()
+    except KeyboardInterrupt:
+        return 0
+    except Exception as e:
+        print(json.dumps({ 'ok': False, 'error': str(e) }))
+        return 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,471 @@
+#!/usr/bin/env python3
+"""
+library_index.py
+
+In-memory search index over the detected library. Each game is indexed under
+its title, launcher-specific aliases (Epic AppName, Xbox package name, store
+ids, the title's initials, digits for roman numerals) and its install folder
+name. Words go into three inverted indexes: whole tokens, token prefixes (for
+search-as-you-type) and the trigrams of every distinct token (for typos and
+infix matches), so a query only touches the postings of its own words.
+
+Games are keyed by "launcher:id"; sync() diffs a fresh detector payload against
+what is indexed and only re-indexes games that were added, changed or removed.
+
+CLI:
+  python scripts/library_index.py --games games.json --query "gta 5" [--limit 20]
+  python scripts/library_index.py --serve
+
+With --serve, requests are read as NDJSON from stdin:
+  {"op": "sync", "games": [...]}          replace the library (diffed)
+  {"op": "upsert", "games": [...]}        add or update some games
+  {"op": "remove", "keys": ["epic:Fortnite"]}
+  {"op": "query", "id": 7, "q": "fortnite", "limit": 50}
+  {"op": "commit", "games": [...]}        sync, and record the full games as a new library version
+  {"op": "since", "id": 8, "version": 1700000000123}   changes after a version (see library_state.py)
+
+Outputs JSON (one-shot) / NDJSON (--serve):
+  {"event": "synced", "added": 3, "updated": 1, "removed": 0, "size": 412}
+  {"event": "results", "id": 7, "keys": ["epic:Fortnite"], "scores": [3.5], "ms": 0.08}
+  {"event": "committed", "version": 1700000000124, "added": 1, "changed": 0, "removed": 0, "size": 412}
+  {"event": "changes", "id": 8, "version": 1700000000124, "added": [...], "changed": [...], "removed": [...]}
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import re
+import sys
+import time
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+
+from glhelpers import metrics, span_trace
+from library_state import LibraryState
+
+# Field weights: a title hit outranks an alias hit, which outranks the install folder
+TITLE, ALIAS, FOLDER = 1.0, 0.8, 0.5
+# Score factors for a query word matching the start of an indexed word, or only approximately
+PREFIX, FUZZY = 0.75, 0.6
+# Bonus for the title's first word, and the per-character penalty that ranks shorter titles first on ties
+LEAD, TIE = 0.25, 1e-5
+# Minimum Dice coefficient of two words' trigrams to count as a typo match
+MIN_SIMILARITY = 0.5
+# Longest prefix stored in the prefix index; longer query words fall back to the sorted vocabulary
+MAX_PREFIX = 8
+
+STOPWORDS = {'a', 'an', 'the', 'of', 'and', 'or'}
+ROMAN = {
+    'ii': '2', 'iii': '3', 'iv': '4', 'v': '5', 'vi': '6', 'vii': '7', 'viii': '8', 'ix': '9',
+    'x': '10', 'xi': '11', 'xii': '12', 'xiii': '13', 'xiv': '14', 'xv': '15', 'xvi': '16',
+}
+_APOSTROPHES = re.compile(r"['’`]")
+_CAMEL = re.compile(r'(?<=[a-z])(?=[A-Z])|(?<=[A-Za-z])(?=[0-9])|(?<=[0-9])(?=[A-Za-z])')
+_NON_WORD = re.compile(r'[\W_]+')
+_HEXISH = re.compile(r'^[0-9a-f]{16,}$')
+
+
+def normalize(text: str) -> str:
+    """Casefolded words separated by single spaces; marks, apostrophes and punctuation dropped."""
+    s = _APOSTROPHES.sub('', str(text or '')).casefold()
+    return _NON_WORD.sub(' ', s).strip()
+
+
+def tokenize(text: str) -> list[str]:
+    return normalize(text).split()
+
+
+def split_words(name: str) -> str:
+    """'StarForge_Win64' -> 'Star Forge Win 64' for folder and package names."""
+    return _CAMEL.sub(' ', str(name or ''))
+
+
+def trigrams(word: str) -> set[str]:
+    w = f'${word}$'
+    return {w[i:i + 3] for i in range(len(w) - 2)}
+
+
+def initials(words: list[str]) -> str:
+    """'counter strike 2' -> 'cs2'; '' when the title is a single word."""
+    if len(words) < 2:
+        return ''
+    return ''.join(w if w.isdigit() else w[0] for w in words if w not in STOPWORDS)
+
+
+def _basename(path: str) -> str:
+    return re.split(r'[\\/]', str(path).rstrip('\\/'))[-1] if path else ''
+
+
+def _epic_aliases(g: dict) -> list[str]:
+    # AppName is often the codename the community uses (e.g. "Sugar"); skip the hex ids
+    app = str(g.get('id') or '')
+    return [split_words(app)] if app and not _HEXISH.match(app.lower()) else []
+
+
+def _xbox_aliases(g: dict) -> list[str]:
+    # "Microsoft.MinecraftUWP_8wekyb3d8bbwe" -> "Minecraft UWP"
+    pfn = str(g.get('pfn') or g.get('id') or '').split('_', 1)[0]
+    name = pfn.split('.', 1)[-1]
+    return [split_words(name)] if name else []
+
+
+def _id_alias(g: dict) -> list[str]:
+    # Store ids (Steam appid, GOG product id, Ubisoft install id) so a pasted id finds the game
+    gid = str(g.get('id') or '')
+    return [gid] if gid.isdigit() else []
+
+
+ALIASES = {
+    'epic': _epic_aliases,
+    'xbox': _xbox_aliases,
+    'steam': _id_alias,
+    'gog': _id_alias,
+    'ubisoft': _id_alias,
+}
+
+
+def game_key(g: dict) -> str:
+    return f"{g.get('launcher')}:{g.get('id')}"
+
+
+def game_fields(g: dict) -> list[tuple[float, list[str]]]:
+    """(weight, words) for everything a game is found by."""
+    title = tokenize(g.get('title') or '')
+    out = [(TITLE, title)]
+    alias_words = []
+    for alias in ALIASES.get(g.get('launcher'), lambda _g: [])(g) + list(g.get('aliases') or []):
+        alias_words += tokenize(alias)
+    short = initials(title)
+    if short:
+        alias_words.append(short)
+        if (title[-1].isdigit() or title[-1] in ROMAN) and len(title) > 2:
+            # 'grand theft auto v' is also 'gta' (+ '5' below)
+            alias_words.append(initials(title[:-1]))
+    alias_words += [ROMAN[w] for w in title[1:] if w in ROMAN]
+    if 1 < len(title) <= 3:
+        # 'Star Forge' typed as 'starforge'
+        alias_words.append(''.join(title))
+    if alias_words:
+        out.append((ALIAS, alias_words))
+    folder = tokenize(split_words(_basename(g.get('installDir') or '')))
+    if folder and folder != title:
+        out.append((FOLDER, folder))
+    return out
+
+
+def _fingerprint(g: dict) -> tuple:
+    return (g.get('title'), g.get('installDir'), tuple(g.get('aliases') or ()))
+
+
+def _drop_posting(index: dict, word: str, doc: int) -> None:
+    postings = index.get(word)
+    if postings is not None:
+        postings.pop(doc, None)
+        if not postings:
+            del index[word]
+
+
+def _merge(a: dict, b: dict) -> dict:
+    if not a or not b:
+        return a or b
+    out = dict(a)
+    for doc, score in b.items():
+        if out.get(doc, 0.0) < score:
+            out[doc] = score
+    return out
+
+
+class LibraryIndex:
+    def __init__(self):
+        self.keys = []          # doc -> key (None once removed)
+        self.docs = {}          # key -> doc
+        self.prints = {}        # key -> fingerprint of the indexed game
+        self.terms = {}         # doc -> {word: weight}
+        self.words = {}         # word -> {doc: weight}
+        self.prefixes = {}      # prefix -> {doc: weight * PREFIX}
+        self.vocab = {}         # word -> number of docs using it
+        self.grams = {}         # trigram -> set of words
+        self._sorted = None     # sorted vocabulary, rebuilt lazily for long prefixes
+        self.free = []
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # --- updates --------------------------------------------------------------
+
+    def add(self, g: dict) -> bool:
+        """Index one game (replacing its previous version); False when it is unchanged."""
+        key = game_key(g)
+        fp = _fingerprint(g)
+        if self.prints.get(key) == fp:
+            return False
+        self.remove(key)
+        title = normalize(g.get('title') or '')
+        terms = {}
+        for weight, words in game_fields(g):
+            for w in words:
+                if terms.get(w, 0.0) < weight:
+                    terms[w] = weight
+        if not terms:
+            return False
+        lead = title.split(' ', 1)[0]
+        if lead in terms:
+            terms[lead] += LEAD
+        # Fold the tie-break into every weight so ranking needs no per-doc work at query time
+        tie = len(title) * TIE
+        for w in terms:
+            terms[w] -= tie
+        doc = self.free.pop() if self.free else len(self.keys)
+        if doc == len(self.keys):
+            self.keys.append(key)
+        self.keys[doc] = key
+        self.docs[key] = doc
+        self.prints[key] = fp
+        self.terms[doc] = terms
+        words, prefixes, vocab = self.words, self.prefixes, self.vocab
+        for w, weight in terms.items():
+            postings = words.get(w)
+            if postings is None:
+                words[w] = {doc: weight}
+            else:
+                postings[doc] = weight
+            weight *= PREFIX
+            for n in range(1, min(len(w), MAX_PREFIX + 1)):
+                pre = w[:n]
+                postings = prefixes.get(pre)
+                if postings is None:
+                    prefixes[pre] = {doc: weight}
+                elif postings.get(doc, 0.0) < weight:
+                    postings[doc] = weight
+            count = vocab.get(w, 0)
+            vocab[w] = count + 1
+            if not count:
+                self._sorted = None
+                for t in trigrams(w):
+                    self.grams.setdefault(t, set()).add(w)
+        return True
+
+    def remove(self, key: str) -> bool:
+        doc = self.docs.pop(key, None)
+        if doc is None:
+            return False
+        del self.prints[key]
+        for w in self.terms.pop(doc):
+            _drop_posting(self.words, w, doc)
+            for n in range(1, min(len(w), MAX_PREFIX + 1)):
+                _drop_posting(self.prefixes, w[:n], doc)
+            count = self.vocab[w] - 1
+            if count:
+                self.vocab[w] = count
+                continue
+            del self.vocab[w]
+            self._sorted = None
+            for t in trigrams(w):
+                words = self.grams[t]
+                words.discard(w)
+                if not words:
+                    del self.grams[t]
+        self.keys[doc] = None
+        self.free.append(doc)
+        return True
+
+    def upsert(self, games) -> dict:
+        added = updated = 0
+        for g in games:
+            if not isinstance(g, dict) or g.get('id') in (None, '') or not g.get('launcher'):
+                continue
+            existed = game_key(g) in self.docs
+            if self.add(g):
+                if existed:
+                    updated += 1
+                else:
+                    added += 1
+        return { 'added': added, 'updated': updated }
+
+    def sync(self, games) -> dict:
+        """Make the index hold exactly `games`, touching only what changed."""
+        games = [g for g in games if isinstance(g, dict) and g.get('id') not in (None, '') and g.get('launcher')]
+        keep = {game_key(g) for g in games}
+        removed = 0
+        for key in [k for k in self.docs if k not in keep]:
+            removed += self.remove(key)
+        return { **self.upsert(games), 'removed': removed }
+
+    # --- queries --------------------------------------------------------------
+
+    def _expand(self, word: str) -> dict:
+        """Words starting with `word` -> {doc: weight * PREFIX}, for words past MAX_PREFIX."""
+        if self._sorted is None:
+            self._sorted = sorted(self.vocab)
+        vocab = self._sorted
+        out = {}
+        for i in range(bisect_left(vocab, word), len(vocab)):
+            w = vocab[i]
+            if not w.startswith(word):
+                break
+            if w == word:
+                continue
+            for doc, weight in self.words[w].items():
+                if out.get(doc, 0.0) < weight * PREFIX:
+                    out[doc] = weight * PREFIX
+        return out
+
+    def _fuzzy(self, word: str) -> dict:
+        """Docs with a word sharing most of `word`'s trigrams (typos, infixes) -> weighted score."""
+        grams = trigrams(word)
+        shared = Counter(chain.from_iterable(self.grams.get(t, ()) for t in grams))
+        out = {}
+        for w, n in shared.items():
+            # A word of length k has k padded trigrams
+            sim = 2.0 * n / (len(grams) + len(w))
+            if sim < MIN_SIMILARITY:
+                continue
+            for doc, weight in self.words[w].items():
+                score = weight * FUZZY * sim
+                if out.get(doc, 0.0) < score:
+                    out[doc] = score
+        return out
+
+    def _match(self, word: str, last: bool) -> dict:
+        """doc -> score of its best match for one query word."""
+        exact = self.words.get(word)
+        prefixed = None
+        if last:
+            # The word being typed also matches as a prefix
+            prefixed = self.prefixes.get(word) if len(word) <= MAX_PREFIX else self._expand(word)
+        if exact or prefixed:
+            # Postings come back as they are unless both kinds matched; search() only reads them
+            return _merge(exact, prefixed)
+        return self._fuzzy(word) if len(word) >= 3 else {}
+
+    def search(self, query: str, limit: int = 50) -> list[tuple[str, float]]:
+        """Best matches for `query` as (key, score), highest first; every word but stopwords must match."""
+        words = tokenize(query)
+        if not words:
+            return []
+        required = [w for w in words if w not in STOPWORDS] or words
+        needed, optional = [], []
+        for i, w in enumerate(words):
+            m = self._match(w, i == len(words) - 1)
+            if i and w in ROMAN:
+                # 'witcher iii' also finds 'witcher 3'
+                m = _merge(m, self._match(ROMAN[w], False))
+            if w in required:
+                if not m:
+                    return []
+                needed.append(m)
+            elif m:
+                optional.append(m)
+        # Walk the rarest word's docs and look the rest up
+        needed.sort(key=len)
+        scores = needed[0]
+        if len(needed) > 1 or optional:
+            rest = [(m, True) for m in needed[1:]] + [(m, False) for m in optional]
+            scores = {}
+            for doc, score in needed[0].items():
+                for m, must in rest:
+                    s = m.get(doc)
+                    if s is None:
+                        if must:
+                            break
+                        continue
+                    score += s
+                else:
+                    scores[doc] = score
+        best = heapq.nlargest(limit, scores, key=scores.__getitem__)
+        return [(self.keys[doc], round(scores[doc], 3)) for doc in best]
+
+
+def serve(lines, emit, index: LibraryIndex | None = None, state: LibraryState | None = None) -> LibraryIndex:
+    """Handle NDJSON request lines until they run out."""
+    index = index or LibraryIndex()
+    state = state or LibraryState()
+    for line in lines:
+        try:
+            req = json.loads(line)
+        except ValueError:
+            continue
+        if not isinstance(req, dict):
+            continue
+        op = req.get('op')
+        if op in ('sync', 'upsert'):
+            with metrics.timed('library_index_ms', op=op):
+                stats = index.sync(req.get('games') or []) if op == 'sync' else index.upsert(req.get('games') or [])
+            emit({ 'event': 'synced', **stats, 'size': len(index) })
+        elif op == 'remove':
+            removed = sum(index.remove(str(k)) for k in req.get('keys') or [])
+            emit({ 'event': 'synced', 'added': 0, 'updated': 0, 'removed': removed, 'size': len(index) })
+        elif op == 'commit':
+            games = req.get('games') or []
+            with metrics.timed('library_index_ms', op=op):
+                index.sync(games)
+                stats = state.commit(games)
+            emit({ 'event': 'committed', **stats })
+        elif op == 'since':
+            with metrics.timed('library_index_ms', op=op):
+                delta = state.since(req.get('version'))
+            emit({ 'event': 'changes', 'id': req.get('id'), **delta })
+        elif op == 'query':
+            t0 = time.perf_counter()
+            try:
+                limit = int(req.get('limit') or 50)
+            except (TypeError, ValueError):
+                limit = 50
+            hits = index.search(str(req.get('q') or ''), limit)
+            ms = (time.perf_counter() - t0) * 1000.0
+            metrics.observe('library_query_ms', ms)
+            emit({
+                'event': 'results', 'id': req.get('id'), 'keys': [k for k, _ in hits],
+                'scores': [s for _, s in hits], 'ms': round(ms, 3),
+            })
+    return index
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Search the game library by title, alias or install folder')
+    parser.add_argument('--games', default=None, help="Detector output or a list of games ('-' for stdin)")
+    parser.add_argument('--query', default=None, help='Search text')
+    parser.add_argument('--limit', type=int, default=20, help='Results to return')
+    parser.add_argument('--serve', action='store_true', help='Read NDJSON requests from stdin')
+    args = parser.parse_args(metrics.init_from_argv(span_trace.init_from_argv(list(argv))))
+
+    def emit(obj: dict) -> None:
+        sys.stdout.write(json.dumps(obj, ensure_ascii=False) + '\n')
+        sys.stdout.flush()
+
+    try:
+        if args.serve:
+            serve(sys.stdin, emit)
+            metrics.flush()
+            return 0
+        if not args.games or args.query is None:
+            parser.error('--games and --query are required without --serve')
+        if args.games == '-':
+            payload = json.load(sys.stdin)
+        else:
+            with open(args.games, 'r', encoding='utf-8') as f:
+                payload = json.load(f)
+        games = payload.get('games', []) if isinstance(payload, dict) else payload
+        index = LibraryIndex()
+        index.sync(games or [])
+        t0 = time.perf_counter()
+        hits = index.search(args.query, args.limit)
+        result = {
+            'ok': True, 'query': args.query, 'size': len(index),
+            'results': [{ 'key': k, 'score': s } for k, s in hits],
+            'ms': round((time.perf_counter() - t0) * 1000.0, 3),
+        }
+    except KeyboardInterrupt:
+        return 0
+    except Exception as e:
+        emit({ 'ok': False, 'error': str(e) })
+        return 1
+    emit(span_trace.finish(result))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+library_state.py
+
+Versioned snapshot of the merged library. Every game carries a content hash
+(of its whole JSON object), and each commit that adds, removes or changes a
+game bumps the version and appends the touched keys to a change log, so
+since(version) costs time proportional to what changed after that version.
+
+Versions start at the state's creation time in milliseconds: a client holding
+a version from an earlier process is always older than the new state's floor
+and gets the full list instead of a wrong delta. The log keeps the last
+MAX_LOG changes; older versions also fall back to the full list.
+
+CLI (JSON in on stdin where noted, JSON out on stdout):
+  python scripts/library_state.py --state state.json commit < games.json
+  python scripts/library_state.py --state state.json since --version 1700000000123
+
+Outputs JSON:
+  commit: {"ok": true, "version": 1700000000124, "added": 1, "changed": 0, "removed": 2, "size": 412}
+  since:  {"ok": true, "version": 1700000000124}                                (nothing changed)
+          {"ok": true, "version": ..., "added": [...], "changed": [...], "removed": ["epic:Fortnite"]}
+          {"ok": true, "version": ..., "full": true, "games": [...]}           (unknown or too old)
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sys
+import time
+from bisect import bisect_right
+
+# Change-log entries kept for since(); older versions get the full list
+MAX_LOG = 20_000
+
+
+def game_key(g: dict) -> str:
+    return f"{g.get('launcher')}:{g.get('id')}"
+
+
+def content_hash(g: dict) -> str:
+    """Stable across processes and key order: the hash of the game's canonical JSON."""
+    raw = json.dumps(g, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.blake2b(raw.encode('utf-8'), digest_size=8).hexdigest()
+
+
+class LibraryState:
+    def __init__(self, version: int | None = None):
+        self.version = int(time.time() * 1000) if version is None else version
+        # Versions at or below the floor cannot be answered with a delta
+        self.floor = self.version
+        self.entries = {}       # key -> [hash, game, version added]
+        self.gone = {}          # key -> [(version added, version removed), ...] inside the log window
+        self.log_versions = []  # parallel to log_keys, non-decreasing
+        self.log_keys = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def hash_of(self, key: str) -> str | None:
+        e = self.entries.get(key)
+        return e[0] if e else None
+
+    def games(self) -> list:
+        return [e[1] for e in self.entries.values()]
+
+    def commit(self, games) -> dict:
+        """Make `games` the current library; bumps the version only when something differs."""
+        fresh = {}
+        for g in games:
+            if isinstance(g, dict) and g.get('id') not in (None, '') and g.get('launcher'):
+                fresh[game_key(g)] = g
+        version = self.version + 1
+        added = changed = removed = 0
+        touched = []
+        for key, g in fresh.items():
+            e = self.entries.get(key)
+            if e is None:
+                # Earlier lifespans stay in `gone`: a client from back then still holds the game
+                self.entries[key] = [content_hash(g), g, version]
+                added += 1
+            elif e[1] == g:
+                # Equal dicts hash equal; skip serializing the unchanged bulk of the library
+                continue
+            else:
+                h = content_hash(g)
+                if e[0] == h:
+                    e[1] = g
+                    continue
+                e[0], e[1] = h, g
+                changed += 1
+            touched.append(key)
+        for key in [k for k in self.entries if k not in fresh]:
+            self.gone.setdefault(key, []).append((self.entries.pop(key)[2], version))
+            touched.append(key)
+            removed += 1
+        if touched:
+            self.version = version
+            self.log_versions += [version] * len(touched)
+            self.log_keys += touched
+            self._trim()
+        return { 'version': self.version, 'added': added, 'changed': changed, 'removed': removed, 'size': len(self.entries) }
+
+    def _trim(self) -> None:
+        extra = len(self.log_keys) - MAX_LOG
+        if extra <= 0:
+            return
+        # Cut on a version boundary so a version is either fully logged or below the floor
+        cut = bisect_right(self.log_versions, self.log_versions[extra - 1])
+        self.floor = self.log_versions[cut - 1]
+        del self.log_versions[:cut]
+        del self.log_keys[:cut]
+        for key, spans in list(self.gone.items()):
+            spans = [s for s in spans if s[1] > self.floor]
+            if spans:
+                self.gone[key] = spans
+            else:
+                del self.gone[key]
+
+    def _had(self, key: str, version: int) -> bool:
+        """Whether a client at `version` holds `key`."""
+        e = self.entries.get(key)
+        if e is not None and e[2] <= version:
+            return True
+        return any(a <= version < r for a, r in self.gone.get(key, ()))
+
+    def since(self, version) -> dict:
+        """What changed after `version`: nothing, a delta, or the full list when the version is unknown."""
+        try:
+            version = int(version)
+        except (TypeError, ValueError):
+            version = -1
+        if version == self.version:
+            return { 'version': self.version }
+        if version < self.floor or version > self.version:
+            return { 'version': self.version, 'full': True, 'games': self.games() }
+        added, changed, removed = [], [], []
+        seen = set()
+        for key in self.log_keys[bisect_right(self.log_versions, version):]:
+            if key in seen:
+                continue
+            seen.add(key)
+            e = self.entries.get(key)
+            had = self._had(key, version)
+            if e is not None:
+                # A game removed and re-added since `version` is a change to a client that still has it
+                (changed if had else added).append(e[1])
+            elif had:
+                # Only keys the client could have seen; ones added and dropped since never reached it
+                removed.append(key)
+        return { 'version': self.version, 'added': added, 'changed': changed, 'removed': removed }
+
+    def to_json(self) -> dict:
+        return {
+            'version': self.version, 'floor': self.floor,
+            'entries': self.entries, 'gone': self.gone,
+            'log': [self.log_versions, self.log_keys],
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> LibraryState:
+        state = cls(int(data['version']))
+        state.floor = int(data.get('floor', state.version))
+        state.entries = { k: list(e) for k, e in (data.get('entries') or {}).items() }
+        state.gone = { k: [tuple(s) for s in v] for k, v in (data.get('gone') or {}).items() }
+        state.log_versions, state.log_keys = (data.get('log') or [[], []])
+        return state
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    import os
+    parser = argparse.ArgumentParser(description='Versioned library state with change diffs')
+    parser.add_argument('--state', required=True, help='JSON file holding the state between runs')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    sub.add_parser('commit')
+    sub.add_parser('since').add_argument('--version', type=int, default=-1)
+    args = parser.parse_args(argv)
+
+    try:
+        try:
+            with open(args.state, 'r', encoding='utf-8') as f:
+                state = LibraryState.from_json(json.load(f))
+        except (OSError, ValueError, KeyError):
+            state = LibraryState()
+        if args.cmd == 'commit':
+            payload = json.load(sys.stdin)
+            games = payload.get('games', []) if isinstance(payload, dict) else payload
+            result = { 'ok': True, **state.commit(games or []) }
+            tmp = args.state + '.tmp'
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(state.to_json(), f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp, args.state)
+        else:
+            result = { 'ok': True, **state.since(args.version) }
+    except Exception as e:
+        print(json.dumps({ 'ok': False, 'error': str(e) }))
+        return 1
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
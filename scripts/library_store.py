@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+library_store.py
+
+Persistent game library backed by SQLite (WAL mode). Detector output is upserted
+incrementally so only changed rows are written, and the library can be read
+back from disk at startup before any detector has run.
+
+CLI (JSON in on stdin where noted, JSON out on stdout):
+  python scripts/library_store.py --db library.db upsert --launcher steam [--replace] < detector.json
+  python scripts/library_store.py --db library.db list [--launcher steam] [--all]
+  python scripts/library_store.py --db library.db recent [--limit 10]
+  python scripts/library_store.py --db library.db most-played [--limit 10]
+  python scripts/library_store.py --db library.db session --launcher steam --id 620 --start 1700000000 --end 1700003600
+
+`upsert` accepts either a detector payload ({"games": [...]}) or a bare list.
+With --replace, games of that launcher missing from the payload are marked
+uninstalled rather than deleted: a library drive that is unmounted for one scan
+keeps its games' playtime, sessions and artwork, and a later scan that finds
+them again marks them installed. `list` shows installed games unless --all is
+given; `recent` and `most-played` include uninstalled games (with
+"installed": false) so their history still ranks.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import sys
+import time
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS launchers (
+    name        TEXT PRIMARY KEY,
+    scanned_at  REAL
+);
+CREATE TABLE IF NOT EXISTS games (
+    launcher        TEXT NOT NULL,
+    id              TEXT NOT NULL,
+    title           TEXT NOT NULL,
+    install_dir     TEXT,
+    executable_path TEXT,
+    extra           TEXT,
+    added_at        REAL NOT NULL,
+    updated_at      REAL NOT NULL,
+    last_played     REAL NOT NULL DEFAULT 0,
+    total_seconds   INTEGER NOT NULL DEFAULT 0,
+    installed       INTEGER NOT NULL DEFAULT 1,
+    PRIMARY KEY (launcher, id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS games_by_last_played ON games (last_played DESC);
+CREATE INDEX IF NOT EXISTS games_by_total_seconds ON games (total_seconds DESC);
+CREATE INDEX IF NOT EXISTS games_by_title ON games (launcher, title COLLATE NOCASE);
+CREATE TABLE IF NOT EXISTS artwork (
+    launcher    TEXT NOT NULL,
+    id          TEXT NOT NULL,
+    kind        TEXT NOT NULL,
+    url         TEXT NOT NULL,
+    PRIMARY KEY (launcher, id, kind)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS sessions (
+    launcher    TEXT NOT NULL,
+    id          TEXT NOT NULL,
+    started_at  REAL NOT NULL,
+    ended_at    REAL NOT NULL,
+    seconds     INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sessions_by_game ON sessions (launcher, id, started_at);
+"""
+
+# Detector fields that get their own column; everything else lands in `extra`.
+_COLUMNS = ('id', 'title', 'launcher', 'installDir', 'executablePath', 'image')
+
+
+class LibraryStore:
+    def __init__(self, path: str):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=5.0, isolation_level=None)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute('PRAGMA journal_mode=WAL')
+        self.db.execute('PRAGMA synchronous=NORMAL')
+        self.db.execute('PRAGMA foreign_keys=OFF')
+        version = self.db.execute('PRAGMA user_version').fetchone()[0]
+        if version < SCHEMA_VERSION:
+            self.db.executescript(SCHEMA)
+            self.db.execute(f'PRAGMA user_version={SCHEMA_VERSION}')
+
+    def close(self) -> None:
+        self.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_exc):
+        self.close()
+
+    # --- writes ---------------------------------------------------------------
+
+    def upsert_games(self, launcher: str, games: list, replace: bool = False) -> dict:
+        """Insert new games and update changed ones; unchanged rows are not rewritten."""
+        now = time.time()
+        added = changed = removed = 0
+        seen = set()
+        with self._tx():
+            cur = self.db.cursor()
+            for g in games:
+                if not isinstance(g, dict) or g.get('id') in (None, '') or not g.get('title'):
+                    continue
+                gid = str(g['id'])
+                seen.add(gid)
+                extra = {k: v for k, v in g.items() if k not in _COLUMNS and v is not None}
+                row = (
+                    str(g['title']), g.get('installDir') or None, g.get('executablePath') or None,
+                    json.dumps(extra, sort_keys=True, ensure_ascii=False) if extra else None,
+                )
+                cur.execute(
+                    'INSERT INTO games (launcher, id, title, install_dir, executable_path, extra, added_at, updated_at) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (launcher, id) DO NOTHING',
+                    (launcher, gid, *row, now, now),
+                )
+                if cur.rowcount:
+                    added += 1
+                else:
+                    cur.execute(
+                        'UPDATE games SET title = ?, install_dir = ?, executable_path = ?, extra = ?, installed = 1, '
+                        'updated_at = ? WHERE launcher = ? AND id = ? AND (title, install_dir, executable_path, extra, installed) '
+                        'IS NOT (?, ?, ?, ?, 1)',
+                        (*row, now, launcher, gid, *row),
+                    )
+                    changed += cur.rowcount
+                image = g.get('image')
+                if image:
+                    cur.execute(
+                        'INSERT INTO artwork (launcher, id, kind, url) VALUES (?, ?, ?, ?) '
+                        'ON CONFLICT (launcher, id, kind) DO UPDATE SET url = excluded.url WHERE url != excluded.url',
+                        (launcher, gid, 'image', str(image)),
+                    )
+            if replace:
+                # Keep the rows (playtime, sessions, artwork) of games that went missing
+                existing = [r[0] for r in cur.execute('SELECT id FROM games WHERE launcher = ? AND installed = 1', (launcher,))]
+                gone = [(now, launcher, gid) for gid in existing if gid not in seen]
+                if gone:
+                    cur.executemany('UPDATE games SET installed = 0, updated_at = ? WHERE launcher = ? AND id = ?', gone)
+                    removed = len(gone)
+            cur.execute(
+                'INSERT INTO launchers (name, scanned_at) VALUES (?, ?) '
+                'ON CONFLICT (name) DO UPDATE SET scanned_at = excluded.scanned_at',
+                (launcher, now),
+            )
+        return {'added': added, 'changed': changed, 'removed': removed}
+
+    def record_session(self, launcher: str, gid: str, started_at: float, ended_at: float) -> int:
+        seconds = max(0, int(ended_at - started_at))
+        with self._tx():
+            self.db.execute(
+                'INSERT INTO sessions (launcher, id, started_at, ended_at, seconds) VALUES (?, ?, ?, ?, ?)',
+                (launcher, str(gid), started_at, ended_at, seconds),
+            )
+            self.db.execute(
+                'UPDATE games SET total_seconds = total_seconds + ?, last_played = MAX(last_played, ?) '
+                'WHERE launcher = ? AND id = ?',
+                (seconds, ended_at, launcher, str(gid)),
+            )
+        return seconds
+
+    def _tx(self):
+        return _Transaction(self.db)
+
+    # --- reads ----------------------------------------------------------------
+
+    def games(self, launcher: str | None = None, include_uninstalled: bool = False) -> list:
+        where = [] if include_uninstalled else ['g.installed = 1']
+        if launcher:
+            where.append('g.launcher = ?')
+        sql = _SELECT + (' WHERE ' + ' AND '.join(where) if where else '') + ' ORDER BY g.title COLLATE NOCASE'
+        return [_row_to_game(r) for r in self.db.execute(sql, (launcher,) if launcher else ())]
+
+    def recent(self, limit: int = 10) -> list:
+        sql = _SELECT + ' WHERE g.last_played > 0 ORDER BY g.last_played DESC LIMIT ?'
+        return [_row_to_game(r) for r in self.db.execute(sql, (limit,))]
+
+    def most_played(self, limit: int = 10) -> list:
+        sql = _SELECT + ' WHERE g.total_seconds > 0 ORDER BY g.total_seconds DESC LIMIT ?'
+        return [_row_to_game(r) for r in self.db.execute(sql, (limit,))]
+
+
+_SELECT = (
+    'SELECT g.*, a.url AS image FROM games g '
+    "LEFT JOIN artwork a ON a.launcher = g.launcher AND a.id = g.id AND a.kind = 'image'"
+)
+
+
+class _Transaction:
+    def __init__(self, db: sqlite3.Connection):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute('BEGIN IMMEDIATE')
+        return self.db
+
+    def __exit__(self, exc_type, _exc, _tb):
+        self.db.execute('ROLLBACK' if exc_type else 'COMMIT')
+        return False
+
+
+def _row_to_game(r: sqlite3.Row) -> dict:
+    g = json.loads(r['extra']) if r['extra'] else {}
+    g.update({
+        'id': r['id'],
+        'title': r['title'],
+        'launcher': r['launcher'],
+        'installDir': r['install_dir'],
+        'executablePath': r['executable_path'],
+        'lastPlayedAt': int(r['last_played'] * 1000),
+        'playtimeSeconds': r['total_seconds'],
+        'installed': bool(r['installed']),
+    })
+    if r['image']:
+        g['image'] = r['image']
+    return g
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Game Librarian library store')
+    parser.add_argument('--db', required=True, help='Path to the SQLite library file')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    p_up = sub.add_parser('upsert')
+    p_up.add_argument('--launcher', required=True)
+    p_up.add_argument('--replace', action='store_true')
+    p_ls = sub.add_parser('list')
+    p_ls.add_argument('--launcher')
+    p_ls.add_argument('--all', action='store_true', help='Include games missing from the last --replace scan')
+    for name in ('recent', 'most-played'):
+        sub.add_parser(name).add_argument('--limit', type=int, default=10)
+    p_ss = sub.add_parser('session')
+    p_ss.add_argument('--launcher', required=True)
+    p_ss.add_argument('--id', required=True)
+    p_ss.add_argument('--start', type=float, required=True)
+    p_ss.add_argument('--end', type=float, required=True)
+    args = parser.parse_args(argv)
+
+    try:
+        with LibraryStore(args.db) as store:
+            if args.cmd == 'upsert':
+                payload = json.load(sys.stdin)
+                games = payload.get('games', []) if isinstance(payload, dict) else payload
+                result = {'ok': True, **store.upsert_games(args.launcher, games or [], replace=args.replace)}
+            elif args.cmd == 'list':
+                result = {'ok': True, 'games': store.games(args.launcher, include_uninstalled=args.all)}
+            elif args.cmd == 'recent':
+                result = {'ok': True, 'games': store.recent(args.limit)}
+            elif args.cmd == 'most-played':
+                result = {'ok': True, 'games': store.most_played(args.limit)}
+            else:
+                result = {'ok': True, 'seconds': store.record_session(args.launcher, args.id, args.start, args.end)}
+    except Exception as e:
+        print(json.dumps({'ok': False, 'error': str(e)}))
+        return 1
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
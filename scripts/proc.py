@@ -1,28 +1,12 @@
 import sys
 import os
 import json
-import subprocess
+import ntpath
 import time
+from array import array
 
-
-def _ps_list_windows():
-    try:
-        cmd = [
-            'powershell',
-            '-NoProfile',
-            '-ExecutionPolicy', 'Bypass',
-            '-Command',
-            'Get-CimInstance Win32_Process | Select-Object ProcessId,ExecutablePath,CommandLine,ParentProcessId,Name | ConvertTo-Json -Depth 2 -Compress'
-        ]
-        completed = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-        if completed.returncode == 0 and completed.stdout:
-            data = json.loads(completed.stdout)
-            if isinstance(data, dict):
-                return [data]
-            return data or []
-    except Exception:
-        pass
-    return []
+from glhelpers import metrics, span_trace
+from glhelpers.proc_snapshot import DEFAULT_FIELDS, list_processes, pids_alive
 
 
 def _norm_path(p):
@@ -33,7 +17,7 @@ def _norm_path(p):
 
 def _image_from_path(p):
     try:
-        return os.path.basename(p).lower()
+        return ntpath.basename(p).lower()
     except Exception:
         return ''
 
@@ -85,33 +69,87 @@ def _sanitize_tokens(title):
     return out
 
 
-def _evaluate_match(proc, f):
-    pid = proc.get('ProcessId') or proc.get('Id') or proc.get('pid')
-    ppid = proc.get('ParentProcessId') or proc.get('ppid')
-    name = (proc.get('Name') or '').lower()
-    exe_path = (proc.get('ExecutablePath') or '').strip()
-    cmd = (proc.get('CommandLine') or '').strip()
-    parsed = _extract_cmd_exe(cmd)
-    path_val = _norm_path(exe_path or parsed)
-    if not name and path_val:
-        name = _image_from_path(path_val)
-    base_name = os.path.splitext(os.path.basename(path_val or name))[0].lower()
-
-    exact_exec = bool(f['executablePath'] and path_val == f['executablePath'])
-    image_match = bool(f['imageName'] and name == f['imageName'])
-    title_match = False
-    if f['titleTokens']:
-        matches = [tok for tok in f['titleTokens'] if tok in base_name]
-        title_match = (len(matches) >= 2) or (''.join(f['titleTokens']) == base_name)
-
-    install_dir = f['installDir']
-    under_install = bool(install_dir and path_val.startswith(install_dir))
-    # Check alternate install variants (e.g., with steamapps/common injected)
-    if not under_install and f.get('installDirVariants'):
-        for v in f['installDirVariants']:
-            if v and path_val.startswith(v):
-                under_install = True
-                break
+class ProcessTable:
+    """One process snapshot as parallel columns.
+
+    Rows hold pids, parent pids (-1 when unknown) and ids into de-duplicated
+    string tables: normalized executable paths, lower-cased image names and
+    executable stems. Normalization runs once per distinct value when the table
+    is built, so matching only compares ids and reads precomputed flags.
+    """
+
+    __slots__ = ('pids', 'ppids', 'path_ids', 'name_ids', 'base_ids', 'paths', 'names', 'bases')
+
+    def __init__(self, procs=()):
+        self.pids = array('q')
+        self.ppids = array('q')
+        self.path_ids = array('I')
+        self.name_ids = array('I')
+        self.base_ids = array('I')
+        self.paths = []
+        self.names = []
+        self.bases = []
+        path_ix, name_ix, base_ix = {}, {}, {}
+        raw_paths = {}
+        for p in procs:
+            pid = p.get('ProcessId') or p.get('Id') or p.get('pid')
+            if not isinstance(pid, int):
+                continue
+            ppid = p.get('ParentProcessId') or p.get('ppid')
+            exe = p.get('ExecutablePath') or ''
+            raw = exe if exe.strip() else _extract_cmd_exe((p.get('CommandLine') or '').strip())
+            pi = raw_paths.get(raw)
+            if pi is None:
+                pi = raw_paths[raw] = self._intern(self.paths, path_ix, _norm_path(raw))
+            path_val = self.paths[pi]
+            name = (p.get('Name') or '').lower() or _image_from_path(path_val)
+            ni = self._intern(self.names, name_ix, name)
+            # Paths are normalized to backslashes, which os.path only splits on Windows
+            base = ntpath.splitext(ntpath.basename(path_val or name))[0].lower()
+            self.pids.append(pid)
+            self.ppids.append(ppid if isinstance(ppid, int) else -1)
+            self.path_ids.append(pi)
+            self.name_ids.append(ni)
+            self.base_ids.append(self._intern(self.bases, base_ix, base))
+
+    @staticmethod
+    def _intern(table, index, value):
+        i = index.get(value)
+        if i is None:
+            i = index[value] = len(table)
+            table.append(sys.intern(value))
+        return i
+
+    def __len__(self):
+        return len(self.pids)
+
+    def rows_by_pid(self):
+        return { pid: i for i, pid in enumerate(self.pids) }
+
+
+def _match_columns(table, f):
+    """Evaluate the filters once per distinct path / name / stem; returns per-table flag lists."""
+    exec_path = f['executablePath']
+    prefixes = [d for d in [f['installDir']] + list(f.get('installDirVariants') or []) if d]
+    image = f['imageName']
+    tokens = f.get('titleTokens') or []
+    joined = ''.join(tokens)
+    exact = [bool(exec_path) and p == exec_path for p in table.paths]
+    under = [bool(prefixes) and p.startswith(tuple(prefixes)) for p in table.paths]
+    image_match = [bool(image) and n == image for n in table.names]
+    title = [bool(tokens) and (sum(1 for t in tokens if t in b) >= 2 or joined == b) for b in table.bases]
+    return exact, under, image_match, title
+
+
+def _row_match(table, i, f, cols):
+    """Return (any_match, reasons, score) for row i, given _match_columns() flags."""
+    exact_col, under_col, image_col, title_col = cols
+    exact_exec = exact_col[table.path_ids[i]]
+    under_install = under_col[table.path_ids[i]]
+    image_match = image_col[table.name_ids[i]]
+    title_match = title_col[table.base_ids[i]]
+    if not (exact_exec or image_match or title_match or under_install):
+        return False, None, 0
 
     reasons = []
     if exact_exec:
@@ -122,12 +160,10 @@ def _evaluate_match(proc, f):
         reasons.append('exec-under-installDir')
     if title_match:
         reasons.append('title-match')
-    if f.get('parentPid') and isinstance(ppid, int) and int(f['parentPid']) == int(ppid):
+    parent_match = bool(f.get('parentPid')) and int(f['parentPid']) == table.ppids[i]
+    if parent_match:
         reasons.append('parent-match')
 
-    strong = exact_exec or image_match or title_match
-    any_match = strong or under_install
-
     # Scoring to rank most likely game processes
     score = 0
     if exact_exec:
@@ -138,18 +174,14 @@ def _evaluate_match(proc, f):
         score += 20
     if under_install:
         score += 50
-    if 'parent-match' in reasons:
+    if parent_match:
         score += 30
-    if name in LAUNCHER_IMAGES:
+    if table.names[table.name_ids[i]] in LAUNCHER_IMAGES:
         score -= 40
+    return True, reasons, score
 
-    return any_match, strong, pid, name, path_val, reasons, score
-
-
-def action_find(filters):
-    if os.name != 'nt':
-        return { 'ok': True, 'pids': [], 'matches': [], 'note': 'windows-only finder' }
 
+def _build_find_filters(filters):
     exec_path = _norm_path((filters.get('executablePath') or ''))
     image_name = (filters.get('imageName') or '').strip().lower()
     if not image_name and exec_path:
@@ -185,28 +217,95 @@ def action_find(filters):
         'titleTokens': title_tokens,
         'parentPid': parent_pid
     }
+    return f
 
-    procs = _ps_list_windows()
-    candidates = []
-    for p in procs:
-        any_match, strong, pid, name, path_val, reasons, score = _evaluate_match(p, f)
-        if not any_match or not isinstance(pid, int):
-            continue
-        # Skip known irrelevant images
-        if name in IGNORE_IMAGES:
+
+# Above this many OR terms the WMI-side filter stops paying for itself
+MAX_WQL_TERMS = 24
+# Install dirs too broad to filter on: everything under them would match anyway
+BROAD_DIRS = {'c:\\program files\\', 'c:\\program files (x86)\\', 'c:\\windows\\', 'c:\\users\\'}
+FIND_FIELDS = ('ProcessId', 'ExecutablePath', 'ParentProcessId', 'Name')
+
+
+def _wql_str(s):
+    """Quote a WQL string literal."""
+    return "'" + s.replace('\\', '\\\\').replace("'", "\\'") + "'"
+
+
+def _wql_like(s):
+    """Escape LIKE wildcards ([, %, _) in a literal fragment."""
+    return s.replace('[', '[[]').replace('%', '[%]').replace('_', '[_]')
+
+
+def _needs_cmdline(f):
+    """Whether the path filters are set; rows without ExecutablePath then fall back to the exe named in CommandLine."""
+    return bool(f['executablePath'] or any([f['installDir']] + list(f.get('installDirVariants') or [])))
+
+
+def _compile_wql(f):
+    """Compile find filters into (where, fields) for the WMI query; where is None when too broad."""
+    terms = []
+    if f['executablePath']:
+        terms.append('ExecutablePath = ' + _wql_str(f['executablePath']))
+        terms.append('CommandLine LIKE ' + _wql_str('%' + _wql_like(f['executablePath']) + '%'))
+    if f['imageName']:
+        terms.append('Name = ' + _wql_str(f['imageName']))
+    for d in [f['installDir']] + list(f.get('installDirVariants') or []):
+        if not d:
             continue
-        if any(name.startswith(pref) for pref in IGNORE_PREFIXES):
+        if d.count('\\') < 2 or d in BROAD_DIRS:
+            return None, DEFAULT_FIELDS
+        terms.append('ExecutablePath LIKE ' + _wql_str(_wql_like(d) + '%'))
+        terms.append('CommandLine LIKE ' + _wql_str('%' + _wql_like(d) + '%'))
+    for tok in f.get('titleTokens') or []:
+        terms.append('Name LIKE ' + _wql_str('%' + _wql_like(tok) + '%'))
+    if not terms or len(terms) > MAX_WQL_TERMS:
+        return None, DEFAULT_FIELDS
+    fields = FIND_FIELDS + (('CommandLine',) if _needs_cmdline(f) else ())
+    return ' OR '.join(terms), fields
+
+
+def _rank_candidates(table, f):
+    cols = _match_columns(table, f)
+    # Known irrelevant images, decided once per distinct name
+    skip = [n in IGNORE_IMAGES or n in LAUNCHER_IMAGES or n.startswith(IGNORE_PREFIXES) for n in table.names]
+    candidates = []
+    for i in range(len(table)):
+        if skip[table.name_ids[i]]:
             continue
-        if name in LAUNCHER_IMAGES:
+        any_match, reasons, score = _row_match(table, i, f, cols)
+        if not any_match:
             continue
-        candidates.append({ 'pid': pid, 'name': name, 'path': path_val, 'reasons': reasons, 'score': score })
+        candidates.append({
+            'pid': table.pids[i], 'name': table.names[table.name_ids[i]], 'path': table.paths[table.path_ids[i]],
+            'reasons': reasons, 'score': score
+        })
 
     # Sort by score descending and return top set (cap to avoid noise)
     candidates.sort(key=lambda x: x['score'], reverse=True)
     top = candidates[:12]
     # For UWP/Xbox titles often the executable is a UWP host; relax threshold slightly
     out_pids = [c['pid'] for c in top if c['score'] >= 10]
-    return { 'ok': True, 'pids': out_pids, 'matches': top, 'ts': time.time() }
+    return out_pids, top
+
+
+def action_find(filters):
+    if os.name != 'nt' and not sys.platform.startswith('linux'):
+        return { 'ok': True, 'pids': [], 'matches': [], 'note': 'windows-only finder' }
+
+    f = _build_find_filters(filters)
+    # The WQL filter only applies to the Windows query; /proc is always read whole
+    where, fields = _compile_wql(f) if os.name == 'nt' else (None, DEFAULT_FIELDS)
+    stats = {}
+    with span_trace.span('snapshot') as s:
+        table = ProcessTable(list_processes(fields, where, stats))
+        s.add('processes', len(table))
+    if where is None and os.name == 'nt':
+        stats['fallback'] = stats.get('fallback') or 'broad-filters'
+    with span_trace.span('match') as s, metrics.timed('proc_match_ms', action='find'):
+        out_pids, top = _rank_candidates(table, f)
+        s.add('candidates', len(top))
+    return { 'ok': True, 'pids': out_pids, 'matches': top, 'snapshot': stats, 'ts': time.time() }
 
 
 def action_alive(filters):
@@ -220,89 +319,73 @@ def action_alive(filters):
     if not pids:
         return { 'ok': True, 'pids': [] }
 
-    if os.name == 'nt':
-        procs = _ps_list_windows()
-        # Map existing processes by PID for quick lookup
-        proc_map = { p.get('ProcessId'): p for p in procs if isinstance(p.get('ProcessId'), int) }
-
-        # Determine whether caller provided match-filters
-        exec_path = _norm_path((filters.get('executablePath') or ''))
-        image_name = (filters.get('imageName') or '').strip().lower()
-        if not image_name and exec_path:
-            image_name = _image_from_path(exec_path)
-        install_dir = _norm_path((filters.get('installDir') or '')).rstrip('\\')
-        if install_dir:
-            install_dir = install_dir + '\\'
-        title = (filters.get('title') or '').strip().lower()
-        has_match_filters = bool(exec_path or image_name or install_dir or title)
-
-        alive = []
-        if has_match_filters:
-            # Only keep PID if still matches filters
-            f = {
-                'executablePath': exec_path,
-                'imageName': image_name,
-                'installDir': install_dir,
-                'title': title
-            }
-            for pid in pids:
-                p = proc_map.get(pid)
-                if not p:
-                    continue
-                any_match, _, _, _, _, _ = _evaluate_match(p, f)
-                if any_match:
-                    alive.append(pid)
-        else:
-            # No filters: just check existence
-            alive = [pid for pid in pids if pid in proc_map]
-
-        return { 'ok': True, 'pids': alive }
-    else:
-        alive = []
+    f = _build_find_filters(filters)
+    # Match filters: only keep a PID if it still matches them
+    has_match_filters = bool(f['executablePath'] or f['imageName'] or f['installDir'] or f['title'])
+    if os.name != 'nt' or not has_match_filters:
+        # Existence only: ask the OS per pid instead of spawning a process listing
+        if os.name == 'nt':
+            metrics.inc('proc_spawns_avoided_total', action='alive')
+        return { 'ok': True, 'pids': pids_alive(pids) }
+
+    # Only the tracked PIDs are serialized; very long lists fall back to the full table
+    where = ' OR '.join(f'ProcessId = {pid}' for pid in pids) if len(pids) <= MAX_WQL_TERMS else None
+    fields = ('ProcessId', 'Name', 'ExecutablePath') + (('CommandLine',) if _needs_cmdline(f) else ())
+    stats = {}
+    table = ProcessTable(list_processes(fields, where, stats))
+    rows = table.rows_by_pid()
+    alive = []
+    with metrics.timed('proc_match_ms', action='alive'):
+        cols = _match_columns(table, f)
         for pid in pids:
-            try:
-                os.kill(pid, 0)
+            i = rows.get(pid)
+            if i is not None and _row_match(table, i, f, cols)[0]:
                 alive.append(pid)
-            except Exception:
-                pass
-        return { 'ok': True, 'pids': alive }
+    return { 'ok': True, 'pids': alive, 'snapshot': stats }
 
 
 def action_kill(filters):
+    """Force-kill the given pids (or every process named imageName), children left running.
+
+    Pass "tree": true to take each process's descendants down with it, and
+    gracefulTimeout (seconds) to ask them to close before the forced kill."""
     pids = []
     for pid in (filters.get('pids') or []):
         try:
             pids.append(int(pid))
         except Exception:
             pass
-    image = (filters.get('imageName') or '').strip()
-
-    if os.name != 'nt':
-        # Try to kill by pid on non-windows
-        killed = []
-        for pid in pids:
-            try:
-                os.kill(pid, 9)
-                killed.append(pid)
-            except Exception:
-                pass
-        return { 'ok': True, 'killedPids': killed }
+    image = (filters.get('imageName') or '').strip().lower()
 
     try:
-        killed = []
-        if pids:
-            args = ' /PID '.join(str(pid) for pid in pids)
-            subprocess.run(f'taskkill /PID {args} /F', shell=True, capture_output=True, text=True, timeout=10)
-            killed = pids
-        elif image:
-            subprocess.run(f'taskkill /IM "{image}" /F', shell=True, capture_output=True, text=True, timeout=10)
-        return { 'ok': True, 'killedPids': killed }
+        from process_kill import TREE_FIELDS, kill_pids, kill_tree
+        tree = bool(filters.get('tree'))
+        procs = list_processes(TREE_FIELDS if tree else ('ProcessId', 'Name'))
+        if not pids and image:
+            pids = [p.get('ProcessId') for p in procs if (p.get('Name') or '').lower() == image]
+        kill = kill_tree if tree else kill_pids
+        results = kill(pids, procs, graceful_timeout=float(filters.get('gracefulTimeout', 0)))
+        killed = [r['pid'] for r in results if r['outcome'] in ('exited', 'killed')]
+        return { 'ok': True, 'killedPids': killed, 'results': results }
     except Exception as e:
         return { 'ok': False, 'error': str(e) }
 
 
+def action_metrics(filters):
+    """The metrics file (--metrics=<file> / GL_METRICS) as JSON, or as Prometheus text with format=prometheus."""
+    path = filters.get('path') or metrics.path()
+    if not path:
+        return { 'ok': False, 'error': 'no metrics file (pass --metrics=<file> or set GL_METRICS)' }
+    data = metrics.load(path)
+    if str(filters.get('format') or '').lower() == 'prometheus':
+        return metrics.render_prometheus(data)
+    return { 'ok': True, 'path': path, **metrics.summarize(data) }
+
+
 def main():
     try:
+        span_trace.init_from_argv(sys.argv)
+        metrics.init_from_argv(sys.argv)
         action = (sys.argv[1] if len(sys.argv) > 1 else '').strip().lower()
         raw = sys.argv[2] if len(sys.argv) > 2 else '{}'
         try:
@@ -310,14 +393,19 @@ def main():
         except Exception:
             filters = {}
 
+        if action:
+            metrics.inc('proc_requests_total', action=action)
         if action == 'find':
-            print(json.dumps(action_find(filters)))
+            print(json.dumps(span_trace.finish(action_find(filters))))
         elif action == 'alive':
-            print(json.dumps(action_alive(filters)))
+            print(json.dumps(span_trace.finish(action_alive(filters))))
         elif action == 'kill':
-            print(json.dumps(action_kill(filters)))
+            print(json.dumps(span_trace.finish(action_kill(filters))))
+        elif action == 'metrics':
+            result = action_metrics(filters)
+            sys.stdout.write(result if isinstance(result, str) else json.dumps(result) + '\n')
         else:
-            print(json.dumps({ 'ok': False, 'error': 'unknown_action', 'hint': 'use find|alive|kill' }))
+            print(json.dumps({ 'ok': False, 'error': 'unknown_action', 'hint': 'use find|alive|kill|metrics' }))
     except Exception as e:
         print(json.dumps({ 'ok': False, 'error': str(e) }))
         sys.exit(1)
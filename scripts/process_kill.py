@@ -1,27 +1,21 @@
 import sys
 import os
 import json
-import subprocess
+import time
+import signal
 
+from glhelpers import span_trace
+from glhelpers.proc_snapshot import DEFAULT_FIELDS, list_processes, children_map, descendants
 
-def get_processes():
-    try:
-        cmd = [
-            'powershell',
-            '-NoProfile',
-            '-ExecutionPolicy', 'Bypass',
-            '-Command',
-            'Get-CimInstance Win32_Process | Select-Object ProcessId,ExecutablePath,CommandLine,Name | ConvertTo-Json -Depth 2 -Compress'
-        ]
-        completed = subprocess.run(cmd, capture_output=True, text=True, timeout=10)
-        if completed.returncode == 0 and completed.stdout:
-            data = json.loads(completed.stdout)
-            if isinstance(data, dict):
-                return [data]
-            return data or []
-    except Exception:
-        pass
-    return []
+
+CRITICAL_IMAGES = {
+    'explorer.exe','csrss.exe','wininit.exe','winlogon.exe','services.exe','lsass.exe',
+    'dwm.exe','smss.exe','fontdrvhost.exe','system','registry'
+}
+
+MAX_ROOT_PIDS = 5
+# What kill_tree needs from a snapshot; CreationDate keeps recycled parent PIDs out of the tree
+TREE_FIELDS = ('ProcessId', 'ParentProcessId', 'Name', 'CreationDate')
 
 
 def safe_match_pid_records(p, filters, strict=False):
@@ -32,11 +26,7 @@ def safe_match_pid_records(p, filters, strict=False):
     exec_path = (filters.get('executablePath') or '').lower()
     image = os.path.basename(exec_path) if exec_path else ''
 
-    critical = {
-        'explorer.exe','csrss.exe','wininit.exe','winlogon.exe','services.exe','lsass.exe',
-        'dwm.exe','smss.exe','fontdrvhost.exe','system','registry'
-    }
-    if name in critical:
+    if name in CRITICAL_IMAGES:
         return pid, 'critical-skip', False
 
     if strict:
@@ -54,31 +44,194 @@ def safe_match_pid_records(p, filters, strict=False):
     return pid, 'no-match', False
 
 
-def taskkill_pids(pids):
-    if not pids:
-        return []
-    try:
-        args = ' /PID '.join(str(pid) for pid in pids)
-        subprocess.run(f'taskkill /PID {args} /F', shell=True, capture_output=True, text=True, timeout=10)
-    except Exception:
-        pass
-    return pids
+# --- native termination -------------------------------------------------------
 
+if os.name == 'nt':
+    import ctypes
+    from ctypes import wintypes
 
-def taskkill_image(image_name):
-    try:
-        subprocess.run(f'taskkill /IM "{image_name}" /F', shell=True, capture_output=True, text=True, timeout=10)
-        return True
-    except Exception:
+    _k32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    _u32 = ctypes.WinDLL('user32', use_last_error=True)
+
+    PROCESS_TERMINATE = 0x0001
+    SYNCHRONIZE = 0x00100000
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    WAIT_OBJECT_0 = 0x0
+    ERROR_ACCESS_DENIED = 5
+    ERROR_INVALID_PARAMETER = 87
+    WM_CLOSE = 0x0010
+
+    _k32.OpenProcess.restype = wintypes.HANDLE
+    _k32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    _k32.TerminateProcess.argtypes = (wintypes.HANDLE, wintypes.UINT)
+    _k32.WaitForSingleObject.argtypes = (wintypes.HANDLE, wintypes.DWORD)
+    _k32.WaitForSingleObject.restype = wintypes.DWORD
+    _k32.CloseHandle.argtypes = (wintypes.HANDLE,)
+
+    _WNDENUMPROC = ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    _u32.EnumWindows.argtypes = (_WNDENUMPROC, wintypes.LPARAM)
+    _u32.GetWindowThreadProcessId.argtypes = (wintypes.HWND, ctypes.POINTER(wintypes.DWORD))
+    _u32.PostMessageW.argtypes = (wintypes.HWND, wintypes.UINT, wintypes.WPARAM, wintypes.LPARAM)
+
+    def _close_request(pids):
+        """Ask every top-level window owned by `pids` to close (WM_CLOSE)."""
+        targets = set(pids)
+        owner = wintypes.DWORD()
+
+        def _cb(hwnd, _lparam):
+            _u32.GetWindowThreadProcessId(hwnd, ctypes.byref(owner))
+            if owner.value in targets:
+                _u32.PostMessageW(hwnd, WM_CLOSE, 0, 0)
+            return True
+
+        try:
+            _u32.EnumWindows(_WNDENUMPROC(_cb), 0)
+        except Exception:
+            pass
+
+    def _open(pid):
+        h = _k32.OpenProcess(PROCESS_TERMINATE | SYNCHRONIZE | PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if h:
+            return h, None
+        err = ctypes.get_last_error()
+        if err == ERROR_INVALID_PARAMETER:
+            return None, 'not-found'
+        return None, 'denied' if err == ERROR_ACCESS_DENIED else f'error-{err}'
+
+    def _finish(h, graceful_timeout, force_timeout):
+        try:
+            if graceful_timeout > 0 and _k32.WaitForSingleObject(h, int(graceful_timeout * 1000)) == WAIT_OBJECT_0:
+                return 'exited'
+            if not _k32.TerminateProcess(h, 1):
+                err = ctypes.get_last_error()
+                return 'denied' if err == ERROR_ACCESS_DENIED else f'error-{err}'
+            if _k32.WaitForSingleObject(h, int(force_timeout * 1000)) == WAIT_OBJECT_0:
+                return 'killed'
+            return 'still-alive'
+        finally:
+            _k32.CloseHandle(h)
+
+else:
+    def _gone(pid):
+        # Zombies still answer kill(0); treat them as exited.
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                stat = f.read()
+            rp = stat.rfind(b')')
+            return stat[rp + 2:rp + 3] in (b'Z', b'X')
+        except OSError:
+            pass
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            return False
         return False
 
+    def _wait_gone(pid, timeout):
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+        while True:
+            if _gone(pid):
+                return True
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+    def _open(pid):
+        return (pid, None) if not _gone(pid) else (None, 'not-found')
+
+    def _close_request(pids):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+
+    def _finish(pid, graceful_timeout, force_timeout):
+        if graceful_timeout > 0 and _wait_gone(pid, graceful_timeout):
+            return 'exited'
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except ProcessLookupError:
+            return 'exited'
+        except PermissionError:
+            return 'denied'
+        return 'killed' if _wait_gone(pid, force_timeout) else 'still-alive'
+
+
+def terminate_pids(pids, graceful_timeout=2.0, force_timeout=2.0):
+    """Terminate `pids` in parallel: graceful close first, then a forced kill.
+
+    Returns a list of {pid, outcome} in input order. Outcomes:
+    exited | killed | not-found | denied | still-alive | error-<code>.
+    """
+    pids = [p for p in dict.fromkeys(pids) if isinstance(p, int) and p > 0 and p != os.getpid()]
+    outcomes = {}
+    handles = {}
+    for pid in pids:
+        h, err = _open(pid)
+        if h is None:
+            outcomes[pid] = err
+        else:
+            handles[pid] = h
+    if handles:
+        from concurrent.futures import ThreadPoolExecutor
+        span_trace.add('terminated', len(handles))
+        if graceful_timeout > 0:
+            _close_request(list(handles))
+        with ThreadPoolExecutor(max_workers=min(16, len(handles))) as pool:
+            futures = {pid: pool.submit(_finish, h, graceful_timeout, force_timeout) for pid, h in handles.items()}
+            for pid, fut in futures.items():
+                outcomes[pid] = fut.result()
+    return [{'pid': pid, 'outcome': outcomes[pid]} for pid in pids]
+
+
+def _terminate_named(pids, names, graceful_timeout, force_timeout):
+    results = []
+    targets = []
+    for pid in pids:
+        if names.get(pid) in CRITICAL_IMAGES:
+            results.append({'pid': pid, 'outcome': 'critical-skip'})
+        else:
+            targets.append(pid)
+    with span_trace.span('terminate', pids=len(targets)):
+        results.extend(terminate_pids(targets, graceful_timeout, force_timeout))
+    for r in results:
+        r['name'] = names.get(r['pid'], '')
+    return results
+
+
+def kill_pids(pids, procs=None, graceful_timeout=0.0, force_timeout=2.0):
+    """Terminate exactly `pids`, leaving their children alone; critical system images are skipped."""
+    if procs is None:
+        procs = list_processes(('ProcessId', 'Name'))
+    names = {p.get('ProcessId'): (p.get('Name') or '').lower() for p in procs}
+    return _terminate_named([p for p in pids if isinstance(p, int)], names, graceful_timeout, force_timeout)
+
+
+def kill_tree(root_pids, procs=None, graceful_timeout=2.0, force_timeout=2.0):
+    """Terminate each root PID together with all of its descendants from one snapshot.
+
+    Pass a snapshot taken with TREE_FIELDS; without CreationDate a child of a
+    recycled parent PID cannot be told apart from a real one."""
+    if procs is None:
+        procs = list_processes(TREE_FIELDS)
+    names = {p.get('ProcessId'): (p.get('Name') or '').lower() for p in procs}
+    with span_trace.span('tree'):
+        tree = descendants(root_pids, children_map(procs))
+    return _terminate_named(tree, names, graceful_timeout, force_timeout)
+
+
+def _killed(results):
+    return [r['pid'] for r in results if r['outcome'] in ('exited', 'killed')]
+
 
 def main():
     try:
-        if os.name != 'nt':
-            print(json.dumps({"killedPids": [], "ok": False, "error": "windows only"}))
-            return
-
+        span_trace.init_from_argv(sys.argv)
         filters = {}
         if len(sys.argv) > 1 and sys.argv[1]:
             try:
@@ -95,45 +248,47 @@ def main():
         strict = bool(filters.get('strict'))
         prefer_image = bool(filters.get('preferImage'))
         forced_image_name = (filters.get('imageName') or '').strip()
+        graceful_timeout = float(filters.get('gracefulTimeout', 2.0))
+        force_timeout = float(filters.get('forceTimeout', 2.0))
 
-        procs = get_processes()
+        with span_trace.span('snapshot'):
+            procs = list_processes(DEFAULT_FIELDS + ('CreationDate',))
         hits = []
         details = []
         for p in procs:
             pid, reason, ok = safe_match_pid_records(p, filters, strict=strict)
-            details.append({'pid': pid, 'name': p.get('Name'), 'path': p.get('ExecutablePath'), 'reason': reason, 'ok': ok})
             if ok and isinstance(pid, int):
                 hits.append(pid)
+                if len(details) < 10:
+                    details.append({'pid': pid, 'name': p.get('Name'), 'path': p.get('ExecutablePath'), 'reason': reason, 'ok': ok})
 
         used_image = False
-        killed = []
         image_to_kill = ''
+        roots = []
         if prefer_image:
             if forced_image_name:
                 image_to_kill = forced_image_name
             elif filters.get('executablePath'):
                 image_to_kill = os.path.basename(filters.get('executablePath'))
-            if image_to_kill:
-                # Safety: restrict to .exe and non-critical
-                safe_images = {
-                    'explorer.exe','csrss.exe','wininit.exe','winlogon.exe','services.exe','lsass.exe',
-                    'dwm.exe','smss.exe','fontdrvhost.exe','system','registry'
-                }
-                if image_to_kill.lower().endswith('.exe') and image_to_kill.lower() not in safe_images:
-                    used_image = taskkill_image(image_to_kill)
+            image_lower = image_to_kill.lower()
+            # Safety: restrict to .exe and non-critical
+            if image_lower.endswith('.exe') and image_lower not in CRITICAL_IMAGES:
+                roots = [p.get('ProcessId') for p in procs if (p.get('Name') or '').lower() == image_lower]
+                used_image = bool(roots)
         if not used_image:
-            all_pids = sorted(set(provided_pids + hits))
-            if len(all_pids) > 5:
-                print(json.dumps({"ok": False, "error": "too_many_pids", "capped": len(all_pids), "details": details[:10]}))
+            roots = sorted(set(provided_pids + hits))
+            if len(roots) > MAX_ROOT_PIDS:
+                print(json.dumps({"ok": False, "error": "too_many_pids", "capped": len(roots), "details": details}))
                 return
-            killed = taskkill_pids(all_pids)
 
-        print(json.dumps({
-            "killedPids": killed,
-            "usedImage": bool(used_image),
+        results = kill_tree(roots, procs, graceful_timeout, force_timeout)
+        print(json.dumps(span_trace.finish({
+            "killedPids": _killed(results),
+            "usedImage": used_image,
             "ok": True,
-            "details": details[:10]
-        }))
+            "results": results,
+            "details": details
+        })))
     except Exception as e:
         print(json.dumps({"ok": False, "error": str(e)}))
         sys.exit(1)
@@ -141,5 +296,3 @@ def main():
 
 if __name__ == '__main__':
     main()
-
-
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+session_journal.py
+
+Append-only playtime journal. Every session start, heartbeat and end is one
+fixed-size binary record appended to `sessions.journal`; a compactor folds the
+journal into per-game totals and per-day histograms stored in `index.json`.
+
+A crash mid-session loses at most one heartbeat interval: on recovery, a session
+without an end record is closed at its last heartbeat. A record torn by a crash
+is cut off the tail before the writer appends again; reads step over torn bytes
+in the middle of older journals by resyncing on the next valid record.
+
+Record layout (little-endian, 24 bytes):
+  '<BBHQdI'  kind (1=start, 2=heartbeat, 3=end), version, reserved,
+             key hash (blake2b-64 of "launcher:id"), unix timestamp, crc32 of the first 20 bytes
+
+Key strings live in `keys.ndjson` ({"h": hash, "k": key}), written once per game.
+
+Rotation renames the journal to `sessions.journal.<generation>`, writes the
+index for the next generation, then deletes the old file. A crash in between
+leaves the renamed file behind with the index still on its generation; the next
+reader folds it before the new journal.
+
+CLI:
+  python scripts/session_journal.py --dir DATA start --key steam:620
+  python scripts/session_journal.py --dir DATA heartbeat --key steam:620
+  python scripts/session_journal.py --dir DATA end --key steam:620
+  python scripts/session_journal.py --dir DATA compact
+  python scripts/session_journal.py --dir DATA stats [--key steam:620]
+
+The journal assumes a single writer process; run `compact` from that writer.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+import sys
+import time
+import zlib
+
+RECORD = struct.Struct('<BBHQdI')
+BODY = struct.Struct('<BBHQd')
+VERSION = 1
+START, HEARTBEAT, END = 1, 2, 3
+
+JOURNAL_NAME = 'sessions.journal'
+KEYS_NAME = 'keys.ndjson'
+INDEX_NAME = 'index.json'
+
+# A session with no record for this long is considered crashed and closed at its last heartbeat.
+STALE_AFTER = 180.0
+# Journal size at which `compact` rewrites it empty after folding.
+ROTATE_BYTES = 1 << 20
+
+
+def key_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _pack(kind: int, h: int, ts: float) -> bytes:
+    body = BODY.pack(kind, VERSION, 0, h, ts)
+    return body + struct.pack('<I', zlib.crc32(body))
+
+
+def _iter_records(buf: bytes, offset: int = 0):
+    """Yield (kind, hash, ts, end_offset) for every intact record from `offset`.
+
+    A record that fails its version/CRC check is skipped byte by byte until the
+    next one that passes, so records appended after a torn write are still read.
+    """
+    n = len(buf)
+    pos = offset
+    while pos + RECORD.size <= n:
+        kind, ver, _r, h, ts, crc = RECORD.unpack_from(buf, pos)
+        if ver != VERSION or kind not in (START, HEARTBEAT, END) or zlib.crc32(buf[pos:pos + BODY.size]) != crc:
+            pos += 1
+            continue
+        pos += RECORD.size
+        yield kind, h, ts, pos
+
+
+def _intact_end(buf: bytes, offset: int = 0) -> int:
+    """Offset just past the last intact record at or after `offset`."""
+    end = offset
+    for *_, end in _iter_records(buf, offset):
+        pass
+    return end
+
+
+def _day(ts: float) -> str:
+    return time.strftime('%Y-%m-%d', time.localtime(ts))
+
+
+def _split_by_day(start: float, end: float):
+    """Yield (YYYY-MM-DD, seconds) for [start, end) split at local midnights."""
+    cur = start
+    while cur < end:
+        lt = time.localtime(cur)
+        midnight = time.mktime((lt.tm_year, lt.tm_mon, lt.tm_mday + 1, 0, 0, 0, 0, 0, -1))
+        stop = min(end, midnight)
+        yield _day(cur), stop - cur
+        cur = stop
+
+
+class SessionJournal:
+    def __init__(self, data_dir: str, fsync_interval: float = 5.0, fsync_every: int = 32):
+        self.dir = data_dir
+        os.makedirs(data_dir, exist_ok=True)
+        self.journal_path = os.path.join(data_dir, JOURNAL_NAME)
+        self.keys_path = os.path.join(data_dir, KEYS_NAME)
+        self.index_path = os.path.join(data_dir, INDEX_NAME)
+        self.fsync_interval = fsync_interval
+        self.fsync_every = fsync_every
+        self._fd = None
+        self._pending = 0
+        self._last_sync = time.monotonic()
+        self._keys = None
+
+    # --- writes ---------------------------------------------------------------
+
+    def _repair(self) -> None:
+        """Cut a torn tail off the journal so the next append starts on a record boundary."""
+        buf = self._read_journal()
+        end = _intact_end(buf, min(self._current(0.0)['offset'], len(buf)))
+        if end < len(buf):
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(end)
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _open(self) -> int:
+        if self._fd is None:
+            self._repair()
+            self._fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND | getattr(os, 'O_BINARY', 0), 0o644)
+        return self._fd
+
+    def _ensure_key(self, key: str) -> int:
+        h = key_hash(key)
+        keys = self.keys()
+        if h not in keys:
+            with open(self.keys_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'h': h, 'k': key}, ensure_ascii=False) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            keys[h] = key
+        return h
+
+    def append(self, kind: int, key: str, ts: float | None = None, sync: bool = False) -> None:
+        h = self._ensure_key(key)
+        os.write(self._open(), _pack(kind, h, time.time() if ts is None else ts))
+        self._pending += 1
+        now = time.monotonic()
+        if sync or self._pending >= self.fsync_every or now - self._last_sync >= self.fsync_interval:
+            self.flush()
+
+    def start(self, key: str, ts: float | None = None) -> None:
+        self.append(START, key, ts, sync=True)
+
+    def heartbeat(self, key: str, ts: float | None = None) -> None:
+        self.append(HEARTBEAT, key, ts)
+
+    def end(self, key: str, ts: float | None = None) -> None:
+        self.append(END, key, ts, sync=True)
+
+    def flush(self) -> None:
+        if self._fd is not None and self._pending:
+            os.fsync(self._fd)
+        self._pending = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            self.flush()
+            os.close(self._fd)
+            self._fd = None
+
+    # --- reads / compaction ---------------------------------------------------
+
+    def keys(self) -> dict:
+        if self._keys is None:
+            self._keys = {}
+            try:
+                with open(self.keys_path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        try:
+                            rec = json.loads(line)
+                            self._keys[int(rec['h'])] = rec['k']
+                        except Exception:
+                            continue
+            except OSError:
+                pass
+        return self._keys
+
+    def _load_index(self) -> dict:
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                idx = json.load(f)
+            if idx.get('version') == VERSION:
+                idx.setdefault('generation', 0)
+                return idx
+        except Exception:
+            pass
+        return {'version': VERSION, 'generation': 0, 'offset': 0, 'games': {}, 'open': {}}
+
+    def _rotated_path(self, generation: int) -> str:
+        return f'{self.journal_path}.{generation}'
+
+    def _fold(self, idx: dict, buf: bytes, now: float) -> dict:
+        """Apply journal records after idx['offset'] to idx in place."""
+        keys = self.keys()
+        games = idx['games']
+        open_ = idx['open']
+
+        def close(key, start, stop):
+            g = games.setdefault(key, {'seconds': 0, 'sessions': 0, 'lastPlayed': 0, 'days': {}})
+            secs = max(0.0, stop - start)
+            g['seconds'] = round(g['seconds'] + secs, 3)
+            g['sessions'] += 1
+            g['lastPlayed'] = max(g['lastPlayed'], stop)
+            for day, part in _split_by_day(start, stop):
+                g['days'][day] = round(g['days'].get(day, 0) + part, 3)
+
+        for kind, h, ts, end_off in _iter_records(buf, idx['offset']):
+            key = keys.get(h, f'#{h:016x}')
+            cur = open_.get(key)
+            if kind == START:
+                if cur:
+                    close(key, cur[0], cur[1])
+                open_[key] = [ts, ts]
+            elif kind == HEARTBEAT:
+                if cur:
+                    cur[1] = max(cur[1], ts)
+                else:
+                    open_[key] = [ts, ts]
+            elif kind == END and cur:
+                close(key, cur[0], max(cur[1], ts))
+                del open_[key]
+            idx['offset'] = end_off
+
+        for key, (start, last) in list(open_.items()):
+            if now - last >= STALE_AFTER:
+                close(key, start, last)
+                del open_[key]
+        return idx
+
+    def _read_journal(self, path: str | None = None) -> bytes:
+        try:
+            with open(path or self.journal_path, 'rb') as f:
+                return f.read()
+        except OSError:
+            return b''
+
+    def _current(self, now: float) -> dict:
+        """The index with a rotation interrupted before its index write folded in.
+
+        Leaves idx['offset'] pointing into the live journal."""
+        idx = self._load_index()
+        rotated = self._rotated_path(idx['generation'])
+        if os.path.exists(rotated):
+            self._fold(idx, self._read_journal(rotated), now)
+            idx['generation'] += 1
+            idx['offset'] = 0
+        return idx
+
+    def _write_index(self, idx: dict) -> None:
+        tmp = self.index_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(idx, f, ensure_ascii=False, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.index_path)
+
+    def compact(self, now: float | None = None) -> dict:
+        """Fold new journal records into index.json; rotate the journal once it is large."""
+        self.flush()
+        if self._fd is None:
+            self._repair()
+        now = time.time() if now is None else now
+        generation = self._load_index()['generation']
+        buf = self._read_journal()
+        idx = self._fold(self._current(now), buf, now)
+        rotated = False
+        if idx['offset'] >= ROTATE_BYTES and idx['offset'] == len(buf):
+            # Everything was consumed; open sessions are carried in the index.
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
+            os.replace(self.journal_path, self._rotated_path(idx['generation']))
+            with open(self.journal_path, 'wb'):
+                pass
+            idx['generation'] += 1
+            idx['offset'] = 0
+            rotated = True
+        self._write_index(idx)
+        # Rotated files of generations the index has moved past are folded already;
+        # one before `generation` may be left by a crash just after the index write
+        for g in range(max(0, generation - 1), idx['generation']):
+            try:
+                os.remove(self._rotated_path(g))
+            except OSError:
+                pass
+        return {'offset': idx['offset'], 'games': len(idx['games']), 'open': len(idx['open']), 'rotated': rotated}
+
+    def stats(self, key: str | None = None, now: float | None = None) -> dict:
+        """Aggregates from the index plus any not-yet-compacted tail (read-only)."""
+        now = time.time() if now is None else now
+        idx = self._fold(self._current(now), self._read_journal(), now)
+        games = idx['games']
+        if key is not None:
+            g = games.get(key, {'seconds': 0, 'sessions': 0, 'lastPlayed': 0, 'days': {}})
+            return {**g, 'running': key in idx['open']}
+        return {'games': games, 'running': sorted(idx['open'])}
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Append-only playtime session journal')
+    parser.add_argument('--dir', required=True, help='Directory holding the journal and index')
+    sub = parser.add_subparsers(dest='cmd', required=True)
+    for name in ('start', 'heartbeat', 'end'):
+        p = sub.add_parser(name)
+        p.add_argument('--key', required=True, help='launcher:id')
+        p.add_argument('--ts', type=float, default=None)
+    sub.add_parser('compact')
+    sub.add_parser('stats').add_argument('--key', default=None)
+    args = parser.parse_args(argv)
+
+    journal = SessionJournal(args.dir)
+    try:
+        if args.cmd in ('start', 'heartbeat', 'end'):
+            getattr(journal, args.cmd)(args.key, args.ts)
+            result = {'ok': True}
+        elif args.cmd == 'compact':
+            result = {'ok': True, **journal.compact()}
+        else:
+            result = {'ok': True, **journal.stats(args.key)}
+    except Exception as e:
+        print(json.dumps({'ok': False, 'error': str(e)}))
+        return 1
+    finally:
+        journal.close()
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
@@ -2,6 +2,15 @@ import os
 import sys
 import json
 import re
+import time
+import zlib
+
+from glhelpers import metrics, span_trace
+from glhelpers.binary_vdf import AppInfo, read_shortcuts
+from glhelpers.span_trace import span
+
+# Non-Steam shortcuts are launched as steam://rungameid/<(appid << 32) | this>
+SHORTCUT_GAMEID_TYPE = 0x02000000
 
 
 def parse_vdf_manifest(text: str):
@@ -22,8 +31,10 @@ def parse_vdf_manifest(text: str):
     return appid, name, installdir
 
 
-def find_steam_libraries(extra_roots=None):
-    """Return a list of steamapps folders found across drives and provided roots."""
+def find_steam_libraries(extra_roots=None, drives=None):
+    """Return a list of steamapps folders found across drives and provided roots.
+
+    `drives` overrides the A:..Z: roots that get a shallow walk (used by benchmarks)."""
     libraries = []
     checked = set()
 
@@ -50,7 +61,8 @@ def find_steam_libraries(extra_roots=None):
                 roots.append(os.path.join(r, "steamapps"))
 
     # Windows drive scan A:..Z:
-    drives = [f"{d}:\\" for d in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"]
+    if drives is None:
+        drives = [f"{d}:\\" for d in "ABCDEFGHIJKLMNOPQRSTUVWXYZ"]
     for d in drives:
         if os.path.exists(d):
             roots.append(d)
@@ -66,17 +78,21 @@ def find_steam_libraries(extra_roots=None):
 
         # Walk shallowly to find steamapps folders
         max_depth = 4
-        for current_root, dirs, _files in os.walk(root):
-            depth = current_root.count(os.sep) - root.count(os.sep)
-            if depth > max_depth:
-                dirs[:] = []
-                continue
-            if "steamapps" in (name.lower() for name in dirs):
-                steamapps_path = os.path.join(current_root, "steamapps")
-                key = os.path.normcase(steamapps_path)
-                if os.path.exists(steamapps_path) and key not in checked:
-                    libraries.append(steamapps_path)
-                    checked.add(key)
+        walked = 0
+        with span('walk', root=root) as s:
+            for current_root, dirs, _files in os.walk(root):
+                walked += 1
+                depth = current_root.count(os.sep) - root.count(os.sep)
+                if depth > max_depth:
+                    dirs[:] = []
+                    continue
+                if "steamapps" in (name.lower() for name in dirs):
+                    steamapps_path = os.path.join(current_root, "steamapps")
+                    key = os.path.normcase(steamapps_path)
+                    if os.path.exists(steamapps_path) and key not in checked:
+                        libraries.append(steamapps_path)
+                        checked.add(key)
+            s.add('dirs', walked)
 
     return libraries
 
@@ -84,40 +100,176 @@ def find_steam_libraries(extra_roots=None):
 def list_steam_games(libraries):
     games = []
     for lib in libraries:
-        try:
-            for file in os.listdir(lib):
-                if file.lower().startswith("appmanifest") and file.lower().endswith(".acf"):
-                    path = os.path.join(lib, file)
-                    with open(path, "r", encoding="utf-8", errors="ignore") as f:
-                        data = f.read()
-                    appid, name, installdir = parse_vdf_manifest(data)
-                    if name and installdir:
-                        # 'lib' points to the steamapps folder; install path lives under steamapps/common/<installdir>
-                        install_path = os.path.join(lib, "common", installdir)
-                        games.append({
-                            "id": appid or f"unknown-{file}",
-                            "title": name,
-                            "installDir": install_path,
-                            "library": lib,
-                        })
-        except Exception:
+        with span('manifests', library=lib) as s:
+            files = 0
+            try:
+                for file in os.listdir(lib):
+                    if file.lower().startswith("appmanifest") and file.lower().endswith(".acf"):
+                        path = os.path.join(lib, file)
+                        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                            data = f.read()
+                        files += 1
+                        appid, name, installdir = parse_vdf_manifest(data)
+                        if installdir:
+                            # 'lib' points to the steamapps folder; install path lives under steamapps/common/<installdir>
+                            install_path = os.path.join(lib, "common", installdir)
+                            game = {
+                                "id": appid or f"unknown-{file}",
+                                "title": name,
+                                "installDir": install_path,
+                                "library": lib,
+                            }
+                            m = re.search(r'"SizeOnDisk"\s*"(\d+)"', data, re.IGNORECASE)
+                            if m and int(m.group(1)):
+                                game["sizeOnDisk"] = int(m.group(1))
+                            games.append(game)
+            except Exception:
+                continue
+            finally:
+                s.add('files', files)
+    return games
+
+
+def find_steam_root(libraries, steam_path=None):
+    """The Steam install dir: `steam_path` if given, else the first library parent holding appcache/ or userdata/."""
+    if steam_path:
+        return steam_path
+    for lib in libraries:
+        root = os.path.dirname(os.path.normpath(lib))
+        if os.path.isdir(os.path.join(root, "appcache")) or os.path.isdir(os.path.join(root, "userdata")):
+            return root
+    return None
+
+
+def _pick_launch(launch):
+    """Pick the default Windows launch option from appinfo's config/launch map."""
+    fallback = None
+    for entry in (launch or {}).values():
+        if not isinstance(entry, dict) or not entry.get("executable"):
+            continue
+        oslist = str((entry.get("config") or {}).get("oslist") or "")
+        if oslist and "windows" not in oslist:
             continue
+        if str(entry.get("type") or "default").lower() in ("default", "none"):
+            return entry["executable"]
+        fallback = fallback or entry["executable"]
+    return fallback
+
+
+def read_app_details(appinfo_path, appids):
+    """{appid: {"title", "executable"}} for the given appids, decoding only their appinfo.vdf records."""
+    out = {}
+    try:
+        info = AppInfo(appinfo_path)
+    except Exception:
+        return out
+    with info:
+        for appid in appids:
+            try:
+                if not str(appid).isdigit() or int(appid) not in info:
+                    continue
+                out[str(appid)] = {
+                    "title": info.find(appid, "appinfo", "common", "name"),
+                    "executable": _pick_launch(info.find(appid, "appinfo", "config", "launch")),
+                }
+            except Exception:
+                continue
+    return out
+
+
+def apply_app_details(games, details):
+    """Fill missing titles and the launch executable from read_app_details(); drop games left untitled."""
+    out = []
+    for g in games:
+        d = details.get(g["id"]) or {}
+        if not g["title"] and d.get("title"):
+            g["title"] = d["title"]
+        exe = d.get("executable")
+        if exe:
+            path = os.path.normpath(os.path.join(g["installDir"], exe.replace("\\", os.sep).replace("/", os.sep)))
+            if os.path.isfile(path):
+                g["executablePath"] = path
+        if g["title"]:
+            out.append(g)
+    return out
+
+
+def _shortcut_field(entry, name):
+    for k, v in entry.items():
+        if k.lower() == name:
+            return v
+    return None
+
+
+def list_shortcuts(steam_root):
+    """Non-Steam games added to the library, from every userdata/<account>/config/shortcuts.vdf."""
+    games = []
+    seen = set()
+    try:
+        accounts = [e.path for e in os.scandir(os.path.join(steam_root, "userdata")) if e.is_dir()]
+    except OSError:
+        return games
+    for account in accounts:
+        for entry in read_shortcuts(os.path.join(account, "config", "shortcuts.vdf")):
+            name = str(_shortcut_field(entry, "appname") or "").strip()
+            exe = str(_shortcut_field(entry, "exe") or "").strip().strip('"')
+            if not name or not exe or _shortcut_field(entry, "ishidden"):
+                continue
+            appid = _shortcut_field(entry, "appid")
+            if isinstance(appid, int):
+                appid &= 0xFFFFFFFF
+            else:
+                # Older files have no appid; Steam derives it from the target and name
+                appid = zlib.crc32((f'"{exe}"' + name).encode("utf-8")) | 0x80000000
+            if appid in seen:
+                continue
+            seen.add(appid)
+            start_dir = str(_shortcut_field(entry, "startdir") or "").strip().strip('"')
+            games.append({
+                "id": str((appid << 32) | SHORTCUT_GAMEID_TYPE),
+                "title": name,
+                "installDir": os.path.normpath(start_dir) if start_dir else os.path.dirname(exe),
+                "executablePath": exe,
+                "launchOptions": str(_shortcut_field(entry, "launchoptions") or ""),
+                "shortcut": True,
+                "library": None,
+            })
     return games
 
 
 def main():
     try:
+        argv = metrics.init_from_argv(span_trace.init_from_argv(list(sys.argv)))
+        steam_path = None
+        for arg in list(argv):
+            if arg.startswith("--steam-path="):
+                steam_path = arg.split("=", 1)[1] or None
+                argv.remove(arg)
         # Accept JSON array of extra roots from argv[1] if provided
         extra_roots = []
-        if len(sys.argv) > 1:
+        if len(argv) > 1:
             try:
-                extra_roots = json.loads(sys.argv[1])
+                extra_roots = json.loads(argv[1])
             except Exception:
                 extra_roots = []
 
-        libraries = find_steam_libraries(extra_roots)
-        games = list_steam_games(libraries)
-        print(json.dumps({"libraries": libraries, "games": games}))
+        t0 = time.perf_counter()
+        with span('find_steam_libraries'):
+            libraries = find_steam_libraries(extra_roots)
+        with span('list_steam_games'):
+            games = list_steam_games(libraries)
+        root = find_steam_root(libraries, steam_path)
+        if root:
+            with span('appinfo') as s:
+                details = read_app_details(os.path.join(root, "appcache", "appinfo.vdf"), [g["id"] for g in games])
+                s.add('apps', len(details))
+            with span('shortcuts'):
+                shortcuts = list_shortcuts(root)
+        else:
+            details, shortcuts = {}, []
+        games = apply_app_details(games, details) + shortcuts
+        metrics.observe('detect_ms', (time.perf_counter() - t0) * 1000.0, launcher='steam')
+        print(json.dumps(span_trace.finish({"libraries": libraries, "games": games})))
     except Exception as e:
         print(json.dumps({"error": str(e)}))
         sys.exit(1)
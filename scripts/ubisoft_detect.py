@@ -7,70 +7,42 @@ import json
 import re
 from pathlib import Path
 
-try:
-    import winreg  # type: ignore
-except Exception:
-    winreg = None  # type: ignore
+from glhelpers import metrics, span_trace, ubisoft_config
+from glhelpers.registry import snapshot_from_argv, watch_loop
+from glhelpers.span_trace import span
+from glhelpers.stamp_cache import StampCache, stamp_of
 
-def read_registry_installs():
+UBI_INSTALLS = r"SOFTWARE\WOW6432Node\Ubisoft\Launcher\Installs"
+# Bump when the shape of the cached configuration index changes
+CACHE_VERSION = 1
+
+def read_registry_installs(snapshot):
     installs = []
-    if sys.platform != 'win32' or not winreg:
-        return installs
-    root_path = r"SOFTWARE\WOW6432Node\Ubisoft\Launcher\Installs"
-    try:
-        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, root_path) as root:
-            i = 0
-            while True:
-                try:
-                    subname = winreg.EnumKey(root, i)
-                except OSError:
-                    break
-                i += 1
-                try:
-                    with winreg.OpenKey(root, subname) as sub:
-                        title = None
-                        install_dir = None
-                        j = 0
-                        while True:
-                            try:
-                                name, val, _ = winreg.EnumValue(sub, j)
-                            except OSError:
-                                break
-                            j += 1
-                            k = name.lower()
-                            if k == 'displayname':
-                                title = str(val)
-                            elif k == 'installdir' or k == 'installldir' or k == 'path':
-                                install_dir = str(val)
-                        if install_dir:
-                            installs.append({
-                                'id': subname,
-                                'title': clean_title(title or subname),
-                                'installDir': os.path.normpath(install_dir)
-                            })
-                except OSError:
-                    pass
-    except OSError:
-        pass
+    for subname, values in snapshot.children('HKLM', UBI_INSTALLS).items():
+        title = None
+        install_dir = None
+        for name, val in values.items():
+            k = name.lower()
+            if k == 'displayname':
+                title = str(val)
+            elif k == 'installdir' or k == 'installldir' or k == 'path':
+                install_dir = str(val)
+        if install_dir:
+            installs.append({
+                'id': subname,
+                'title': clean_title(title or subname),
+                'installDir': os.path.normpath(install_dir)
+            })
     return installs
 
 def powershell_query_fileinfo(exe: str) -> str | None:
     try:
-        import subprocess
-        cmd = [
-            'powershell', '-NoProfile', '-Command',
-            f"(Get-Item '{exe.replace("'", "''")}').VersionInfo.FileDescription"
-        ]
-        out = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=4)
-        val = (out.stdout or '').strip()
+        from glhelpers.powershell import run_powershell
+        quoted = exe.replace("'", "''")
+        val = run_powershell(f"(Get-Item '{quoted}').VersionInfo.FileDescription", label='VersionInfo.FileDescription')
         if val:
             return clean_title(val)
-        cmd = [
-            'powershell', '-NoProfile', '-Command',
-            f"(Get-Item '{exe.replace("'", "''")}').VersionInfo.ProductName"
-        ]
-        out = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=4)
-        val = (out.stdout or '').strip()
+        val = run_powershell(f"(Get-Item '{quoted}').VersionInfo.ProductName", label='VersionInfo.ProductName')
         return clean_title(val) if val else None
     except Exception:
         return None
@@ -78,7 +50,9 @@ def powershell_query_fileinfo(exe: str) -> str | None:
 def find_likely_exe(folder: Path) -> Path | None:
     try:
         bad = re.compile(r"(vcredist|dxsetup|directx|redist|depots|unins|crash|helper|support|_commonredist|eac|easyanticheat|installer|uplay|ubisoft)", re.I)
-        exes = list(folder.rglob('*.exe'))
+        with span('find_likely_exe', folder=folder.name) as s:
+            exes = list(folder.rglob('*.exe'))
+            s.add('exes', len(exes))
         exes = [p for p in exes if not bad.search(p.name)]
         if not exes:
             return None
@@ -92,13 +66,58 @@ def find_likely_exe(folder: Path) -> Path | None:
 
 def any_icon_nearby(folder: Path) -> str | None:
     try:
-        ico = next(folder.rglob('*.ico'), None)
+        with span('icon_search', folder=folder.name):
+            ico = next(folder.rglob('*.ico'), None)
         if ico:
             return ico.resolve().as_uri()
     except Exception:
         pass
     return None
 
+def load_configurations(path: str | None, cache: StampCache, ids: set) -> dict:
+    """Product id -> metadata for `ids` from Ubisoft Connect's configurations file.
+
+    The file is re-read only when it changes or a product not decoded last time is asked for."""
+    if not path or not ids:
+        return {}
+    with span('configurations') as s:
+        try:
+            stamp = stamp_of(os.stat(path))
+        except OSError:
+            return {}
+        hit, cached = cache.get(path, stamp)
+        known = set(cached['ids']) if hit and cached else set()
+        reused = ids <= known
+        if reused:
+            index = cached['index']
+        else:
+            known |= ids
+            try:
+                index = ubisoft_config.read_configurations(path, known)
+            except OSError:
+                return {}
+            cache.put(path, stamp, { 'ids': sorted(known), 'index': index })
+        cache.prune({path})
+        s.set(products=len(index), cached=reused)
+    return index
+
+def config_exe(folder: Path, meta: dict) -> Path | None:
+    for rel in meta.get('executables') or []:
+        p = folder / rel.replace('\\', os.sep).replace('/', os.sep)
+        if p.is_file():
+            return p
+    return None
+
+def config_image(launcher_dir: str | None, meta: dict) -> str | None:
+    thumb = meta.get('thumbImage')
+    if not thumb:
+        return None
+    if launcher_dir:
+        local = Path(launcher_dir, 'cache', 'assets', thumb)
+        if local.is_file():
+            return local.resolve().as_uri()
+    return ubisoft_config.asset_url(thumb)
+
 def clean_title(s: str) -> str:
     if not s:
         return s
@@ -109,22 +128,32 @@ def clean_title(s: str) -> str:
     out = re.sub(r"\s*\((?:Uplay|UPlay|Ubisoft\s*Connect)\)\s*$", "", out, flags=re.I)
     return out.strip()
 
-def main():
-    if sys.platform != 'win32':
-        print(json.dumps({'games': []}))
-        return
-    # Optional custom libraries passed as JSON list arg
-    custom_libs = []
-    if len(sys.argv) >= 2:
-        try:
-            custom_libs = json.loads(sys.argv[1]) or []
-        except Exception:
-            custom_libs = []
+def detect(custom_libs, snapshot, cache=None, configurations=None):
+    with metrics.timed('detect_ms', launcher='ubisoft'):
+        return _detect(custom_libs, snapshot, cache or StampCache(), configurations)
+
 
-    installs = read_registry_installs()
+def _resolve(folder: Path, gid: str, title: str | None, configs: dict, launcher_dir: str | None):
+    """Title, executable and image for one install: the configuration cache first, file walks last."""
+    meta = configs.get(gid) or {}
+    if (not title or title.isdigit()) and meta.get('name'):
+        title = meta['name']
+    title = title or folder.name
+    exe = config_exe(folder, meta) or find_likely_exe(folder)
+    if (not title or title.isdigit()) and exe:
+        desc = powershell_query_fileinfo(str(exe))
+        if desc:
+            title = desc
+    image = config_image(launcher_dir, meta) or any_icon_nearby(folder)
+    return clean_title(title), exe, image
+
+
+def _detect(custom_libs, snapshot, cache, configurations=None):
+    with span('registry') as s:
+        installs = read_registry_installs(snapshot)
+        s.set(**snapshot.stats)
     by_dir = { i['installDir'].lower(): i for i in installs }
     by_id = { i['id']: i for i in installs }
-
     game_dirs: list[Path] = []
     # Default Ubisoft games directory
     base = os.environ.get('ProgramFiles(x86)', '')
@@ -136,46 +165,56 @@ def main():
         except Exception:
             pass
 
+    listed = []
+    for root in game_dirs:
+        with span('scan_root', root=str(root)) as s:
+            try:
+                entries = [e for e in root.iterdir() if e.is_dir()]
+            except Exception:
+                continue
+            s.add('dirs', len(entries))
+            listed.append(entries)
+
+    # Only the products found here are decoded from the configuration cache
+    launcher_dir = ubisoft_config.default_launcher_dir(snapshot)
+    if configurations is None and launcher_dir:
+        configurations = os.path.join(launcher_dir, ubisoft_config.CONFIGURATIONS)
+    wanted = set(by_id) | { e.name for entries in listed for e in entries if e.name.isdigit() }
+    configs = load_configurations(configurations, cache, wanted)
+
     seen = set()
     games = []
-    for root in game_dirs:
-        try:
-            for entry in root.iterdir():
-                if not entry.is_dir():
-                    continue
-                dir_lower = str(entry.resolve()).lower()
-                rid = None
-                title = entry.name
-                # Match registry by dir or id
-                if dir_lower in by_dir:
-                    title = by_dir[dir_lower]['title'] or title
-                    rid = by_dir[dir_lower]['id']
-                elif re.match(r'^\d+$', entry.name):
-                    rid = entry.name
-                    if rid in by_id:
-                        title = by_id[rid]['title'] or title
-                exe = find_likely_exe(entry)
-                if (not title or title.isdigit()) and exe:
-                    desc = powershell_query_fileinfo(str(exe))
-                    if desc:
-                        title = desc
-                title = clean_title(title)
-                image = any_icon_nearby(entry)
-                gid = rid or entry.name
-                sig = f"{dir_lower}|{gid}"
-                if sig in seen:
-                    continue
-                seen.add(sig)
-                games.append({
-                    'id': gid,
-                    'title': title,
-                    'launcher': 'ubisoft',
-                    'installDir': str(entry.resolve()),
-                    'executablePath': str(exe) if exe else None,
-                    'image': image
-                })
-        except Exception:
-            continue
+    for entries in listed:
+        with span('resolve_root'):
+            try:
+                for entry in entries:
+                    dir_lower = str(entry.resolve()).lower()
+                    rid = None
+                    title = None
+                    # Match registry by dir or id; folders without a registry title are named by the configuration cache
+                    if dir_lower in by_dir:
+                        title = by_dir[dir_lower]['title']
+                        rid = by_dir[dir_lower]['id']
+                    elif re.match(r'^\d+$', entry.name):
+                        rid = entry.name
+                        if rid in by_id:
+                            title = by_id[rid]['title']
+                    gid = rid or entry.name
+                    title, exe, image = _resolve(entry, gid, title, configs, launcher_dir)
+                    sig = f"{dir_lower}|{gid}"
+                    if sig in seen:
+                        continue
+                    seen.add(sig)
+                    games.append({
+                        'id': gid,
+                        'title': title,
+                        'launcher': 'ubisoft',
+                        'installDir': str(entry.resolve()),
+                        'executablePath': str(exe) if exe else None,
+                        'image': image
+                    })
+            except Exception:
+                continue
 
     # Registry-only entries (e.g., games in non-default dirs)
     for inst in installs:
@@ -183,18 +222,7 @@ def main():
             dir_lower = inst['installDir'].lower()
             if any(dir_lower in s for s in seen):
                 continue
-            exe = None
-            try:
-                exe = find_likely_exe(Path(inst['installDir']))
-            except Exception:
-                pass
-            title = inst['title'] or Path(inst['installDir']).name
-            if (not title or title.isdigit()) and exe:
-                desc = powershell_query_fileinfo(str(exe))
-                if desc:
-                    title = desc
-            title = clean_title(title)
-            image = any_icon_nearby(Path(inst['installDir']))
+            title, exe, image = _resolve(Path(inst['installDir']), inst['id'], inst['title'], configs, launcher_dir)
             games.append({
                 'id': inst['id'],
                 'title': title,
@@ -206,7 +234,52 @@ def main():
         except Exception:
             continue
 
-    print(json.dumps({'games': games}, ensure_ascii=False))
+    return {'games': games}
+
+def main():
+    span_trace.init_from_argv(sys.argv)
+    metrics.init_from_argv(sys.argv)
+    snapshot = snapshot_from_argv(sys.argv)
+    watch = '--watch' in sys.argv[1:]
+    cache_path = configurations = None
+    args = []
+    for a in sys.argv[1:]:
+        if a.startswith('--config-cache='):
+            cache_path = a.split('=', 1)[1]
+        elif a.startswith('--configurations='):
+            configurations = a.split('=', 1)[1]
+        elif a != '--watch':
+            args.append(a)
+    if snapshot.backend is None:
+        print(json.dumps(span_trace.finish({'games': []})))
+        return
+    # Optional custom libraries passed as JSON list arg
+    custom_libs = []
+    if args:
+        try:
+            custom_libs = json.loads(args[0]) or []
+        except Exception:
+            custom_libs = []
+
+    cache = StampCache(cache_path, CACHE_VERSION)
+
+    def run():
+        result = detect(custom_libs, snapshot, cache, configurations)
+        cache.save()
+        return result
+
+    if watch:
+        def emit(obj):
+            sys.stdout.write(json.dumps(obj, ensure_ascii=False) + '\n')
+            sys.stdout.flush()
+        try:
+            watch_loop(snapshot, run, emit)
+        except KeyboardInterrupt:
+            pass
+        return
+    result = run()
+    snapshot.save()
+    print(json.dumps(span_trace.finish(result), ensure_ascii=False))
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""
+verify_install.py
+
+Integrity check for a game install dir against a baseline manifest of
+{relative path: [size, mtime_ns, hash]}.
+
+Files whose (size, mtime) still match the baseline are taken as unchanged
+without being read (use --full to hash everything). The rest are hashed in a
+process pool: each file is memory-mapped and fed to the hash in large slices;
+small files are batched so one task covers many of them, and at most --io
+tasks are in flight at once to cap concurrent disk reads.
+
+CLI:
+  python scripts/verify_install.py baseline --dir DIR --manifest FILE [--workers N] [--io N]
+  python scripts/verify_install.py verify   --dir DIR --manifest FILE [--full] [--update] [--workers N] [--io N]
+
+Outputs JSON:
+{
+  "ok": true, "mode": "verify", "dir": "...",
+  "changed": ["bin/game.exe"], "missing": ["data/a.pak"], "extra": ["mods/x.dll"],
+  "stats": {"files": 1200, "skipped": 1190, "hashed": 10, "touched": 9, "bytesHashed": 123456, "ms": 812}
+}
+`touched` counts files whose stamp moved but whose content hashes the same;
+--update writes the current state back as the new baseline.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import stat
+import sys
+import time
+
+from glhelpers import metrics, span_trace
+from glhelpers.span_trace import span
+
+MANIFEST_VERSION = 1
+ALGO = 'blake2b'
+# Slice fed to the hash per update; mmap pages are read sequentially in this size
+CHUNK = 8 << 20
+# Files below this are grouped into one task up to BATCH_BYTES / BATCH_FILES
+SMALL_FILE = 1 << 20
+BATCH_BYTES = 32 << 20
+BATCH_FILES = 256
+# Below this many bytes to hash, hashing runs in this process
+INLINE_BYTES = 64 << 20
+
+
+def _is_reparse_point(entry: os.DirEntry) -> bool:
+    """True for junctions and other reparse points, which is_dir(follow_symlinks=False) reports as dirs before 3.12."""
+    if hasattr(entry, 'is_junction') and entry.is_junction():
+        return True
+    return bool(getattr(entry.stat(follow_symlinks=False), 'st_file_attributes', 0) & stat.FILE_ATTRIBUTE_REPARSE_POINT)
+
+
+def scan_tree(root: str) -> dict:
+    """{relative path (forward slashes): (size, mtime_ns)} for every regular file under root."""
+    out = {}
+    stack = [('', root)]
+    while stack:
+        rel, path = stack.pop()
+        try:
+            it = os.scandir(path)
+        except OSError:
+            continue
+        with it:
+            for e in it:
+                name = f'{rel}/{e.name}' if rel else e.name
+                try:
+                    if e.is_dir(follow_symlinks=False):
+                        # Files behind a junction belong to whatever it points at, not this install
+                        if not _is_reparse_point(e):
+                            stack.append((name, e.path))
+                    elif e.is_file(follow_symlinks=False):
+                        st = e.stat(follow_symlinks=False)
+                        out[name] = (st.st_size, st.st_mtime_ns)
+                except OSError:
+                    continue
+    return out
+
+
+def hash_file(path: str) -> str:
+    import hashlib
+    import mmap
+    h = hashlib.new(ALGO)
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        if size:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    for off in range(0, size, CHUNK):
+                        h.update(view[off:off + CHUNK])
+                finally:
+                    view.release()
+    return h.hexdigest()
+
+
+def _hash_batch(root: str, rels: list) -> list:
+    """Worker entry point: [(rel, hash or None)] for one batch."""
+    out = []
+    for rel in rels:
+        try:
+            out.append((rel, hash_file(os.path.join(root, rel))))
+        except OSError:
+            out.append((rel, None))
+    return out
+
+
+def _batches(files: dict, rels: list):
+    """Group rels into tasks: large files alone, small ones together (largest first so the pool stays busy)."""
+    batch, batch_bytes = [], 0
+    for rel in sorted(rels, key=lambda r: -files[r][0]):
+        size = files[rel][0]
+        if size >= SMALL_FILE:
+            yield [rel]
+            continue
+        batch.append(rel)
+        batch_bytes += size
+        if batch_bytes >= BATCH_BYTES or len(batch) >= BATCH_FILES:
+            yield batch
+            batch, batch_bytes = [], 0
+    if batch:
+        yield batch
+
+
+def hash_files(root: str, files: dict, rels: list, workers: int | None = None, io: int | None = None) -> dict:
+    """{rel: hash or None} for rels, hashed in a process pool with at most `io` batches in flight."""
+    if not rels:
+        return {}
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+    workers = max(1, workers or os.cpu_count() or 2)
+    limit = max(1, io or workers)
+    out = {}
+    batches = _batches(files, rels)
+    if workers == 1 or sum(files[r][0] for r in rels) < INLINE_BYTES:
+        # Starting worker processes costs more than hashing this little
+        for batch in batches:
+            out.update(_hash_batch(root, batch))
+        return out
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        running = set()
+        for batch in batches:
+            if len(running) >= limit:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    out.update(fut.result())
+            running.add(pool.submit(_hash_batch, root, batch))
+        for fut in running:
+            out.update(fut.result())
+    return out
+
+
+def load_manifest(path: str) -> dict | None:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except Exception:
+        return None
+    if data.get('version') != MANIFEST_VERSION or data.get('algo') != ALGO:
+        return None
+    return data
+
+
+def save_manifest(path: str, root: str, entries: dict) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({ 'version': MANIFEST_VERSION, 'algo': ALGO, 'root': root, 'files': entries }, f,
+                  ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def make_baseline(root: str, manifest: str, workers: int | None = None, io: int | None = None) -> dict:
+    t0 = time.perf_counter()
+    with span('scan'):
+        files = scan_tree(root)
+    with span('hash', files=len(files)):
+        hashes = hash_files(root, files, list(files), workers, io)
+    entries = {rel: [size, mtime, hashes.get(rel)] for rel, (size, mtime) in files.items() if hashes.get(rel)}
+    save_manifest(manifest, root, entries)
+    return {
+        'ok': True, 'mode': 'baseline', 'dir': root, 'manifest': manifest,
+        'stats': {
+            'files': len(entries), 'hashed': len(hashes), 'bytesHashed': sum(files[r][0] for r in hashes),
+            'ms': round((time.perf_counter() - t0) * 1000),
+        },
+    }
+
+
+def verify(root: str, manifest: str, full: bool = False, update: bool = False,
+           workers: int | None = None, io: int | None = None) -> dict:
+    t0 = time.perf_counter()
+    base = load_manifest(manifest)
+    if base is None:
+        return { 'ok': False, 'error': f'no usable baseline manifest: {manifest}' }
+    known = base.get('files') or {}
+    with span('scan'):
+        files = scan_tree(root)
+
+    missing = sorted(rel for rel in known if rel not in files)
+    extra = sorted(rel for rel in files if rel not in known)
+    todo = [
+        rel for rel, stamp in files.items()
+        if rel in known and (full or known[rel][0] != stamp[0] or known[rel][1] != stamp[1])
+    ]
+    with span('hash', files=len(todo)):
+        hashes = hash_files(root, files, todo, workers, io)
+
+    changed = []
+    touched = 0
+    entries = dict(known)
+    for rel in todo:
+        digest = hashes.get(rel)
+        if digest is None or digest != known[rel][2]:
+            changed.append(rel)
+        elif files[rel][:2] != tuple(known[rel][:2]):
+            touched += 1
+        if digest is not None:
+            entries[rel] = [files[rel][0], files[rel][1], digest]
+    changed.sort()
+    if update:
+        for rel in missing:
+            entries.pop(rel, None)
+        if extra:
+            entries.update({rel: [files[rel][0], files[rel][1], h]
+                            for rel, h in hash_files(root, files, extra, workers, io).items() if h})
+        save_manifest(manifest, root, entries)
+    return {
+        'ok': True, 'mode': 'verify', 'dir': root,
+        'changed': changed, 'missing': missing, 'extra': extra,
+        'stats': {
+            'files': len(files), 'skipped': len(files) - len(extra) - len(todo), 'hashed': len(hashes),
+            'touched': touched, 'bytesHashed': sum(files[r][0] for r in hashes),
+            'ms': round((time.perf_counter() - t0) * 1000),
+        },
+    }
+
+
+def main(argv: list[str]) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(description='Verify a game install against a baseline manifest')
+    parser.add_argument('mode', choices=('baseline', 'verify'))
+    parser.add_argument('--dir', required=True, help='Install dir')
+    parser.add_argument('--manifest', required=True, help='Baseline manifest JSON file')
+    parser.add_argument('--full', action='store_true', help='Hash every file, ignoring the (size, mtime) pre-check')
+    parser.add_argument('--update', action='store_true', help='Write the verified state back as the baseline')
+    parser.add_argument('--workers', type=int, default=None, help='Hashing processes (default: CPU count)')
+    parser.add_argument('--io', type=int, default=None, help='Max batches being read at once (default: workers)')
+    args = parser.parse_args(metrics.init_from_argv(span_trace.init_from_argv(list(argv))))
+    try:
+        root = os.path.normpath(args.dir)
+        if not os.path.isdir(root):
+            raise ValueError(f'not a directory: {root}')
+        with span(args.mode):
+            if args.mode == 'baseline':
+                result = make_baseline(root, args.manifest, args.workers, args.io)
+            else:
+                result = verify(root, args.manifest, args.full, args.update, args.workers, args.io)
+        print(json.dumps(span_trace.finish(result), ensure_ascii=False))
+        return 0 if result.get('ok') else 1
+    except Exception as e:
+        print(json.dumps({ 'ok': False, 'error': str(e) }))
+        return 1
+
+
+if __name__ == '__main__':
+    raise SystemExit(main(sys.argv[1:]))
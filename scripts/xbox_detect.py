@@ -1,5 +1,9 @@
 #!/usr/bin/env python3
 # Windows-only Xbox/Microsoft Store game detector
+#
+# Reads AppxManifest.xml / MicrosoftGame.config from each C:\XboxGames\*\Content and
+# GamingServices install dir: AUMID = <Identity Name>_<publisher id>!<Application Id>.
+#   python scripts/xbox_detect.py ['["D:/XboxGames"]'] [--manifest-cache=<file>] [--watch]
 
 import os
 import sys
@@ -7,81 +11,185 @@ import json
 import re
 from pathlib import Path
 
-try:
-    import winreg  # type: ignore
-except Exception:
-    winreg = None  # type: ignore
+from glhelpers import metrics, span_trace
+from glhelpers.registry import snapshot_from_argv, watch_loop
+from glhelpers.span_trace import span
+from glhelpers.stamp_cache import StampCache, stamp_of
 
+# Cached manifest index shape; bump when read_package() output changes
+CACHE_VERSION = 1
+XBOX_GAMES_ROOT = 'C:/XboxGames'
+_CROCKFORD32 = '0123456789abcdefghjkmnpqrstvwxyz'
 
-def read_gaming_services_games():
+GAMING_SERVICES_KEYS = (
+    ('HKLM', r"SOFTWARE\Microsoft\GamingServices\Games"),
+    ('HKLM', r"SOFTWARE\WOW6432Node\Microsoft\GamingServices\Games"),
+)
+
+
+def read_gaming_services_games(snapshot):
     games = []
-    if sys.platform != 'win32' or not winreg:
-        return games
-    roots = [
-        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\GamingServices\Games"),
-        (winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\WOW6432Node\Microsoft\GamingServices\Games"),
-    ]
-    for hive, base in roots:
+    for hive, base in GAMING_SERVICES_KEYS:
+        for key_name, values in snapshot.children(hive, base).items():
+            data = { 'id': key_name }
+            for name, val in values.items():
+                k = name.lower()
+                if k == 'displayname':
+                    data['display'] = str(val)
+                elif k == 'packagefamilyname':
+                    data['pfn'] = str(val)
+                elif k in ('installfullpath', 'installlocation', 'installpath'):
+                    data['installDir'] = str(val)
+            games.append(data)
+    return games
+
+
+def publisher_id(publisher: str) -> str:
+    """13-char publisher hash used in package family names (Crockford base32 of sha256(UTF-16LE)[:8])."""
+    import hashlib
+    n = int.from_bytes(hashlib.sha256(publisher.encode('utf-16-le')).digest()[:8], 'big') << 1
+    return ''.join(_CROCKFORD32[(n >> (5 * (12 - i))) & 31] for i in range(13))
+
+
+def _local(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def parse_appx_manifest(path: str) -> dict:
+    """Stream AppxManifest.xml up to the first <Application>; returns identity, app id, exe and logo."""
+    import xml.etree.ElementTree as ET
+    out = {}
+    stack = []
+    for event, el in ET.iterparse(path, events=('start', 'end')):
+        tag = _local(el.tag)
+        if event == 'start':
+            stack.append(tag)
+            if tag == 'Identity' and 'name' not in out:
+                out['name'] = el.get('Name') or ''
+                out['publisher'] = el.get('Publisher') or ''
+            elif tag == 'Application' and 'appId' not in out:
+                out['appId'] = el.get('Id') or ''
+                out['executable'] = el.get('Executable') or ''
+            elif tag == 'VisualElements' and 'Application' in stack:
+                out.setdefault('visualName', el.get('DisplayName') or '')
+                out.setdefault('squareLogo', el.get('Square150x150Logo') or '')
+            continue
+        stack.pop()
+        if tag in ('DisplayName', 'Logo') and stack[-1:] == ['Properties']:
+            out['display' if tag == 'DisplayName' else 'logo'] = (el.text or '').strip()
+        elif tag == 'Application':
+            break
+    return out
+
+
+def parse_game_config(path: str) -> dict:
+    """Read the title, executable and logo from MicrosoftGame.config."""
+    import xml.etree.ElementTree as ET
+    out = {}
+    for _event, el in ET.iterparse(path, events=('start',)):
+        tag = _local(el.tag)
+        if tag == 'Identity' and 'name' not in out:
+            out['name'] = el.get('Name') or ''
+            out['publisher'] = el.get('Publisher') or ''
+        elif tag == 'Executable' and 'executable' not in out:
+            out['executable'] = el.get('Name') or ''
+            out['appId'] = el.get('Id') or ''
+        elif tag == 'ShellVisuals':
+            out['display'] = el.get('DefaultDisplayName') or ''
+            out['logo'] = el.get('StoreLogo') or el.get('Square150x150Logo') or ''
+    return out
+
+
+def _resolve_asset(content: str, rel: str) -> str | None:
+    """Resolve a manifest asset path, including scale-qualified variants (Logo.scale-200.png)."""
+    if not rel:
+        return None
+    path = os.path.join(content, rel.replace('\\', os.sep).replace('/', os.sep))
+    if os.path.isfile(path):
+        return path
+    folder, name = os.path.split(path)
+    stem, ext = os.path.splitext(name)
+    try:
+        variants = sorted(e.name for e in os.scandir(folder) if e.name.lower().startswith(stem.lower() + '.') and e.name.lower().endswith(ext.lower()))
+    except OSError:
+        return None
+    return os.path.join(folder, variants[-1]) if variants else None
+
+
+def _manifest_paths(install_dir: str):
+    """Yield (content dir, AppxManifest.xml path, stat) for an install dir's Content subdir or the dir itself."""
+    for content in (os.path.join(install_dir, 'Content'), install_dir):
+        manifest = os.path.join(content, 'AppxManifest.xml')
         try:
-            with winreg.OpenKey(hive, base) as root:
-                i = 0
-                while True:
-                    try:
-                        key_name = winreg.EnumKey(root, i)
-                    except OSError:
-                        break
-                    i += 1
-                    try:
-                        with winreg.OpenKey(root, key_name) as sub:
-                            data = { 'id': key_name }
-                            j = 0
-                            while True:
-                                try:
-                                    name, val, _ = winreg.EnumValue(sub, j)
-                                except OSError:
-                                    break
-                                j += 1
-                                k = name.lower()
-                                if k == 'displayname':
-                                    data['display'] = str(val)
-                                elif k == 'packagefamilyname':
-                                    data['pfn'] = str(val)
-                                elif k in ('installfullpath', 'installlocation', 'installpath'):
-                                    data['installDir'] = str(val)
-                            games.append(data)
-                    except OSError:
-                        pass
+            yield content, manifest, os.stat(manifest)
+            return
         except OSError:
-            pass
-    return games
+            continue
 
 
-def ps_get_startapps():
+def read_package(content: str, manifest: str) -> dict | None:
+    """Build {pfn, aumid, title, executablePath, image, isGame} from the manifests in `content`."""
     try:
-        import subprocess
-        cmd = [
-            'powershell', '-NoProfile', '-Command',
-            "Get-StartApps | Select-Object Name,AppID | ConvertTo-Json -Depth 2"
-        ]
-        out = subprocess.run(cmd, capture_output=True, text=True, encoding='utf-8', errors='replace', timeout=8)
-        txt = out.stdout.strip()
-        if not txt:
-            return []
-        data = json.loads(txt)
-        if isinstance(data, dict):
-            data = [data]
-        return data
+        appx = parse_appx_manifest(manifest)
     except Exception:
-        return []
+        appx = {}
+    config = {}
+    config_path = os.path.join(content, 'MicrosoftGame.config')
+    if os.path.isfile(config_path):
+        try:
+            config = parse_game_config(config_path)
+        except Exception:
+            config = {}
+    name = appx.get('name') or config.get('name')
+    publisher = appx.get('publisher') or config.get('publisher')
+    if not name or not publisher:
+        return None
+    pfn = f'{name}_{publisher_id(publisher)}'
+    app_id = appx.get('appId') or config.get('appId') or ''
+    title = ''
+    for cand in (config.get('display'), appx.get('display'), appx.get('visualName')):
+        # ms-resource: strings need the PRI resource table; skip them
+        if cand and not cand.startswith('ms-resource:'):
+            title = cand
+            break
+    # MicrosoftGame.config names the real game binary; AppxManifest often only has gamelaunchhelper.exe
+    exe = config.get('executable') or appx.get('executable') or ''
+    logo = _resolve_asset(content, config.get('logo') or appx.get('logo') or appx.get('squareLogo') or '')
+    return {
+        'pfn': pfn,
+        'aumid': f'{pfn}!{app_id}' if app_id else None,
+        'title': title,
+        'executablePath': os.path.normpath(os.path.join(content, exe)) if exe else None,
+        'image': Path(logo).resolve().as_uri() if logo else None,
+        'isGame': bool(config),
+    }
 
 
-def _norm(s: str) -> str:
-    s = (s or "").casefold()
-    s = re.sub(r"\s*\(windows\s*mixed\s*reality\)\s*$", "", s)
-    s = s.replace("microsoft ", "").replace("windows ", "")
-    s = re.sub(r"[^\w\s]", " ", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
+def index_packages(install_dirs: list, cache: StampCache) -> dict:
+    """Map normcased install dir -> read_package() result, reusing entries whose manifest is unchanged."""
+    index = {}
+    seen = set()
+    with span('manifests') as s:
+        for install_dir in install_dirs:
+            for content, manifest, st in _manifest_paths(install_dir):
+                stamp = stamp_of(st)
+                config = os.path.join(content, 'MicrosoftGame.config')
+                try:
+                    stamp += stamp_of(os.stat(config))
+                except OSError:
+                    pass
+                seen.add(manifest)
+                hit, pkg = cache.get(manifest, stamp)
+                if hit:
+                    s.add('cached')
+                else:
+                    pkg = read_package(content, manifest)
+                    cache.put(manifest, stamp, pkg)
+                    s.add('parsed')
+                if pkg:
+                    index[os.path.normcase(os.path.normpath(install_dir))] = pkg
+    cache.prune(seen)
+    return index
 
 
 def prettify_title(raw: str) -> str:
@@ -111,114 +219,137 @@ def find_store_logo(base_dir: Path) -> str | None:
     return None
 
 
-def main():
-    if sys.platform != 'win32':
-        print(json.dumps({'games': []}))
-        return
+def _list_xbox_games(roots: list) -> list:
+    dirs = []
+    for root in roots:
+        try:
+            for entry in os.scandir(root):
+                if entry.is_dir() and entry.name.lower() != 'gamesave':
+                    dirs.append(entry.path)
+        except OSError:
+            continue
+    return dirs
+
 
-    # Read registry games and Start menu apps
-    reg_games = read_gaming_services_games()
-    apps = ps_get_startapps()
-    # Build lookups for AUMID by PFN and by fuzzy name
-    aumid_by_pfn = {}
-    aumid_by_name = {}
-    for a in apps:
-        name = str(a.get('Name') or '')
-        appid = str(a.get('AppID') or '')
-        # PFN is prefix of AUMID in most cases
-        p = appid.split('!')[0] if '!' in appid else ''
-        if p:
-            aumid_by_pfn.setdefault(p.lower(), appid)
-        nkey = _norm(name)
-        if nkey:
-            aumid_by_name.setdefault(nkey, appid)
+def detect(snapshot, roots=None, cache=None):
+    cache = cache or StampCache()
+    with span('registry') as s:
+        reg_games = read_gaming_services_games(snapshot)
+        s.add('keys', len(reg_games))
+        s.set(**snapshot.stats)
+
+    with span('scan_xboxgames'):
+        folder_dirs = _list_xbox_games(roots if roots is not None else [XBOX_GAMES_ROOT])
+    reg_dirs = [str(g['installDir']) for g in reg_games if g.get('installDir')]
+    packages = index_packages(folder_dirs + reg_dirs, cache)
+
+    def package_for(install_dir):
+        return packages.get(os.path.normcase(os.path.normpath(install_dir))) if install_dir else None
 
     results = []
-    # Include games installed under C:\XboxGames (excluding GameSave)
-    try:
-        xbox_root = Path('C:/XboxGames')
-        if xbox_root.exists():
-            for entry in xbox_root.iterdir():
-                if not entry.is_dir():
-                    continue
-                if entry.name.lower() == 'gamesave':
-                    continue
-                title = entry.name
-                # try to map to AUMID using PFN guess from folder name fragment
-                aumid = None
-                # Prefer matching by registry PFN that contains folder name
-                for g in reg_games:
-                    pfn = str(g.get('pfn') or '')
-                    if pfn and entry.name.lower() in pfn.lower():
-                        aumid = aumid_by_pfn.get(pfn.lower())
-                        if aumid:
-                            break
-                # Fallback: match by friendly name using StartApps
-                if not aumid:
-                    tkey = _norm(title)
-                    if tkey in aumid_by_name:
-                        aumid = aumid_by_name[tkey]
-                    else:
-                        # relaxed startswith/contains
-                        for k, v in aumid_by_name.items():
-                            if k.startswith(tkey) or tkey.startswith(k) or (tkey and k and tkey in k):
-                                aumid = v
-                                break
-                image = find_store_logo(entry) or None
-                results.append({
-                    'id': title,
-                    'title': prettify_title(title),
-                    'launcher': 'xbox',
-                    'installDir': str(entry.resolve()),
-                    'executablePath': None,
-                    'image': image,
-                    'aumid': aumid
-                })
-    except Exception:
-        pass
+    seen = set()
+    # Games installed under C:\XboxGames (excluding GameSave)
+    for d in folder_dirs:
+        pkg = package_for(d) or {}
+        # The folder name stays the id: playtime is stored under "xbox:<folder>"
+        gid = os.path.basename(d)
+        pfn = pkg.get('pfn')
+        if gid.lower() in seen or (pfn and pfn.lower() in seen):
+            continue
+        seen.add(gid.lower())
+        if pfn:
+            seen.add(pfn.lower())
+        results.append({
+            'id': gid,
+            'title': prettify_title(pkg.get('title') or gid),
+            'launcher': 'xbox',
+            'installDir': str(Path(d).resolve()),
+            'executablePath': pkg.get('executablePath'),
+            'image': pkg.get('image') or find_store_logo(Path(d)),
+            'aumid': pkg.get('aumid'),
+            'pfn': pfn,
+        })
     for g in reg_games:
-        pfn = str(g.get('pfn') or '')
-        aumid = aumid_by_pfn.get(pfn.lower()) if pfn else None
-        title = prettify_title(str(g.get('display') or ''))
+        install_dir = str(g.get('installDir') or '')
+        pkg = package_for(install_dir) or {}
+        pfn = str(g.get('pfn') or pkg.get('pfn') or '')
+        if (pfn or g.get('id') or '').lower() in seen:
+            continue
+        title = prettify_title(str(g.get('display') or '')) or prettify_title(pkg.get('title') or '')
         if not title:
             # fallback from PFN last segment
             if pfn:
-                title = pfn.split('.')[-1]
-        install_dir = str(g.get('installDir') or '')
-        # Heuristic: include only likely games
-        norm = (title + ' ' + pfn).lower()
-        include = any(tok in norm for tok in [
-            'xbox', 'game', 'forza', 'halo', 'gears', 'flight', 'minecraft', 'mojang', 'seaofthieves', 'ageofempires', 'ori', 'grounded', 'starfield'
-        ])
+                title = pfn.split('_')[0].split('.')[-1]
+        aumid = pkg.get('aumid')
+        # Heuristic: include only likely games (a MicrosoftGame.config settles it)
+        include = bool(pkg.get('isGame'))
+        if not include:
+            norm = (title + ' ' + pfn).lower()
+            include = any(tok in norm for tok in [
+                'xbox', 'game', 'forza', 'halo', 'gears', 'flight', 'minecraft', 'mojang', 'seaofthieves', 'ageofempires', 'ori', 'grounded', 'starfield'
+            ])
         if not include:
             # still include if aumid exists and path seems like XboxGames
             include = ('xboxgames' in install_dir.lower()) or bool(aumid)
         if not include:
             continue
-        if not aumid and title:
-            tkey = _norm(title)
-            if tkey in aumid_by_name:
-                aumid = aumid_by_name[tkey]
-            else:
-                for k, v in aumid_by_name.items():
-                    if k.startswith(tkey) or tkey.startswith(k) or (tkey and k and tkey in k):
-                        aumid = v
-                        break
-        img = find_store_logo(Path(install_dir)) or None
+        seen.add((pfn or g.get('id') or '').lower())
         results.append({
             'id': pfn or g.get('id') or title,
             'title': title,
             'launcher': 'xbox',
             'installDir': install_dir,
-            'executablePath': None,
-            'image': img,
+            'executablePath': pkg.get('executablePath'),
+            'image': pkg.get('image') or find_store_logo(Path(install_dir)) or None,
             'aumid': aumid
         })
 
-    print(json.dumps({'games': results}, ensure_ascii=False))
+    return {'games': results}
 
 
-if __name__ == '__main__':
-    main()
+def main():
+    span_trace.init_from_argv(sys.argv)
+    metrics.init_from_argv(sys.argv)
+    snapshot = snapshot_from_argv(sys.argv)
+    watch = '--watch' in sys.argv[1:]
+    cache_path = None
+    args = []
+    for a in sys.argv[1:]:
+        if a.startswith('--manifest-cache='):
+            cache_path = a.split('=', 1)[1]
+        elif a != '--watch':
+            args.append(a)
+    if snapshot.backend is None:
+        print(json.dumps(span_trace.finish({'games': []})))
+        return
+    # Optional library roots (default C:/XboxGames) passed as JSON list arg
+    roots = None
+    if args:
+        try:
+            roots = json.loads(args[0]) or None
+        except Exception:
+            roots = None
+    cache = StampCache(cache_path, CACHE_VERSION)
 
+    def run():
+        with metrics.timed('detect_ms', launcher='xbox'):
+            result = detect(snapshot, roots, cache)
+        cache.save()
+        return result
 
+    if watch:
+        def emit(obj):
+            sys.stdout.write(json.dumps(obj, ensure_ascii=False) + '\n')
+            sys.stdout.flush()
+        try:
+            watch_loop(snapshot, run, emit)
+        except KeyboardInterrupt:
+            pass
+        return
+    result = run()
+    snapshot.save()
+    print(json.dumps(span_trace.finish(result), ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
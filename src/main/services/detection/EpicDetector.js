@@ -6,6 +6,16 @@ import { spawn } from 'node:child_process'
 export class EpicDetector {
   async detect(settings) {
     try { console.log('[Detector:Epic]: Initialising') } catch {}
+    // Prefer the Python detector: parallel manifest reads, LauncherInstalled.dat cross-check, mtime cache
+    const pythonResult = await this.tryPythonDetector(settings)
+    if (pythonResult && pythonResult.games?.length) {
+      // Steam artwork fallbacks are fetched afterwards by ArtworkService, visible cards first
+      const games = pythonResult.games.map((g) => ({ id: g.id, title: g.title, launcher: 'epic', installDir: g.installDir || undefined, executablePath: g.executablePath || undefined, installSize: g.installSize || undefined }))
+      try { console.log(`[Detector:Epic]: Found Library at "${pythonResult.manifestDir}"`) } catch {}
+      try { console.log(`[Detector:Epic]: Found Games : ${JSON.stringify(games.map(g=>({id:g.id,title:g.title})))}`) } catch {}
+      try { console.log('[Detector:Epic]: Code ok') } catch {}
+      return games
+    }
     const manifestDir = await this.findManifestDir(settings)
     if (!manifestDir) return []
     let files = []
@@ -19,19 +29,10 @@ export class EpicDetector {
         const id = json.AppName || json.CatalogItemId || json.InstallationGuid || f
         const title = json.DisplayName || json.AppName || 'Epic Game'
         const installDir = json.InstallLocation || json.InstallLocationWin64 || json.InstallLocationWin32
-        // Try to attach a Steam community image as a fallback for Epic titles
         games.push({ id, title, launcher: 'epic', installDir })
       } catch {}
     }
-    // Resolve Steam image fallbacks in parallel
-    const results = await Promise.all(games.map(async (g) => {
-      try {
-        const image = await this.trySteamCommunityImage(g.title)
-        return image ? { ...g, image } : g
-      } catch {
-        return g
-      }
-    }))
+    const results = games
     try { console.log(`[Detector:Epic]: Found Library at "${manifestDir}"`) } catch {}
     try { console.log(`[Detector:Epic]: Found Games : ${JSON.stringify(results.map(g=>({id:g.id,title:g.title})))}`) } catch {}
     try { console.log('[Detector:Epic]: Code ok') } catch {}
@@ -49,16 +50,15 @@ export class EpicDetector {
     return null
   }
 
-  async trySteamCommunityImage(gameTitle) {
-    // Attempts to run scripts/SteamApi_Search.py to resolve an image URL
+  async tryPythonDetector(settings) {
     try {
-      const base = (await import('electron')).app?.isPackaged ? process.resourcesPath : process.cwd()
-      const scriptPath = path.join(base, 'scripts', 'SteamApi_Search.py')
-      const candidates = [
-        ['python', [scriptPath, '--game', gameTitle]],
-        ['py', [scriptPath, '--game', gameTitle]]
-      ]
-      for (const [cmd, args] of candidates) {
+      const electron = await import('electron')
+      const base = electron.app?.isPackaged ? process.resourcesPath : process.cwd()
+      const scriptPath = path.join(base, 'scripts', 'epic_detect.py')
+      const args = [scriptPath]
+      if (settings?.epic?.manifestDir) args.push('--manifests', settings.epic.manifestDir)
+      try { args.push('--cache', path.join(electron.app.getPath('userData'), 'epic_manifests.json')) } catch {}
+      for (const cmd of ['python', 'py']) {
         try {
           const out = await new Promise((resolve, reject) => {
             const p = spawn(cmd, args, { stdio: ['ignore', 'pipe', 'pipe'] })
@@ -73,13 +73,10 @@ export class EpicDetector {
             })
           })
           const parsed = JSON.parse(out)
-          const url = parsed && parsed.imageUrl
-          if (url && typeof url === 'string' && url.startsWith('http')) return url
+          if (parsed?.ok) return parsed
         } catch {}
       }
     } catch {}
-    return undefined
+    return null
   }
 }
-
-
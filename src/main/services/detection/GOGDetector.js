@@ -1,4 +1,4 @@
-import { spawnSync } from 'node:child_process'
+import { spawn, spawnSync } from 'node:child_process'
 import path from 'node:path'
 import fs from 'node:fs/promises'
 
@@ -11,6 +11,40 @@ export class GOGDetector {
     if (process.platform !== 'win32') return []
     try { console.log('[Detector:GOG]: Initialising') } catch {}
     const games = []
+    // One Python process reads the whole GOG.com\Games tree plus goggame-*.info files
+    const pythonResult = await this.tryPythonDetector(settings)
+    if (pythonResult) {
+      for (const g of pythonResult.games || []) {
+        games.push({ id: g.id, title: g.title, launcher: 'gog', installDir: g.installDir, executablePath: g.executablePath || undefined })
+      }
+    } else {
+      await this.readRegistryWithReg(games)
+    }
+    // Also scan user-provided custom libraries for executables as a fallback
+    try {
+      const { default: fg } = await import('fast-glob')
+      const libs = settings?.gog?.customLibraries || []
+      const known = games.map((g) => path.normalize(g.installDir || '').toLowerCase()).filter(Boolean)
+      for (const root of libs) {
+        try {
+          const candidates = await fg(['**/*.exe'], { cwd: root, absolute: true, deep: 3, suppressErrors: true })
+          for (const exe of candidates) {
+            const lower = path.normalize(exe).toLowerCase()
+            if (known.some((d) => lower.startsWith(d + path.sep))) continue
+            const title = path.basename(exe, '.exe')
+            games.push({ id: title, title, launcher: 'gog', installDir: path.dirname(exe), executablePath: exe })
+          }
+        } catch {}
+      }
+    } catch {}
+    try { console.log(`[Detector:GOG]: Found Library at "Registry+CustomLibs"`) } catch {}
+    try { console.log(`[Detector:GOG]: Found Games : ${JSON.stringify(games.map(g=>({id:g.id,title:g.title})))}`) } catch {}
+    try { console.log('[Detector:GOG]: Code ok') } catch {}
+    return games
+  }
+
+  // Legacy path when Python is unavailable: one `reg query` per game subkey
+  async readRegistryWithReg(games) {
     try {
       // Query 32-bit registry hive where GOG stores game entries
       const { stdout } = spawnSync('reg', ['query', 'HKLM\\SOFTWARE\\WOW6432Node\\GOG.com\\Games'], { encoding: 'utf8' })
@@ -33,25 +67,32 @@ export class GOGDetector {
         } catch {}
       }
     } catch {}
-    // Also scan user-provided custom libraries for executables as a fallback
+  }
+
+  async tryPythonDetector(settings) {
     try {
-      const { default: fg } = await import('fast-glob')
-      const libs = settings?.gog?.customLibraries || []
-      for (const root of libs) {
+      const base = (await import('electron')).app?.isPackaged ? process.resourcesPath : process.cwd()
+      const scriptPath = path.join(base, 'scripts', 'gog_detect.py')
+      const args = [scriptPath, '--roots', JSON.stringify(settings?.gog?.customLibraries || [])]
+      for (const cmd of ['python', 'py']) {
         try {
-          const candidates = await fg(['**/*.exe'], { cwd: root, absolute: true, deep: 3, suppressErrors: true })
-          for (const exe of candidates) {
-            const title = path.basename(exe, '.exe')
-            games.push({ id: title, title, launcher: 'gog', installDir: path.dirname(exe), executablePath: exe })
-          }
+          const out = await new Promise((resolve, reject) => {
+            const p = spawn(cmd, args, { stdio: ['ignore', 'pipe', 'pipe'] })
+            let stdout = ''
+            let stderr = ''
+            p.stdout.on('data', (d) => (stdout += d.toString()))
+            p.stderr.on('data', (d) => (stderr += d.toString()))
+            p.on('error', reject)
+            p.on('close', (code) => {
+              if (code === 0 && stdout) resolve(stdout)
+              else reject(new Error(stderr || `python exited ${code}`))
+            })
+          })
+          const parsed = JSON.parse(out)
+          if (parsed?.ok) return parsed
         } catch {}
       }
     } catch {}
-    try { console.log(`[Detector:GOG]: Found Library at "Registry+CustomLibs"`) } catch {}
-    try { console.log(`[Detector:GOG]: Found Games : ${JSON.stringify(games.map(g=>({id:g.id,title:g.title})))}`) } catch {}
-    try { console.log('[Detector:GOG]: Code ok') } catch {}
-    return games
+    return null
   }
 }
-
-
@@ -22,15 +22,22 @@ export class SteamDetector {
   async detect(settings) {
     try { console.log('[Detector:Steam]: Initialising') } catch {}
     // If Python is available, run the Python detector for higher accuracy
-    const pythonResult = await this.tryPythonDetector(settings)
+    const pythonSteamPath = await this.findSteamPath(settings)
+    const pythonResult = await this.tryPythonDetector(settings, pythonSteamPath)
     if (pythonResult && pythonResult.games?.length) {
       // Attach images for Steam appids when possible
-      const steamPath = await this.findSteamPath(settings)
+      const steamPath = pythonSteamPath
       const games = []
       for (const g of pythonResult.games) {
+        if (g.shortcut) {
+          // Non-Steam shortcut: id is the 64-bit game id used by steam://rungameid
+          games.push({ id: g.id, title: g.title, launcher: 'steam', shortcut: true, installDir: g.installDir, library: null, executablePath: g.executablePath || undefined, args: g.launchOptions ? g.launchOptions.split(' ').filter(Boolean) : [] })
+          continue
+        }
         const image = g.id && /^\d+$/.test(String(g.id)) && steamPath ? await this.resolveSteamImage(steamPath, String(g.id)) : undefined
-        const exe = await this.findLikelyExecutable(g.installDir)
-        games.push({ id: g.id, title: g.title, launcher: 'steam', installDir: g.installDir, library: g.library || null, image, executablePath: exe || undefined })
+        // The launch exe from appinfo.vdf is authoritative; globbing is the fallback
+        const exe = g.executablePath || await this.findLikelyExecutable(g.installDir)
+        games.push({ id: g.id, title: g.title, launcher: 'steam', installDir: g.installDir, library: g.library || null, image, executablePath: exe || undefined, installSize: g.sizeOnDisk || undefined })
       }
       this.lastDebug = {
         steamPath: steamPath || null,
@@ -280,14 +287,16 @@ export class SteamDetector {
     }
   }
 
-  async tryPythonDetector(settings) {
+  async tryPythonDetector(settings, steamPath) {
     // Try 'python' and 'py' commands. Resolve script path for packaged build
     const extras = JSON.stringify(settings?.steam?.customLibraries || [])
     const base = (await import('electron')).app?.isPackaged ? process.resourcesPath : process.cwd()
     const scriptPath = path.join(base, 'scripts', 'steam_detect.py')
+    // appinfo.vdf / shortcuts.vdf live under the Steam install dir
+    const args = steamPath ? [scriptPath, extras, `--steam-path=${steamPath}`] : [scriptPath, extras]
     const candidates = [
-      ['python', [scriptPath, extras]],
-      ['py', [scriptPath, extras]]
+      ['python', args],
+      ['py', args]
     ]
     for (const [cmd, args] of candidates) {
       try {
@@ -1,4 +1,4 @@
-import { spawnSync, spawn } from 'node:child_process'
+import { spawnSync } from 'node:child_process'
 import path from 'node:path'
 import fs from 'node:fs/promises'
 import { pathToFileURL } from 'node:url'
@@ -13,13 +13,8 @@ export class UbisoftDetector {
     const py = await this.tryPythonDetector(settings)
     if (py && Array.isArray(py.games) && py.games.length) {
       const baseGames = py.games.map((g) => ({ id: g.id, title: g.title, launcher: 'ubisoft', installDir: g.installDir, executablePath: g.executablePath || undefined, image: g.image }))
-      const withFallback = await Promise.all(baseGames.map(async (g) => {
-        if (g.image) return g
-        try {
-          const steamImg = await this.trySteamCommunityImage(g.title)
-          return steamImg ? { ...g, image: steamImg } : g
-        } catch { return g }
-      }))
+      // Games without local artwork get a Steam fallback later from ArtworkService
+      const withFallback = baseGames
       try { console.log(`[Detector:Ubisoft]: Found Library at "Registry+DefaultDir"`) } catch {}
       try { console.log(`[Detector:Ubisoft]: Found Games : ${JSON.stringify(withFallback.map(g=>({id:g.id,title:g.title})))}`) } catch {}
       try { console.log('[Detector:Ubisoft]: Code ok') } catch {}
@@ -92,14 +87,7 @@ export class UbisoftDetector {
         } catch {}
       }
     } catch {}
-    // Attach Steam community image fallback where local image is missing
-    const results = await Promise.all(games.map(async (g) => {
-      if (g.image) return g
-      try {
-        const steamImg = await this.trySteamCommunityImage(g.title)
-        return steamImg ? { ...g, image: steamImg } : g
-      } catch { return g }
-    }))
+    const results = games
     try { console.log(`[Detector:Ubisoft]: Found Library at "Registry+DefaultDir+CustomLibs"`) } catch {}
     try { console.log(`[Detector:Ubisoft]: Found Games : ${JSON.stringify(results.map(g=>({id:g.id,title:g.title})))}`) } catch {}
     try { console.log('[Detector:Ubisoft]: Code ok') } catch {}
@@ -155,11 +143,17 @@ export class UbisoftDetector {
   async tryPythonDetector(settings) {
     try {
       const { spawn } = await import('node:child_process')
-      const base = (await import('electron')).app?.isPackaged ? process.resourcesPath : process.cwd()
+      const electron = await import('electron')
+      const base = electron.app?.isPackaged ? process.resourcesPath : process.cwd()
       const script = path.join(base, 'scripts', 'ubisoft_detect.py')
       const extras = JSON.stringify(settings?.ubisoft?.customLibraries || [])
+      const args = [script, extras]
+      // Registry snapshot reused across runs; unchanged install keys are not re-read
+      try { args.push(`--registry-cache=${path.join(electron.app.getPath('userData'), 'registry_ubisoft.json')}`) } catch {}
+      // Titles/executables decoded from Ubisoft Connect's configurations file, kept until the file changes
+      try { args.push(`--config-cache=${path.join(electron.app.getPath('userData'), 'ubisoft_configurations.json')}`) } catch {}
       return await new Promise((resolve) => {
-        const p = spawn('python', [script, extras], { stdio: ['ignore', 'pipe', 'ignore'] })
+        const p = spawn('python', args, { stdio: ['ignore', 'pipe', 'ignore'] })
         let out = ''
         p.stdout.on('data', (d) => (out += d.toString()))
         p.on('error', () => resolve(null))
@@ -169,37 +163,4 @@ export class UbisoftDetector {
       })
     } catch { return null }
   }
-
-  async trySteamCommunityImage(gameTitle) {
-    try {
-      const base = (await import('electron')).app?.isPackaged ? process.resourcesPath : process.cwd()
-      const scriptPath = path.join(base, 'scripts', 'SteamApi_Search.py')
-      const candidates = [
-        ['python', [scriptPath, '--game', gameTitle]],
-        ['py', [scriptPath, '--game', gameTitle]]
-      ]
-      for (const [cmd, args] of candidates) {
-        try {
-          const out = await new Promise((resolve, reject) => {
-            const p = spawn(cmd, args, { stdio: ['ignore', 'pipe', 'pipe'] })
-            let stdout = ''
-            let stderr = ''
-            p.stdout.on('data', (d) => (stdout += d.toString()))
-            p.stderr.on('data', (d) => (stderr += d.toString()))
-            p.on('error', reject)
-            p.on('close', (code) => {
-              if (code === 0 && stdout) resolve(stdout)
-              else reject(new Error(stderr || `python exited ${code}`))
-            })
-          })
-          const parsed = JSON.parse(out)
-          const url = parsed && parsed.imageUrl
-          if (url && typeof url === 'string' && url.startsWith('http')) return url
-        } catch {}
-      }
-    } catch {}
-    return undefined
-  }
 }
-
-
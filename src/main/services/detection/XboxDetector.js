@@ -20,12 +20,18 @@ export class XboxDetector {
   async tryPythonDetector() {
     try {
       const { spawn } = await import('node:child_process')
-      const base = (await import('electron')).app?.isPackaged ? process.resourcesPath : process.cwd()
+      const electron = await import('electron')
+      const base = electron.app?.isPackaged ? process.resourcesPath : process.cwd()
       const script = path.join(base, 'scripts', 'xbox_detect.py')
+      const args = [script]
+      // Registry snapshot reused across runs; unchanged GamingServices keys are not re-read
+      try { args.push(`--registry-cache=${path.join(electron.app.getPath('userData'), 'registry_xbox.json')}`) } catch {}
+      // Parsed AppxManifest.xml / MicrosoftGame.config index, keyed by manifest mtime
+      try { args.push(`--manifest-cache=${path.join(electron.app.getPath('userData'), 'xbox_manifests.json')}`) } catch {}
       try { console.log('[Detector:Xbox]: Using script:', script) } catch {}
       const run = (cmd) => new Promise((resolve) => {
         try { console.log('[Detector:Xbox]: Trying interpreter:', cmd) } catch {}
-        const p = spawn(cmd, [script], { stdio: ['ignore', 'pipe', 'pipe'] })
+        const p = spawn(cmd, args, { stdio: ['ignore', 'pipe', 'pipe'] })
         let out = ''
         let err = ''
         p.stdout.on('data', (d) => (out += d.toString()))
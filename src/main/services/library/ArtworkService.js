@@ -0,0 +1,137 @@
+import path from 'node:path'
+import { spawn } from 'node:child_process'
+import { app } from 'electron'
+
+// Launchers whose games get a Steam artwork fallback when they come without an image
+const FALLBACK_LAUNCHERS = new Set(['epic', 'ubisoft'])
+// Priority of the first library row when filling in the background; on-screen cards use 0
+const BACKGROUND_PRIORITY = 1000
+
+// Keeps one scripts/artwork_fetch.py worker running and feeds it prioritized lookups
+export class ArtworkService {
+  constructor(onResolved) {
+    this.onResolved = onResolved
+    this.proc = null
+    this.images = new Map()
+    this.pending = new Map()
+    this.background = new Map()
+  }
+
+  keyOf(game) {
+    return `${game.launcher}:${game.id}`
+  }
+
+  start() {
+    if (this.proc) return this.proc
+    const base = app && app.isPackaged ? process.resourcesPath : process.cwd()
+    const scriptPath = path.join(base, 'scripts', 'artwork_fetch.py')
+    const run = (cmd) => {
+      const py = spawn(cmd, [scriptPath], { stdio: ['pipe', 'pipe', 'ignore'] })
+      let buf = ''
+      py.stdout.on('data', (d) => {
+        buf += d.toString()
+        let nl
+        while ((nl = buf.indexOf('\n')) >= 0) {
+          this.handle(buf.slice(0, nl))
+          buf = buf.slice(nl + 1)
+        }
+      })
+      py.on('error', () => {
+        if (this.proc !== py) return
+        this.proc = null
+        if (cmd === 'python') {
+          this.proc = run('py')
+          this.resend()
+        }
+      })
+      py.on('exit', () => { if (this.proc === py) this.proc = null })
+      py.stdin.on('error', () => {})
+      return py
+    }
+    this.proc = run('python')
+    // A fresh worker knows nothing of what was queued in the last one
+    this.resend()
+    return this.proc
+  }
+
+  send(msg) {
+    try { this.start().stdin.write(JSON.stringify(msg) + '\n') } catch {}
+  }
+
+  resend() {
+    for (const [key, { title, priority }] of this.pending) this.send({ op: 'want', key, title, priority })
+  }
+
+  handle(line) {
+    let ev
+    try { ev = JSON.parse(line) } catch { return }
+    if (ev.event !== 'artwork') return
+    this.pending.delete(ev.key)
+    this.background.delete(ev.key)
+    if (ev.imageUrl && /^(https?|file):/.test(ev.imageUrl)) {
+      this.images.set(ev.key, ev.imageUrl)
+      try { this.onResolved && this.onResolved({ key: ev.key, image: ev.imageUrl }) } catch {}
+    }
+  }
+
+  want(game, priority = 0) {
+    if (!game?.title || game.image || !FALLBACK_LAUNCHERS.has(game.launcher)) return
+    const key = this.keyOf(game)
+    if (this.images.has(key)) {
+      try { this.onResolved && this.onResolved({ key, image: this.images.get(key) }) } catch {}
+      return
+    }
+    const current = this.pending.get(key)
+    if (current && current.priority === priority && this.proc) return
+    this.pending.set(key, { title: game.title, priority })
+    // Starting a worker resends everything pending, this key included
+    if (this.proc) this.send({ op: 'want', key, title: game.title, priority })
+    else this.start()
+  }
+
+  // Card left the screen: fall back to its library-order slot, or drop it if it had none
+  cancel(key) {
+    if (!this.pending.has(key)) return
+    const bg = this.background.get(key)
+    if (bg !== undefined) {
+      this.pending.set(key, { ...this.pending.get(key), priority: bg })
+      this.send({ op: 'want', key, title: this.pending.get(key).title, priority: bg })
+      return
+    }
+    this.pending.delete(key)
+    this.send({ op: 'cancel', key })
+  }
+
+  // Attach artwork found earlier, and queue the rest top-down behind whatever is on screen
+  fill(games) {
+    // Cards still on screen keep their place at the front of the refilled queue
+    const onScreen = new Map()
+    for (const [key, { priority }] of this.pending) if (priority < BACKGROUND_PRIORITY) onScreen.set(key, priority)
+    if (this.proc) this.send({ op: 'clear' })
+    this.pending.clear()
+    this.background.clear()
+    const out = []
+    for (const g of games) {
+      const key = this.keyOf(g)
+      if (!g.image && this.images.has(key)) {
+        out.push({ ...g, image: this.images.get(key) })
+        continue
+      }
+      if (!g.image && FALLBACK_LAUNCHERS.has(g.launcher)) {
+        const priority = BACKGROUND_PRIORITY + out.length
+        this.background.set(key, priority)
+        this.want(g, onScreen.get(key) ?? priority)
+      }
+      out.push(g)
+    }
+    return out
+  }
+
+  // Drop queued lookups and let the worker exit once its running ones finish
+  stop() {
+    if (!this.proc) return
+    try { this.proc.stdin.end(JSON.stringify({ op: 'clear' }) + '\n') } catch {}
+    this.proc = null
+    this.pending.clear()
+  }
+}
@@ -0,0 +1,50 @@
+import path from 'node:path'
+import { spawn } from 'node:child_process'
+import { app } from 'electron'
+
+// Runs scripts/disk_usage.py: launcher-reported sizes first, cached parallel walks for the rest
+export class DiskUsageService {
+  constructor(userDataDir) {
+    this.cachePath = path.join(userDataDir || process.cwd(), 'disk_usage.json')
+    this.sizes = {}
+  }
+
+  // Resolves to { "launcher:id": { bytes, source } }; onEvent gets each progress/size event as it arrives
+  computeSizes(games, onEvent) {
+    const base = app && app.isPackaged ? process.resourcesPath : process.cwd()
+    const scriptPath = path.join(base, 'scripts', 'disk_usage.py')
+    const input = JSON.stringify((games || []).map((g) => ({
+      launcher: g.launcher, id: g.id, installDir: g.installDir || null, library: g.library || null, installSize: g.installSize || null
+    })))
+    const args = [scriptPath, '--games', '-', '--cache', this.cachePath, '--stream']
+    return new Promise((resolve) => {
+      const run = (cmd) => {
+        const py = spawn(cmd, args, { stdio: ['pipe', 'pipe', 'ignore'] })
+        let buf = ''
+        const handle = (line) => {
+          try {
+            const ev = JSON.parse(line)
+            if (ev.event === 'size') this.sizes[ev.key] = { bytes: ev.bytes, source: ev.source }
+            if (onEvent && (ev.event === 'size' || ev.event === 'progress')) onEvent(ev)
+          } catch {}
+        }
+        py.stdout.on('data', (d) => {
+          buf += d.toString()
+          let nl
+          while ((nl = buf.indexOf('\n')) >= 0) {
+            handle(buf.slice(0, nl))
+            buf = buf.slice(nl + 1)
+          }
+        })
+        py.on('error', () => {
+          if (cmd === 'python') return run('py')
+          return resolve({ ...this.sizes })
+        })
+        py.on('exit', () => resolve({ ...this.sizes }))
+        py.stdin.on('error', () => {})
+        py.stdin.end(input)
+      }
+      run('python')
+    })
+  }
+}
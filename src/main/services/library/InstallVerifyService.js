@@ -0,0 +1,42 @@
+import path from 'node:path'
+import fs from 'node:fs/promises'
+import { spawn } from 'node:child_process'
+import { app } from 'electron'
+
+// Runs scripts/verify_install.py against a per-game baseline kept under userData/verify
+export class InstallVerifyService {
+  constructor(userDataDir) {
+    this.dir = path.join(userDataDir || process.cwd(), 'verify')
+  }
+
+  manifestPath(game) {
+    const safe = `${game.launcher}_${game.id}`.replace(/[^\w.-]+/g, '_')
+    return path.join(this.dir, `${safe}.json`)
+  }
+
+  // First call records the baseline; later calls report changed / missing / extra files
+  async verify(game) {
+    if (!game?.installDir) return { ok: false, error: 'no installDir' }
+    const manifest = this.manifestPath(game)
+    let mode = 'verify'
+    try { await fs.access(manifest) } catch { mode = 'baseline' }
+    const base = app && app.isPackaged ? process.resourcesPath : process.cwd()
+    const scriptPath = path.join(base, 'scripts', 'verify_install.py')
+    const args = [scriptPath, mode, '--dir', game.installDir, '--manifest', manifest]
+    return await new Promise((resolve) => {
+      const run = (cmd) => {
+        const py = spawn(cmd, args, { stdio: ['ignore', 'pipe', 'ignore'] })
+        let out = ''
+        py.stdout.on('data', (d) => (out += d.toString()))
+        py.on('error', () => {
+          if (cmd === 'python') return run('py')
+          return resolve({ ok: false, error: 'python not available' })
+        })
+        py.on('exit', () => {
+          try { resolve(JSON.parse(out)) } catch { resolve({ ok: false, error: 'bad output' }) }
+        })
+      }
+      run('python')
+    })
+  }
+}
@@ -0,0 +1,138 @@
+import path from 'node:path'
+import { spawn } from 'node:child_process'
+import { app } from 'electron'
+
+// How long a search waits for the worker before the renderer falls back to plain filtering
+const QUERY_TIMEOUT_MS = 500
+// A first commit builds the whole index before the worker answers
+const CHANGES_TIMEOUT_MS = 5000
+
+// Keeps one scripts/library_index.py --serve worker holding the library's search index
+// and its versioned state (scripts/library_state.py), which the renderer refreshes from
+export class LibraryIndexService {
+  constructor() {
+    this.proc = null
+    this.games = null
+    this.committed = null
+    this.seq = 0
+    this.queries = new Map()
+  }
+
+  start() {
+    if (this.proc) return this.proc
+    const base = app && app.isPackaged ? process.resourcesPath : process.cwd()
+    const scriptPath = path.join(base, 'scripts', 'library_index.py')
+    const run = (cmd) => {
+      const py = spawn(cmd, [scriptPath, '--serve'], { stdio: ['pipe', 'pipe', 'ignore'] })
+      let buf = ''
+      py.stdout.on('data', (d) => {
+        buf += d.toString()
+        let nl
+        while ((nl = buf.indexOf('\n')) >= 0) {
+          this.handle(buf.slice(0, nl))
+          buf = buf.slice(nl + 1)
+        }
+      })
+      py.on('error', () => {
+        if (this.proc !== py) return
+        this.proc = null
+        if (cmd === 'python') {
+          this.proc = run('py')
+          this.replay()
+        } else {
+          this.failAll()
+        }
+      })
+      py.on('exit', () => {
+        if (this.proc !== py) return
+        this.proc = null
+        this.failAll()
+      })
+      py.stdin.on('error', () => {})
+      return py
+    }
+    this.proc = run('python')
+    this.replay()
+    return this.proc
+  }
+
+  // A fresh worker starts empty: hand it the library it should hold before any query
+  replay() {
+    const msg = this.committed ? { op: 'commit', games: this.committed } : this.games ? { op: 'sync', games: this.games } : null
+    if (msg) try { this.proc.stdin.write(JSON.stringify(msg) + '\n') } catch {}
+  }
+
+  send(msg) {
+    try { this.start().stdin.write(JSON.stringify(msg) + '\n') } catch {}
+  }
+
+  handle(line) {
+    let ev
+    try { ev = JSON.parse(line) } catch { return }
+    if (ev.event !== 'results' && ev.event !== 'changes') return
+    const q = this.queries.get(ev.id)
+    if (!q) return
+    this.queries.delete(ev.id)
+    clearTimeout(q.timer)
+    if (ev.event === 'results') return q.resolve(ev.keys || [])
+    const { event, id, ...delta } = ev
+    q.resolve(delta)
+  }
+
+  failAll() {
+    for (const q of this.queries.values()) {
+      clearTimeout(q.timer)
+      q.resolve(null)
+    }
+    this.queries.clear()
+  }
+
+  // Only the fields the index reads; the worker diffs them against what it already holds
+  sync(games) {
+    this.games = (games || []).map((g) => ({ launcher: g.launcher, id: g.id, title: g.title, installDir: g.installDir || null }))
+    // Starting a worker replays this state itself
+    if (this.proc) this.send({ op: 'sync', games: this.games })
+    else this.start()
+  }
+
+  // Syncs the index and records the full (decorated) games as the next library version
+  commit(games) {
+    this.committed = games || []
+    this.games = this.committed.map((g) => ({ launcher: g.launcher, id: g.id, title: g.title, installDir: g.installDir || null }))
+    // Starting a worker replays this state itself
+    if (this.proc) this.send({ op: 'commit', games: this.committed })
+    else this.start()
+  }
+
+  request(msg, timeoutMs = QUERY_TIMEOUT_MS) {
+    const id = ++this.seq
+    return new Promise((resolve) => {
+      const timer = setTimeout(() => {
+        this.queries.delete(id)
+        resolve(null)
+      }, timeoutMs)
+      this.queries.set(id, { resolve, timer })
+      this.send({ ...msg, id })
+    })
+  }
+
+  // Resolves to ranked "launcher:id" keys, or null when the index is unavailable
+  search(query, limit = 500) {
+    if (!this.games) return Promise.resolve(null)
+    return this.request({ op: 'query', q: String(query || ''), limit })
+  }
+
+  // Resolves to { version } when nothing changed after `version`, { version, added, changed, removed },
+  // or { version, full: true, games } for an unknown version; null when the worker is unavailable
+  changes(version) {
+    if (!this.committed) return Promise.resolve(null)
+    return this.request({ op: 'since', version: version ?? null }, CHANGES_TIMEOUT_MS)
+  }
+
+  stop() {
+    if (!this.proc) return
+    try { this.proc.stdin.end() } catch {}
+    this.proc = null
+    this.failAll()
+  }
+}
@@ -66,7 +66,12 @@ export class PlaytimeService {
     if (platform === 'win32') {
       baseStart = typeof entry.trackStart === 'number' ? entry.trackStart : null
     }
-    const durationMs = baseStart == null ? 0 : (Date.now() - baseStart)
+    const now = Date.now()
+    const durationMs = baseStart == null ? 0 : (now - baseStart)
+    // detectMs: launch to first PID match; exitDetectMs: last poll that saw the game alive to now
+    const timings = {}
+    if (platform === 'win32' && typeof entry.trackStart === 'number') timings.detectMs = entry.trackStart - entry.start
+    if (typeof entry.lastAliveAt === 'number') timings.exitDetectMs = now - entry.lastAliveAt
     this.running.delete(key)
     if (baseStart != null) {
       const seconds = Math.max(0, Math.floor(durationMs / 1000))
@@ -76,10 +81,10 @@ export class PlaytimeService {
     }
 
     try {
-      console.log('[PlaytimeDetector] session-ended', { title: game.title, durationMs, reason: reason || 'unknown' })
+      console.log('[PlaytimeDetector] session-ended', { title: game.title, durationMs, reason: reason || 'unknown', ...timings })
       const windows = BrowserWindow.getAllWindows()
       if (windows.length > 0) {
-        windows[0].webContents.send('game:session-ended', { game, durationMs, reason })
+        windows[0].webContents.send('game:session-ended', { game, durationMs, reason, timings })
       }
     } catch (e) {
       console.error('Failed to send session-ended:', e)
@@ -88,6 +93,8 @@ export class PlaytimeService {
 
   buildLaunchCommand(game) {
     if (game.launcher === 'steam') {
+      // Non-Steam shortcuts only launch through the protocol (-applaunch wants a real appid)
+      if (game.shortcut) return this.protocol(`steam://rungameid/${game.id}`)
       const steamExe = this.findSteamExe()
       if (steamExe) {
         return { command: steamExe, args: ['-applaunch', String(game.id)] }
@@ -279,6 +286,45 @@ export class PlaytimeService {
     })
   }
 
+  followLauncherEvents(source, appId, onChange) {
+    // Tails the launcher log for start/stop lines; the process table is then only used to confirm them
+    const base = app && app.isPackaged ? process.resourcesPath : process.cwd()
+    const scriptPath = path.join(base, 'scripts', 'launcher_events.py')
+    const statePath = path.join(path.dirname(this.storePath), 'launcher_events.json')
+    const args = [scriptPath, '--follow', '--source', source, '--state', statePath]
+    let child = null
+    let stopped = false
+    // The script reports the state left by the log's backlog first; only lines after it are live
+    let synced = false
+    const handle = (line) => {
+      try {
+        const ev = JSON.parse(line)
+        if (ev.event === 'running') {
+          synced = true
+          onChange((ev.running?.[source] || []).includes(appId))
+        } else if (synced && ev.launcher === source && String(ev.appId) === appId) onChange(ev.event === 'start')
+      } catch {}
+    }
+    const run = (cmd) => {
+      child = spawn(cmd, args, { stdio: ['ignore', 'pipe', 'ignore'] })
+      let buf = ''
+      child.stdout.on('data', (d) => {
+        buf += d.toString()
+        let nl
+        while ((nl = buf.indexOf('\n')) >= 0) {
+          handle(buf.slice(0, nl))
+          buf = buf.slice(nl + 1)
+        }
+      })
+      child.on('error', () => { if (cmd === 'python' && !stopped) run('py') })
+    }
+    run('python')
+    return () => {
+      stopped = true
+      try { child?.kill() } catch {}
+    }
+  }
+
   findSteamExe() {
     if (os.platform() !== 'win32') return null
     const programFilesX86 = process.env['ProgramFiles(x86)']
@@ -308,6 +354,16 @@ export class PlaytimeService {
     let lastMatchedAt = null
     let lastProcessLostLogSec = null
     let lastKnownMatch = null
+    // true/false once the launcher log has reported this app's state; null when unknown
+    let logRunning = null
+    let logSawRunning = false
+    const stopFollow = game.launcher === 'steam' && !game.shortcut
+      ? this.followLauncherEvents('steam', String(game.id), (running) => {
+        if (running !== logRunning) log('launcher log', { running })
+        logRunning = running
+        if (running) logSawRunning = true
+      })
+      : () => {}
 
     log('monitor start', {
       key,
@@ -360,7 +416,7 @@ export class PlaytimeService {
     }
 
     const poll = async () => {
-      if (!this.running.has(key)) return
+      if (!this.running.has(key)) return stopFollow()
       try {
         // Attempt initial seeding within a generous window to catch delayed spawns
         if (!seeded && (Date.now() - startTime) < seedWindowMs) {
@@ -402,11 +458,14 @@ export class PlaytimeService {
           vlog('alive(check)', { before: [...trackedPids], alive })
           trackedPids = new Set(alive)
           const entry = this.running.get(key)
-          if (entry) entry.pids = [...trackedPids]
+          if (entry) {
+            entry.pids = [...trackedPids]
+            if (alive.length > 0) entry.lastAliveAt = Date.now()
+          }
 
           
-        // Regular reacquire to catch new PIDs beyond initial seed window
-        if (seeded && trackedPids.size > 0) {
+        // Regular reacquire to catch new PIDs beyond initial seed window (not needed while the launcher log says running)
+        if (seeded && trackedPids.size > 0 && logRunning !== true) {
           const findFilters = JSON.stringify({
             executablePath: game.executablePath || '',
             installDir: game.installDir || '',
@@ -443,6 +502,11 @@ export class PlaytimeService {
         }
 if (seeded && trackedPids.size === 0) {
             // Possible handoff from launcher stub -> real game process. Try re-acquire within grace.
+            if (logRunning === false && logSawRunning) {
+              log('ending session: launcher log reports the app stopped')
+              this.finishSession(game, 'launcher-log-stopped')
+              return
+            }
             if (emptySinceTs == null) emptySinceTs = Date.now()
             const since = Date.now() - emptySinceTs
             const findFilters = JSON.stringify({
@@ -489,6 +553,11 @@ if (seeded && trackedPids.size === 0) {
           }
         } else if (seeded) {
           // Seeded but nothing alive. Try a quick re-acquire attempt before ending.
+          if (logRunning === false && logSawRunning) {
+            log('ending session: launcher log reports the app stopped')
+            this.finishSession(game, 'launcher-log-stopped')
+            return
+          }
           if (emptySinceTs == null) emptySinceTs = Date.now()
           const since = Date.now() - emptySinceTs
           const findFilters = JSON.stringify({
@@ -539,6 +608,7 @@ if (seeded && trackedPids.size === 0) {
         }
       } finally {
         if (this.running.has(key)) setTimeout(poll, 200)
+        else stopFollow()
       }
     }
     setTimeout(poll, 150)
@@ -1,4 +1,4 @@
-import React, { useEffect, useState } from 'react'
+import React, { useEffect, useRef, useState } from 'react'
 import { GameCard } from './GameCard'
 import { SessionOverlay } from './SessionOverlay'
 const sounds = {
@@ -41,6 +41,8 @@ export function App() {
   const [viewMode, setViewMode] = useState<'large' | 'small' | 'list'>('large')
   const [sortOrder, setSortOrder] = useState<'az' | 'za' | 'playtime-desc' | 'playtime-asc'>('az')
   const [query, setQuery] = useState('')
+  // Rank of each matching "launcher:id" from the main-process search index; null falls back to substring filtering
+  const [searchRank, setSearchRank] = useState<Map<string, number> | null>(null)
   const [modeAnim, setModeAnim] = useState(false)
   const [audioEnabled, setAudioEnabled] = useState(true)
   const [masterVolume, setMasterVolume] = useState(1)
@@ -48,19 +50,38 @@ export function App() {
   const [appVersion, setAppVersion] = useState<string | null>(null)
   const [theme, setTheme] = useState<string>('dark')
   const [showChangelog, setShowChangelog] = useState(false)
+  // Library version the games state reflects; refreshes only ship what changed since
+  const libraryVersion = useRef<number | null>(null)
+
+  async function refreshGames() {
+    const api = (window as any).electronAPI
+    if (!api?.getGameChanges) {
+      setGames(await api.listGames())
+      return
+    }
+    const delta = await api.getGameChanges(libraryVersion.current)
+    if (!delta) return
+    if (delta.full) setGames(delta.games || [])
+    else if (delta.added?.length || delta.changed?.length || delta.removed?.length) setGames((gs) => applyLibraryChanges(gs, delta))
+    libraryVersion.current = delta.version ?? null
+  }
   // Controller UI temporarily disabled
   useEffect(() => {
     // Controller detection temporarily disabled
     const api = (window as any).electronAPI
     if (api?.listGames) {
       setLoading(true)
-      api
-        .listGames()
-        .then(setGames)
+      refreshGames()
         .catch(() => setGames([]))
         .finally(() => setLoading(false))
     }
 
+    if (api?.onArtwork) {
+      api.onArtwork(({ key, image }: { key: string; image: string }) => {
+        setGames((gs) => gs.map((g) => (`${g.launcher}:${g.id}` === key && !(g as any).image ? ({ ...g, image } as Game) : g)))
+      })
+    }
+
     if (api?.onSessionStart) {
       api.onSessionStart((payload: any) => {
         console.log('Session started:', payload)
@@ -222,6 +243,22 @@ export function App() {
 
   // Removed global UI button hover sound
 
+  useEffect(() => {
+    const api = (window as any).electronAPI
+    const q = query.trim()
+    if (!q || !api?.searchGames) {
+      setSearchRank(null)
+      return
+    }
+    let stale = false
+    api.searchGames(q)
+      .then((keys: string[] | null) => {
+        if (!stale) setSearchRank(keys ? new Map(keys.map((k, i) => [k, i])) : null)
+      })
+      .catch(() => { if (!stale) setSearchRank(null) })
+    return () => { stale = true }
+  }, [query, games.length])
+
   const sortedGames = React.useMemo(() => {
     const byTitle = (a: Game, b: Game) =>
       (a.title || '').localeCompare(b.title || '', undefined, { sensitivity: 'base' })
@@ -237,6 +274,14 @@ export function App() {
       if (ap !== bp) return ap - bp
       return byTitle(a, b)
     }
+    if (query.trim().length > 0 && searchRank) {
+      const rank = (g: Game) => searchRank.get(`${g.launcher}:${g.id}`) ?? -1
+      const hits = games.filter((g) => rank(g) >= 0)
+      // Best matches first unless a playtime order was picked
+      if (sortOrder === 'playtime-desc') return hits.sort(byPlaytimeDesc)
+      if (sortOrder === 'playtime-asc') return hits.sort(byPlaytimeAsc)
+      return hits.sort((a, b) => rank(a) - rank(b))
+    }
     const filtered = query.trim().length > 0
       ? games.filter((g) => (g.title || '').toLowerCase().includes(query.trim().toLowerCase()))
       : games
@@ -245,7 +290,7 @@ export function App() {
     if (sortOrder === 'playtime-asc') return list.sort(byPlaytimeAsc)
     const titled = list.sort(byTitle)
     return sortOrder === 'az' ? titled : titled.reverse()
-  }, [games, sortOrder, query])
+  }, [games, sortOrder, query, searchRank])
 
   async function changeView(next: 'large' | 'small' | 'list') {
     setViewMode(next)
@@ -411,7 +456,7 @@ export function App() {
                 onSaved={async () => {
                   setLoading(true)
                   try {
-                    setGames(await (window as any).electronAPI.listGames())
+                    await refreshGames()
                   } finally {
                     setLoading(false)
                   }
@@ -497,6 +542,23 @@ function RecentsRow({ games, onLaunch, onOpen, audioEnabled, masterVolume, audio
   )
 }
 
+// Unchanged games keep their object identity so memoized cards skip re-rendering
+function applyLibraryChanges(games: Game[], delta: { added?: Game[]; changed?: Game[]; removed?: string[] }) {
+  const updates = new Map<string, Game>()
+  for (const g of [...(delta.changed || []), ...(delta.added || [])]) updates.set(`${g.launcher}:${g.id}`, g)
+  const removed = new Set(delta.removed || [])
+  const next: Game[] = []
+  for (const g of games) {
+    const key = `${g.launcher}:${g.id}`
+    if (removed.has(key)) continue
+    const u = updates.get(key)
+    if (u) updates.delete(key)
+    next.push(u || g)
+  }
+  for (const g of updates.values()) next.push(g)
+  return next
+}
+
 function onLaunch(
   game: Game,
   setStarting: (v: { game: Game }) => void,
@@ -1,4 +1,4 @@
-import React, { useState } from 'react'
+import React, { useEffect, useRef, useState } from 'react'
 import type { Game } from './App'
 import hoverSound from '../../sounds/hover.ogg'
 
@@ -12,9 +12,32 @@ type Props = {
   audioProfile?: 'normal' | 'alt'
 }
 
-export function GameCard({ game, onLaunch, onOpen, variant = 'large', audioEnabled = true, masterVolume = 1, audioProfile = 'normal' }: Props) {
+function GameCardView({ game, onLaunch, onOpen, variant = 'large', audioEnabled = true, masterVolume = 1, audioProfile = 'normal' }: Props) {
   const [hover, setHover] = useState(false)
   const [audioPlayed, setAudioPlayed] = useState(false)
+  const cardRef = useRef<HTMLDivElement>(null)
+  const hasImage = Boolean((game as any).image)
+
+  // Ask for missing artwork while the card is on screen; give the slot back when it scrolls away
+  useEffect(() => {
+    const api = (window as any).electronAPI
+    const el = cardRef.current
+    if (hasImage || !el || !api?.wantArtwork || typeof IntersectionObserver === 'undefined') return
+    const key = `${game.launcher}:${game.id}`
+    let visible = false
+    const observer = new IntersectionObserver((entries) => {
+      const now = entries.some((e) => e.isIntersecting)
+      if (now === visible) return
+      visible = now
+      if (now) api.wantArtwork([{ id: game.id, title: game.title, launcher: game.launcher }])
+      else api.cancelArtwork([key])
+    }, { rootMargin: '200px' })
+    observer.observe(el)
+    return () => {
+      observer.disconnect()
+      if (visible) api.cancelArtwork([key])
+    }
+  }, [game.launcher, game.id, game.title, hasImage])
 
   const handleMouseEnter = () => {
     setHover(true)
@@ -54,7 +77,7 @@ export function GameCard({ game, onLaunch, onOpen, variant = 'large', audioEnabl
 
   if (variant === 'list') {
     return (
-      <div className={`card list ${hover ? 'hover' : ''}`} onMouseEnter={handleMouseEnter} onMouseLeave={handleMouseLeave} onClick={handleOpen}>
+      <div ref={cardRef} className={`card list ${hover ? 'hover' : ''}`} onMouseEnter={handleMouseEnter} onMouseLeave={handleMouseLeave} onClick={handleOpen}>
         <div className="thumb" aria-hidden style={thumbStyle} />
         <div className="content">
           <div className="title-row">
@@ -68,7 +91,7 @@ export function GameCard({ game, onLaunch, onOpen, variant = 'large', audioEnabl
   }
 
   return (
-    <div className={`card ${variant} ${hover ? 'hover' : ''}`} onMouseEnter={handleMouseEnter} onMouseLeave={handleMouseLeave} onClick={handleOpen}>
+    <div ref={cardRef} className={`card ${variant} ${hover ? 'hover' : ''}`} onMouseEnter={handleMouseEnter} onMouseLeave={handleMouseLeave} onClick={handleOpen}>
       <div className="thumb" aria-hidden style={thumbStyle} />
       <div className="title-row"><div className="title">{game.title}</div>{metaInline}</div>
       {hover && (
@@ -96,4 +119,11 @@ function gameThumb(game: Game) {
   return 'linear-gradient(135deg, #2a2d35, #1f2127)'
 }
 
+// Callers pass fresh onLaunch/onOpen arrows each render that only close over `game` and the audio
+// settings, so comparing the data props is enough; a library refresh re-renders only changed cards
+function sameCard(a: Props, b: Props) {
+  return a.game === b.game && a.variant === b.variant && a.audioEnabled === b.audioEnabled &&
+    a.masterVolume === b.masterVolume && a.audioProfile === b.audioProfile
+}
 
+export const GameCard = React.memo(GameCardView, sameCard)
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPTS_DIR = os.path.join(ROOT, 'scripts')
+# scripts/ for the helpers, the repo root for benchmarks.fixtures
+for path in (SCRIPTS_DIR, ROOT):
+    if path not in sys.path:
+        sys.path.insert(0, path)
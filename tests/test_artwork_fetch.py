@@ -0,0 +1,177 @@
+import json
+
+import pytest
+
+import artwork_fetch
+from artwork_fetch import Cancelled, HostGate, Scheduler, TokenBucket
+
+FOUND = { 'imageUrl': 'https://cdn.example/a.jpg', 'source': 'cdn', 'steamAppId': 10 }
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() only moves the clock forward."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(round(seconds, 6))
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(artwork_fetch, 'time', fake)
+    return fake
+
+
+def _drain(sched):
+    sched.close()
+    out = []
+    while (job := sched.take()) is not None:
+        out.append(job)
+    return out
+
+
+def test_lower_priorities_run_first_in_request_order():
+    sched = Scheduler()
+    sched.want('epic:a', 'Alpha', 5)
+    sched.want('epic:b', 'Bravo', 1)
+    sched.want('epic:c', 'Charlie', 5)
+    sched.want('epic:d', 'Delta', 3)
+    assert [j.title for j in _drain(sched)] == ['Bravo', 'Delta', 'Alpha', 'Charlie']
+
+
+def test_wanting_a_key_again_moves_it():
+    sched = Scheduler()
+    sched.want('epic:a', 'Alpha', 1000)
+    sched.want('epic:b', 'Bravo', 1001)
+    sched.want('epic:b', 'Bravo', 0)          # scrolled into view
+    sched.want('epic:a', 'Alpha', 2000)       # moving back down works too
+    jobs = _drain(sched)
+    assert [j.title for j in jobs] == ['Bravo', 'Alpha']
+    assert jobs[1].priority == 2000
+
+
+def test_titles_normalizing_alike_share_one_lookup():
+    sched = Scheduler()
+    sched.want('epic:a', 'Half-Life 2', 10)
+    sched.want('ubisoft:b', 'half life 2™', 0)
+    (job,) = _drain(sched)
+    assert job.keys == {'epic:a', 'ubisoft:b'} and job.priority == 0
+    assert sched.stats['coalesced'] == 1
+    assert sched.finish(job, FOUND) == (['epic:a', 'ubisoft:b'], True)
+    # Finished titles are answered from memory
+    assert sched.want('epic:c', 'HALF-LIFE 2', 0) == FOUND
+    assert sched.stats['cached'] == 1 and not sched.heap
+
+
+def test_cancelling_every_key_drops_a_queued_lookup():
+    sched = Scheduler()
+    sched.want('epic:a', 'Alpha', 0)
+    sched.want('epic:b', 'Bravo', 1)
+    sched.want('ubisoft:b', 'Bravo', 1)
+    sched.cancel('epic:a')
+    sched.cancel('epic:b')                    # ubisoft:b still wants Bravo
+    (job,) = _drain(sched)
+    assert job.title == 'Bravo' and job.keys == {'ubisoft:b'}
+    assert sched.stats['cancelled'] == 1
+
+
+def test_clear_drops_everything_queued():
+    sched = Scheduler()
+    for i in range(3):
+        sched.want(f'epic:{i}', f'Game {i}', i)
+    sched.clear()
+    assert _drain(sched) == [] and sched.stats['cancelled'] == 3
+
+
+def test_cancelled_running_job_stops_at_its_next_request():
+    sched = Scheduler()
+    gate = HostGate({}, default=(1, 1000.0, 10))
+    sched.want('epic:a', 'Alpha', 0)
+    job = sched.take()
+    gate.local.job = job
+    with gate('store.steampowered.com'):
+        pass
+    sched.cancel('epic:a')
+    with pytest.raises(Cancelled):
+        with gate('store.steampowered.com'):
+            pass
+    assert sched.finish(job, None) == ([], True)
+    assert 'alpha' not in sched.results
+
+
+def test_rerequest_while_the_cancelled_job_still_runs():
+    sched = Scheduler()
+    sched.want('epic:a', 'Alpha', 0)
+    old = sched.take()
+    sched.cancel('epic:a')
+    sched.want('epic:a', 'Alpha', 0)
+    # The old lookup finishing must not take the new one's place, nor answer for it
+    assert sched.finish(old, None) == ([], False)
+    new = sched.take()
+    assert new is not old and new.keys == {'epic:a'}
+    assert sched.finish(new, FOUND) == (['epic:a'], True)
+
+
+def test_token_bucket_allows_a_burst_then_paces(clock):
+    bucket = TokenBucket(rate=2.0, burst=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == [0.5, 0.5]
+    clock.now += 10                           # idle time refills up to the burst only
+    for _ in range(3):
+        bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == [0.5, 0.5, 0.5]
+
+
+def test_host_gate_limits(clock):
+    gate = HostGate({ 'api.steampowered.com': (1, 0.5, 1) }, default=(2, 100.0, 100))
+    with gate('api.steampowered.com'):
+        sem, _bucket = gate._host('api.steampowered.com')
+        # One request in flight is the cap for this host
+        assert not sem.acquire(blocking=False)
+    with gate('api.steampowered.com'):
+        pass
+    assert clock.sleeps == [2.0]
+    # Hosts not listed get the default: two in flight, and their own bucket
+    with gate('example.com'), gate('example.com'):
+        sem, _bucket = gate._host('example.com')
+        assert not sem.acquire(blocking=False)
+    assert clock.sleeps == [2.0]
+
+
+def test_serve_answers_each_key_once_per_title(monkeypatch):
+    titles = []
+
+    def resolve(title, _steam_root):
+        titles.append(title)
+        return dict(FOUND)
+
+    monkeypatch.setattr(artwork_fetch.SteamApi_Search, 'resolve_thumbnail', resolve)
+    monkeypatch.setattr(artwork_fetch.SteamApi_Search, 'http_gate', None, raising=False)
+    monkeypatch.setattr(artwork_fetch.SteamApi_Search, 'applist_ttl', None, raising=False)
+    out = []
+    lines = [json.dumps(r) for r in (
+        { 'op': 'want', 'key': 'epic:a', 'title': 'Alpha', 'priority': 1 },
+        { 'op': 'want', 'key': 'ubisoft:a', 'title': 'alpha', 'priority': 0 },
+        { 'op': 'want', 'key': 'epic:b' },
+    )] + ['not json']
+    artwork_fetch.serve(lines, out.append, workers=1)
+    # ubisoft:a joins the running lookup or is answered from its result, whichever comes first
+    answers = sorted(e['key'] for e in out if e['event'] == 'artwork')
+    assert answers == ['epic:a', 'ubisoft:a'] and titles == ['Alpha']
+    assert any(e['event'] == 'idle' for e in out)
@@ -0,0 +1,57 @@
+import random
+import struct
+
+import pytest
+
+from benchmarks import fixtures
+from glhelpers import binary_vdf
+from glhelpers.binary_vdf import AppInfo, read_shortcuts
+
+APPIDS = [440, 570, 730]
+
+
+@pytest.mark.parametrize('version', [27, 28, 29])
+def test_appinfo_find_and_get_on_every_version(tmp_path, version):
+    path = fixtures.make_steam_appinfo(str(tmp_path), APPIDS, extra=5, version=version)
+    with AppInfo(path) as info:
+        assert info.version == version
+        assert len(info) == len(APPIDS) + 5 and 570 in info and 1 not in info
+        name = info.find(440, 'appinfo', 'common', 'name')
+        # The fixture draws the first title from Random(seed=9)
+        assert name == fixtures.game_title(random.Random(9), 0)
+        # Keys match case-insensitively; a missing path or app is None
+        assert info.find(440, 'AppInfo', 'Common', 'NAME') == name
+        assert info.find(440, 'appinfo', 'common', 'nope') is None
+        assert info.find(440, 'appinfo', 'common', 'name', 'deeper') is None
+        assert info.find(1, 'appinfo') is None and info.get(1) is None
+        tree = info.get('730')
+        assert tree['appinfo']['appid'] == 730
+        launch = tree['appinfo']['config']['launch']
+        assert launch['1']['config'] == { 'oslist': 'windows' }
+        assert launch['1']['executable'].endswith('.exe')
+
+
+def test_unknown_magic_is_rejected(tmp_path):
+    path = tmp_path / 'appinfo.vdf'
+    path.write_bytes(struct.pack('<II', 0x07564426, 1) + bytes(8))
+    with pytest.raises(ValueError, match='0x07564426'):
+        AppInfo(str(path))
+
+
+def test_read_shortcuts(tmp_path):
+    path = fixtures.make_steam_shortcuts(str(tmp_path), 3)
+    entries = read_shortcuts(path)
+    assert [e['AppName'] for e in entries] == ['Tool 0', 'Tool 1', 'Tool 2']
+    assert entries[0]['appid'] == -0x7FFF0000
+    assert read_shortcuts(str(tmp_path / 'missing.vdf')) == []
+    (tmp_path / 'junk.vdf').write_bytes(b'\x01')
+    assert read_shortcuts(str(tmp_path / 'junk.vdf')) == []
+
+
+def test_loads_wide_strings_and_fixed_types():
+    data = (b'\x05w\x00' + 'Ω!'.encode('utf-16-le') + b'\x00\x00'
+            + b'\x07big\x00' + struct.pack('<Q', 1 << 40)
+            + b'\x03f\x00' + struct.pack('<f', 1.5) + b'\x08')
+    assert binary_vdf.loads(data) == { 'w': 'Ω!', 'big': 1 << 40, 'f': 1.5 }
+    with pytest.raises(ValueError, match='unknown binary VDF type'):
+        binary_vdf.loads(b'\x09k\x00\x08')
@@ -0,0 +1,98 @@
+import struct
+
+import controller_db
+from controller_db import HEADER, RECORD, ControllerDB
+from gen_controller_db import build
+
+SEED = """\
+# comment lines and blank lines are skipped
+
+045E,*,Xbox,standard,xbox,Microsoft Controller
+045E,0B12,Xbox,standard,xbox,Xbox Series X|S Controller
+057E,2006,Nintendo,joycon-left,nintendo,Joy-Con (L)
+28DE,1205,Valve,handheld,xbox,Steam Deck
+"""
+
+
+def _db(tmp_path, data: bytes) -> ControllerDB:
+    path = tmp_path / 'controllers.bin'
+    path.write_bytes(data)
+    return ControllerDB(str(path))
+
+
+def _built(tmp_path) -> bytes:
+    src = tmp_path / 'seed.csv'
+    src.write_text(SEED, encoding='utf-8')
+    return build([str(src)])
+
+
+def test_build_then_lookup_round_trip(tmp_path):
+    db = _db(tmp_path, _built(tmp_path))
+    assert len(db) == 4
+    assert db.lookup('045E', '0B12') == {
+        'type': 'Xbox', 'layout': 'standard', 'buttonMap': 'xbox',
+        'model': 'Xbox Series X|S Controller', 'exact': True,
+    }
+    pad = db.lookup('057e', '2006')
+    assert pad['layout'] == 'joycon-left' and pad['buttonMap'] == 'nintendo' and pad['exact']
+    assert db.lookup('28DE', '1205')['model'] == 'Steam Deck'
+
+
+def test_unknown_product_falls_back_to_vendor_default(tmp_path):
+    db = _db(tmp_path, _built(tmp_path))
+    hit = db.lookup('045E', '07A5')
+    assert hit['model'] == 'Microsoft Controller' and hit['exact'] is False
+    assert db.lookup('045E')['exact'] is True
+
+
+def test_unknown_vendor_and_product(tmp_path):
+    db = _db(tmp_path, _built(tmp_path))
+    assert db.lookup('F00D', '0001') is None
+    # No vendor default for Nintendo in the seed, so an unknown pid misses outright
+    assert db.lookup('057E', '0001') is None
+    assert db.lookup('not-hex', '0001') is None
+
+
+def test_bad_magic_is_rejected(tmp_path):
+    data = bytearray(_built(tmp_path))
+    data[:4] = b'NOPE'
+    db = _db(tmp_path, bytes(data))
+    assert db.lookup('045E', '0B12') is None
+    assert len(db) == 0
+
+
+def test_truncated_table_is_rejected(tmp_path):
+    data = _built(tmp_path)
+    for size in (HEADER.size - 1, HEADER.size + 5, HEADER.size + 3 * RECORD.size):
+        db = _db(tmp_path, data[:size])
+        assert db.lookup('045E', '0B12') is None
+    # Cut inside the string section: the last record's name runs past the end
+    assert _db(tmp_path, data[:-1]).lookup('28DE', '1205') is None
+
+
+def test_header_count_beyond_records_is_rejected(tmp_path):
+    data = bytearray(_built(tmp_path))
+    magic, version, rec_size, count, strings = HEADER.unpack_from(data, 0)
+    struct.pack_into(HEADER.format, data, 0, magic, version, rec_size, count + 1000, strings)
+    assert _db(tmp_path, bytes(data)).lookup('045E', '0B12') is None
+
+
+def test_sdl_mappings_take_the_vendor_type(tmp_path):
+    src = tmp_path / 'seed.csv'
+    src.write_text(SEED, encoding='utf-8')
+    sdl = tmp_path / 'gamecontrollerdb.txt'
+    # 030000005e040000ff0b000000000000: USB, vid 045E, pid 0BFF (little-endian halves)
+    sdl.write_text('030000005e040000ff0b000000000000,Some Xbox Pad,a:b0,platform:Windows,\n', encoding='utf-8')
+    db = _db(tmp_path, build([str(src), str(sdl)]))
+    hit = db.lookup('045E', '0BFF')
+    assert hit['model'] == 'Some Xbox Pad' and hit['type'] == 'Xbox' and hit['exact']
+
+
+def test_shipped_table():
+    db = ControllerDB()
+    assert len(db) > 300
+    for vid, pid, typ in (('054C', '0CE6', 'PlayStation'), ('045E', '028E', 'Xbox'),
+                          ('057E', '2009', 'Nintendo'), ('0F0D', '0067', 'Xbox'),
+                          ('0E6F', '0185', 'Nintendo'), ('28DE', '11FF', 'Valve')):
+        hit = controller_db.lookup(vid, pid)
+        assert hit['type'] == typ and hit['exact'], (vid, pid)
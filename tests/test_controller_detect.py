@@ -0,0 +1,57 @@
+import os
+
+import controller_detect
+from controller_detect import _is_controller, _make_device, _symlink_to_instance
+
+GAMEPAD, KEYBOARD, MOUSE = (0x01, 0x05), (0x01, 0x06), (0x01, 0x02)
+
+
+def test_exact_table_hit_is_a_controller():
+    dev = _make_device('', 'HID\\VID_045E&PID_0B12&IG_00\\8&1A2B&0&0000')
+    assert dev['type'] == 'Xbox' and _is_controller(dev)
+
+
+def test_vendor_match_alone_is_not_a_controller():
+    # Microsoft keyboard, Razer mouse: vendors in the table, products not
+    for inst in ('HID\\VID_045E&PID_07A5&MI_00\\7&1&0&0000', 'HID\\VID_1532&PID_0084&MI_00\\7&2&0&0000'):
+        dev = _make_device('', inst)
+        assert not _is_controller(dev)
+        assert not _is_controller(dev, KEYBOARD) and not _is_controller(dev, MOUSE)
+
+
+def test_unknown_pad_with_gamepad_usage_is_a_controller():
+    dev = _make_device('', 'HID\\VID_F00D&PID_0001\\7&3&0&0000')
+    assert not _is_controller(dev) and _is_controller(dev, GAMEPAD)
+    assert _is_controller(dev, (0x01, 0x04))
+
+
+def test_symlink_to_instance():
+    link = '\\\\?\\HID#VID_054C&PID_0CE6&MI_03#8&1a2b&0&0000#{4d1e55b2-f16f-11cf-88cb-001111000030}'
+    assert _symlink_to_instance(link) == 'HID\\VID_054C&PID_0CE6&MI_03\\8&1A2B&0&0000'
+
+
+def _input_node(root, name, vid, pid, key_bits, title):
+    base = os.path.join(root, name)
+    os.makedirs(os.path.join(base, 'capabilities'))
+    os.makedirs(os.path.join(base, 'id'))
+    for rel, value in (('capabilities/key', key_bits), ('id/vendor', vid), ('id/product', pid),
+                       ('name', title), ('phys', f'usb-0000:00:14.0-{name}')):
+        with open(os.path.join(base, rel), 'w') as f:
+            f.write(value + '\n')
+
+
+def test_linux_lists_only_gamepad_capable_nodes(tmp_path):
+    root = str(tmp_path)
+    # BTN_GAMEPAD (0x130 = 4 * 64 + 48) is bit 48 of word 4, the fifth 64-bit word (sysfs lists the highest word first)
+    gamepad_bits = f'{1 << (0x130 - 256):x} 0 0 0 0'
+    _input_node(root, 'input3', '045e', '0b12', gamepad_bits, 'Xbox Wireless Controller')
+    _input_node(root, 'input4', '045e', '07a5', '0 0 0 fffffffffffffffe', 'Microsoft Keyboard')
+    devices = controller_detect._list_linux_devices(root)
+    assert [(d['vendorId'], d['productId']) for d in devices] == [('045E', '0B12')]
+
+
+def test_unknown_powera_and_hyperkin_pads_are_not_8bitdo():
+    for vid in ('20D6', '2E24'):
+        assert controller_detect._classify(vid, '9999', 'usb gamepad')[0] == 'Generic'
+        assert controller_detect._classify(vid, '9999', 'Xbox Controller')[0] == 'Xbox'
+    assert controller_detect._classify('2DC8', '9999', 'usb gamepad')[0] == '8BitDo'
@@ -0,0 +1,111 @@
+import os
+import stat
+from types import SimpleNamespace
+
+import disk_usage
+from glhelpers.stamp_cache import StampCache
+
+
+def _write(path, size):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'\0' * size)
+
+
+def _tree(root):
+    _write(os.path.join(root, 'game.exe'), 100)
+    _write(os.path.join(root, 'data', 'a.pak'), 1000)
+    _write(os.path.join(root, 'data', 'maps', 'm1.bin'), 10)
+    _write(os.path.join(root, 'data', 'maps', 'm2.bin'), 20)
+    _write(os.path.join(root, 'saves', 's.sav'), 5)
+    return root
+
+
+def test_unchanged_directories_are_reused(tmp_path):
+    root = _tree(str(tmp_path / 'g'))
+    cache = StampCache()
+    stats = {}
+    assert disk_usage.walk_sizes({ 'gog:1': root }, cache, stats=stats) == { 'gog:1': 1135 }
+    assert stats == { 'dirs': 4, 'listed': 4, 'reused': 0 }
+    stats = {}
+    assert disk_usage.walk_sizes({ 'gog:1': root }, cache, stats=stats) == { 'gog:1': 1135 }
+    assert stats == { 'dirs': 4, 'listed': 0, 'reused': 4 }
+
+
+def test_only_the_changed_directory_is_listed_again(tmp_path):
+    root = _tree(str(tmp_path / 'g'))
+    cache = StampCache()
+    disk_usage.walk_sizes({ 'gog:1': root }, cache)
+    maps = os.path.join(root, 'data', 'maps')
+    _write(os.path.join(maps, 'm3.bin'), 300)
+    st = os.stat(maps)
+    os.utime(maps, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    stats = {}
+    assert disk_usage.walk_sizes({ 'gog:1': root }, cache, stats=stats) == { 'gog:1': 1435 }
+    assert stats == { 'dirs': 4, 'listed': 1, 'reused': 3 }
+
+
+def test_removed_directories_leave_the_cache(tmp_path):
+    root = _tree(str(tmp_path / 'g'))
+    other = _tree(str(tmp_path / 'other'))
+    cache = StampCache()
+    disk_usage.walk_sizes({ 'gog:1': root, 'gog:2': other }, cache)
+    saves = os.path.join(root, 'saves')
+    os.remove(os.path.join(saves, 's.sav'))
+    os.rmdir(saves)
+    assert disk_usage.walk_sizes({ 'gog:1': root }, cache) == { 'gog:1': 1130 }
+    assert saves not in cache.entries
+    # Trees that were not walked this time keep their entries
+    assert os.path.join(other, 'saves') in cache.entries
+
+
+def test_symlinked_directories_are_not_followed(tmp_path):
+    root = _tree(str(tmp_path / 'g'))
+    elsewhere = _tree(str(tmp_path / 'elsewhere'))
+    os.symlink(elsewhere, os.path.join(root, 'linked'), target_is_directory=True)
+    assert disk_usage.walk_sizes({ 'gog:1': root }, StampCache()) == { 'gog:1': 1135 }
+
+
+def test_junctions_are_not_walked(tmp_path, monkeypatch):
+    root = _tree(str(tmp_path / 'g'))
+    # Before Python 3.12 a junction passes is_dir(follow_symlinks=False); stand one in for 'saves'
+    monkeypatch.setattr(disk_usage, '_is_reparse_point', lambda e: e.name == 'saves')
+    assert disk_usage.walk_sizes({ 'gog:1': root }, StampCache()) == { 'gog:1': 1130 }
+
+
+def test_reparse_point_attribute_is_checked():
+    def entry(attrs):
+        st = SimpleNamespace(st_file_attributes=attrs)
+        return SimpleNamespace(is_junction=lambda: False, stat=lambda follow_symlinks=True: st)
+    assert disk_usage._is_reparse_point(entry(stat.FILE_ATTRIBUTE_REPARSE_POINT | stat.FILE_ATTRIBUTE_DIRECTORY))
+    assert not disk_usage._is_reparse_point(entry(stat.FILE_ATTRIBUTE_DIRECTORY))
+    plain = SimpleNamespace(stat=lambda follow_symlinks=True: SimpleNamespace())
+    assert not disk_usage._is_reparse_point(plain)
+
+
+def test_launcher_then_manifest_sizes_take_precedence_over_a_scan(tmp_path):
+    root = _tree(str(tmp_path / 'g'))
+    library = str(tmp_path / 'steamapps')
+    os.makedirs(library)
+    with open(os.path.join(library, 'appmanifest_10.acf'), 'w', encoding='utf-8') as f:
+        f.write('"AppState"\n{\n\t"appid"\t\t"10"\n\t"SizeOnDisk"\t\t"777"\n}\n')
+    with open(os.path.join(library, 'appmanifest_11.acf'), 'w', encoding='utf-8') as f:
+        f.write('"AppState"\n{\n\t"SizeOnDisk"\t\t"0"\n}\n')
+    games = [
+        { 'launcher': 'steam', 'id': '10', 'installDir': root, 'library': library, 'installSize': 5 },
+        { 'launcher': 'steam', 'id': '10', 'installDir': root, 'library': library },   # same key: counted once
+        { 'launcher': 'epic', 'id': 'x', 'installDir': root, 'sizeOnDisk': 'bad' },
+        { 'launcher': 'steam', 'id': '11', 'installDir': root, 'library': library },
+        { 'launcher': 'steam', 'id': '12', 'installDir': root, 'library': library, 'installSize': 0 },
+        { 'launcher': 'gog', 'id': '9', 'installDir': str(tmp_path / 'missing') },
+    ]
+    out = disk_usage.compute_sizes(games, StampCache())
+    assert out['sizes'] == {
+        'steam:10': { 'bytes': 5, 'source': 'launcher' },
+        'epic:x': { 'bytes': 1135, 'source': 'scan' },
+        'steam:11': { 'bytes': 1135, 'source': 'scan' },
+        'steam:12': { 'bytes': 1135, 'source': 'scan' },
+    }
+    assert out['stats']['games'] == 5 and out['stats']['scanned'] == 3
+    del games[0]
+    assert disk_usage.compute_sizes(games[:1], StampCache())['sizes'] == { 'steam:10': { 'bytes': 777, 'source': 'manifest' } }
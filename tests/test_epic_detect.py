@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+
+import epic_detect
+from benchmarks import fixtures
+from glhelpers.stamp_cache import StampCache
+
+N = 30
+
+
+@pytest.fixture
+def library(tmp_path):
+    return fixtures.make_epic_manifests(str(tmp_path), N)
+
+
+def _expected_ids():
+    # fixtures: every tenth manifest is a DLC, every 25th is missing from the .dat
+    return {f'App{i:05d}' for i in range(N) if i % 10 != 9 and i % 25 != 24}
+
+
+def test_dlc_and_uninstalled_manifests_are_dropped(library):
+    manifests, dat = library
+    result = epic_detect.detect(manifests, dat)
+    games = result['games']
+    assert {g['id'] for g in games} == _expected_ids()
+    assert result['stats'] == { 'manifests': N, 'parsed': N, 'cached': 0, 'skipped': N - len(games) }
+    for g in games:
+        assert g['launcher'] == 'epic' and g['title']
+        assert g['executablePath'].startswith(g['installDir']) and g['executablePath'].endswith('.exe')
+        assert g['catalogItemId'] and g['catalogNamespace']
+
+
+def test_unreadable_dat_keeps_every_game_manifest(library, tmp_path):
+    manifests, _dat = library
+    games = epic_detect.detect(manifests, str(tmp_path / 'missing.dat'))['games']
+    assert {g['id'] for g in games} == {f'App{i:05d}' for i in range(N) if i % 10 != 9}
+
+
+def test_cache_reparses_only_changed_manifests(library, tmp_path):
+    manifests, dat = library
+    cache_path = str(tmp_path / 'epic.json')
+    epic_detect.detect(manifests, dat, cache_path)
+    warm = epic_detect.detect(manifests, dat, cache_path)
+    assert warm['stats']['parsed'] == 0 and warm['stats']['cached'] == N
+
+    for name in sorted(os.listdir(manifests)):
+        path = os.path.join(manifests, name)
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if data['AppName'] in _expected_ids():
+            break
+    data['DisplayName'] = 'Renamed In Place'
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    again = epic_detect.detect(manifests, dat, cache_path)
+    assert again['stats']['parsed'] == 1 and again['stats']['cached'] == N - 1
+    assert { g['id']: g['title'] for g in again['games'] }[data['AppName']] == 'Renamed In Place'
+
+
+def test_deleted_manifests_leave_the_cache(library):
+    manifests, dat = library
+    cache = StampCache()
+    epic_detect.scan_manifests(manifests, epic_detect.read_launcher_installed(dat), cache)
+    victim = os.path.join(manifests, sorted(os.listdir(manifests))[0])
+    os.remove(victim)
+    epic_detect.scan_manifests(manifests, None, cache)
+    assert victim not in cache.entries and len(cache.entries) == N - 1
+
+
+def test_install_dir_falls_back_to_the_dat(tmp_path):
+    manifests = tmp_path / 'Manifests'
+    manifests.mkdir()
+    (manifests / 'a.item').write_text(json.dumps({
+        'AppName': 'Fortnite', 'DisplayName': 'Fortnite', 'AppCategories': ['public', 'games'],
+        'LaunchExecutable': 'FortniteGame/Binaries/Win64/FortniteLauncher.exe',
+    }), encoding='utf-8')
+    (manifests / 'b.item').write_text(json.dumps({
+        'AppName': 'Half', 'DisplayName': 'Half Done', 'bIsIncompleteInstall': True,
+    }), encoding='utf-8')
+    (manifests / 'c.item').write_text(json.dumps({
+        'AppName': 'Plugin', 'AppCategories': ['plugins', 'engines'],
+    }), encoding='utf-8')
+    games, stats = epic_detect.scan_manifests(str(manifests), { 'Fortnite': str(tmp_path / 'Fortnite'), 'Half': '' })
+    assert [g['id'] for g in games] == ['Fortnite']
+    assert games[0]['installDir'] == os.path.normpath(str(tmp_path / 'Fortnite'))
+    assert games[0]['executablePath'] == os.path.normpath(
+        str(tmp_path / 'Fortnite' / 'FortniteGame' / 'Binaries' / 'Win64' / 'FortniteLauncher.exe'))
+    assert stats['skipped'] == 2
+    # With no install dir from either source there is no path to launch
+    for installed in ({ 'Fortnite': '' }, None):
+        (game,) = epic_detect.scan_manifests(str(manifests), installed)[0]
+        assert game['installDir'] is None and game['executablePath'] is None
+
+
+def test_stream_reports_each_game_once(library):
+    manifests, dat = library
+    seen = []
+    result = epic_detect.detect(manifests, dat, on_game=seen.append)
+    assert sorted(g['id'] for g in seen) == sorted(g['id'] for g in result['games'])
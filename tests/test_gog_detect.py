@@ -0,0 +1,79 @@
+import json
+import os
+
+import pytest
+
+import gog_detect
+from benchmarks import fixtures
+from glhelpers.registry import MemoryBackend
+
+N = 30
+BASE = 1_200_000_000
+GAMES_KEY = 'HKLM\\SOFTWARE\\WOW6432Node\\GOG.com\\Games'
+
+
+@pytest.fixture
+def library(tmp_path):
+    registry, games_root = fixtures.make_gog_library(str(tmp_path), N)
+    return MemoryBackend.from_json(registry), games_root
+
+
+def _ids(games):
+    return {int(g['id']) - BASE for g in games}
+
+
+def test_registry_games_skip_dlc(library):
+    backend, _games_root = library
+    result = gog_detect.detect([], backend)
+    # fixtures: every tenth game is offline-installed, every 15th is a DLC
+    assert _ids(result['games']) == {i for i in range(N) if i % 10 != 9 and i % 15 != 14}
+    registered = [i for i in range(N) if i % 10 != 9]
+    assert result['stats']['registry'] == len(registered)
+    assert result['stats']['skipped'] == len([i for i in registered if i % 15 == 14])
+    for g in result['games']:
+        assert g['launcher'] == 'gog' and g['title']
+        assert g['executablePath'].startswith(g['installDir']) and g['executablePath'].endswith('.exe')
+
+
+def test_roots_add_offline_installs_once(library):
+    backend, games_root = library
+    games = gog_detect.detect([games_root], backend)['games']
+    assert _ids(games) == {i for i in range(N) if i % 15 != 14}
+    assert len(games) == len({g['id'] for g in games})
+    offline = [g for g in games if (int(g['id']) - BASE) % 10 == 9]
+    assert offline
+    for g in offline:
+        # No registry entry: title and exe come from the .info's primary play task
+        assert g['executablePath'] == os.path.join(g['installDir'], 'bin', g['title'].replace(' ', '') + '.exe')
+
+
+def test_info_file_fills_what_the_registry_lacks(tmp_path):
+    install = tmp_path / 'Witcher'
+    (install / 'bin').mkdir(parents=True)
+    (install / 'goggame-1207664643.info').write_text(json.dumps({
+        'gameId': '1207664643', 'rootGameId': '1207664643', 'name': 'The Witcher',
+        'playTasks': [
+            { 'category': 'document', 'type': 'FileTask', 'path': 'manual.pdf' },
+            { 'isPrimary': True, 'type': 'FileTask', 'path': 'bin\\witcher.exe' },
+        ],
+    }), encoding='utf-8')
+    backend = MemoryBackend({ f'{GAMES_KEY}\\1207664643': { 'gameID': '1207664643', 'path': str(install) } })
+    (game,) = gog_detect.detect([], backend)['games']
+    assert game['title'] == 'The Witcher'
+    assert game['executablePath'] == os.path.join(str(install), 'bin', 'witcher.exe')
+
+
+def test_dlc_flagged_only_in_its_info_file_is_skipped(tmp_path):
+    install = tmp_path / 'Expansion'
+    install.mkdir()
+    (install / 'goggame-2.info').write_text(json.dumps({ 'gameId': '2', 'rootGameId': '1', 'name': 'Expansion' }),
+                                            encoding='utf-8')
+    backend = MemoryBackend({ f'{GAMES_KEY}\\2': { 'gameID': '2', 'gameName': 'Expansion', 'path': str(install) } })
+    result = gog_detect.detect([str(tmp_path)], backend)
+    assert result['games'] == [] and result['stats']['skipped'] == 1
+
+
+def test_registry_entry_without_install_dir_is_skipped(tmp_path):
+    backend = MemoryBackend({ f'{GAMES_KEY}\\3': { 'gameID': '3', 'gameName': 'Gone', 'path': str(tmp_path / 'nope') } })
+    result = gog_detect.detect([], backend)
+    assert result['games'] == [] and result['stats'] == { 'registry': 1, 'infoFiles': 0, 'skipped': 1 }
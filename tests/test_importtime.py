@@ -0,0 +1,23 @@
+import os
+
+import pytest
+
+from benchmarks.importtime import LAZY_ONLY, helper_modules, measure
+
+# Per-module median cumulative import time; GL_IMPORT_BUDGET_MS loosens it on slow machines
+BUDGET_MS = float(os.environ.get('GL_IMPORT_BUDGET_MS') or 40.0)
+
+
+def test_every_helper_is_checked():
+    modules = helper_modules()
+    for name in ('library_store', 'session_journal', 'library_state', 'controller_db', 'glhelpers.metrics'):
+        assert name in modules
+    assert 'build_pybundle' not in modules and 'gen_controller_db' not in modules
+
+
+@pytest.mark.parametrize('module', helper_modules())
+def test_import_stays_lean(module):
+    us, loaded = measure(module, 3)
+    eager = sorted(m for m in LAZY_ONLY if m in loaded)
+    assert not eager, f'{module} imports {", ".join(eager)} at module level'
+    assert us / 1000.0 <= BUDGET_MS, f'{module} took {us / 1000.0:.1f} ms to import (budget {BUDGET_MS} ms)'
@@ -0,0 +1,150 @@
+import json
+import os
+
+import launcher_events
+from launcher_events import LogTail, load_state, make_tails, save_state
+
+
+def _append(path, *lines, end='\n'):
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('\n'.join(lines) + end)
+
+
+def _steam(second, appid, running):
+    state = 'Fully Installed,App Running,' if running else 'Fully Installed,'
+    return f'[2024-05-01 20:15:{second:02d}] AppID {appid} state changed : {state}'
+
+
+def test_prime_learns_what_is_running_without_events(tmp_path):
+    log = str(tmp_path / 'content_log.txt')
+    _append(log, _steam(0, 440, True), _steam(1, 570, True), _steam(2, 570, False))
+    tail = LogTail('steam', log)
+    assert tail.read() == []
+    assert tail.running == {'440'}
+
+
+def test_lines_appended_while_following(tmp_path):
+    log = str(tmp_path / 'content_log.txt')
+    _append(log, _steam(0, 440, True))
+    tail = LogTail('steam', log)
+    tail.read()
+
+    _append(log, 'noise without the marker', _steam(5, 440, True), _steam(6, 730, True))
+    assert tail.read() == [{ 'event': 'start', 'launcher': 'steam', 'appId': '730', 'logTime': '2024-05-01 20:15:06' }]
+
+    # A half-written line waits for its newline
+    _append(log, _steam(7, 730, False)[:20], end='')
+    assert tail.read() == []
+    _append(log, _steam(7, 730, False)[20:])
+    assert [(e['event'], e['appId']) for e in tail.read()] == [('stop', '730')]
+    assert tail.running == {'440'} and tail.offset == os.path.getsize(log)
+
+
+def test_rotated_log_is_finished_before_the_new_one(tmp_path):
+    log = str(tmp_path / 'content_log.txt')
+    _append(log, _steam(0, 440, True))
+    tail = LogTail('steam', log)
+    tail.read()
+    _append(log, _steam(1, 440, False))
+    os.replace(log, str(tmp_path / 'content_log.previous.txt'))
+    _append(log, _steam(2, 570, True))
+    assert [(e['event'], e['appId']) for e in tail.read()] == [('stop', '440'), ('start', '570')]
+
+
+def test_log_rewritten_in_place_is_read_from_the_start(tmp_path):
+    log = str(tmp_path / 'content_log.txt')
+    _append(log, _steam(0, 440, True), _steam(1, 440, False), _steam(2, 440, True))
+    tail = LogTail('steam', log)
+    tail.read()
+    with open(log, 'w', encoding='utf-8') as f:
+        f.write(_steam(9, 570, True) + '\n')
+    assert [(e['event'], e['appId']) for e in tail.read()] == [('start', '570')]
+
+
+def test_state_resumes_only_for_the_same_file(tmp_path):
+    log = str(tmp_path / 'content_log.txt')
+    state_path = str(tmp_path / 'events.json')
+    _append(log, _steam(0, 440, True))
+    tails = make_tails({ 'steam': log }, {})
+    tails[0].read()
+    save_state(state_path, tails)
+
+    _append(log, _steam(1, 440, False))
+    (resumed,) = make_tails({ 'steam': log }, load_state(state_path))
+    assert [(e['event'], e['appId']) for e in resumed.read()] == [('stop', '440')]
+
+    (other,) = make_tails({ 'steam': str(tmp_path / 'other.txt') }, load_state(state_path))
+    assert other.offset is None and not other.running
+
+
+def test_epic_and_ubisoft_rules(tmp_path):
+    epic = str(tmp_path / 'EpicGamesLauncher.log')
+    ubi = str(tmp_path / 'launcher_log.txt')
+    _append(epic, '[2024.05.01-20.00.00:000][  0]LogInit: started')
+    _append(ubi, 'launcher ready')
+    tails = [LogTail('epic', epic), LogTail('ubisoft', ubi)]
+    for t in tails:
+        t.read()
+    _append(epic, "[2024.05.01-20.15.02:123][  1]LogLaunch: Display: Launching app 'Fortnite'",
+            "[2024.05.01-20.45.10:456][  2]LogLaunch: Display: app 'Fortnite' exited")
+    _append(ubi, '[20:15:02] Game launched: 635', '[20:40:00] Game closed: 635')
+    assert tails[0].read() == [
+        { 'event': 'start', 'launcher': 'epic', 'appId': 'Fortnite', 'logTime': '2024.05.01-20.15.02' },
+        { 'event': 'stop', 'launcher': 'epic', 'appId': 'Fortnite', 'logTime': '2024.05.01-20.45.10' },
+    ]
+    assert tails[1].read() == [
+        { 'event': 'start', 'launcher': 'ubisoft', 'appId': '635' },
+        { 'event': 'stop', 'launcher': 'ubisoft', 'appId': '635' },
+    ]
+
+
+def test_cli_reports_events_since_the_saved_state(tmp_path, capsys):
+    log = str(tmp_path / 'content_log.txt')
+    state = str(tmp_path / 'events.json')
+    _append(log, _steam(0, 440, True))
+    argv = ['--source', f'steam={log}', '--state', state]
+    assert launcher_events.main(argv) == 0
+    first = json.loads(capsys.readouterr().out)
+    assert first['events'] == [] and first['running'] == { 'steam': ['440'] }
+
+    _append(log, _steam(1, 440, False))
+    assert launcher_events.main(argv) == 0
+    second = json.loads(capsys.readouterr().out)
+    assert [e['event'] for e in second['events']] == ['stop'] and second['running'] == { 'steam': [] }
+
+
+def test_follow_skips_the_backlog_and_reports_running_first(tmp_path, monkeypatch, capsys):
+    log = str(tmp_path / 'content_log.txt')
+    state = str(tmp_path / 'events.json')
+    _append(log, _steam(0, 570, True))
+    argv = ['--source', f'steam={log}', '--state', state]
+    launcher_events.main(argv)
+    capsys.readouterr()
+
+    # An earlier session came and went while nobody was following
+    _append(log, _steam(1, 440, True), _steam(2, 440, False), _steam(3, 570, False))
+    ticks = iter([lambda: _append(log, _steam(9, 440, True)), None])
+
+    def sleep(_seconds):
+        step = next(ticks)
+        if step is None:
+            raise KeyboardInterrupt
+        step()
+
+    monkeypatch.setattr(launcher_events.time, 'sleep', sleep)
+    assert launcher_events.main(argv + ['--follow']) == 0
+    lines = [json.loads(l) for l in capsys.readouterr().out.splitlines()]
+    assert lines == [
+        { 'event': 'running', 'running': { 'steam': [] } },
+        { 'event': 'start', 'launcher': 'steam', 'appId': '440', 'logTime': '2024-05-01 20:15:09' },
+    ]
+
+
+def test_quiet_read_updates_running_only(tmp_path):
+    log = str(tmp_path / 'content_log.txt')
+    _append(log, _steam(0, 440, True))
+    tail = LogTail('steam', log)
+    tail.read()
+    _append(log, _steam(1, 440, False), _steam(2, 730, True))
+    assert tail.read(report=False) == []
+    assert tail.running == {'730'} and tail.offset == os.path.getsize(log)
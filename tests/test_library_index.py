@@ -0,0 +1,144 @@
+import json
+
+import library_index
+from library_index import LibraryIndex, trigrams
+
+
+def _game(gid, title, launcher='steam', **extra):
+    return { 'id': gid, 'launcher': launcher, 'title': title, **extra }
+
+
+LIBRARY = [
+    _game('271590', 'Grand Theft Auto V', installDir='C:\\Games\\GTAV'),
+    _game('730', 'Counter-Strike 2'),
+    _game('292030', 'The Witcher 3: Wild Hunt'),
+    _game('Fortnite', 'Fortnite', launcher='epic'),
+    _game('Sugar', 'Rocket League', launcher='epic'),
+    _game('Microsoft.MinecraftUWP_8wekyb3d8bbwe', 'Minecraft for Windows', launcher='xbox'),
+    _game('1', 'Star Forge', launcher='gog', installDir='D:\\GOG\\StarForge_Win64'),
+    _game('2', 'Extraordinarilylongtitle Adventures', launcher='gog'),
+]
+
+
+def _index(games=LIBRARY):
+    index = LibraryIndex()
+    index.sync(games)
+    return index
+
+
+def _keys(index, query, limit=50):
+    return [k for k, _ in index.search(query, limit)]
+
+
+def test_sync_counts_and_removals():
+    index = LibraryIndex()
+    assert index.sync(LIBRARY) == { 'added': len(LIBRARY), 'updated': 0, 'removed': 0 }
+    assert index.sync(LIBRARY) == { 'added': 0, 'updated': 0, 'removed': 0 }
+    renamed = [_game('730', 'Counter-Strike 2 Beta')] + LIBRARY[2:] + [_game('9', 'New Game'), { 'id': '', 'launcher': 'x' }]
+    assert index.sync(renamed) == { 'added': 1, 'updated': 1, 'removed': 1 }
+    assert len(index) == len(LIBRARY)
+    assert _keys(index, 'grand theft') == [] and _keys(index, 'beta') == ['steam:730']
+
+
+def test_freed_doc_slots_are_reused():
+    index = _index()
+    slot = index.docs['epic:Fortnite']
+    index.remove('epic:Fortnite')
+    assert index.keys[slot] is None and index.free == [slot]
+    index.add(_game('3', 'Another Game', launcher='gog'))
+    assert index.docs['gog:3'] == slot and len(index.keys) == len(LIBRARY) and not index.free
+
+
+def test_remove_cleans_postings_prefixes_and_trigrams():
+    index = _index([_game('1', 'Zyxquor'), _game('2', 'Zyxquor Two')])
+    gone = index.docs['steam:1']
+    index.remove('steam:1')
+    assert list(index.words['zyxquor']) == [index.docs['steam:2']]
+    assert all(gone not in postings for postings in index.prefixes.values())
+    assert index.vocab['zyxquor'] == 1 and 'zyxquor' in index.grams['zyx']
+    index.remove('steam:2')
+    assert 'zyxquor' not in index.words and 'zyx' not in index.prefixes and 'zyxquor' not in index.vocab
+    assert not any('zyxquor' in words for words in index.grams.values())
+    assert not any(t in index.grams for t in trigrams('zyxquor'))
+    assert index.words == {} and index.prefixes == {} and index.grams == {}
+
+
+def test_last_word_matches_as_a_prefix():
+    index = _index()
+    assert _keys(index, 'fortn') == ['epic:Fortnite']
+    assert _keys(index, 'witcher wi')[0] == 'steam:292030'
+    # Only the word being typed is a prefix: an earlier partial word has to match in full (or as a typo)
+    assert _keys(index, 'ro league') == []
+
+
+def test_prefixes_longer_than_max_prefix_use_the_vocabulary():
+    index = _index()
+    word = 'extraordinarilylong'
+    assert len(word) > library_index.MAX_PREFIX
+    assert word[:library_index.MAX_PREFIX + 1] not in index.prefixes
+    assert _keys(index, word) == ['gog:2']
+    assert _keys(index, 'adventures ' + word) == ['gog:2']
+
+
+def test_roman_numerals_initials_and_aliases():
+    index = _index()
+    assert _keys(index, 'gta 5')[0] == 'steam:271590'
+    assert _keys(index, 'gta')[0] == 'steam:271590'
+    assert _keys(index, 'cs2') == ['steam:730']
+    assert _keys(index, 'witcher iii')[0] == 'steam:292030'
+    assert _keys(index, 'sugar') == ['epic:Sugar']                 # Epic AppName
+    assert _keys(index, 'minecraft uwp')[0] == 'xbox:Microsoft.MinecraftUWP_8wekyb3d8bbwe'
+    assert _keys(index, '271590') == ['steam:271590']              # store id
+    assert _keys(index, 'starforge') == ['gog:1']                  # joined title
+    assert _keys(index, 'win 64') == ['gog:1']                     # install folder
+
+
+def test_title_hits_outrank_folder_hits():
+    index = _index([_game('1', 'Hollow Sky'), _game('2', 'Other', installDir='C:\\Games\\Hollow')])
+    assert _keys(index, 'hollow') == ['steam:1', 'steam:2']
+
+
+def test_typos_above_the_similarity_floor_match():
+    index = _index()
+    assert _keys(index, 'witchr') == ['steam:292030']
+    assert _keys(index, 'minecarft windows')[0] == 'xbox:Microsoft.MinecraftUWP_8wekyb3d8bbwe'
+
+
+def test_typos_below_the_similarity_floor_do_not(monkeypatch):
+    index = _index()
+    word = 'forxqzwv'
+    sim = 2.0 * len(trigrams(word) & trigrams('fortnite')) / (len(trigrams(word)) + len('fortnite'))
+    assert 0 < sim < library_index.MIN_SIMILARITY
+    assert _keys(index, word) == []
+    monkeypatch.setattr(library_index, 'MIN_SIMILARITY', sim)
+    assert 'epic:Fortnite' in _keys(index, word)
+
+
+def test_stopwords_are_optional_unless_the_query_is_only_stopwords():
+    index = _index(LIBRARY + [_game('5', 'The Of')])
+    assert _keys(index, 'the witcher')[0] == 'steam:292030'
+    assert _keys(index, 'the counter strike') == ['steam:730']
+    assert _keys(index, 'the of') == ['steam:5']
+    assert _keys(index, '   ') == [] and _keys(index, '!!') == []
+
+
+def test_serve_ops():
+    out = []
+    lines = [json.dumps(r) for r in (
+        { 'op': 'sync', 'games': LIBRARY[:3] },
+        { 'op': 'upsert', 'games': [LIBRARY[3], _game('730', 'Counter-Strike 2', installDir='C:\\cs2')] },
+        { 'op': 'query', 'id': 7, 'q': 'fortnite', 'limit': 'x' },
+        { 'op': 'remove', 'keys': ['epic:Fortnite', 'epic:missing'] },
+        { 'op': 'commit', 'games': LIBRARY[:2] },
+        { 'op': 'since', 'id': 8, 'version': 0 },
+        { 'op': 'unknown' },
+    )] + ['not json', '[1]']
+    index = library_index.serve(lines, out.append)
+    events = [e['event'] for e in out]
+    assert events == ['synced', 'synced', 'results', 'synced', 'committed', 'changes']
+    assert out[0] == { 'event': 'synced', 'added': 3, 'updated': 0, 'removed': 0, 'size': 3 }
+    assert out[1] == { 'event': 'synced', 'added': 1, 'updated': 1, 'size': 4 }
+    assert out[2]['id'] == 7 and out[2]['keys'] == ['epic:Fortnite'] and len(out[2]['scores']) == 1
+    assert out[3]['removed'] == 1 and out[3]['size'] == 3
+    assert out[4]['added'] == 2 and out[4]['size'] == 2 and len(index) == 2
+    assert out[5]['id'] == 8 and out[5]['full'] and len(out[5]['games']) == 2
@@ -0,0 +1,124 @@
+import json
+
+import library_state
+from library_state import LibraryState
+
+
+def _game(i, **extra):
+    return { 'id': str(i), 'launcher': 'steam', 'title': f'Game {i}', **extra }
+
+
+def _keys(games):
+    return sorted(library_state.game_key(g) for g in games)
+
+
+def test_noop_commit_keeps_the_version():
+    state = LibraryState(1000)
+    games = [_game(i) for i in range(5)]
+    assert state.commit(games) == { 'version': 1001, 'added': 5, 'changed': 0, 'removed': 0, 'size': 5 }
+    # Equal content under a fresh dict (and a different key order) is not a change
+    again = [dict(reversed(list(g.items()))) for g in games]
+    assert state.commit(again)['version'] == 1001
+    assert state.since(1001) == { 'version': 1001 }
+
+
+def test_since_reports_add_change_remove():
+    state = LibraryState(1000)
+    state.commit([_game(i) for i in range(5)])
+    v1 = state.version
+    state.commit([_game(0, playtimeMinutes=30)] + [_game(i) for i in range(1, 4)] + [_game(9)])
+    delta = state.since(v1)
+    assert _keys(delta['added']) == ['steam:9']
+    assert _keys(delta['changed']) == ['steam:0']
+    assert delta['removed'] == ['steam:4']
+    assert delta['version'] == state.version == v1 + 1
+
+
+def test_remove_then_readd_across_versions():
+    state = LibraryState(1000)
+    state.commit([_game(1), _game(2)])
+    v1 = state.version
+    state.commit([_game(1)])
+    v2 = state.version
+    state.commit([_game(1), _game(2, title='Game 2 Remastered')])
+
+    # Seen before the removal: the game comes back as a change, not a removal
+    from_v1 = state.since(v1)
+    assert _keys(from_v1['changed']) == ['steam:2'] and not from_v1['removed'] and not from_v1['added']
+    # Seen only after the removal: it is new
+    from_v2 = state.since(v2)
+    assert _keys(from_v2['added']) == ['steam:2'] and not from_v2['removed']
+    assert from_v2['added'][0]['title'] == 'Game 2 Remastered'
+
+
+def test_removed_again_after_a_readd_reaches_an_old_client():
+    state = LibraryState(1000)
+    state.commit([_game(1), _game(2)])
+    v1 = state.version
+    state.commit([_game(1)])
+    state.commit([_game(1), _game(2)])
+    state.commit([_game(1)])
+    assert state.since(v1)['removed'] == ['steam:2']
+    # A client that never saw game 2 gets nothing for it
+    assert state.since(v1 + 1) == { 'version': state.version, 'added': [], 'changed': [], 'removed': [] }
+
+
+def test_added_and_dropped_between_polls_never_reaches_the_client():
+    state = LibraryState(1000)
+    state.commit([_game(1)])
+    v1 = state.version
+    state.commit([_game(1), _game(2)])
+    state.commit([_game(1)])
+    assert state.since(v1) == { 'version': state.version, 'added': [], 'changed': [], 'removed': [] }
+
+
+def test_unknown_versions_get_the_full_list():
+    state = LibraryState(1000)
+    state.commit([_game(1), _game(2)])
+    for stale in (0, 999, state.version + 5, 'junk', None):
+        out = state.since(stale)
+        assert out['full'] and _keys(out['games']) == ['steam:1', 'steam:2']
+
+
+def test_invalid_games_are_ignored():
+    state = LibraryState(1000)
+    out = state.commit([_game(1), { 'id': '', 'launcher': 'steam' }, { 'id': '3' }, 'nope', None])
+    assert out['size'] == 1 and len(state) == 1
+
+
+def test_trimming_moves_the_floor_on_a_version_boundary(monkeypatch):
+    monkeypatch.setattr(library_state, 'MAX_LOG', 10)
+    state = LibraryState(1000)
+    state.commit([_game(i) for i in range(6)])           # 1001: six entries
+    v1 = state.version
+    state.commit([_game(i) for i in range(4)])           # 1002: two removals
+    v2 = state.version
+    state.commit([_game(i, n=1) for i in range(4)])      # 1003: four changes -> 12 entries, trimmed
+    assert len(state.log_keys) <= 10
+    # The whole of version 1001 went; a client at 1001 can still get a delta, one before it cannot
+    assert state.floor == v1
+    assert state.since(v1 - 1)['full']
+    delta = state.since(v1)
+    assert delta['removed'] == ['steam:4', 'steam:5'] and len(delta['changed']) == 4
+    assert not state.since(v2)['removed']
+    # Removal records older than the floor are dropped with the log
+    state.commit([_game(i, n=2) for i in range(4)] + [_game(7)])   # 1004: five more -> 1002 trimmed too
+    assert state.floor == v2 and state.gone == {}
+    assert state.since(v1)['full']
+
+
+def test_json_round_trip_and_cli(tmp_path, monkeypatch, capsys):
+    state = LibraryState(1000)
+    state.commit([_game(1), _game(2)])
+    v1 = state.version
+    state.commit([_game(1)])
+    restored = LibraryState.from_json(json.loads(json.dumps(state.to_json())))
+    assert restored.since(v1) == state.since(v1) and restored.version == state.version
+
+    path = str(tmp_path / 'state.json')
+    monkeypatch.setattr('sys.stdin', __import__('io').StringIO(json.dumps({ 'games': [_game(1), _game(2)] })))
+    assert library_state.main(['--state', path, 'commit']) == 0
+    committed = json.loads(capsys.readouterr().out)
+    assert committed['ok'] and committed['added'] == 2
+    assert library_state.main(['--state', path, 'since', '--version', str(committed['version'])]) == 0
+    assert json.loads(capsys.readouterr().out) == { 'ok': True, 'version': committed['version'] }
@@ -0,0 +1,33 @@
+from library_store import LibraryStore
+
+GAMES = [
+    {'id': '620', 'title': 'Portal 2', 'installDir': 'D:\\Steam\\common\\Portal 2'},
+    {'id': '730', 'title': 'Counter-Strike 2', 'installDir': 'E:\\Steam\\common\\CS2'},
+]
+
+
+def test_replace_keeps_playtime_of_missing_games(tmp_path):
+    with LibraryStore(str(tmp_path / 'library.db')) as store:
+        store.upsert_games('steam', GAMES)
+        store.record_session('steam', '730', 1000.0, 4600.0)
+        store.record_session('steam', '620', 1000.0, 1600.0)
+
+        # Drive E: is unmounted for one scan
+        assert store.upsert_games('steam', GAMES[:1], replace=True)['removed'] == 1
+        assert [g['id'] for g in store.games()] == ['620']
+        top = store.most_played(1)[0]
+        assert top['id'] == '730' and top['playtimeSeconds'] == 3600 and top['installed'] is False
+
+        # ...and back for the next one
+        result = store.upsert_games('steam', GAMES, replace=True)
+        assert result == {'added': 0, 'changed': 1, 'removed': 0}
+        cs2 = next(g for g in store.games() if g['id'] == '730')
+        assert cs2['installed'] is True and cs2['playtimeSeconds'] == 3600
+
+
+def test_unchanged_upsert_writes_nothing(tmp_path):
+    with LibraryStore(str(tmp_path / 'library.db')) as store:
+        store.upsert_games('steam', GAMES)
+        assert store.upsert_games('steam', GAMES, replace=True) == {'added': 0, 'changed': 0, 'removed': 0}
+        assert len(store.games('steam', include_uninstalled=True)) == 2
+
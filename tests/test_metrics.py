@@ -0,0 +1,120 @@
+import json
+
+import pytest
+
+from glhelpers import metrics
+
+
+@pytest.fixture(autouse=True)
+def _reset():
+    yield
+    metrics.disable()
+    metrics._path = None
+
+
+def scrape(text):
+    """Parse Prometheus text the way a scraper would: {series: value}, plus {name: type}."""
+    samples, types = {}, {}
+    for line in text.splitlines():
+        if line.startswith('# TYPE '):
+            _, _, name, kind = line.split(' ')
+            types[name] = kind
+            continue
+        assert line and not line.startswith('#'), line
+        key, value = line.rsplit(' ', 1)
+        assert key not in samples, key
+        samples[key] = float(value)
+    return samples, types
+
+
+def _buckets(samples, base, labels=''):
+    prefix = f'{base}_bucket{{{labels + "," if labels else ""}le="'
+    return [(k[len(prefix):-2], v) for k, v in samples.items() if k.startswith(prefix)]
+
+
+def test_disabled_records_nothing():
+    metrics.inc('x_total')
+    metrics.observe('x_ms', 1.0)
+    with metrics.timed('y_ms'):
+        pass
+    assert metrics.snapshot() == { 'version': metrics.VERSION, 'counters': {}, 'histograms': {} }
+
+
+def test_buckets_hold_their_values_within_precision():
+    for us in list(range(1, 2000)) + [10 ** k + d for k in range(3, 10) for d in (-1, 0, 1, 7)]:
+        i = metrics.bucket_index(us)
+        upper = metrics.bucket_upper(i)
+        assert upper >= us
+        assert i == 0 or metrics.bucket_upper(i - 1) < us
+        assert upper - us <= us / metrics.SUB_BUCKETS
+
+
+def test_percentiles_are_close():
+    h = metrics.Histogram()
+    for v in range(1, 10_001):
+        h.record(v / 10.0)
+    assert h.count == 10_000 and h.min == 0.1 and h.max == 1000.0
+    for p, exact in ((50, 500.0), (90, 900.0), (99, 990.0)):
+        assert abs(h.percentile(p) - exact) / exact < 0.04
+    assert metrics.Histogram().percentile(50) is None
+
+
+def test_flush_merges_runs_into_the_file(tmp_path):
+    path = str(tmp_path / 'metrics.json')
+    for run in range(3):
+        metrics.enable(path)
+        metrics.inc('requests_total', action='find')
+        metrics.inc('requests_total', 2, action='kill')
+        metrics.observe('snapshot_ms', 10.0 * (run + 1))
+        metrics.flush()
+        metrics.disable()
+    data = metrics.load(path)
+    assert data['counters'] == { 'requests_total{action="find"}': 3, 'requests_total{action="kill"}': 6 }
+    summary = metrics.summarize(data)['histograms']['snapshot_ms']
+    assert summary['count'] == 3 and summary['min'] == 10.0 and summary['max'] == 30.0
+    assert abs(summary['p50'] - 20.0) / 20.0 < 0.04
+
+
+def test_prometheus_scrape(tmp_path):
+    metrics.enable(str(tmp_path / 'metrics.json'))
+    values = [(i * 7919) % 5000 / 10.0 for i in range(2000)]
+    for v in values:
+        metrics.observe('http_ms', v, host='a.example')
+    metrics.observe('http_ms', 3.0, host='b.example')
+    for i in range(10):
+        metrics.inc('bench_total', kind=str(i % 2))
+    metrics.flush()
+
+    text = metrics.render_prometheus(metrics.load(metrics.path()))
+    samples, types = scrape(text)
+    assert types == { 'bench_total': 'counter', 'http_seconds': 'histogram' }
+    assert samples['bench_total{kind="0"}'] == 5 and samples['bench_total{kind="1"}'] == 5
+
+    buckets = _buckets(samples, 'http_seconds', 'host="a.example"')
+    counts = [v for _, v in buckets]
+    assert counts == sorted(counts) and buckets[-1] == ('+Inf', len(values))
+    assert samples['http_seconds_count{host="a.example"}'] == len(values)
+    assert samples['http_seconds_sum{host="a.example"}'] == pytest.approx(sum(values) / 1000.0, rel=1e-5)
+    # Every observation is at or below its bucket's le, in seconds
+    for le, cumulative in buckets[:-1]:
+        assert cumulative >= sum(1 for v in values if v / 1000.0 <= float(le) * (1 - 1e-6))
+    assert _buckets(samples, 'http_seconds', 'host="b.example"')[-1] == ('+Inf', 1)
+
+
+def test_init_from_argv_strips_the_flag(tmp_path, monkeypatch):
+    monkeypatch.delenv('GL_METRICS', raising=False)
+    path = str(tmp_path / 'm.json')
+    argv = ['find', f'--metrics={path}', '{}']
+    assert metrics.init_from_argv(argv) == ['find', '{}']
+    assert metrics.enabled() and metrics.path() == path
+
+
+def test_proc_metrics_action_serves_prometheus(tmp_path):
+    import proc
+    path = str(tmp_path / 'metrics.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({ 'version': metrics.VERSION, 'counters': { 'proc_requests_total{action="find"}': 4 }, 'histograms': {} }, f)
+    samples, types = scrape(proc.action_metrics({ 'path': path, 'format': 'prometheus' }))
+    assert samples == { 'proc_requests_total{action="find"}': 4 } and types['proc_requests_total'] == 'counter'
+    assert proc.action_metrics({ 'path': path })['counters'] == { 'proc_requests_total{action="find"}': 4 }
+    assert proc.action_metrics({})['ok'] is False
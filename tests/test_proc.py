@@ -0,0 +1,169 @@
+import sys
+
+import pytest
+
+import proc
+
+
+@pytest.fixture
+def windows_listing(monkeypatch):
+    """Run action_alive down its Windows path; returns the fields each listing asked for."""
+    asked = []
+
+    def list_processes(fields, where=None, stats=None):
+        asked.append(fields)
+        return [{ 'ProcessId': 42, 'Name': 'game.exe', 'ExecutablePath': 'C:\\Games\\Game\\game.exe' }]
+
+    monkeypatch.setattr(proc.os, 'name', 'nt')
+    monkeypatch.setattr(proc, 'list_processes', list_processes)
+    return asked
+
+
+def test_alive_by_image_name_skips_the_command_line(windows_listing):
+    out = proc.action_alive({ 'pids': [42, 43], 'imageName': 'game.exe' })
+    assert out['pids'] == [42]
+    assert windows_listing == [('ProcessId', 'Name', 'ExecutablePath')]
+
+
+@pytest.mark.parametrize('filters', [
+    { 'executablePath': 'C:\\Games\\Game\\game.exe' },
+    { 'installDir': 'C:\\Games\\Game' },
+])
+def test_alive_by_path_reads_the_command_line(windows_listing, filters):
+    out = proc.action_alive({ 'pids': [42], **filters })
+    assert out['pids'] == [42]
+    assert windows_listing == [('ProcessId', 'Name', 'ExecutablePath', 'CommandLine')]
+
+
+def test_find_query_fields_follow_the_same_rule():
+    by_image = proc._build_find_filters({ 'imageName': 'game.exe', 'title': 'Some Game' })
+    by_dir = proc._build_find_filters({ 'installDir': 'C:\\Games\\Game' })
+    assert 'CommandLine' not in proc._compile_wql(by_image)[1]
+    assert proc._compile_wql(by_dir)[1] == proc.FIND_FIELDS + ('CommandLine',)
+
+
+def _table(*extra, n=50):
+    from benchmarks import fixtures
+    return proc.ProcessTable(fixtures.make_process_snapshot(n) + list(extra))
+
+
+def test_table_interns_and_normalizes_columns():
+    table = _table(
+        { 'ProcessId': 7, 'Name': '', 'ExecutablePath': '', 'CommandLine': '"C:/Games/Other Game/Other.EXE" -windowed' },
+        { 'ProcessId': 8, 'ParentProcessId': None, 'Name': 'bare.exe', 'CommandLine': 'bare.exe --x' },
+        { 'ProcessId': 9, 'Name': 'noexe', 'CommandLine': 'noexe --x' },
+        { 'ProcessId': '10', 'Name': 'skipped.exe' },
+    )
+    assert len(table) == 56 and 10 not in table.rows_by_pid()
+    # Every distinct value is stored once, interned, and rows share its id
+    assert len(set(table.paths)) == len(table.paths) and len(set(table.names)) == len(table.names)
+    chrome = [i for i, n in enumerate(table.name_ids) if table.names[n] == 'chrome.exe']
+    assert len(chrome) > 1 and len({table.path_ids[i] for i in chrome}) == 1
+    assert table.names[table.name_ids[chrome[0]]] is sys.intern('chrome.exe')
+    rows = table.rows_by_pid()
+    # No ExecutablePath: the exe named in CommandLine stands in, normalized, and gives the image name
+    i = rows[7]
+    assert table.paths[table.path_ids[i]] == 'c:\\games\\other game\\other.exe'
+    assert table.names[table.name_ids[i]] == 'other.exe' and table.bases[table.base_ids[i]] == 'other'
+    assert table.ppids[i] == -1 and table.ppids[rows[8]] == -1
+    assert table.paths[table.path_ids[rows[8]]] == 'bare.exe'
+    assert table.paths[table.path_ids[rows[9]]] == '' and table.bases[table.base_ids[rows[9]]] == 'noexe'
+
+
+def test_match_columns_flag_each_distinct_value():
+    table = _table()
+    f = proc._build_find_filters({
+        'executablePath': 'C:\\Games\\Star Forge\\bin\\starforge.exe', 'installDir': 'C:/Games/Star Forge/', 'title': 'The Star Forge',
+    })
+    exact, under, image, title = proc._match_columns(table, f)
+    assert [p for p, hit in zip(table.paths, exact) if hit] == ['c:\\games\\star forge\\bin\\starforge.exe']
+    assert sorted(p for p, hit in zip(table.paths, under) if hit) == [
+        f'c:\\games\\star forge\\bin\\starforge{k}.exe' for k in ('', '1', '2')
+    ]
+    assert [n for n, hit in zip(table.names, image) if hit] == ['starforge.exe']
+    # Both title tokens, or all of them joined, have to be in the exe stem
+    assert sorted(b for b, hit in zip(table.bases, title) if hit) == ['starforge', 'starforge1', 'starforge2']
+    solo = proc._build_find_filters({ 'title': 'Starforge' })
+    assert [b for b, hit in zip(table.bases, proc._match_columns(table, solo)[3]) if hit] == ['starforge']
+
+
+def test_rank_scores_reasons_and_launcher_penalty():
+    table = _table(
+        { 'ProcessId': 70, 'ParentProcessId': 5, 'Name': 'steam.exe', 'ExecutablePath': 'C:\\Games\\Star Forge\\steam.exe' },
+        { 'ProcessId': 71, 'ParentProcessId': 5, 'Name': 'UnityCrashHandler64.exe',
+          'ExecutablePath': 'C:\\Games\\Star Forge\\UnityCrashHandler64.exe' },
+        { 'ProcessId': 72, 'ParentProcessId': 5, 'Name': 'helper.exe', 'ExecutablePath': 'C:\\Games\\Star Forge\\helper.exe' },
+    )
+    f = proc._build_find_filters({
+        'executablePath': 'C:\\Games\\Star Forge\\bin\\starforge.exe', 'installDir': 'C:\\Games\\Star Forge', 'title': 'Star Forge',
+        'parentPid': 5,
+    })
+    pids, top = proc._rank_candidates(table, f)
+    assert pids == [900000, 72, 900001, 900002]
+    assert top[0]['reasons'] == ['exact-executablePath', 'image-name-match', 'exec-under-installDir', 'title-match']
+    assert top[0]['score'] == 250 and top[0]['path'] == 'c:\\games\\star forge\\bin\\starforge.exe'
+    assert (top[1]['reasons'], top[1]['score']) == (['exec-under-installDir', 'parent-match'], 80)
+    assert [(c['reasons'], c['score']) for c in top[2:]] == [(['exec-under-installDir', 'title-match'], 70)] * 2
+    # Launchers and crash handlers never rank; scored directly, a launcher pays its penalty
+    row = table.rows_by_pid()[70]
+    assert proc._row_match(table, row, f, proc._match_columns(table, f)) == (
+        True, ['exec-under-installDir', 'parent-match'], 40
+    )
+    assert proc._row_match(table, table.rows_by_pid()[1000], f, proc._match_columns(table, f)) == (False, None, 0)
+
+
+def _where(**filters):
+    return proc._compile_wql(proc._build_find_filters(filters))[0]
+
+
+def test_wql_literals_escape_quotes_backslashes_and_like_wildcards():
+    where = _where(executablePath="C:\\Games\\Tom's [50%]_Off\\game.exe")
+    assert where == (
+        "ExecutablePath = 'c:\\\\games\\\\tom\\'s [50%]_off\\\\game.exe' OR "
+        "CommandLine LIKE '%c:\\\\games\\\\tom\\'s [[]50[%]][_]off\\\\game.exe%' OR "
+        "Name = 'game.exe'"
+    )
+    assert proc._wql_like('a[b]%c_d') == 'a[[]b][%]c[_]d'
+    # Title tokens are alphanumeric runs, so punctuation never reaches the LIKE pattern
+    assert _where(title='100% Orange_Juice') == "Name LIKE '%100%' OR Name LIKE '%orange%' OR Name LIKE '%juice%'"
+
+
+def test_install_dir_terms():
+    assert _where(installDir='D:\\SteamLibrary\\common\\Game') == (
+        "ExecutablePath LIKE 'd:\\\\steamlibrary\\\\common\\\\game\\\\%' OR "
+        "CommandLine LIKE '%d:\\\\steamlibrary\\\\common\\\\game\\\\%' OR "
+        "ExecutablePath LIKE 'd:\\\\steamlibrary\\\\steamapps\\\\common\\\\game\\\\%' OR "
+        "CommandLine LIKE '%d:\\\\steamlibrary\\\\steamapps\\\\common\\\\game\\\\%'"
+    )
+
+
+@pytest.mark.parametrize('install_dir', ['C:\\Program Files', 'c:/program files (x86)/', 'C:\\Users\\', 'D:\\', 'Games'])
+def test_broad_or_shallow_install_dirs_fall_back_to_a_full_listing(install_dir):
+    f = proc._build_find_filters({ 'imageName': 'game.exe', 'installDir': install_dir })
+    assert proc._compile_wql(f) == (None, proc.DEFAULT_FIELDS)
+    assert _where(imageName='game.exe', installDir='C:\\Program Files\\Game') is not None
+
+
+def test_too_many_terms_fall_back_to_a_full_listing():
+    assert _where() is None
+    words = ['word%02d' % i for i in range(proc.MAX_WQL_TERMS)]
+    assert _where(title=' '.join(words)).count(' OR ') == proc.MAX_WQL_TERMS - 1
+    assert _where(title=' '.join(words + ['extra'])) is None
+
+
+def test_alive_lists_only_the_tracked_pids_up_to_the_term_limit(monkeypatch):
+    wheres = []
+
+    def list_processes(fields, where=None, stats=None):
+        wheres.append(where)
+        return [{ 'ProcessId': 42, 'Name': 'game.exe' }]
+
+    monkeypatch.setattr(proc.os, 'name', 'nt')
+    monkeypatch.setattr(proc, 'list_processes', list_processes)
+    assert proc.action_alive({ 'pids': [42, '43', 'x'], 'imageName': 'game.exe' })['pids'] == [42]
+    assert wheres == ['ProcessId = 42 OR ProcessId = 43']
+    many = list(range(1, proc.MAX_WQL_TERMS + 1))
+    proc.action_alive({ 'pids': many, 'imageName': 'game.exe' })
+    assert wheres[-1].count('ProcessId = ') == proc.MAX_WQL_TERMS
+    assert proc.action_alive({ 'pids': many + [42], 'imageName': 'game.exe' })['pids'] == [42]
+    assert wheres[-1] is None
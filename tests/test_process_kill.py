@@ -0,0 +1,102 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+import proc
+import process_kill
+from glhelpers.proc_snapshot import children_map, descendants, list_processes
+
+linux_only = pytest.mark.skipif(not sys.platform.startswith('linux'), reason='reads /proc')
+
+
+def _p(pid, ppid, created=None):
+    rec = { 'ProcessId': pid, 'ParentProcessId': ppid, 'Name': f'p{pid}.exe' }
+    if created is not None:
+        rec['CreationDate'] = created
+    return rec
+
+
+def test_children_older_than_a_recycled_parent_pid_are_not_linked():
+    # 10 died and its PID went to an unrelated newer process; 11 and 12 still name it as parent
+    procs = [_p(10, 1, created=500), _p(11, 10, created=100), _p(12, 10, created=100), _p(13, 10, created=600)]
+    kids = children_map(procs)
+    assert kids[10] == [13]
+    assert descendants([10], kids) == [10, 13]
+    # Without creation stamps every row is trusted as before
+    assert children_map([_p(10, 1), _p(11, 10)])[10] == [11]
+
+
+def test_same_tick_children_are_still_linked():
+    kids = children_map([_p(10, 1, created=500), _p(11, 10, created=500)])
+    assert kids[10] == [11]
+
+
+@linux_only
+def test_linux_snapshot_carries_creation_stamps():
+    procs = { p['ProcessId']: p for p in list_processes(process_kill.TREE_FIELDS) }
+    me = procs[os.getpid()]
+    assert isinstance(me['CreationDate'], int)
+    parent = procs.get(os.getppid())
+    if parent and parent.get('CreationDate') is not None:
+        assert me['CreationDate'] >= parent['CreationDate']
+    assert 'CreationDate' not in list_processes(('ProcessId', 'Name'))[0]
+
+
+@pytest.fixture
+def tree():
+    """A shell holding one sleeping child; yields (parent_pid, child_pid)."""
+    parent = subprocess.Popen(['sh', '-c', 'sleep 30 & echo $!; wait'], stdout=subprocess.PIPE, text=True)
+    child = int(parent.stdout.readline())
+    yield parent.pid, child
+    for pid in (child, parent.pid):
+        try:
+            os.kill(pid, 9)
+        except OSError:
+            pass
+    parent.wait()
+
+
+def _alive(pid):
+    return not process_kill._gone(pid)
+
+
+@linux_only
+def test_kill_pids_leaves_children_running(tree):
+    parent, child = tree
+    (result,) = process_kill.kill_pids([parent])
+    assert result['pid'] == parent and result['outcome'] == 'killed'
+    assert _alive(child)
+
+
+@linux_only
+def test_kill_tree_takes_the_children_too(tree):
+    parent, child = tree
+    results = process_kill.kill_tree([parent], graceful_timeout=0)
+    assert [r['pid'] for r in results] == [parent, child]
+    assert process_kill._killed(results) == [parent, child]
+
+
+@linux_only
+def test_action_kill_defaults_to_the_given_pids(tree):
+    parent, child = tree
+    out = proc.action_kill({ 'pids': [str(parent)] })
+    assert out['ok'] and out['killedPids'] == [parent]
+    assert _alive(child)
+
+    out = proc.action_kill({ 'pids': [child], 'tree': True })
+    assert out['killedPids'] == [child]
+    deadline = time.monotonic() + 2
+    while _alive(child) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not _alive(child)
+
+
+def test_critical_images_are_never_terminated(monkeypatch):
+    calls = []
+    monkeypatch.setattr(process_kill, 'terminate_pids', lambda pids, *a: calls.append(pids) or [])
+    procs = [{ 'ProcessId': 4, 'Name': 'explorer.exe' }]
+    assert process_kill.kill_pids([4], procs) == [{ 'pid': 4, 'outcome': 'critical-skip', 'name': 'explorer.exe' }]
+    assert calls == [[]]
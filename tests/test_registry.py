@@ -0,0 +1,125 @@
+import json
+import threading
+
+from glhelpers import registry
+from glhelpers.registry import MemoryBackend, RegistrySnapshot
+
+TREE = 'SOFTWARE\\Vendor\\Installs'
+
+
+def _backend(n=3):
+    return MemoryBackend({
+        f'HKLM\\{TREE}\\{i}': { 'InstallDir': f'C:\\Games\\{i}', 'Blob': b'\x01\x02' } for i in range(n)
+    })
+
+
+def test_second_read_reuses_every_key():
+    snap = RegistrySnapshot(_backend())
+    first = snap.children('HKLM', TREE)
+    assert first['0'] == { 'InstallDir': 'C:\\Games\\0', 'Blob': '0102' }
+    assert snap.stats == { 'enumerated': 1, 'read': 3, 'reused': 0 }
+    assert snap.children('HKLM', TREE) == first
+    assert snap.stats == { 'enumerated': 1, 'read': 3, 'reused': 3 }
+
+
+def test_only_the_key_whose_stamp_moved_is_read_again():
+    backend = _backend()
+    snap = RegistrySnapshot(backend)
+    snap.children('HKLM', TREE)
+    backend.set(f'HKLM\\{TREE}\\1', { 'InstallDir': 'D:\\Moved' })
+    out = snap.children('HKLM', TREE)
+    assert out['1'] == { 'InstallDir': 'D:\\Moved' }
+    # Changing values does not touch the tree key, so the subkey list is not enumerated again
+    assert snap.stats == { 'enumerated': 1, 'read': 4, 'reused': 2 }
+
+
+def test_added_and_removed_subkeys():
+    backend = _backend()
+    snap = RegistrySnapshot(backend)
+    snap.children('HKLM', TREE)
+    backend.set(f'hklm\\{TREE.lower()}\\9', { 'InstallDir': 'C:\\Games\\9' })
+    backend.delete(f'HKLM\\{TREE}\\0')
+    assert snap.stale()
+    assert sorted(snap.children('HKLM', TREE)) == ['1', '2', '9']
+    assert snap.stats['enumerated'] == 2 and snap.stats['read'] == 4
+    backend.delete(f'HKLM\\{TREE}')
+    assert snap.children('HKLM', TREE) == {}
+
+
+def test_cache_file_round_trip(tmp_path):
+    backend = _backend()
+    path = str(tmp_path / 'registry.json')
+    snap = RegistrySnapshot(backend, path)
+    expected = snap.children('HKLM', TREE)
+    snap.save()
+
+    again = RegistrySnapshot(backend, path)
+    assert again.children('HKLM', TREE) == expected
+    assert again.stats == { 'enumerated': 0, 'read': 0, 'reused': 3 }
+    assert not again._dirty
+
+
+def test_cache_from_another_version_is_ignored(tmp_path):
+    backend = _backend()
+    path = tmp_path / 'registry.json'
+    snap = RegistrySnapshot(backend, str(path))
+    snap.children('HKLM', TREE)
+    snap.save()
+    data = json.loads(path.read_text())
+    path.write_text(json.dumps({ **data, 'version': registry.CACHE_VERSION + 1 }))
+
+    again = RegistrySnapshot(backend, str(path))
+    again.children('HKLM', TREE)
+    assert again.stats == { 'enumerated': 1, 'read': 3, 'reused': 0 }
+
+
+def test_wait_for_change_wakes_on_a_memory_change():
+    backend = _backend()
+    snap = RegistrySnapshot(backend)
+    assert snap.wait_for_change(0.01) is False            # nothing read yet
+    snap.children('HKLM', TREE)
+    timer = threading.Timer(0.05, backend.set, (f'HKLM\\{TREE}\\2', { 'InstallDir': 'E:\\' },))
+    timer.start()
+    try:
+        assert snap.wait_for_change(5) is True
+    finally:
+        timer.join()
+
+
+def test_wait_for_change_times_out_without_one():
+    backend = _backend()
+    backend.set('HKLM\\SOFTWARE\\Elsewhere', { 'x': 1 })
+    snap = RegistrySnapshot(backend)
+    snap.children('HKLM', TREE)
+    # Changes outside the trees read do not count
+    threading.Timer(0.01, backend.set, ('HKLM\\SOFTWARE\\Elsewhere', { 'x': 2 })).start()
+    assert snap.wait_for_change(0.1) is False
+
+
+def test_change_before_arming_is_not_missed():
+    backend = _backend()
+    snap = RegistrySnapshot(backend)
+    snap.children('HKLM', TREE)
+    backend.set(f'HKLM\\{TREE}\\7', {})
+    assert snap.wait_for_change(0) is True
+
+
+def test_watch_loop_emits_only_changed_results(monkeypatch):
+    backend = _backend(1)
+    snap = RegistrySnapshot(backend)
+    monkeypatch.setattr(snap, 'wait_for_change', lambda: RegistrySnapshot.wait_for_change(snap, 0.05))
+    calls = []
+
+    def detect():
+        calls.append(1)
+        games = sorted(snap.children('HKLM', TREE))
+        if len(calls) == 1:
+            backend.set(f'HKLM\\{TREE}\\5', {})
+        elif len(calls) == 2:
+            backend.set(f'HKLM\\{TREE}\\5', { 'Touched': 1 })   # a new stamp, same result
+        return { 'games': games }
+
+    out = []
+    registry.watch_loop(snap, detect, out.append)
+    assert out == [{ 'event': 'games', 'games': ['0'] }, { 'event': 'games', 'games': ['0', '5'] }]
+    assert len(calls) == 3
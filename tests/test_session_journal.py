@@ -0,0 +1,110 @@
+import os
+
+import session_journal
+from session_journal import RECORD, SessionJournal
+
+
+def _tear(path, nbytes=RECORD.size // 2):
+    """Simulate a crash mid-write: half a record at the end of the journal."""
+    with open(path, 'ab') as f:
+        f.write(session_journal._pack(session_journal.START, 1, 0.0)[:nbytes])
+
+
+def test_session_after_torn_tail_is_folded(tmp_path):
+    j = SessionJournal(str(tmp_path))
+    j.start('steam:1', ts=1000.0)
+    j.end('steam:1', ts=1060.0)
+    j.close()
+    _tear(j.journal_path)
+
+    j = SessionJournal(str(tmp_path))
+    j.start('steam:2', ts=2000.0)
+    j.end('steam:2', ts=2120.0)
+    j.close()
+
+    assert os.path.getsize(j.journal_path) % RECORD.size == 0
+    stats = SessionJournal(str(tmp_path)).stats(now=3000.0)
+    assert stats['games']['steam:1']['seconds'] == 60.0
+    assert stats['games']['steam:2']['seconds'] == 120.0
+
+
+def test_records_behind_a_torn_write_are_resynced(tmp_path):
+    # A journal written before the tail was repaired on open: records sit behind the torn bytes
+    j = SessionJournal(str(tmp_path))
+    j.start('steam:1', ts=1000.0)
+    j.close()
+    _tear(j.journal_path, 7)
+    with open(j.journal_path, 'ab') as f:
+        h = j._ensure_key('steam:2')
+        f.write(session_journal._pack(session_journal.START, h, 2000.0))
+        f.write(session_journal._pack(session_journal.END, h, 2030.0))
+
+    stats = SessionJournal(str(tmp_path)).stats('steam:2', now=3000.0)
+    assert stats['seconds'] == 30.0 and stats['sessions'] == 1
+
+
+def test_compact_rotates_after_a_torn_tail(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_journal, 'ROTATE_BYTES', RECORD.size * 4)
+    j = SessionJournal(str(tmp_path))
+    for i in range(3):
+        j.start('gog:7', ts=1000.0 + i * 100)
+        j.end('gog:7', ts=1010.0 + i * 100)
+    j.close()
+    _tear(j.journal_path)
+
+    j = SessionJournal(str(tmp_path))
+    result = j.compact(now=5000.0)
+    j.close()
+    assert result['rotated'] and result['offset'] == 0
+    assert os.path.getsize(j.journal_path) == 0
+    assert j.stats('gog:7', now=5000.0)['seconds'] == 30.0
+
+
+
+def _rotate(tmp_path, monkeypatch, crash):
+    """Compact once below the rotation size, then play past it and compact again.
+
+    With `crash`, the second compaction dies where the new index would be written."""
+    monkeypatch.setattr(session_journal, 'ROTATE_BYTES', RECORD.size * 4)
+    j = SessionJournal(str(tmp_path))
+    j.start('gog:7', ts=1000.0)
+    j.end('gog:7', ts=1010.0)
+    j.compact(now=1100.0)
+    for i in range(2):
+        j.start('gog:7', ts=1200.0 + i * 100)
+        j.end('gog:7', ts=1220.0 + i * 100)
+    if crash:
+        def boom(_idx):
+            raise OSError('crashed')
+        monkeypatch.setattr(j, '_write_index', boom)
+    try:
+        result = j.compact(now=1500.0)
+    except OSError:
+        result = None
+    j.close()
+    return SessionJournal(str(tmp_path)), result
+
+
+def test_crash_between_rotation_and_index_write_loses_nothing(tmp_path, monkeypatch):
+    j, _ = _rotate(tmp_path, monkeypatch, crash=True)
+    # The journal was renamed aside, but the index still holds the old generation and offset
+    assert os.path.exists(j._rotated_path(0))
+    assert j._load_index()['generation'] == 0 and j._load_index()['offset'] == RECORD.size * 2
+
+    j.start('gog:7', ts=2000.0)
+    j.end('gog:7', ts=2100.0)
+    stats = j.stats('gog:7', now=3000.0)
+    assert stats['sessions'] == 4 and stats['seconds'] == 10.0 + 20.0 + 20.0 + 100.0
+
+    result = j.compact(now=3000.0)
+    j.close()
+    assert not os.path.exists(j._rotated_path(0))
+    assert j._load_index()['generation'] == 1 and result['offset'] == RECORD.size * 2
+    assert SessionJournal(str(tmp_path)).stats('gog:7', now=3000.0) == stats
+
+
+def test_rotation_moves_to_the_next_generation(tmp_path, monkeypatch):
+    j, result = _rotate(tmp_path, monkeypatch, crash=False)
+    assert result['rotated'] and j._load_index()['generation'] == 1
+    assert not os.path.exists(j._rotated_path(0)) and os.path.getsize(j.journal_path) == 0
+    assert j.stats('gog:7', now=1500.0)['seconds'] == 50.0
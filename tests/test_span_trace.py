@@ -0,0 +1,41 @@
+from collections import deque
+
+import pytest
+
+from glhelpers import span_trace
+
+
+@pytest.fixture
+def tracing(monkeypatch):
+    monkeypatch.setattr(span_trace, '_enabled', True)
+    monkeypatch.setattr(span_trace, '_out_path', None)
+    monkeypatch.setattr(span_trace, '_events', deque(maxlen=span_trace.MAX_EVENTS))
+    return span_trace
+
+
+def test_nested_spans_become_a_tree(tracing):
+    with tracing.span('outer', launcher='steam') as s:
+        s.add('files', 2)
+        with tracing.span('inner'):
+            tracing.add('hits')
+    (root,) = tracing.finish({})['_trace']['spans']
+    assert root['name'] == 'outer' and root['attrs'] == { 'launcher': 'steam' } and root['counts'] == { 'files': 2 }
+    assert [(c['name'], c['counts']) for c in root['children']] == [('inner', { 'hits': 1 })]
+
+
+def test_long_running_modes_keep_only_the_latest_spans(tracing, monkeypatch):
+    monkeypatch.setattr(tracing, '_events', deque(maxlen=5))
+    for i in range(50):
+        with tracing.span('poll', n=i):
+            pass
+    events = tracing.chrome_events()
+    assert [e['args']['n'] for e in events] == [45, 46, 47, 48, 49]
+
+
+def test_disabled_tracing_records_nothing(monkeypatch):
+    monkeypatch.setattr(span_trace, '_enabled', False)
+    before = len(span_trace._events)
+    with span_trace.span('x') as s:
+        s.add('n')
+    assert len(span_trace._events) == before
+    assert span_trace.finish({ 'ok': True }) == { 'ok': True }
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+import SteamApi_Search
+import steam_detect
+from benchmarks import fixtures
+
+
+@pytest.fixture
+def steam_root(tmp_path):
+    root = str(tmp_path / 'Steam')
+    appids = [10000 + i for i in range(12)]
+    fixtures.make_steam_appinfo(root, appids, extra=20)
+    fixtures.make_steam_librarycache(root, appids)
+    SteamApi_Search._local.clear()
+    yield root, appids
+    SteamApi_Search._local.clear()
+
+
+def _title(root, appid):
+    info = steam_detect.read_app_details(os.path.join(root, 'appcache', 'appinfo.vdf'), [str(appid)])
+    return info[str(appid)]['title']
+
+
+def test_local_lookups_reuse_one_index(steam_root, monkeypatch):
+    root, appids = steam_root
+    builds = []
+    real = SteamApi_Search.local_title_index
+    monkeypatch.setattr(SteamApi_Search, 'local_title_index', lambda *a: builds.append(a) or real(*a))
+
+    for appid in (appids[0], appids[2], appids[-1]):
+        result = SteamApi_Search.resolve_thumbnail(_title(root, appid), root)
+        assert result['steamAppId'] == appid and result['source'] == 'librarycache'
+        assert result['imageUrl'].startswith('file://')
+    assert len(builds) == 1
+
+
+def test_index_is_rebuilt_when_appinfo_changes(steam_root):
+    root, appids = steam_root
+    SteamApi_Search.resolve_thumbnail(_title(root, appids[0]), root)
+    cache, _ = SteamApi_Search.local_artwork(root)
+
+    path = os.path.join(root, 'appcache', 'appinfo.vdf')
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    rebuilt, titles = SteamApi_Search.local_artwork(root)
+    assert rebuilt is not cache and titles
+
+
+def test_known_appid_skips_the_title_index(steam_root):
+    root, appids = steam_root
+    result = SteamApi_Search.resolve_thumbnail('', root, appids[1])
+    assert result['source'] == 'librarycache'
+    assert SteamApi_Search._local[root][2] is None
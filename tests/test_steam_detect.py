@@ -0,0 +1,79 @@
+import os
+import zlib
+
+import steam_detect
+from benchmarks import fixtures
+
+
+def _write_shortcuts(root, entries, account='1'):
+    path = os.path.join(root, 'userdata', account, 'config', 'shortcuts.vdf')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(b'\x00shortcuts\x00' + fixtures._kv_bytes({ str(i): e for i, e in enumerate(entries) }) + b'\x08')
+
+
+def test_shortcuts_with_and_without_an_appid(tmp_path):
+    root = str(tmp_path)
+    _write_shortcuts(root, [
+        { 'appid': -(0x7FFF0000), 'AppName': 'Tool', 'Exe': '"C:\\Tools\\tool.exe"', 'StartDir': '"C:\\Tools\\"' },
+        { 'AppName': 'Old Tool', 'Exe': '"C:\\Old\\old.exe"', 'LaunchOptions': '-x' },
+        { 'AppName': 'Hidden', 'Exe': '"C:\\H\\h.exe"', 'IsHidden': 1 },
+        { 'AppName': '', 'Exe': '"C:\\N\\n.exe"' },
+    ])
+    tool, old = steam_detect.list_shortcuts(root)
+    assert tool['id'] == str(((-0x7FFF0000) & 0xFFFFFFFF) << 32 | steam_detect.SHORTCUT_GAMEID_TYPE)
+    assert tool['executablePath'] == 'C:\\Tools\\tool.exe' and tool['shortcut']
+    # No appid: Steam's own crc32 of the quoted target and the name
+    appid = zlib.crc32(b'"C:\\Old\\old.exe"Old Tool') | 0x80000000
+    assert old['id'] == str(appid << 32 | steam_detect.SHORTCUT_GAMEID_TYPE)
+    assert old['launchOptions'] == '-x' and old['installDir'] == os.path.dirname('C:\\Old\\old.exe')
+
+
+def test_same_shortcut_in_two_accounts_is_listed_once(tmp_path):
+    root = str(tmp_path)
+    entry = { 'appid': 5, 'AppName': 'Tool', 'Exe': 'C:\\t.exe' }
+    _write_shortcuts(root, [entry], account='1')
+    _write_shortcuts(root, [entry], account='2')
+    assert len(steam_detect.list_shortcuts(root)) == 1
+    assert steam_detect.list_shortcuts(str(tmp_path / 'nowhere')) == []
+
+
+def test_pick_launch_prefers_the_default_windows_entry():
+    pick = steam_detect._pick_launch
+    assert pick({
+        '0': { 'executable': 'game.sh', 'type': 'default', 'config': { 'oslist': 'linux' } },
+        '1': { 'executable': 'tools\\editor.exe', 'type': 'option1' },
+        '2': { 'executable': 'bin\\game.exe', 'type': 'default', 'config': { 'oslist': 'windows' } },
+    }) == 'bin\\game.exe'
+    # Without a default entry the first Windows-capable one wins
+    assert pick({
+        '0': { 'executable': 'safe.exe', 'type': 'option1' },
+        '1': { 'executable': 'vr.exe', 'type': 'option2' },
+        '2': { 'type': 'default' },
+    }) == 'safe.exe'
+    assert pick({ '0': { 'executable': 'game.sh', 'config': { 'oslist': 'macos,linux' } } }) is None
+    assert pick(None) is None
+
+
+def test_app_details_fill_titles_and_drop_untitled_games(tmp_path):
+    root = str(tmp_path)
+    appinfo = fixtures.make_steam_appinfo(root, [440, 570])
+    details = steam_detect.read_app_details(appinfo, ['440', '570', '999', 'unknown-x'])
+    assert set(details) == {'440', '570'}
+    exe = details['440']['executable']
+    assert exe.startswith('bin\\') and exe.endswith('.exe')
+
+    install = tmp_path / 'common' / 'tf'
+    (install / 'bin').mkdir(parents=True)
+    (install / exe.replace('\\', os.sep)).write_bytes(b'')
+    games = [
+        { 'id': '440', 'title': None, 'installDir': str(install) },
+        { 'id': '570', 'title': 'Kept Title', 'installDir': str(tmp_path / 'missing') },
+        { 'id': '999', 'title': None, 'installDir': str(tmp_path) },
+    ]
+    out = steam_detect.apply_app_details(games, details)
+    assert [g['id'] for g in out] == ['440', '570']
+    assert out[0]['title'] == details['440']['title']
+    assert out[0]['executablePath'] == os.path.join(str(install), 'bin', exe[4:])
+    assert out[1]['title'] == 'Kept Title' and 'executablePath' not in out[1]
+    assert steam_detect.read_app_details(str(tmp_path / 'none.vdf'), ['440']) == {}
@@ -0,0 +1,105 @@
+import io
+
+from glhelpers import ubisoft_config
+from glhelpers.ubisoft_config import encode_record, iter_records, parse_yaml, product_meta, read_configurations
+
+FAR_CRY = """\
+version: 2.0
+root:
+  name: l1
+  display_name: Far Cry 5 (unused)
+  thumb_image: 3f1c.jpg
+  logo_image: l2
+  start_game:
+    offline:
+      executables:
+      - path:
+          relative: bin\\FarCry5.exe
+        working_directory:
+          register: HKEY_LOCAL_MACHINE\\SOFTWARE\\Ubisoft\\Launcher\\Installs\\1803\\InstallDir
+    online:
+      executables:
+      - path:
+          relative: bin\\FarCry5.exe
+      - path:
+          relative: bin\\FCLauncher.exe
+  third_party_platform:
+    name: steam
+  description: |
+    A long
+    description
+  tags: [shooter, 'open world']
+localizations:
+  default:
+    l1: "Far Cry\\" 5"
+    l2: logo.png
+"""
+
+
+def _write(tmp_path, *records):
+    path = tmp_path / 'configurations'
+    path.write_bytes(b''.join(records))
+    return str(path)
+
+
+def test_parse_yaml_block_subset():
+    doc = parse_yaml(FAR_CRY)
+    root = doc['root']
+    assert root['name'] == 'l1'
+    assert root['description'] == 'A long\ndescription'
+    assert root['tags'] == ['shooter', 'open world']
+    exes = root['start_game']['online']['executables']
+    assert [e['path']['relative'] for e in exes] == ['bin\\FarCry5.exe', 'bin\\FCLauncher.exe']
+    assert doc['localizations']['default']['l1'] == 'Far Cry" 5'
+
+
+def test_product_meta_resolves_localized_names():
+    meta = product_meta(parse_yaml(FAR_CRY))
+    assert meta == {
+        'name': 'Far Cry" 5',
+        'executables': ['bin\\FarCry5.exe', 'bin\\FCLauncher.exe'],
+        'thumbImage': '3f1c.jpg',
+        'logoImage': 'logo.png',
+        'thirdParty': 'steam',
+    }
+    assert product_meta({}) == {} and product_meta({ 'root': 'x' }) == {}
+
+
+def test_records_round_trip_through_the_stream():
+    data = encode_record(1803, FAR_CRY) + b'\x10\x05' + encode_record(300, 'root:\n  name: Other\n', version=7)
+    records = list(iter_records(io.BytesIO(data)))
+    assert [(pid, raw.decode()) for pid, raw in records] == [(1803, FAR_CRY), (300, 'root:\n  name: Other\n')]
+
+
+def test_read_configurations_filters_and_replaces(tmp_path):
+    path = _write(
+        tmp_path,
+        encode_record(1803, FAR_CRY),
+        encode_record(300, 'root:\n  name: Old Title\n'),
+        encode_record(400, 'root:\n  other: 1\n'),
+        encode_record(300, 'root:\n  name: New Title\n'),
+    )
+    index = read_configurations(path)
+    # A record with neither name nor executables carries nothing for the detector
+    assert set(index) == {'1803', '300'}
+    assert index['300']['name'] == 'New Title'
+    assert set(read_configurations(path, {'300', '999'})) == {'300'}
+
+
+def test_damaged_tail_keeps_the_records_before_it(tmp_path):
+    good = encode_record(1803, FAR_CRY)
+    cut = encode_record(300, 'root:\n  name: Cut Short\n')
+    path = _write(tmp_path, good, cut[:len(cut) // 2])
+    assert set(read_configurations(path)) == {'1803'}
+    path = _write(tmp_path, good, b'\xff\xff\xff')
+    assert set(read_configurations(path)) == {'1803'}
+
+
+def test_launcher_dir_and_asset_url(tmp_path):
+    from glhelpers.registry import MemoryBackend, RegistrySnapshot
+    snapshot = RegistrySnapshot(MemoryBackend({
+        'HKLM\\SOFTWARE\\WOW6432Node\\Ubisoft\\Launcher': { 'InstallDir': str(tmp_path) },
+    }))
+    assert ubisoft_config.default_launcher_dir(snapshot) == str(tmp_path)
+    assert ubisoft_config.asset_url('a.jpg').endswith('/assets/a.jpg')
+    assert ubisoft_config.asset_url('') is None
@@ -0,0 +1,76 @@
+import os
+
+import pytest
+
+import ubisoft_detect
+from benchmarks import fixtures
+from glhelpers.registry import MemoryBackend, RegistrySnapshot
+from glhelpers.stamp_cache import StampCache
+
+N = 12
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    monkeypatch.delenv('ProgramFiles(x86)', raising=False)
+    games_root, registry, configurations, titles = fixtures.make_ubisoft_library(str(tmp_path), N)
+    return games_root, RegistrySnapshot(MemoryBackend.from_json(registry)), configurations, titles
+
+
+def test_titles_and_executables_come_from_the_configuration_cache(library):
+    games_root, snapshot, _configurations, titles = library
+    games = ubisoft_detect.detect([games_root], snapshot, StampCache())['games']
+    assert { g['id']: g['title'] for g in games } == titles
+    for g in games:
+        stem = g['title'].replace(' ', '')
+        # The launcher stub listed first is missing on disk; the real exe is picked
+        assert g['executablePath'] == os.path.join(g['installDir'], 'bin', f'{stem}.exe')
+
+
+def test_images_prefer_the_launcher_asset_cache(library):
+    games_root, snapshot, _configurations, _titles = library
+    games = ubisoft_detect.detect([games_root], snapshot, StampCache())['games']
+    local = [g for g in games if (int(g['id']) - 100) % 8 == 0]
+    remote = [g for g in games if (int(g['id']) - 100) % 8 == 4]
+    assert local and all(g['image'].startswith('file://') for g in local)
+    assert remote and all(g['image'].startswith('https://') for g in remote)
+
+
+def test_configurations_are_decoded_once_while_unchanged(library, monkeypatch):
+    games_root, snapshot, configurations, titles = library
+    cache = StampCache()
+    ubisoft_detect.detect([games_root], snapshot, cache)
+    calls = []
+    real = ubisoft_detect.ubisoft_config.read_configurations
+    monkeypatch.setattr(ubisoft_detect.ubisoft_config, 'read_configurations',
+                        lambda *a, **k: calls.append(a) or real(*a, **k))
+    ubisoft_detect.detect([games_root], snapshot, cache)
+    assert calls == []
+
+    # Only installed products were decoded, so a new install forces one re-read
+    new_id = str(100 + N * 4 - 1)
+    os.makedirs(os.path.join(games_root, new_id, 'bin'))
+    games = ubisoft_detect.detect([games_root], snapshot, cache)['games']
+    assert len(calls) == 1 and new_id in calls[0][1]
+    assert { g['id'] for g in games } == set(titles) | {new_id}
+    assert len(games) == len(titles) + 1
+
+
+def test_registry_only_install_outside_the_roots(library, tmp_path):
+    _games_root, _snapshot, configurations, titles = library
+    pid = sorted(titles)[0]
+    elsewhere = tmp_path / 'elsewhere' / pid
+    (elsewhere / 'bin').mkdir(parents=True)
+    stem = titles[pid].replace(' ', '')
+    (elsewhere / 'bin' / f'{stem}.exe').write_bytes(b'')
+    snapshot = RegistrySnapshot(MemoryBackend({
+        f'HKLM\\SOFTWARE\\WOW6432Node\\Ubisoft\\Launcher\\Installs\\{pid}': { 'InstallDir': str(elsewhere) },
+    }))
+    (game,) = ubisoft_detect.detect([], snapshot, StampCache(), configurations)['games']
+    assert game['id'] == pid and game['title'] == titles[pid]
+    assert game['executablePath'] == str(elsewhere / 'bin' / f'{stem}.exe')
+
+
+def test_clean_title():
+    assert ubisoft_detect.clean_title('Far Cry 5 Uplay') == 'Far Cry 5'
+    assert ubisoft_detect.clean_title('Anno 1800 (Ubisoft Connect)') == 'Anno 1800'
@@ -0,0 +1,122 @@
+import json
+import os
+
+import pytest
+
+import verify_install
+
+
+def _write(root, rel, data):
+    path = os.path.join(root, *rel.split('/'))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def _bump(path, seconds=5):
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + seconds * 1_000_000_000))
+
+
+@pytest.fixture
+def install(tmp_path):
+    root = str(tmp_path / 'game')
+    _write(root, 'bin/game.exe', b'exe' * 1000)
+    _write(root, 'data/a.pak', b'a' * 5000)
+    _write(root, 'data/b.pak', b'b' * 5000)
+    _write(root, 'readme.txt', b'hello')
+    manifest = str(tmp_path / 'manifest.json')
+    assert verify_install.make_baseline(root, manifest, workers=1)['stats']['files'] == 4
+    return root, manifest
+
+
+def test_unchanged_files_are_not_read(install, monkeypatch):
+    root, manifest = install
+    monkeypatch.setattr(verify_install, 'hash_file', lambda path: pytest.fail(f'hashed {path}'))
+    out = verify_install.verify(root, manifest)
+    assert (out['changed'], out['missing'], out['extra']) == ([], [], [])
+    assert out['stats']['skipped'] == 4 and out['stats']['hashed'] == 0
+
+
+def test_changed_missing_extra_and_touched(install):
+    root, manifest = install
+    _write(root, 'data/a.pak', b'A' * 5000)               # same size, new content
+    _write(root, 'bin/game.exe', b'exe')                  # new size
+    os.remove(os.path.join(root, 'data', 'b.pak'))
+    _write(root, 'mods/x.dll', b'mod')
+    _bump(os.path.join(root, 'readme.txt'))               # new stamp, same bytes
+    _bump(os.path.join(root, 'data', 'a.pak'))
+    out = verify_install.verify(root, manifest)
+    assert out['changed'] == ['bin/game.exe', 'data/a.pak']
+    assert out['missing'] == ['data/b.pak'] and out['extra'] == ['mods/x.dll']
+    assert out['stats'] == { **out['stats'], 'files': 4, 'skipped': 0, 'hashed': 3, 'touched': 1 }
+    # Without --update the baseline is left as it was
+    assert verify_install.verify(root, manifest)['changed'] == ['bin/game.exe', 'data/a.pak']
+
+
+def test_full_hashes_files_whose_stamp_matches(install):
+    root, manifest = install
+    path = os.path.join(root, 'data', 'a.pak')
+    st = os.stat(path)
+    _write(root, 'data/a.pak', b'A' * 5000)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert verify_install.verify(root, manifest)['changed'] == []
+    out = verify_install.verify(root, manifest, full=True)
+    assert out['changed'] == ['data/a.pak'] and out['stats']['hashed'] == 4
+
+
+def test_update_writes_the_current_state_back(install):
+    root, manifest = install
+    _write(root, 'data/a.pak', b'A' * 4000)
+    os.remove(os.path.join(root, 'readme.txt'))
+    _write(root, 'mods/x.dll', b'mod')
+    out = verify_install.verify(root, manifest, update=True)
+    assert out['changed'] == ['data/a.pak'] and out['missing'] == ['readme.txt'] and out['extra'] == ['mods/x.dll']
+    with open(manifest, 'r', encoding='utf-8') as f:
+        files = json.load(f)['files']
+    assert sorted(files) == ['bin/game.exe', 'data/a.pak', 'data/b.pak', 'mods/x.dll']
+    assert files['data/a.pak'][2] == verify_install.hash_file(os.path.join(root, 'data', 'a.pak'))
+    again = verify_install.verify(root, manifest)
+    assert (again['changed'], again['missing'], again['extra']) == ([], [], [])
+    assert again['stats']['hashed'] == 0
+
+
+def test_manifest_from_another_version_is_refused(install):
+    root, manifest = install
+    with open(manifest, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    with open(manifest, 'w', encoding='utf-8') as f:
+        json.dump({ **data, 'version': verify_install.MANIFEST_VERSION + 1 }, f)
+    assert verify_install.verify(root, manifest)['ok'] is False
+
+
+def test_batches_keep_large_files_alone(monkeypatch):
+    monkeypatch.setattr(verify_install, 'SMALL_FILE', 100)
+    monkeypatch.setattr(verify_install, 'BATCH_FILES', 2)
+    files = { 'big': (500, 0), 'huge': (900, 0), 's1': (10, 0), 's2': (20, 0), 's3': (30, 0) }
+    assert list(verify_install._batches(files, list(files))) == [['huge'], ['big'], ['s3', 's2'], ['s1']]
+
+
+def test_process_pool_matches_inline_hashing(install, monkeypatch):
+    root, manifest = install
+    files = verify_install.scan_tree(root)
+    inline = verify_install.hash_files(root, files, list(files), workers=1)
+    monkeypatch.setattr(verify_install, 'INLINE_BYTES', 0)
+    monkeypatch.setattr(verify_install, 'SMALL_FILE', 1000)
+    pooled = verify_install.hash_files(root, files, list(files), workers=2, io=1)
+    assert pooled == inline and len(pooled) == 4 and all(pooled.values())
+    # Files that vanish before they are read come back as None
+    os.remove(os.path.join(root, 'readme.txt'))
+    assert verify_install.hash_files(root, files, ['readme.txt', 'data/a.pak'], workers=2)['readme.txt'] is None
+
+
+def test_junctions_and_symlinks_are_not_followed(install, tmp_path, monkeypatch):
+    root, _manifest = install
+    elsewhere = str(tmp_path / 'elsewhere')
+    _write(elsewhere, 'other.bin', b'x')
+    os.symlink(elsewhere, os.path.join(root, 'linked'), target_is_directory=True)
+    assert sorted(verify_install.scan_tree(root)) == ['bin/game.exe', 'data/a.pak', 'data/b.pak', 'readme.txt']
+    # Before Python 3.12 a junction passes is_dir(follow_symlinks=False); stand one in for 'data'
+    monkeypatch.setattr(verify_install, '_is_reparse_point', lambda e: e.name == 'data')
+    assert sorted(verify_install.scan_tree(root)) == ['bin/game.exe', 'readme.txt']
@@ -0,0 +1,78 @@
+import json
+import os
+
+import pytest
+
+import xbox_detect
+from benchmarks import fixtures
+from glhelpers.registry import MemoryBackend, RegistrySnapshot
+from glhelpers.stamp_cache import StampCache
+
+N = 10
+
+
+@pytest.fixture
+def library(tmp_path):
+    games_root, registry = fixtures.make_xbox_library(str(tmp_path), N)
+    return games_root, registry
+
+
+def _detect(games_root, registry, cache=None):
+    snapshot = RegistrySnapshot(MemoryBackend.from_json(registry))
+    return xbox_detect.detect(snapshot, [games_root], cache)['games']
+
+
+def test_folder_titles_keep_their_folder_id(library):
+    games_root, registry = library
+    games = _detect(games_root, registry)
+    folders = sorted(os.listdir(games_root))
+    by_id = {g['id']: g for g in games}
+    for folder in folders:
+        g = by_id[folder]
+        assert g['pfn'].startswith('Microsoft.') and g['pfn'].endswith('_8wekyb3d8bbwe')
+        assert g['aumid'] == g['pfn'] + '!Game'
+        assert g['executablePath'].endswith(folder + '.exe')
+        assert g['image'].startswith('file://') and 'StoreLogo' in g['image']
+
+
+def test_registry_titles_are_keyed_by_package_family(library):
+    games_root, registry = library
+    games = _detect(games_root, registry)
+    with open(registry, encoding='utf-8') as f:
+        pfns = {v['PackageFamilyName'] for v in json.load(f).values()}
+    assert pfns <= {g['id'] for g in games}
+    assert len(games) == N
+    assert all(g['title'] and ' ' in g['title'] for g in games)
+
+
+def test_registry_entry_for_a_folder_title_is_not_duplicated(library):
+    games_root, registry = library
+    folder = sorted(os.listdir(games_root))[0]
+    with open(registry, encoding='utf-8') as f:
+        data = json.load(f)
+    pfn = next(g['pfn'] for g in _detect(games_root, registry) if g['id'] == folder)
+    data['HKLM\\SOFTWARE\\Microsoft\\GamingServices\\Games\\dup'] = {
+        'PackageFamilyName': pfn, 'InstallFullPath': os.path.join(games_root, folder),
+    }
+    with open(registry, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    games = _detect(games_root, registry)
+    assert [g['id'] for g in games].count(folder) == 1
+    assert pfn not in {g['id'] for g in games}
+
+
+def test_cached_manifests_give_the_same_result(library):
+    games_root, registry = library
+    cache = StampCache()
+    first = _detect(games_root, registry, cache)
+    assert cache.entries
+    assert _detect(games_root, registry, cache) == first
+
+
+def test_ms_resource_display_name_falls_back_to_visual_elements(library):
+    games_root, _ = library
+    content = os.path.join(games_root, sorted(os.listdir(games_root))[0], 'Content')
+    os.remove(os.path.join(content, 'MicrosoftGame.config'))
+    pkg = xbox_detect.read_package(content, os.path.join(content, 'AppxManifest.xml'))
+    assert pkg['title'] and not pkg['title'].startswith('ms-resource:')
+    assert pkg['executablePath'].endswith('gamelaunchhelper.exe') and not pkg['isGame']